@@ -0,0 +1,212 @@
+"""
+bar_store.py
+============
+Historique local des bougies OHLCV, par (paire, timeframe).
+
+Chaque série est rangée dans deux fichiers NumPy, ouverts en mémoire
+projetée (mmap) :
+
+    <racine>/<PAIRE>/<tf>.time.npy    horodatages d'ouverture (int64, ns UTC), triés
+    <racine>/<PAIRE>/<tf>.ohlcv.npy   float64 [n, 5] : open, high, low, close, volume
+
+Une plage de dates ne lit que les pages qui la couvrent : recherche binaire
+sur les horodatages, puis tranche des lignes. Le rejeu historique et le
+backtest peuvent donc parcourir plusieurs années sans tout charger.
+
+Alimentation : `write` fusionne un DataFrame (une bougie déjà présente est
+remplacée, ce qui corrige une bougie encore en cours lors de l'écriture
+précédente) ; `sync` y verse la sortie de MarketFeed.get_ohlcv.
+"""
+
+import logging
+import os
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_ROOT = "outputs/bars"
+
+COLUMNS = ("open", "high", "low", "close", "volume")
+
+
+class BarStore:
+    """
+    Magasin local de bougies, une série par (paire, timeframe).
+
+    Utilisation :
+        store = BarStore()
+        store.sync(feed, "EUR/USD", "1h", limit=700)
+        df = store.load("EUR/USD", "1h", start="2023-01-01", warmup=300)
+    """
+
+    def __init__(self, root: str = DEFAULT_ROOT):
+        self.root = root
+
+    # ------------------------------------------------------------------
+    # Lecture
+    # ------------------------------------------------------------------
+
+    def path(self, pair: str, tf: str) -> tuple[str, str]:
+        """Chemins (horodatages, OHLCV) de la série (pair, tf)."""
+        folder = os.path.join(self.root, pair.replace("/", "_"))
+        return (
+            os.path.join(folder, f"{tf}.time.npy"),
+            os.path.join(folder, f"{tf}.ohlcv.npy"),
+        )
+
+    def has(self, pair: str, tf: str) -> bool:
+        return all(os.path.isfile(p) for p in self.path(pair, tf))
+
+    def series(self, pair: str, tf: str) -> tuple[np.ndarray, np.ndarray] | None:
+        """
+        Tableaux (horodatages, OHLCV) de la série, en mémoire projetée.
+
+        Returns:
+            (int64 [n] ns UTC, float64 [n, 5]) ou None si la série est absente.
+        """
+        if not self.has(pair, tf):
+            return None
+        time_path, ohlcv_path = self.path(pair, tf)
+        try:
+            times = np.load(time_path, mmap_mode="r")
+            ohlcv = np.load(ohlcv_path, mmap_mode="r")
+        except (OSError, ValueError) as exc:
+            logger.error("Série illisible %s %s : %s", pair, tf, exc)
+            return None
+        if len(times) != len(ohlcv):
+            # Écriture interrompue entre les deux fichiers : partie commune
+            logger.warning("Série %s %s incohérente (%d / %d lignes)", pair, tf, len(times), len(ohlcv))
+            n = min(len(times), len(ohlcv))
+            times, ohlcv = times[:n], ohlcv[:n]
+        return times, ohlcv
+
+    def span(self, pair: str, tf: str) -> tuple[pd.Timestamp, pd.Timestamp, int] | None:
+        """(première bougie, dernière bougie, nombre de bougies) ou None."""
+        series = self.series(pair, tf)
+        if series is None or not len(series[0]):
+            return None
+        times = series[0]
+        return pd.Timestamp(int(times[0])), pd.Timestamp(int(times[-1])), len(times)
+
+    def locate(self, pair: str, tf: str, start=None, end=None) -> tuple[int, int]:
+        """Lignes [début, fin[ des bougies ouvertes dans [start, end[."""
+        series = self.series(pair, tf)
+        if series is None:
+            return 0, 0
+        times = series[0]
+        lo = 0 if start is None else int(np.searchsorted(times, self._ns(start), side="left"))
+        hi = len(times) if end is None else int(np.searchsorted(times, self._ns(end), side="left"))
+        return lo, max(hi, lo)
+
+    def load(self, pair: str, tf: str, start=None, end=None, warmup: int = 0) -> pd.DataFrame | None:
+        """
+        Bougies ouvertes dans [start, end[, précédées de `warmup` bougies.
+
+        Args:
+            pair   : paire (ex : "EUR/USD")
+            tf     : timeframe (ex : "1h")
+            start  : date de début (incluse), None = début de la série
+            end    : date de fin (exclue), None = fin de la série
+            warmup : bougies supplémentaires avant `start` (fenêtres, indicateurs)
+
+        Returns:
+            DataFrame [timestamp, open, high, low, close, volume] (timestamp
+            naïf en UTC), ou None si la série est absente ou vide.
+        """
+        series = self.series(pair, tf)
+        if series is None:
+            return None
+        lo, hi = self.locate(pair, tf, start, end)
+        return self._frame(series, max(lo - warmup, 0), hi)
+
+    def rows(self, pair: str, tf: str, lo: int, hi: int) -> pd.DataFrame | None:
+        """Bougies des lignes [lo, hi[ de la série (seules ces pages sont lues)."""
+        series = self.series(pair, tf)
+        return None if series is None else self._frame(series, lo, hi)
+
+    # ------------------------------------------------------------------
+    # Écriture
+    # ------------------------------------------------------------------
+
+    def write(self, pair: str, tf: str, df: pd.DataFrame) -> int:
+        """
+        Fusionne les bougies de `df` dans la série (pair, tf).
+
+        Une bougie de même horodatage remplace l'ancienne. Les deux fichiers
+        sont réécrits de façon atomique (fichier temporaire puis os.replace).
+
+        Returns:
+            Nombre de bougies nouvelles.
+        """
+        if df is None or len(df) == 0:
+            return 0
+
+        if "timestamp" in df.columns:
+            stamps = df["timestamp"]
+        else:
+            stamps = df.index.to_series()
+        times = (
+            pd.to_datetime(stamps, utc=True).dt.tz_localize(None)
+            .to_numpy(dtype="datetime64[ns]").view(np.int64)
+        )
+        ohlcv = df[list(COLUMNS)].to_numpy(dtype=float)
+        keep  = ~np.isnan(ohlcv[:, :4]).any(axis=1)
+        times, ohlcv = times[keep], ohlcv[keep]
+
+        series = self.series(pair, tf)
+        before = 0
+        if series is not None:
+            old_times, old_ohlcv = (np.asarray(a) for a in series)
+            before = len(old_times)
+            times  = np.concatenate([old_times, times])
+            ohlcv  = np.concatenate([old_ohlcv, ohlcv])
+
+        # Dernière occurrence de chaque horodatage (la plus récente écrite)
+        order = np.lexsort((np.arange(len(times)), times))
+        times, ohlcv = times[order], ohlcv[order]
+        last = np.ones(len(times), dtype=bool)
+        last[:-1] = times[1:] != times[:-1]
+        times, ohlcv = times[last], np.ascontiguousarray(ohlcv[last])
+
+        time_path, ohlcv_path = self.path(pair, tf)
+        os.makedirs(os.path.dirname(time_path), exist_ok=True)
+        for path, values in ((ohlcv_path, ohlcv), (time_path, times)):
+            tmp = f"{path}.tmp.npy"
+            np.save(tmp, values)
+            os.replace(tmp, path)
+
+        added = len(times) - before
+        logger.debug("Bar store %s %s : %d bougie(s) ajoutée(s), %d au total", pair, tf, added, len(times))
+        return added
+
+    def sync(self, feed, pair: str, tf: str, limit: int = 300) -> int:
+        """Télécharge les dernières bougies via MarketFeed et les fusionne."""
+        df = feed.get_ohlcv(pair, tf, limit=limit)
+        if df is None or len(df) == 0:
+            logger.warning("Bar store : aucune bougie reçue pour %s %s", pair, tf)
+            return 0
+        return self.write(pair, tf, df)
+
+    # ------------------------------------------------------------------
+    # Helpers internes
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _ns(value) -> int:
+        """Date (str, datetime, Timestamp) → ns UTC naïf."""
+        ts = pd.Timestamp(value)
+        if ts.tzinfo is not None:
+            ts = ts.tz_convert("UTC").tz_localize(None)
+        return int(ts.as_unit("ns").value)
+
+    @staticmethod
+    def _frame(series: tuple, lo: int, hi: int) -> pd.DataFrame | None:
+        times, ohlcv = series
+        if hi <= lo:
+            return None
+        values = np.asarray(ohlcv[lo:hi])
+        df = pd.DataFrame(values, columns=list(COLUMNS))
+        df.insert(0, "timestamp", pd.to_datetime(np.asarray(times[lo:hi]), unit="ns"))
+        return df
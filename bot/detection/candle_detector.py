@@ -30,10 +30,29 @@ class CandleDetector:
     # Période ATR pour l'indication de volatilité
     ATR_PERIODE = 14
 
+    # Figures testées, dans l'ordre d'émission des signaux :
+    # (clé du masque, direction, type de zone S/R requis, description)
+    # Le Doji prend la direction de la zone S/R la plus proche.
+    FIGURES = [
+        ("PIN_BAR_BULLISH",      "LONG",  "support",    "Pin Bar Bullish sur zone support {zone:.4f}"),
+        ("PIN_BAR_BEARISH",      "SHORT", "resistance", "Pin Bar Bearish (Shooting Star) sur zone résistance {zone:.4f}"),
+        ("HAMMER_BULLISH",       "LONG",  "support",    "Hammer Bullish sur zone support {zone:.4f}"),
+        ("ENGULFING_BULLISH",    "LONG",  "support",    "Engulfing Bullish sur zone support {zone:.4f}"),
+        ("ENGULFING_BEARISH",    "SHORT", "resistance", "Engulfing Bearish sur zone résistance {zone:.4f}"),
+        ("MORNING_STAR_BULLISH", "LONG",  "support",    "Morning Star Bullish sur zone support {zone:.4f}"),
+        ("EVENING_STAR_BEARISH", "SHORT", "resistance", "Evening Star Bearish sur zone résistance {zone:.4f}"),
+        ("HARAMI_BULLISH",       "LONG",  "support",    "Harami Bullish sur zone support {zone:.4f}"),
+        ("HARAMI_BEARISH",       "SHORT", "resistance", "Harami Bearish sur zone résistance {zone:.4f}"),
+        ("DOJI",                 None,    None,         "Doji sur zone {label} {zone:.4f}"),
+    ]
+
     def detect(self, df: pd.DataFrame, sr_zones: list) -> list[dict]:
         """
         Détecte les chandeliers de retournement sur les 3 dernières barres.
 
+        Les masques de `scan` sont calculés sur les 3 dernières bougies ;
+        seul leur dernier élément (bougie actuelle) est retenu.
+
         Paramètres
         ----------
         df : pd.DataFrame
@@ -57,39 +76,186 @@ class CandleDetector:
         # --- ATR pour la valeur atr dans le signal ---
         atr_value = self._calculer_atr_dernier(df)
 
-        # --- Extraction des 3 dernières bougies ---
-        c0 = df.iloc[-1]   # Bougie actuelle (signal)
-        c1 = df.iloc[-2]   # Bougie précédente
-        c2 = df.iloc[-3]   # Bougie ante-précédente
+        ohlc = df[["open", "high", "low", "close"]].to_numpy(dtype=float)[-3:]
+        masques = self._masques(*ohlc.T)
+        bougie = dict(zip(("open", "high", "low", "close"), ohlc[-1].tolist()))
 
         signaux: list[dict] = []
-
-        # --- Lancement des détecteurs individuels ---
-        detecteurs = [
-            self._pin_bar_bullish,
-            self._pin_bar_bearish,
-            self._hammer,
-            self._engulfing_bullish,
-            self._engulfing_bearish,
-            self._morning_star,
-            self._evening_star,
-            self._harami_bullish,
-            self._harami_bearish,
-            self._doji,
-        ]
-
-        for detecteur in detecteurs:
-            try:
-                signal = detecteur(c0, c1, c2, sr_zones, atr_value)
-                if signal is not None:
-                    signaux.append(signal)
-                    logger.info("Signal détecté : %s à %.4f", signal["pattern"], signal["price"])
-            except Exception as exc:
-                logger.error("Erreur dans %s : %s", detecteur.__name__, exc)
+        for cle, direction, type_zone, description in self.FIGURES:
+            if not masques[cle][-1]:
+                continue
+            proche, zone = self._is_near_sr(bougie["close"], sr_zones, self.TOLERANCE_SR)
+            signal = self._signal_figure(cle, direction, type_zone, description, bougie, zone, atr_value)
+            if proche and signal is not None:
+                signaux.append(signal)
+                logger.info("Signal détecté : %s à %.4f", signal["pattern"], signal["price"])
 
         logger.debug("%d signal(s) chandelier trouvé(s).", len(signaux))
         return signaux
 
+    def scan(self, bars: pd.DataFrame, sr_zones: list = None) -> dict[str, np.ndarray]:
+        """
+        Calcule en une passe les masques de toutes les figures sur tout l'historique.
+
+        Corps, ombres, range et relations entre bougies consécutives
+        (englobement, harami, étoiles) sont évalués sous forme de tableaux :
+        masques[cle][t] est vrai si la figure `cle` se termine sur la bougie t.
+        Les figures à 2 ou 3 bougies sont fausses sur les premières barres.
+
+        Paramètres
+        ----------
+        bars : pd.DataFrame
+            DataFrame OHLCV (colonnes insensibles à la casse).
+        sr_zones : list[dict], optionnel
+            Si fourni, chaque masque exige en plus la zone S/R du bon type
+            (support ou résistance, l'une ou l'autre pour le Doji) à moins
+            de TOLERANCE_SR de la clôture.
+
+        Retourne
+        --------
+        dict[str, np.ndarray]
+            Masque booléen (longueur len(bars)) par clé de FIGURES.
+        """
+        colonnes = {c.lower(): c for c in bars.columns}
+        o, h, l, cl = (
+            bars[colonnes[k]].to_numpy(dtype=float) for k in ("open", "high", "low", "close")
+        )
+        masques = self._masques(o, h, l, cl)
+
+        if sr_zones is not None:
+            _, types = self._zones_proches(cl, sr_zones)
+            support, resistance = types == "support", types == "resistance"
+            for cle, _, type_zone, _ in self.FIGURES:
+                if type_zone == "support":
+                    masques[cle] &= support
+                elif type_zone == "resistance":
+                    masques[cle] &= resistance
+                else:
+                    masques[cle] &= support | resistance
+
+        return masques
+
+    def _masques(
+        self, o: np.ndarray, h: np.ndarray, l: np.ndarray, cl: np.ndarray
+    ) -> dict[str, np.ndarray]:
+        """Masques géométriques de toutes les figures (sans condition S/R)."""
+        body = np.abs(cl - o)
+        rng_brut = h - l
+        rng = np.maximum(rng_brut, 1e-12)
+        ombre_b = np.minimum(o, cl) - l
+        ombre_h = h - np.maximum(o, cl)
+        position_close = (cl - l) / rng
+        hausse = cl > o
+        baisse = cl < o
+        grand_corps = body >= 0.5 * rng
+        petit_corps = (rng_brut <= 1e-12) | (body < 0.30 * rng)
+
+        # Valeurs des bougies précédentes (c1 = t-1, c2 = t-2)
+        o1, cl1, hausse1, baisse1, grand1, petit1 = (
+            self._decaler(x, 1) for x in (o, cl, hausse, baisse, grand_corps, petit_corps)
+        )
+        o2, cl2, hausse2, baisse2, grand2 = (
+            self._decaler(x, 2) for x in (o, cl, hausse, baisse, grand_corps)
+        )
+        milieu_c2 = (o2 + cl2) / 2
+
+        corps_ok = body >= 1e-12
+        return {
+            "PIN_BAR_BULLISH":      corps_ok & (ombre_b >= 2.5 * body) & (position_close >= 0.60),
+            "PIN_BAR_BEARISH":      corps_ok & (ombre_h >= 2.5 * body) & (position_close <= 0.40),
+            "HAMMER_BULLISH":       hausse & (body < 0.30 * rng) & corps_ok
+                                    & (ombre_b >= 2.0 * body) & (ombre_h < 0.10 * rng),
+            "ENGULFING_BULLISH":    hausse & baisse1 & (o <= cl1) & (cl >= o1),
+            "ENGULFING_BEARISH":    baisse & hausse1 & (o >= cl1) & (cl <= o1),
+            "MORNING_STAR_BULLISH": baisse2 & grand2 & petit1 & hausse & (cl > milieu_c2),
+            "EVENING_STAR_BEARISH": hausse2 & grand2 & petit1 & baisse & (cl < milieu_c2),
+            "HARAMI_BULLISH":       baisse1 & grand1 & hausse & (o >= cl1) & (cl <= o1),
+            "HARAMI_BEARISH":       hausse1 & grand1 & baisse & (o <= cl1) & (cl >= o1),
+            "DOJI":                 (body < 0.10 * rng) & (ombre_b > 0) & (ombre_h > 0),
+        }
+
+    def detect_history(
+        self,
+        bars: pd.DataFrame,
+        sr_zones: list = None,
+        ends: np.ndarray = None,
+        zones_at=None,
+    ) -> list[dict]:
+        """
+        Mode historique : tous les signaux que detect() aurait émis sur chaque bougie.
+
+        Les masques géométriques et l'ATR de Wilder sont calculés une seule
+        fois sur tout l'historique ; seules les bougies portant une figure
+        cherchent leur zone S/R et construisent un signal.
+
+        Paramètres
+        ----------
+        bars : pd.DataFrame
+            DataFrame OHLCV complet, ordre chronologique.
+        sr_zones : list[dict], optionnel
+            Zones S/R appliquées à toutes les bougies.
+        ends : np.ndarray, optionnel
+            Bougies à évaluer (défaut : toutes).
+        zones_at : callable(bougie) → list[dict], optionnel
+            Zones S/R propres à cette bougie (remplace sr_zones ; appelé
+            seulement pour les bougies portant une figure).
+
+        Retourne
+        --------
+        list[dict]
+            Signaux triés par bougie, avec en plus "bar" (indice absolu) et
+            "timestamp" (si colonne présente).
+        """
+        sr_zones = sr_zones or []
+        if len(bars) < 3 or not (sr_zones or zones_at):
+            return []
+
+        colonnes = {c.lower(): c for c in bars.columns}
+        valeurs = {
+            k: bars[colonnes[k]].to_numpy(dtype=float) for k in ("open", "high", "low", "close")
+        }
+        masques = self._masques(*valeurs.values())
+        atr = self._serie_atr(valeurs["high"], valeurs["low"], valeurs["close"])
+        timestamps = bars[colonnes["timestamp"]].values if "timestamp" in colonnes else None
+
+        # Bougies portant au moins une figure (les 2 premières n'ont pas d'historique)
+        candidates = np.logical_or.reduce(list(masques.values()))
+        candidates[:2] = False
+        if ends is not None:
+            retenues = np.zeros(len(bars), dtype=bool)
+            retenues[np.asarray(ends, dtype=np.int64)] = True
+            candidates &= retenues
+        if zones_at is None:
+            proches, _ = self._zones_proches(valeurs["close"], sr_zones, self.TOLERANCE_SR)
+
+        signaux: list[dict] = []
+        for bar in np.flatnonzero(candidates):
+            if zones_at is None:
+                zones, indice = sr_zones, proches[bar]
+            else:
+                zones = zones_at(int(bar))
+                indice = self._zones_proches(
+                    valeurs["close"][bar:bar + 1], zones, self.TOLERANCE_SR
+                )[0][0]
+            if indice < 0:
+                continue
+
+            bougie = {k: float(v[bar]) for k, v in valeurs.items()}
+            for cle, direction, type_zone, description in self.FIGURES:
+                if not masques[cle][bar]:
+                    continue
+                signal = self._signal_figure(
+                    cle, direction, type_zone, description, bougie, zones[indice], float(atr[bar]),
+                )
+                if signal is None:
+                    continue
+                signal["bar"] = int(bar)
+                if timestamps is not None:
+                    signal["timestamp"] = timestamps[bar]
+                signaux.append(signal)
+
+        return signaux
+
     # ------------------------------------------------------------------
     # Helper : proximité S/R
     # ------------------------------------------------------------------
@@ -120,6 +286,36 @@ class CandleDetector:
 
         return (meilleure_zone is not None), meilleure_zone
 
+    def _zones_proches(
+        self, prix: np.ndarray, sr_zones: list, tolerance: float = 0.005
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Version tableau de `_is_near_sr` : zone la plus proche de chaque prix.
+
+        Retourne
+        --------
+        (np.ndarray, np.ndarray)
+            Indice de la zone dans `sr_zones` (-1 si aucune à portée) et son
+            type ("" si aucune).
+        """
+        indices = np.full(len(prix), -1)
+        types = np.full(len(prix), "", dtype=object)
+        if not sr_zones:
+            return indices, types
+
+        niveaux = np.array([zone.get("price", 0) for zone in sr_zones], dtype=float)
+        valides = niveaux > 0
+        with np.errstate(divide="ignore", invalid="ignore"):
+            distance = np.abs(prix[:, None] - niveaux[None, :]) / niveaux[None, :]
+        distance[:, ~valides] = np.inf
+
+        plus_proche = np.argmin(distance, axis=1)
+        proche = distance[np.arange(len(prix)), plus_proche] <= tolerance
+        indices[proche] = plus_proche[proche]
+        types_zones = np.array([zone.get("type", "") for zone in sr_zones], dtype=object)
+        types[proche] = types_zones[plus_proche[proche]]
+        return indices, types
+
     # ------------------------------------------------------------------
     # Helper : calcul ATR
     # ------------------------------------------------------------------
@@ -154,30 +350,36 @@ class CandleDetector:
 
         return round(atr, 8)
 
-    # ------------------------------------------------------------------
-    # Helpers : mesures d'une bougie
-    # ------------------------------------------------------------------
-
-    @staticmethod
-    def _mesures(c) -> tuple[float, float, float, float, float, float]:
+    def _serie_atr(self, high: np.ndarray, low: np.ndarray, close: np.ndarray) -> np.ndarray:
         """
-        Retourne (open, high, low, close, body, range_total) pour une bougie.
-        body = |close - open|, range_total = high - low (vaut au moins 1e-12).
+        Série de `_calculer_atr_dernier` : valeur ATR(14) vue à chaque bougie
+        (0.0 tant que l'historique est trop court).
         """
-        o, h, l, cl = float(c["open"]), float(c["high"]), float(c["low"]), float(c["close"])
-        body = abs(cl - o)
-        range_total = max(h - l, 1e-12)
-        return o, h, l, cl, body, range_total
+        atr = np.zeros(len(close))
+        if len(close) < self.ATR_PERIODE + 1:
+            return atr
 
-    @staticmethod
-    def _ombre_basse(o: float, l: float, cl: float) -> float:
-        """Longueur de l'ombre basse."""
-        return min(o, cl) - l
+        tr = np.maximum(
+            high[1:] - low[1:],
+            np.maximum(np.abs(high[1:] - close[:-1]), np.abs(low[1:] - close[:-1])),
+        )
+        valeur = float(tr[:self.ATR_PERIODE].mean())
+        atr[self.ATR_PERIODE] = valeur
+        for i in range(self.ATR_PERIODE, len(tr)):
+            valeur = (valeur * (self.ATR_PERIODE - 1) + tr[i]) / self.ATR_PERIODE
+            atr[i + 1] = valeur
+        return np.round(atr, 8)
+
+    # ------------------------------------------------------------------
+    # Helpers : construction des signaux
+    # ------------------------------------------------------------------
 
     @staticmethod
-    def _ombre_haute(o: float, h: float, cl: float) -> float:
-        """Longueur de l'ombre haute."""
-        return h - max(o, cl)
+    def _decaler(x: np.ndarray, k: int) -> np.ndarray:
+        """Décale un tableau de `k` bougies vers le futur (NaN / False en tête)."""
+        decale = np.full(len(x), False if x.dtype == bool else np.nan, dtype=x.dtype)
+        decale[k:] = x[:-k]
+        return decale
 
     @staticmethod
     def _base_signal(pattern: str, direction: str, c, atr: float) -> dict:
@@ -201,349 +403,30 @@ class CandleDetector:
             "description": "",  # Complété par chaque détecteur
         }
 
-    # ------------------------------------------------------------------
-    # Détecteurs individuels
-    # ------------------------------------------------------------------
-
-    def _pin_bar_bullish(self, c0, c1, c2, sr_zones, atr) -> dict | None:
-        """
-        Pin Bar Bullish :
-            - Ombre basse >= 2.5x le corps
-            - Clôture dans les 40% supérieurs du range
-            - Sur zone support
-        """
-        o, h, l, cl, body, rng = self._mesures(c0)
-        ombre_b = self._ombre_basse(o, l, cl)
-
-        if body < 1e-12:
-            return None
-
-        # Condition 1 : ombre basse >= 2.5x corps
-        if ombre_b < 2.5 * body:
-            return None
-
-        # Condition 2 : clôture dans les 40% supérieurs du range
-        position_close = (cl - l) / rng
-        if position_close < 0.60:
-            return None
-
-        # Condition 3 : sur zone support
-        proche, zone = self._is_near_sr(cl, sr_zones, self.TOLERANCE_SR)
-        if not proche or zone is None or zone.get("type") != "support":
-            return None
-
-        signal = self._base_signal("PIN_BAR_BULLISH", "LONG", c0, atr)
-        signal["description"] = f"Pin Bar Bullish sur zone support {zone['price']:.4f}"
-        return signal
-
-    def _pin_bar_bearish(self, c0, c1, c2, sr_zones, atr) -> dict | None:
+    def _signal_figure(
+        self, cle, direction, type_zone, description, c, zone, atr
+    ) -> dict | None:
         """
-        Pin Bar Bearish (Shooting Star) :
-            - Ombre haute >= 2.5x le corps
-            - Clôture dans les 40% inférieurs du range
-            - Sur zone résistance
+        Construit le signal d'une figure de FIGURES à partir de la zone S/R
+        la plus proche, ou None si la zone n'est pas du type requis.
         """
-        o, h, l, cl, body, rng = self._mesures(c0)
-        ombre_h = self._ombre_haute(o, h, cl)
-
-        if body < 1e-12:
-            return None
-
-        # Condition 1 : ombre haute >= 2.5x corps
-        if ombre_h < 2.5 * body:
-            return None
-
-        # Condition 2 : clôture dans les 40% inférieurs du range
-        position_close = (cl - l) / rng
-        if position_close > 0.40:
-            return None
-
-        # Condition 3 : sur zone résistance
-        proche, zone = self._is_near_sr(cl, sr_zones, self.TOLERANCE_SR)
-        if not proche or zone is None or zone.get("type") != "resistance":
-            return None
-
-        signal = self._base_signal("PIN_BAR_BEARISH", "SHORT", c0, atr)
-        signal["description"] = f"Pin Bar Bearish (Shooting Star) sur zone résistance {zone['price']:.4f}"
-        return signal
-
-    def _hammer(self, c0, c1, c2, sr_zones, atr) -> dict | None:
-        """
-        Hammer Bullish :
-            - Petit corps (< 30% du range total)
-            - Ombre basse >= 2x le corps
-            - Ombre haute < 10% du range total
-            - Clôture > Ouverture
-            - Sur zone support
-        """
-        o, h, l, cl, body, rng = self._mesures(c0)
-        ombre_b = self._ombre_basse(o, l, cl)
-        ombre_h = self._ombre_haute(o, h, cl)
-
-        # Clôture haussière
-        if cl <= o:
-            return None
-
-        # Petit corps
-        if body >= 0.30 * rng:
-            return None
-
-        # Ombre basse >= 2x corps
-        if body < 1e-12 or ombre_b < 2.0 * body:
+        if zone is None:
             return None
 
-        # Ombre haute < 10% du range
-        if ombre_h >= 0.10 * rng:
+        if type_zone is None:
+            # Doji : direction déduite du contexte S/R
+            type_zone = zone.get("type", "")
+            if type_zone == "support":
+                direction, label = "LONG", "support"
+            elif type_zone == "resistance":
+                direction, label = "SHORT", "résistance"
+            else:
+                return None
+        elif zone.get("type") != type_zone:
             return None
-
-        # Sur zone support
-        proche, zone = self._is_near_sr(cl, sr_zones, self.TOLERANCE_SR)
-        if not proche or zone is None or zone.get("type") != "support":
-            return None
-
-        signal = self._base_signal("HAMMER_BULLISH", "LONG", c0, atr)
-        signal["description"] = f"Hammer Bullish sur zone support {zone['price']:.4f}"
-        return signal
-
-    def _engulfing_bullish(self, c0, c1, c2, sr_zones, atr) -> dict | None:
-        """
-        Engulfing Bullish :
-            - c0 haussier (close > open)
-            - c1 baissier (close < open)
-            - Corps de c0 englobe entièrement le corps de c1
-            - Sur zone support
-        """
-        o0, h0, l0, cl0, _, _ = self._mesures(c0)
-        o1, h1, l1, cl1, _, _ = self._mesures(c1)
-
-        # c0 haussier, c1 baissier
-        if cl0 <= o0 or cl1 >= o1:
-            return None
-
-        # Englobement des corps
-        if o0 > cl1 or cl0 < o1:
-            return None
-
-        # Sur zone support
-        proche, zone = self._is_near_sr(cl0, sr_zones, self.TOLERANCE_SR)
-        if not proche or zone is None or zone.get("type") != "support":
-            return None
-
-        signal = self._base_signal("ENGULFING_BULLISH", "LONG", c0, atr)
-        signal["description"] = f"Engulfing Bullish sur zone support {zone['price']:.4f}"
-        return signal
-
-    def _engulfing_bearish(self, c0, c1, c2, sr_zones, atr) -> dict | None:
-        """
-        Engulfing Bearish :
-            - c0 baissier (close < open)
-            - c1 haussier (close > open)
-            - Corps de c0 englobe entièrement le corps de c1
-            - Sur zone résistance
-        """
-        o0, h0, l0, cl0, _, _ = self._mesures(c0)
-        o1, h1, l1, cl1, _, _ = self._mesures(c1)
-
-        # c0 baissier, c1 haussier
-        if cl0 >= o0 or cl1 <= o1:
-            return None
-
-        # Englobement des corps
-        if o0 < cl1 or cl0 > o1:
-            return None
-
-        # Sur zone résistance
-        proche, zone = self._is_near_sr(cl0, sr_zones, self.TOLERANCE_SR)
-        if not proche or zone is None or zone.get("type") != "resistance":
-            return None
-
-        signal = self._base_signal("ENGULFING_BEARISH", "SHORT", c0, atr)
-        signal["description"] = f"Engulfing Bearish sur zone résistance {zone['price']:.4f}"
-        return signal
-
-    def _morning_star(self, c0, c1, c2, sr_zones, atr) -> dict | None:
-        """
-        Morning Star (3 bougies, Bullish) :
-            - c2 : baissier avec grand corps
-            - c1 : petit corps (doji-like), gap ou chevauchement
-            - c0 : haussier, clôture au-dessus du milieu du corps de c2
-            - Sur zone support
-        """
-        o0, h0, l0, cl0, body0, rng0 = self._mesures(c0)
-        o1, h1, l1, cl1, body1, rng1 = self._mesures(c1)
-        o2, h2, l2, cl2, body2, rng2 = self._mesures(c2)
-
-        # c2 baissier avec grand corps
-        if cl2 >= o2:
-            return None
-        if body2 < 0.5 * rng2:   # Grand corps = > 50% du range
-            return None
-
-        # c1 petit corps (< 30% de son range)
-        if rng1 > 1e-12 and body1 >= 0.30 * rng1:
-            return None
-
-        # c0 haussier
-        if cl0 <= o0:
-            return None
-
-        # c0 clôture au-dessus du milieu du corps de c2
-        milieu_c2 = (o2 + cl2) / 2
-        if cl0 <= milieu_c2:
-            return None
-
-        # Sur zone support
-        proche, zone = self._is_near_sr(cl0, sr_zones, self.TOLERANCE_SR)
-        if not proche or zone is None or zone.get("type") != "support":
-            return None
-
-        signal = self._base_signal("MORNING_STAR_BULLISH", "LONG", c0, atr)
-        signal["description"] = f"Morning Star Bullish sur zone support {zone['price']:.4f}"
-        return signal
-
-    def _evening_star(self, c0, c1, c2, sr_zones, atr) -> dict | None:
-        """
-        Evening Star (3 bougies, Bearish) :
-            - c2 : haussier avec grand corps
-            - c1 : petit corps
-            - c0 : baissier, clôture en-dessous du milieu du corps de c2
-            - Sur zone résistance
-        """
-        o0, h0, l0, cl0, body0, rng0 = self._mesures(c0)
-        o1, h1, l1, cl1, body1, rng1 = self._mesures(c1)
-        o2, h2, l2, cl2, body2, rng2 = self._mesures(c2)
-
-        # c2 haussier avec grand corps
-        if cl2 <= o2:
-            return None
-        if body2 < 0.5 * rng2:
-            return None
-
-        # c1 petit corps
-        if rng1 > 1e-12 and body1 >= 0.30 * rng1:
-            return None
-
-        # c0 baissier
-        if cl0 >= o0:
-            return None
-
-        # c0 clôture en-dessous du milieu du corps de c2
-        milieu_c2 = (o2 + cl2) / 2
-        if cl0 >= milieu_c2:
-            return None
-
-        # Sur zone résistance
-        proche, zone = self._is_near_sr(cl0, sr_zones, self.TOLERANCE_SR)
-        if not proche or zone is None or zone.get("type") != "resistance":
-            return None
-
-        signal = self._base_signal("EVENING_STAR_BEARISH", "SHORT", c0, atr)
-        signal["description"] = f"Evening Star Bearish sur zone résistance {zone['price']:.4f}"
-        return signal
-
-    def _harami_bullish(self, c0, c1, c2, sr_zones, atr) -> dict | None:
-        """
-        Harami Bullish :
-            - c1 : grand bougie baissière
-            - c0 : petite bougie haussière entièrement à l'intérieur du corps de c1
-            - Sur zone support
-        """
-        o0, h0, l0, cl0, body0, rng0 = self._mesures(c0)
-        o1, h1, l1, cl1, body1, rng1 = self._mesures(c1)
-
-        # c1 baissier avec grand corps
-        if cl1 >= o1:
-            return None
-        if body1 < 0.5 * rng1:
-            return None
-
-        # c0 haussier
-        if cl0 <= o0:
-            return None
-
-        # Corps de c0 entièrement à l'intérieur du corps de c1
-        # Corps de c1 va de cl1 (bas) à o1 (haut) car c1 est baissier
-        if o0 < cl1 or cl0 > o1:
-            return None
-
-        # Sur zone support
-        proche, zone = self._is_near_sr(cl0, sr_zones, self.TOLERANCE_SR)
-        if not proche or zone is None or zone.get("type") != "support":
-            return None
-
-        signal = self._base_signal("HARAMI_BULLISH", "LONG", c0, atr)
-        signal["description"] = f"Harami Bullish sur zone support {zone['price']:.4f}"
-        return signal
-
-    def _harami_bearish(self, c0, c1, c2, sr_zones, atr) -> dict | None:
-        """
-        Harami Bearish :
-            - c1 : grand bougie haussière
-            - c0 : petite bougie baissière entièrement à l'intérieur du corps de c1
-            - Sur zone résistance
-        """
-        o0, h0, l0, cl0, body0, rng0 = self._mesures(c0)
-        o1, h1, l1, cl1, body1, rng1 = self._mesures(c1)
-
-        # c1 haussier avec grand corps
-        if cl1 <= o1:
-            return None
-        if body1 < 0.5 * rng1:
-            return None
-
-        # c0 baissier
-        if cl0 >= o0:
-            return None
-
-        # Corps de c0 entièrement à l'intérieur du corps de c1
-        # Corps de c1 va de o1 (bas) à cl1 (haut) car c1 est haussier
-        if o0 > cl1 or cl0 < o1:
-            return None
-
-        # Sur zone résistance
-        proche, zone = self._is_near_sr(cl0, sr_zones, self.TOLERANCE_SR)
-        if not proche or zone is None or zone.get("type") != "resistance":
-            return None
-
-        signal = self._base_signal("HARAMI_BEARISH", "SHORT", c0, atr)
-        signal["description"] = f"Harami Bearish sur zone résistance {zone['price']:.4f}"
-        return signal
-
-    def _doji(self, c0, c1, c2, sr_zones, atr) -> dict | None:
-        """
-        Doji :
-            - Corps < 10% du range total
-            - Les deux ombres sont présentes
-            - Direction déduite du contexte S/R :
-                LONG si sur support, SHORT si sur résistance
-        """
-        o, h, l, cl, body, rng = self._mesures(c0)
-        ombre_b = self._ombre_basse(o, l, cl)
-        ombre_h = self._ombre_haute(o, h, cl)
-
-        # Corps inférieur à 10% du range
-        if body >= 0.10 * rng:
-            return None
-
-        # Les deux ombres doivent être présentes (> 0)
-        if ombre_b <= 0 or ombre_h <= 0:
-            return None
-
-        # Contexte S/R pour déterminer la direction
-        proche, zone = self._is_near_sr(cl, sr_zones, self.TOLERANCE_SR)
-        if not proche or zone is None:
-            return None
-
-        type_zone = zone.get("type", "")
-        if type_zone == "support":
-            direction = "LONG"
-            label = "support"
-        elif type_zone == "resistance":
-            direction = "SHORT"
-            label = "résistance"
         else:
-            return None
+            label = ""
 
-        signal = self._base_signal("DOJI", direction, c0, atr)
-        signal["description"] = f"Doji sur zone {label} {zone['price']:.4f}"
+        signal = self._base_signal(cle, direction, c, atr)
+        signal["description"] = description.format(zone=zone["price"], label=label)
         return signal
@@ -87,6 +87,109 @@ class CompressionDetector:
         )
         return [compression_trouvee]
 
+    def detect_history(self, df: pd.DataFrame) -> list[dict]:
+        """
+        Mode historique : toutes les zones de compression d'un historique complet.
+
+        Pour chaque bougie de fin, la plus grande fenêtre (5 à 15 barres) qui
+        valide les deux critères est retenue. Les tables de range et de ratio
+        ATR sont calculées en une passe pour toutes les bougies.
+
+        Paramètres
+        ----------
+        df : pd.DataFrame
+            DataFrame OHLCV complet, ordre chronologique.
+
+        Retourne
+        --------
+        list[dict]
+            Compressions triées par bougie de fin, au format de detect(), avec
+            en plus "bar" (indice absolu) et "timestamp" (si colonne présente).
+        """
+        df = df.copy()
+        df.columns = [c.lower() for c in df.columns]
+
+        min_barres = self.ATR_PERIODE + self.FENETRE_MAX + self.ATR_PERIODE
+        if len(df) < min_barres:
+            logger.warning(
+                "DataFrame trop court (%d barres) — minimum requis : %d.",
+                len(df), min_barres
+            )
+            return []
+
+        atr = self._calculer_atr(df).to_numpy()
+        fins = np.arange(len(df))
+        table = self._table_compression(df, atr, fins, debut_min=0)
+
+        trouvee = table["valide"].any(axis=1)
+        colonne = table["valide"].argmax(axis=1)
+        timestamps = df["timestamp"].values if "timestamp" in df.columns else None
+
+        compressions: list[dict] = []
+        for ligne in np.flatnonzero(trouvee):
+            compression = self._compression(table, ligne, colonne[ligne])
+            compression["bar"] = int(fins[ligne])
+            if timestamps is not None:
+                compression["timestamp"] = timestamps[fins[ligne]]
+            compressions.append(compression)
+
+        logger.debug("%d compression(s) sur l'historique.", len(compressions))
+        return compressions
+
+    def detect_at(self, df: pd.DataFrame, ends: np.ndarray) -> list[dict]:
+        """
+        Rejoue detect() sur chaque bougie de `ends` d'un historique complet.
+
+        La bougie t reçoit la compression que detect(df.iloc[:t + 1]) aurait
+        retournée (la plus récente des 20 barres se terminant en t, puis la
+        plus grande) : l'ATR de Wilder étant causal, il est calculé une seule
+        fois, et les tables des bougies de `ends` sont évaluées d'un bloc.
+
+        Paramètres
+        ----------
+        df : pd.DataFrame
+            DataFrame OHLCV complet, ordre chronologique.
+        ends : np.ndarray
+            Bougies où detect() est rejoué.
+
+        Retourne
+        --------
+        list[dict]
+            Compressions au format de detect(), triées par bougie, avec en plus
+            "bar" (bougie d'évaluation) et "timestamp" (si colonne présente).
+            Les indices de bougie ("compression_start_bar") sont absolus.
+        """
+        df = df.copy()
+        df.columns = [c.lower() for c in df.columns]
+
+        min_barres = self.ATR_PERIODE + self.FENETRE_MAX + self.ATR_PERIODE
+        ends = np.asarray(ends, dtype=np.int64)
+        ends = ends[(ends >= min_barres - 1) & (ends < len(df))]
+        if not len(ends):
+            return []
+
+        # Lignes de chaque bougie t : fins t, t-1, …, t-15 (comme _chercher_compression)
+        recul = np.arange(self.FENETRE_MAX - self.FENETRE_MIN + 1)
+        fins = (ends[:, None] - recul[None, :]).ravel()
+        debut_min = np.repeat(ends - self.FENETRE_MAX + 1, len(recul))[:, None]
+        table = self._table_compression(df, self._calculer_atr(df).to_numpy(), fins, debut_min)
+
+        valide = table["valide"].reshape(len(ends), -1)
+        cases = valide.argmax(axis=1)
+        timestamps = df["timestamp"].values if "timestamp" in df.columns else None
+
+        compressions: list[dict] = []
+        for k in np.flatnonzero(valide.any(axis=1)):
+            ligne, colonne = divmod(int(cases[k]), table["valide"].shape[1])
+            compression = self._compression(table, k * len(recul) + ligne, colonne)
+            compression["bar"] = int(ends[k])
+            if timestamps is not None:
+                compression["timestamp"] = timestamps[ends[k]]
+            compressions.append(compression)
+
+        logger.debug("%d compression(s) sur %d bougie(s).", len(compressions), len(ends))
+        return compressions
+
     # ------------------------------------------------------------------
     # Méthodes privées
     # ------------------------------------------------------------------
@@ -98,30 +201,33 @@ class CompressionDetector:
         True Range = max(H-L, |H-Cp|, |L-Cp|)
         ATR = Wilder EMA du True Range sur ATR_PERIODE barres.
         """
-        high = df["high"]
-        low = df["low"]
-        close_prev = df["close"].shift(1)
-
-        # True Range sur chaque bougie
-        tr = pd.concat([
-            high - low,
-            (high - close_prev).abs(),
-            (low - close_prev).abs(),
-        ], axis=1).max(axis=1)
-
-        # Première valeur de l'ATR : moyenne simple des 14 premières TR
-        atr = pd.Series(index=df.index, dtype=float)
+        high = df["high"].to_numpy(dtype=float)
+        low = df["low"].to_numpy(dtype=float)
+        close = df["close"].to_numpy(dtype=float)
+
+        # True Range sur chaque bougie (la première n'a pas de clôture précédente)
+        tr = high - low
+        tr[1:] = np.maximum.reduce([
+            tr[1:],
+            np.abs(high[1:] - close[:-1]),
+            np.abs(low[1:] - close[:-1]),
+        ])
+
+        atr = np.full(len(df), np.nan)
         periode = self.ATR_PERIODE
 
-        # Initialisation avec la moyenne simple des 'periode' premières valeurs TR
-        atr.iloc[periode] = tr.iloc[1:periode + 1].mean()
+        if len(df) > periode:
+            # Initialisation avec la moyenne simple des 'periode' premières valeurs TR
+            valeur = float(tr[1:periode + 1].mean())
+            atr[periode] = valeur
 
-        # Lissage Wilder : ATR(i) = (ATR(i-1) * (n-1) + TR(i)) / n
-        for i in range(periode + 1, len(df)):
-            atr.iloc[i] = (atr.iloc[i - 1] * (periode - 1) + tr.iloc[i]) / periode
+            # Lissage Wilder : ATR(i) = (ATR(i-1) * (n-1) + TR(i)) / n
+            for i, tr_i in enumerate(tr[periode + 1:].tolist(), start=periode + 1):
+                valeur = (valeur * (periode - 1) + tr_i) / periode
+                atr[i] = valeur
 
         logger.debug("ATR calculé sur %d barres.", len(df))
-        return atr
+        return pd.Series(atr, index=df.index)
 
     def _chercher_compression(
         self, df: pd.DataFrame, atr_series: pd.Series
@@ -133,79 +239,115 @@ class CompressionDetector:
         Une compression est valide si :
             - range relatif de la fenêtre < SEUIL_RANGE
             - ATR courant < ATR_REFERENCE * SEUIL_ATR_RATIO
+
+        La table (bougie de fin décroissante × taille décroissante) est
+        calculée d'un bloc ; la première case valide est la fenêtre la plus
+        récente, puis la plus grande.
         """
         n = len(df)
         # Indice de début de la zone d'analyse (20 dernières barres)
         debut_analyse = n - self.FENETRE_MAX
 
-        meilleure_compression = None
-        # On cherche la fenêtre la plus récente (on commence par la fin)
-        for fin in range(n - 1, debut_analyse + self.FENETRE_MIN - 2, -1):
-            for taille in range(self.FENETRE_TAILLE_MAX, self.FENETRE_MIN - 1, -1):
-                debut = fin - taille + 1
-                if debut < debut_analyse:
-                    continue
-
-                # Données de la fenêtre
-                fenetre = df.iloc[debut:fin + 1]
-                max_high = float(fenetre["high"].max())
-                min_low = float(fenetre["low"].min())
-                close_fin = float(fenetre["close"].iloc[-1])
-
-                if close_fin == 0:
-                    continue
-
-                range_relatif = (max_high - min_low) / close_fin
-
-                # ATR courant : dernière valeur valide dans la fenêtre
-                atr_courant = atr_series.iloc[fin]
-                if pd.isna(atr_courant) or atr_courant == 0:
-                    continue
-
-                # ATR de référence : 14 barres avant le début de la fenêtre
-                idx_ref = debut - self.ATR_PERIODE
-                if idx_ref < 0:
-                    continue
-
-                atr_reference = atr_series.iloc[idx_ref]
-                if pd.isna(atr_reference) or atr_reference == 0:
-                    continue
-
-                atr_ratio = atr_courant / atr_reference
-
-                # Validation des deux critères
-                if range_relatif < self.SEUIL_RANGE and atr_ratio < self.SEUIL_ATR_RATIO:
-                    compression = {
-                        "pattern": "COMPRESSION",
-                        "direction": "NEUTRE",
-                        "pattern_clarity": 3,
-                        "compression_zone": True,
-                        "zone_high": round(max_high, 8),
-                        "zone_low": round(min_low, 8),
-                        "range_pct": round(range_relatif, 6),
-                        "bars_count": taille,
-                        "atr_ratio": round(atr_ratio, 4),
-                        "description": (
-                            f"Zone de compression de {taille} bougies "
-                            f"({range_relatif * 100:.1f}% range)"
-                        ),
-                        # Alias pour drawers
-                        "compression_start_bar": int(debut),
-                        "compression_high":      round(max_high, 8),
-                        "compression_low":       round(min_low, 8),
-                        "nb_bougies":            taille,
-                    }
-
-                    # On prend la première trouvée (la plus récente car on itère à rebours)
-                    if meilleure_compression is None:
-                        meilleure_compression = compression
-                        logger.debug(
-                            "Compression candidate : taille=%d, range=%.4f, atr_ratio=%.3f",
-                            taille, range_relatif, atr_ratio,
-                        )
-                    # On continue pour potentiellement trouver une fenêtre plus grande
-                    # sur le même point final (plus de barres = signal plus fort)
-                    elif taille > meilleure_compression["bars_count"] and fin == n - 1:
-                        meilleure_compression = compression
-
-        return meilleure_compression
+        fins = np.arange(n - 1, debut_analyse + self.FENETRE_MIN - 2, -1)
+        table = self._table_compression(df, atr_series.to_numpy(), fins, debut_analyse)
+
+        valide = table["valide"].ravel()
+        if not valide.any():
+            return None
+
+        ligne, colonne = divmod(int(valide.argmax()), table["valide"].shape[1])
+        compression = self._compression(table, ligne, colonne)
+        logger.debug(
+            "Compression candidate : taille=%d, range=%.4f, atr_ratio=%.3f",
+            compression["bars_count"], table["range"][ligne, colonne],
+            table["atr_ratio"][ligne, colonne],
+        )
+        return compression
+
+    def _table_compression(
+        self, df: pd.DataFrame, atr: np.ndarray, fins: np.ndarray, debut_min
+    ) -> dict[str, np.ndarray]:
+        """
+        Tables (bougie de fin × taille) des deux critères de compression.
+
+        Les plus hauts / plus bas de toutes les tailles 5 à 15 viennent d'une
+        seule vue glissante de FENETRE_TAILLE_MAX barres, cumulée depuis la
+        bougie de fin. Les colonnes sont rangées par taille décroissante.
+
+        Paramètres
+        ----------
+        atr : np.ndarray
+            Série ATR de `_calculer_atr`.
+        fins : np.ndarray
+            Indices des bougies de fin (lignes de la table).
+        debut_min : int | np.ndarray
+            Indice minimal du début d'une fenêtre (colonne : un par ligne).
+        """
+        largeur = self.FENETRE_TAILLE_MAX
+        tailles = np.arange(largeur, self.FENETRE_MIN - 1, -1)
+
+        high = np.concatenate([np.full(largeur - 1, -np.inf), df["high"].to_numpy(dtype=float)])
+        low = np.concatenate([np.full(largeur - 1, np.inf), df["low"].to_numpy(dtype=float)])
+        close = df["close"].to_numpy(dtype=float)[fins]
+
+        # Vue [fin - 14, fin] inversée : le cumul donne l'extrême des k dernières barres
+        vue_high = np.lib.stride_tricks.sliding_window_view(high, largeur)[fins, ::-1]
+        vue_low = np.lib.stride_tricks.sliding_window_view(low, largeur)[fins, ::-1]
+        max_high = np.maximum.accumulate(vue_high, axis=1)[:, tailles - 1]
+        min_low = np.minimum.accumulate(vue_low, axis=1)[:, tailles - 1]
+
+        debut = fins[:, None] - tailles[None, :] + 1
+        idx_ref = debut - self.ATR_PERIODE
+        atr_courant = atr[fins][:, None]
+        atr_reference = np.where(idx_ref >= 0, atr[np.maximum(idx_ref, 0)], np.nan)
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            range_relatif = (max_high - min_low) / close[:, None]
+            atr_ratio = atr_courant / atr_reference
+
+        valide = (
+            (debut >= debut_min)
+            & (close[:, None] != 0)
+            & np.isfinite(atr_courant) & (atr_courant != 0)
+            & np.isfinite(atr_reference) & (atr_reference != 0)
+            & (range_relatif < self.SEUIL_RANGE)
+            & (atr_ratio < self.SEUIL_ATR_RATIO)
+        )
+
+        return {
+            "valide": valide,
+            "debut": debut,
+            "taille": np.broadcast_to(tailles, valide.shape),
+            "max_high": max_high,
+            "min_low": min_low,
+            "range": range_relatif,
+            "atr_ratio": atr_ratio,
+        }
+
+    @staticmethod
+    def _compression(table: dict, ligne: int, colonne: int) -> dict:
+        """Construit le dict de compression d'une case de la table."""
+        max_high = float(table["max_high"][ligne, colonne])
+        min_low = float(table["min_low"][ligne, colonne])
+        range_relatif = float(table["range"][ligne, colonne])
+        taille = int(table["taille"][ligne, colonne])
+        return {
+            "pattern": "COMPRESSION",
+            "direction": "NEUTRE",
+            "pattern_clarity": 3,
+            "compression_zone": True,
+            "zone_high": round(max_high, 8),
+            "zone_low": round(min_low, 8),
+            "range_pct": round(range_relatif, 6),
+            "bars_count": taille,
+            "atr_ratio": round(float(table["atr_ratio"][ligne, colonne]), 4),
+            "description": (
+                f"Zone de compression de {taille} bougies "
+                f"({range_relatif * 100:.1f}% range)"
+            ),
+            # Alias pour drawers
+            "compression_start_bar": int(table["debut"][ligne, colonne]),
+            "compression_high":      round(max_high, 8),
+            "compression_low":       round(min_low, 8),
+            "nb_bougies":            taille,
+        }
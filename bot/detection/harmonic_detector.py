@@ -8,11 +8,51 @@ import itertools
 import numpy as np
 import pandas as pd
 from scipy.signal import argrelextrema
-from typing import Optional
 
 logger = logging.getLogger(__name__)
 
 
+def _pattern_rules(tolerance: float) -> dict:
+    """
+    Plages [min, max] des ratios de chaque figure (bornes incluses).
+    Ratios disponibles : AB_XA, BC_AB, CD_BC, XD_XA et CD_XA.
+    Le Shark (O-X-A-B-C) est évalué sur les points renommés X-A-B-C-D :
+      XA/OX = AB_XA, AB/XA = BC_AB, BC/OX = CD_XA.
+    Les ratios de retracement principaux sont élargis de ±tolerance.
+    """
+    return {
+        "BUTTERFLY": {
+            "AB_XA": (0.786 * (1 - tolerance), 0.786 * (1 + tolerance)),
+            "BC_AB": (0.382, 0.886),
+            "CD_BC": (1.618, 2.618),
+            "XD_XA": (1.272, 1.618),
+        },
+        "SHARK": {
+            "AB_XA": (1.130, 1.618),
+            "BC_AB": (1.618, 2.240),
+            "CD_XA": (0.886, 1.130),
+        },
+        "GARTLEY": {
+            "AB_XA": (0.618 * (1 - tolerance), 0.618 * (1 + tolerance)),
+            "BC_AB": (0.382, 0.886),
+            "CD_BC": (1.272, 1.618),
+            "XD_XA": (0.786 * (1 - tolerance), 0.786 * (1 + tolerance)),
+        },
+        "BAT": {
+            "AB_XA": (0.382 * (1 - tolerance), 0.500 * (1 + tolerance)),
+            "BC_AB": (0.382, 0.886),
+            "CD_BC": (1.618, 2.618),
+            "XD_XA": (0.886 * (1 - tolerance), 0.886 * (1 + tolerance)),
+        },
+        "CRAB": {
+            "AB_XA": (0.382, 0.618),
+            "BC_AB": (0.382, 0.886),
+            "CD_BC": (2.618, 3.618),
+            "XD_XA": (1.618 * (1 - tolerance), 1.618 * (1 + tolerance)),
+        },
+    }
+
+
 class HarmonicDetector:
     """
     Détecte les figures harmoniques XABCD sur les 100 dernières bougies.
@@ -30,6 +70,29 @@ class HarmonicDetector:
     # Tolérance par défaut sur les ratios Fibonacci (±5%)
     _DEFAULT_TOLERANCE = 0.05
 
+    # Nombre de points du zigzag conservés pour la recherche XABCD
+    # (X-A-B-C peuvent remonter au-delà des 20 points de l'ancienne recherche)
+    ZIGZAG_POINTS = 30
+
+    # D doit être l'un des derniers points du zigzag (figure en cours, pas
+    # une figure achevée depuis plusieurs swings)
+    D_LAST_POINTS = 2
+
+    # Point du zigzag : indice de bougie, prix, type (+1 = haut, -1 = bas)
+    ZIGZAG_DTYPE = np.dtype([("idx", np.int64), ("price", np.float64), ("type", np.int8)])
+
+    # Plages [min, max] des ratios de chaque figure (cf. _pattern_rules, exposées par pattern_rules)
+    _PATTERN_RULES = _pattern_rules(_DEFAULT_TOLERANCE)
+
+    def __init__(self, tolerance: float = _DEFAULT_TOLERANCE):
+        """
+        Args:
+            tolerance : tolérance sur les ratios Fibonacci principaux (0.05 = ±5%)
+        """
+        self.tolerance = tolerance
+        if tolerance != self._DEFAULT_TOLERANCE:
+            self._PATTERN_RULES = _pattern_rules(tolerance)
+
     # ------------------------------------------------------------------ #
     #  Méthode publique principale                                         #
     # ------------------------------------------------------------------ #
@@ -56,59 +119,54 @@ class HarmonicDetector:
         df_slice = df.tail(100).copy().reset_index(drop=True)
 
         # Calcul de l'ATR
-        atr_value = self._compute_atr(df_slice, period=14)
+        atr_value = self.compute_atr(df_slice, period=14)
 
-        # Extraction du zigzag (20 derniers points)
-        zigzag = self._build_zigzag(df_slice, order=3)
+        # Extraction du zigzag (ZIGZAG_POINTS derniers points)
+        zigzag = self.build_zigzag(df_slice, order=3)
         if len(zigzag) < 5:
             logger.debug("Zigzag insuffisant (%d points < 5)", len(zigzag))
             return []
 
         signals: list[dict] = []
 
-        # Tester toutes les combinaisons de 5 points consécutifs du zigzag
-        for start in range(len(zigzag) - 4):
-            xabcd = zigzag[start : start + 5]
-
-            for detector_fn in [
-                self._check_butterfly,
-                self._check_shark,
-                self._check_gartley,
-                self._check_bat,
-                self._check_crab,
-            ]:
-                try:
-                    result = detector_fn(xabcd, atr_value)
-                    if result:
-                        result.setdefault("reversal_candle", False)
-                        result.setdefault("price", float(df_slice["close"].iloc[-1]))
-                        result.setdefault("atr", round(atr_value, 4))
-
-                        # Bonus de clarté si S/R proche du point D
-                        result["pattern_clarity"] = self._compute_clarity(
-                            result, sr_zones, atr_value
-                        )
-
-                        if result["pattern_clarity"] >= 2:
-                            signals.append(result)
-                            logger.info(
-                                "Harmonique détectée : %s | direction=%s | clarity=%d",
-                                result["pattern"],
-                                result["direction"],
-                                result["pattern_clarity"],
-                            )
-                except Exception as exc:
-                    logger.debug(
-                        "Erreur dans %s : %s", detector_fn.__name__, exc, exc_info=True
+        # Recherche exhaustive : toutes les combinaisons XABCD alternées
+        for pattern, points, ratios in self._search_xabcd(zigzag["price"]):
+            xabcd = zigzag[list(points)]
+            try:
+                result = self.signal_from_points(pattern, xabcd, atr_value, ratios)
+
+                result.setdefault("reversal_candle", False)
+                result.setdefault("price", float(df_slice["close"].iloc[-1]))
+                result.setdefault("atr", round(atr_value, 4))
+
+                # Bonus de clarté si S/R proche du point D
+                result["pattern_clarity"] = self._compute_clarity(
+                    result, sr_zones, atr_value
+                )
+
+                if result["pattern_clarity"] >= 2:
+                    signals.append(result)
+                    logger.info(
+                        "Harmonique détectée : %s | direction=%s | clarity=%d",
+                        result["pattern"],
+                        result["direction"],
+                        result["pattern_clarity"],
                     )
+            except Exception as exc:
+                logger.debug("Erreur harmonique %s : %s", pattern, exc, exc_info=True)
 
         return signals
 
     # ------------------------------------------------------------------ #
-    #  Helpers internes                                                    #
+    #  Méthodes publiques : zigzag, jambes et signaux                      #
     # ------------------------------------------------------------------ #
 
-    def _compute_atr(self, df: pd.DataFrame, period: int = 14) -> float:
+    @property
+    def pattern_rules(self) -> dict:
+        """Plages [min, max] des ratios de chaque figure, à la tolérance du détecteur."""
+        return self._PATTERN_RULES
+
+    def compute_atr(self, df: pd.DataFrame, period: int = 14) -> float:
         """
         Calcule l'ATR avec la méthode EMA de Wilder (identique au PatternDetector).
 
@@ -135,112 +193,259 @@ class HarmonicDetector:
 
         return atr
 
-    def _build_zigzag(self, df: pd.DataFrame, order: int = 3) -> list[dict]:
+    def build_zigzag(self, df: pd.DataFrame, order: int = 3) -> np.ndarray:
         """
         Construit une séquence zigzag alternée haut/bas.
 
         Étapes :
           1. Trouver les pivots hauts et bas avec argrelextrema (order=3).
           2. Fusionner dans une séquence chronologique.
-          3. S'assurer de l'alternance haut/bas (garder le plus extrême en cas de doublon).
-          4. Retourner les 20 derniers points.
+          3. S'assurer de l'alternance haut/bas (garder le plus extrême de
+             chaque série de pivots de même type, le premier en cas d'égalité).
+          4. Retourner les ZIGZAG_POINTS derniers points.
 
-        Chaque point du zigzag est un dict :
-          {"idx": int, "price": float, "type": "high" | "low"}
+        Le zigzag est un tableau structuré ZIGZAG_DTYPE :
+          idx (indice de bougie), price, type (+1 = haut, -1 = bas)
         """
-        highs_prices = df["high"].values
-        lows_prices  = df["low"].values
+        highs_prices = df["high"].to_numpy(dtype=float)
+        lows_prices  = df["low"].to_numpy(dtype=float)
 
         highs_idx = argrelextrema(highs_prices, np.greater, order=order)[0]
         lows_idx  = argrelextrema(lows_prices,  np.less,    order=order)[0]
 
-        # Construire la liste brute de pivots triée par indice
-        raw_pivots = []
-        for idx in highs_idx:
-            raw_pivots.append({"idx": int(idx), "price": float(highs_prices[idx]), "type": "high"})
-        for idx in lows_idx:
-            raw_pivots.append({"idx": int(idx), "price": float(lows_prices[idx]), "type": "low"})
-
-        raw_pivots.sort(key=lambda p: p["idx"])
+        # Pivots bruts triés par indice (un haut précède un bas sur la même bougie)
+        idx    = np.concatenate([highs_idx, lows_idx])
+        price  = np.concatenate([highs_prices[highs_idx], lows_prices[lows_idx]])
+        order_ = np.argsort(idx, kind="stable")
+        idx, price = idx[order_], price[order_]
+        kind   = np.where(order_ < len(highs_idx), 1, -1).astype(np.int8)
+
+        if len(idx) == 0:
+            return np.empty(0, dtype=self.ZIGZAG_DTYPE)
+
+        # Alternance : une série de pivots de même type ne garde que le plus extrême
+        # (tri lexicographique stable : le premier pivot l'emporte à égalité)
+        new_run = np.ones(len(kind), dtype=bool)
+        new_run[1:] = kind[1:] != kind[:-1]
+        run  = np.cumsum(new_run)
+        best = np.lexsort((-kind * price, run))
+        first = np.ones(len(best), dtype=bool)
+        first[1:] = run[best][1:] != run[best][:-1]
+        best = best[first]
+
+        zigzag = np.empty(len(best), dtype=self.ZIGZAG_DTYPE)
+        zigzag["idx"], zigzag["price"], zigzag["type"] = idx[best], price[best], kind[best]
+
+        # Retourner les ZIGZAG_POINTS derniers points
+        return zigzag[-self.ZIGZAG_POINTS:]
+
+    def search_legs(
+        self, prices: np.ndarray, min_c: int = 0
+    ) -> tuple[np.ndarray, ...]:
+        """
+        Construit toutes les jambes alternées X-A-B-C encore compatibles avec
+        au moins une figure (ratios AB/XA puis BC/AB).
 
-        if not raw_pivots:
-            return []
+        Chaque jambe relie deux points qui sont les extrêmes de tous les points
+        du zigzag qu'elle couvre (cf. _legs) : aucun pivot plus haut ou plus
+        bas n'est enjambé. Utilisée aussi par harmonic_prz pour projeter D.
 
-        # Garantir l'alternance haut/bas
-        zigzag: list[dict] = [raw_pivots[0]]
-        for pivot in raw_pivots[1:]:
-            last = zigzag[-1]
-            if pivot["type"] == last["type"]:
-                # Même type consécutif : garder le plus extrême
-                if pivot["type"] == "high" and pivot["price"] > last["price"]:
-                    zigzag[-1] = pivot
-                elif pivot["type"] == "low" and pivot["price"] < last["price"]:
-                    zigzag[-1] = pivot
-            else:
-                zigzag.append(pivot)
+        Les ratios de chaque jambe sont calculés en une fois pour toutes les
+        branches, et comparés aux plages de toutes les figures : une branche
+        qui ne peut plus valider aucune figure n'est pas prolongée.
 
-        # Retourner les 20 derniers points
-        return zigzag[-20:]
+        Args:
+            prices : prix des points du zigzag
+            min_c  : position minimale du point C (0 = toutes les branches)
 
-    def _check_ratio(
-        self, actual: float, expected: float, tolerance: float = _DEFAULT_TOLERANCE
-    ) -> bool:
+        Returns:
+            (x, a, b, c, xa, bc, ok, ratios, legs) : positions des points,
+            amplitudes XA et BC, matrice figure × branche des figures encore
+            valides, ratios par branche et matrice des jambes valides (_legs),
+            réutilisée pour prolonger les branches
+        """
+        n     = len(prices)
+        names = list(self._PATTERN_RULES)
+        legs  = self._legs(prices)
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            # Jambes X→A→B
+            x, a = self._extend(np.arange(n), legs)
+            t, b = self._extend(a, legs)
+            x, a = x[t], a[t]
+            xa = np.abs(prices[a] - prices[x])
+            ab = np.abs(prices[b] - prices[a])
+            ratios = {"AB_XA": ab / xa}
+            ok = self._prune(np.ones((len(names), len(b)), dtype=bool), ratios)
+
+            alive = ok.any(axis=0)
+            x, a, b, xa, ab, ok = x[alive], a[alive], b[alive], xa[alive], ab[alive], ok[:, alive]
+            ratios = {key: v[alive] for key, v in ratios.items()}
+
+            # Jambe B→C
+            t, c = self._extend(b, legs)
+            keep = c >= min_c
+            t, c = t[keep], c[keep]
+            x, a, b, xa, ab, ok = x[t], a[t], b[t], xa[t], ab[t], ok[:, t]
+            ratios = {key: v[t] for key, v in ratios.items()}
+            bc = np.abs(prices[c] - prices[b])
+            ratios["BC_AB"] = bc / ab
+            ok = self._prune(ok, {"BC_AB": ratios["BC_AB"]})
+
+        alive = ok.any(axis=0)
+        ratios = {key: v[alive] for key, v in ratios.items()}
+        return x[alive], a[alive], b[alive], c[alive], xa[alive], bc[alive], ok[:, alive], ratios, legs
+
+    def signal_from_points(
+        self, pattern: str, xabcd: np.ndarray, atr: float, ratios: dict = None
+    ) -> dict:
         """
-        Vérifie si un ratio réel est proche d'un ratio Fibonacci attendu.
+        Construit le signal d'une figure orientée à partir de ses 5 points.
 
         Args:
-            actual    : ratio calculé
-            expected  : ratio Fibonacci cible
-            tolerance : tolérance relative (défaut 5%)
+            pattern : figure orientée (ex : "SHARK_BULLISH")
+            xabcd   : 5 points X, A, B, C, D (tableau ZIGZAG_DTYPE)
+            atr     : valeur ATR
+            ratios  : ratios de la combinaison (recalculés depuis les points si absents)
 
         Returns:
-            True si |actual - expected| / expected <= tolerance
+            dict de signal complet (format _build_signal / _build_shark_signal)
         """
-        if expected == 0:
-            return False
-        return abs(actual - expected) / expected <= tolerance
+        if ratios is None:
+            x, a, b, c, d = xabcd["price"].tolist()
+            xa, ab, bc, cd = abs(a - x), abs(b - a), abs(c - b), abs(d - c)
+            ratios = {
+                "AB_XA": ab / xa, "BC_AB": bc / ab, "CD_BC": cd / bc,
+                "XD_XA": abs(d - x) / xa, "CD_XA": cd / xa,
+            }
+
+        if pattern.startswith("SHARK"):
+            return self._build_shark_signal(pattern, xabcd, atr, ratios)
+        return self._build_signal(
+            pattern,
+            "LONG" if pattern.endswith("BULLISH") else "SHORT",
+            xabcd,
+            atr,
+            {key: round(ratios[key], 4) for key in ("AB_XA", "BC_AB", "CD_BC", "XD_XA")},
+        )
 
-    def _check_ratio_range(
-        self, actual: float, low: float, high: float
-    ) -> bool:
-        """
-        Vérifie si un ratio est dans une plage [low, high].
+    # ------------------------------------------------------------------ #
+    #  Helpers internes                                                    #
+    # ------------------------------------------------------------------ #
 
-        Args:
-            actual : ratio calculé
-            low    : borne inférieure
-            high   : borne supérieure
+    @staticmethod
+    def _legs(prices: np.ndarray) -> np.ndarray:
+        """
+        Jambes valides du zigzag : legs[i, j] est vrai si le point j peut
+        suivre le point i dans une figure.
+
+        Le zigzag alternant haut/bas, j doit être postérieur et à un écart
+        impair (type opposé). Une jambe peut enjamber des pivots, mais ses
+        deux extrémités doivent rester les extrêmes de tous les points
+        qu'elle couvre (plus haut et plus bas du segment) : sinon X, A, B, C
+        ou D ne seraient pas de vrais sommets de swing.
+        """
+        n = len(prices)
+        rows, cols = np.indices((n, n))
+        span = np.where(cols >= rows, prices[None, :], np.nan)
+        top    = np.fmax.accumulate(span, axis=1)     # max des points i..j
+        bottom = np.fmin.accumulate(span, axis=1)     # min des points i..j
+        start, end = prices[:, None], prices[None, :]
+        up   = (end >= top) & (start <= bottom)
+        down = (end <= bottom) & (start >= top)
+        gap  = cols - rows
+        return (gap > 0) & (gap % 2 == 1) & (up | down)
+
+    @staticmethod
+    def _extend(last: np.ndarray, legs: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Prolonge chaque branche d'un point du zigzag (jambes valides de `legs`).
 
         Returns:
-            True si low <= actual <= high
+            (branche, point) : indices des branches prolongées et nouveaux points
         """
-        return low <= actual <= high
+        return np.nonzero(legs[last])
 
-    def _compute_ratios(self, x: float, a: float, b: float, c: float, d: float) -> dict:
+    def _prune(self, ok: np.ndarray, ratios: dict) -> np.ndarray:
+        """Applique les plages de ratios de chaque figure aux nouveaux ratios."""
+        for p, rules in enumerate(self._PATTERN_RULES.values()):
+            for key, (low, high) in rules.items():
+                if key in ratios:
+                    ok[p] &= (ratios[key] >= low) & (ratios[key] <= high)
+        return ok
+
+    def _search_xabcd(self, prices: np.ndarray) -> list[tuple[str, tuple, dict]]:
         """
-        Calcule les ratios XABCD classiques.
+        Recherche exhaustive des figures XABCD sur le zigzag.
+
+        Les jambes X-A-B-C issues de `search_legs` sont prolongées d'un
+        point D pris parmi les D_LAST_POINTS derniers points du zigzag, puis
+        filtrées sur CD/BC, XD/XA et CD/XA.
+
+        Pour une figure et un point D donnés, seule la combinaison la plus
+        proche du centre des plages est retenue.
 
         Returns:
-            dict avec clés : AB_XA, BC_AB, CD_BC, XD_XA
-            (None si division par zéro)
+            Liste de (figure orientée, positions (x, a, b, c, d) dans le zigzag, ratios)
         """
-        xa = abs(a - x)
-        ab = abs(b - a)
-        bc = abs(c - b)
-        cd = abs(d - c)
-        xd = abs(d - x)
+        n     = len(prices)
+        names = list(self._PATTERN_RULES)
+        if n < 5:
+            return []
 
-        return {
-            "AB_XA": ab / xa if xa != 0 else None,
-            "BC_AB": bc / ab if ab != 0 else None,
-            "CD_BC": cd / bc if bc != 0 else None,
-            "XD_XA": xd / xa if xa != 0 else None,
-            "xa": xa,
-            "ab": ab,
-            "bc": bc,
-            "cd": cd,
-            "xd": xd,
-        }
+        x, a, b, c, xa, bc, ok, ratios, legs = self.search_legs(prices)
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            # Jambe C→D (D récent uniquement)
+            t, d = self._extend(c, legs)
+            recent = d >= n - self.D_LAST_POINTS
+            t, d = t[recent], d[recent]
+            x, a, b, c, xa, bc, ok = x[t], a[t], b[t], c[t], xa[t], bc[t], ok[:, t]
+            ratios = {key: v[t] for key, v in ratios.items()}
+            cd = np.abs(prices[d] - prices[c])
+            xd = np.abs(prices[d] - prices[x])
+            last = {"CD_BC": cd / bc, "XD_XA": xd / xa, "CD_XA": cd / xa}
+            ratios.update(last)
+            ok = self._prune(ok, last)
+
+        # Orientation : D par rapport à X (Shark : par rapport à la zone X-A)
+        px, pa, pd_ = prices[x], prices[a], prices[d]
+        found: list[tuple[int, int, str, int]] = []
+
+        for p, name in enumerate(names):
+            if name == "SHARK":
+                bullish = pd_ < np.minimum(px, pa)
+                bearish = pd_ > np.maximum(px, pa)
+            else:
+                bullish = pd_ < px
+                bearish = pd_ > px
+
+            # Écart normalisé au centre des plages (0 = combinaison idéale)
+            error = sum(
+                np.abs(ratios[key] - (low + high) / 2.0) / (high - low)
+                for key, (low, high) in self._PATTERN_RULES[name].items()
+            )
+
+            for side, mask in (("BULLISH", ok[p] & bullish), ("BEARISH", ok[p] & bearish)):
+                rows = np.flatnonzero(mask)
+                if len(rows) == 0:
+                    continue
+                # Meilleure combinaison par point D
+                order = np.lexsort((error[rows], d[rows]))
+                rows  = rows[order]
+                first = np.diff(d[rows], prepend=-1) != 0
+                for row in rows[first]:
+                    found.append((int(d[row]), p, f"{name}_{side}", int(row)))
+
+        found.sort(key=lambda item: (item[0], item[1]))
+        return [
+            (
+                pattern,
+                (int(x[row]), int(a[row]), int(b[row]), int(c[row]), int(d[row])),
+                {key: float(v[row]) for key, v in ratios.items()},
+            )
+            for _, _, pattern, row in found
+        ]
 
     def _compute_clarity(
         self, signal: dict, sr_zones: list, atr: float
@@ -268,7 +473,7 @@ class HarmonicDetector:
         self,
         pattern: str,
         direction: str,
-        xabcd: list[dict],
+        xabcd: np.ndarray,
         atr: float,
         extra: dict = None,
     ) -> dict:
@@ -278,15 +483,15 @@ class HarmonicDetector:
         Args:
             pattern   : nom de la figure (ex : "BUTTERFLY_BULLISH")
             direction : "LONG" ou "SHORT"
-            xabcd     : liste de 5 points [{idx, price, type}, ...]
+            xabcd     : 5 points du zigzag (tableau ZIGZAG_DTYPE)
             atr       : valeur ATR
             extra     : clés supplémentaires optionnelles
 
         Returns:
             dict de signal complet
         """
-        x, a, b, c, d = [p["price"] for p in xabcd]
-        x_idx, a_idx, b_idx, c_idx, d_idx = [p.get("idx", 0) for p in xabcd]
+        x, a, b, c, d = xabcd["price"].tolist()
+        x_idx, a_idx, b_idx, c_idx, d_idx = xabcd["idx"].tolist()
         signal = {
             "pattern":         pattern,
             "direction":       direction,
@@ -318,133 +523,30 @@ class HarmonicDetector:
             signal.update(extra)
         return signal
 
-    # ------------------------------------------------------------------ #
-    #  Vérificateurs harmoniques                                           #
-    # ------------------------------------------------------------------ #
-
-    def _check_butterfly(
-        self, xabcd: list[dict], atr: float
-    ) -> Optional[dict]:
-        """
-        Butterfly Bullish / Bearish.
-
-        Ratios :
-          AB/XA = 0.786 (±5%)
-          BC/AB = 0.382 à 0.886
-          CD/BC = 1.618 à 2.618
-          XD/XA = 1.272 à 1.618
-
-        Bullish : D < X (D plus bas que X)
-        Bearish : D > X
+    def _build_shark_signal(
+        self, pattern: str, xabcd: np.ndarray, atr: float, ratios: dict
+    ) -> dict:
         """
-        x, a, b, c, d = [p["price"] for p in xabcd]
-        ratios = self._compute_ratios(x, a, b, c, d)
-
-        if any(v is None for v in ratios.values()):
-            return None
-
-        ab_xa = ratios["AB_XA"]
-        bc_ab = ratios["BC_AB"]
-        cd_bc = ratios["CD_BC"]
-        xd_xa = ratios["XD_XA"]
-
-        # Validation des 3 ratios obligatoires (B, C, D)
-        b_ok = self._check_ratio(ab_xa, 0.786)
-        c_ok = self._check_ratio_range(bc_ab, 0.382, 0.886)
-        d_cd_ok = self._check_ratio_range(cd_bc, 1.618, 2.618)
-        d_xd_ok = self._check_ratio_range(xd_xa, 1.272, 1.618)
-
-        if not (b_ok and c_ok and d_cd_ok and d_xd_ok):
-            return None
-
-        # Déterminer la direction
-        if d < x:
-            pattern   = "BUTTERFLY_BULLISH"
-            direction = "LONG"
-        elif d > x:
-            pattern   = "BUTTERFLY_BEARISH"
-            direction = "SHORT"
-        else:
-            return None
+        Construit le signal Shark à partir des points O-X-A-B-C.
 
-        logger.debug(
-            "Butterfly — AB/XA=%.3f BC/AB=%.3f CD/BC=%.3f XD/XA=%.3f",
-            ab_xa, bc_ab, cd_bc, xd_xa,
-        )
-
-        return self._build_signal(pattern, direction, xabcd, atr, {
-            "AB_XA": round(ab_xa, 4),
-            "BC_AB": round(bc_ab, 4),
-            "CD_BC": round(cd_bc, 4),
-            "XD_XA": round(xd_xa, 4),
-        })
-
-    def _check_shark(
-        self, xabcd: list[dict], atr: float
-    ) -> Optional[dict]:
+        Les points sont ceux de la séquence XABCD renommée
+        (O=X, X=A, A=B, B=C, C=D) ; l'entrée est au point C.
         """
-        Shark Bullish / Bearish.
+        o, x, a, b, c = xabcd["price"].tolist()  # renommage pour la clarté
+        o_idx, x_idx, a_idx, b_idx, c_idx = xabcd["idx"].tolist()
 
-        Le Shark utilise un pattern O-X-A-B-C (5 points), l'entrée est au point C.
-        On mappe : O=X, X=A, A=B, B=C, C=D dans notre séquence XABCD.
-
-        Ratios (relatifs aux points O-X-A-B-C renommés) :
-          XA/OX = 1.130 à 1.618   (= AB/XA dans notre mapping)
-          AB/XA = 1.618 à 2.240   (= BC/AB dans notre mapping)
-          BC/OX = 0.886 à 1.130   (harmonie avec O = XD/XA dans notre mapping)
-
-        Bullish : C (notre D) est plus bas que la zone O-X (notre X-A).
-        """
-        o, x, a, b, c = [p["price"] for p in xabcd]  # renommage pour la clarté
-
-        ox = abs(x - o)
-        xa = abs(a - x)
-        ab = abs(b - a)
-        bc = abs(c - b)
-        oc = abs(c - o)
-
-        if ox == 0 or xa == 0 or ab == 0 or bc == 0:
-            return None
-
-        xa_ox = xa / ox   # XA/OX
-        ab_xa = ab / xa   # AB/XA
-        bc_ox = bc / ox   # BC/OX (harmonie avec O)
-
-        # Validation des 3 ratios obligatoires (B, C = points b et c)
-        b_ok  = self._check_ratio_range(xa_ox, 1.130, 1.618)
-        c_ok  = self._check_ratio_range(ab_xa, 1.618, 2.240)
-        d_ok  = self._check_ratio_range(bc_ox, 0.886, 1.130)
-
-        if not (b_ok and c_ok and d_ok):
-            return None
-
-        # Déterminer la direction selon la position de C par rapport à la zone O-X
-        ox_min = min(o, x)
-        ox_max = max(o, x)
-
-        if c < ox_min:
-            pattern   = "SHARK_BULLISH"
-            direction = "LONG"
-        elif c > ox_max:
-            pattern   = "SHARK_BEARISH"
-            direction = "SHORT"
-        else:
-            return None
+        xa_ox = ratios["AB_XA"]   # XA/OX
+        ab_xa = ratios["BC_AB"]   # AB/XA
+        bc_ox = ratios["CD_XA"]   # BC/OX (harmonie avec O)
 
         logger.debug(
             "Shark — XA/OX=%.3f AB/XA=%.3f BC/OX=%.3f",
             xa_ox, ab_xa, bc_ox,
         )
 
-        # Construire le signal avec les 5 points originaux (O=X, X=A, A=B, B=C, C=D)
-        o_idx = xabcd[0].get("idx", 0)
-        x_idx = xabcd[1].get("idx", 0)
-        a_idx = xabcd[2].get("idx", 0)
-        b_idx = xabcd[3].get("idx", 0)
-        c_idx = xabcd[4].get("idx", 0)
         return {
             "pattern":         pattern,
-            "direction":       direction,
+            "direction":       "LONG" if pattern.endswith("BULLISH") else "SHORT",
             "pattern_clarity": 2,
             "reversal_candle": False,
             "price":           round(c, 4),
@@ -475,167 +577,3 @@ class HarmonicDetector:
             "BC_OX": round(bc_ox, 4),
             "description": f"{pattern} validé — C={c:.2f} (PRZ)",
         }
-
-    def _check_gartley(
-        self, xabcd: list[dict], atr: float
-    ) -> Optional[dict]:
-        """
-        Gartley Bullish / Bearish.
-
-        Ratios :
-          AB/XA = 0.618 (±5%)
-          BC/AB = 0.382 à 0.886
-          CD/BC = 1.272 à 1.618
-          XD/XA = 0.786 (±5%)
-
-        Bullish : D < X
-        Bearish : D > X
-        """
-        x, a, b, c, d = [p["price"] for p in xabcd]
-        ratios = self._compute_ratios(x, a, b, c, d)
-
-        if any(v is None for v in ratios.values()):
-            return None
-
-        ab_xa = ratios["AB_XA"]
-        bc_ab = ratios["BC_AB"]
-        cd_bc = ratios["CD_BC"]
-        xd_xa = ratios["XD_XA"]
-
-        b_ok    = self._check_ratio(ab_xa, 0.618)
-        c_ok    = self._check_ratio_range(bc_ab, 0.382, 0.886)
-        d_cd_ok = self._check_ratio_range(cd_bc, 1.272, 1.618)
-        d_xd_ok = self._check_ratio(xd_xa, 0.786)
-
-        if not (b_ok and c_ok and d_cd_ok and d_xd_ok):
-            return None
-
-        if d < x:
-            pattern, direction = "GARTLEY_BULLISH", "LONG"
-        elif d > x:
-            pattern, direction = "GARTLEY_BEARISH", "SHORT"
-        else:
-            return None
-
-        logger.debug(
-            "Gartley — AB/XA=%.3f BC/AB=%.3f CD/BC=%.3f XD/XA=%.3f",
-            ab_xa, bc_ab, cd_bc, xd_xa,
-        )
-
-        return self._build_signal(pattern, direction, xabcd, atr, {
-            "AB_XA": round(ab_xa, 4),
-            "BC_AB": round(bc_ab, 4),
-            "CD_BC": round(cd_bc, 4),
-            "XD_XA": round(xd_xa, 4),
-        })
-
-    def _check_bat(
-        self, xabcd: list[dict], atr: float
-    ) -> Optional[dict]:
-        """
-        Bat Bullish / Bearish.
-
-        Ratios :
-          AB/XA = 0.382 à 0.500 (±5%)
-          BC/AB = 0.382 à 0.886
-          CD/BC = 1.618 à 2.618
-          XD/XA = 0.886 (±5%)
-
-        Bullish : D < X
-        Bearish : D > X
-        """
-        x, a, b, c, d = [p["price"] for p in xabcd]
-        ratios = self._compute_ratios(x, a, b, c, d)
-
-        if any(v is None for v in ratios.values()):
-            return None
-
-        ab_xa = ratios["AB_XA"]
-        bc_ab = ratios["BC_AB"]
-        cd_bc = ratios["CD_BC"]
-        xd_xa = ratios["XD_XA"]
-
-        # AB/XA doit être entre 0.382 et 0.500 (avec tolérance de ±5%)
-        b_ok = self._check_ratio_range(
-            ab_xa,
-            0.382 * (1 - self._DEFAULT_TOLERANCE),
-            0.500 * (1 + self._DEFAULT_TOLERANCE),
-        )
-        c_ok    = self._check_ratio_range(bc_ab, 0.382, 0.886)
-        d_cd_ok = self._check_ratio_range(cd_bc, 1.618, 2.618)
-        d_xd_ok = self._check_ratio(xd_xa, 0.886)
-
-        if not (b_ok and c_ok and d_cd_ok and d_xd_ok):
-            return None
-
-        if d < x:
-            pattern, direction = "BAT_BULLISH", "LONG"
-        elif d > x:
-            pattern, direction = "BAT_BEARISH", "SHORT"
-        else:
-            return None
-
-        logger.debug(
-            "Bat — AB/XA=%.3f BC/AB=%.3f CD/BC=%.3f XD/XA=%.3f",
-            ab_xa, bc_ab, cd_bc, xd_xa,
-        )
-
-        return self._build_signal(pattern, direction, xabcd, atr, {
-            "AB_XA": round(ab_xa, 4),
-            "BC_AB": round(bc_ab, 4),
-            "CD_BC": round(cd_bc, 4),
-            "XD_XA": round(xd_xa, 4),
-        })
-
-    def _check_crab(
-        self, xabcd: list[dict], atr: float
-    ) -> Optional[dict]:
-        """
-        Crab Bullish / Bearish.
-
-        Ratios :
-          AB/XA = 0.382 à 0.618
-          BC/AB = 0.382 à 0.886
-          CD/BC = 2.618 à 3.618
-          XD/XA = 1.618 (±5%)
-
-        Bullish : D < X
-        Bearish : D > X
-        """
-        x, a, b, c, d = [p["price"] for p in xabcd]
-        ratios = self._compute_ratios(x, a, b, c, d)
-
-        if any(v is None for v in ratios.values()):
-            return None
-
-        ab_xa = ratios["AB_XA"]
-        bc_ab = ratios["BC_AB"]
-        cd_bc = ratios["CD_BC"]
-        xd_xa = ratios["XD_XA"]
-
-        b_ok    = self._check_ratio_range(ab_xa, 0.382, 0.618)
-        c_ok    = self._check_ratio_range(bc_ab, 0.382, 0.886)
-        d_cd_ok = self._check_ratio_range(cd_bc, 2.618, 3.618)
-        d_xd_ok = self._check_ratio(xd_xa, 1.618)
-
-        if not (b_ok and c_ok and d_cd_ok and d_xd_ok):
-            return None
-
-        if d < x:
-            pattern, direction = "CRAB_BULLISH", "LONG"
-        elif d > x:
-            pattern, direction = "CRAB_BEARISH", "SHORT"
-        else:
-            return None
-
-        logger.debug(
-            "Crab — AB/XA=%.3f BC/AB=%.3f CD/BC=%.3f XD/XA=%.3f",
-            ab_xa, bc_ab, cd_bc, xd_xa,
-        )
-
-        return self._build_signal(pattern, direction, xabcd, atr, {
-            "AB_XA": round(ab_xa, 4),
-            "BC_AB": round(bc_ab, 4),
-            "CD_BC": round(cd_bc, 4),
-            "XD_XA": round(xd_xa, 4),
-        })
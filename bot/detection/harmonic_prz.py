@@ -0,0 +1,286 @@
+"""
+Projection anticipée des PRZ (Potential Reversal Zones) harmoniques.
+
+Le HarmonicDetector ne signale une figure qu'une fois le point D formé.
+Ce module conserve toutes les jambes X-A-B-C valides du zigzag courant et
+projette, pour chaque figure encore possible, la zone où D devrait se former.
+À chaque nouvelle bougie, seul un test de prix est effectué : la recherche
+des jambes n'est relancée que si le zigzag a changé, et uniquement pour les
+jambes dont le point C est nouveau.
+"""
+
+import logging
+from dataclasses import dataclass, field
+
+import numpy as np
+import pandas as pd
+
+from bot.detection.harmonic_detector import HarmonicDetector
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class PRZZone:
+    """Zone de retournement projetée pour une jambe X-A-B-C."""
+    pattern   : str      # ex : "GARTLEY_BULLISH"
+    direction : str      # "LONG" ou "SHORT"
+    points    : tuple    # clés temporelles de X, A, B, C
+    prices    : tuple    # prix de X, A, B, C
+    prz_low   : float
+    prz_high  : float
+    d_down    : bool     # True si D se forme sous C (C est un sommet)
+    alerted   : bool = False
+
+    @property
+    def identity(self) -> tuple:
+        return (self.pattern, self.points)
+
+
+@dataclass
+class _TrackerState:
+    """État conservé entre deux bougies pour un couple (paire, timeframe)."""
+    signature : tuple = ()                       # (clé, prix) des points du zigzag
+    zones     : list = field(default_factory=list)
+    last_key  : object = None                    # clé de la dernière bougie traitée
+
+
+class HarmonicPRZTracker:
+    """
+    Suit les PRZ projetées des figures harmoniques, par (paire, timeframe).
+
+    Fonctionnement d'un appel à `update` :
+      1. Zigzag recalculé sur la fenêtre du HarmonicDetector (100 bougies).
+      2. Zigzag inchangé : les zones existantes sont conservées telles quelles.
+         Zigzag modifié : les zones dont les quatre points sont toujours dans
+         le zigzag sont conservées, et seules les jambes dont C suit le
+         premier point modifié sont recherchées.
+      3. Test des nouvelles bougies contre chaque zone : entrée dans la PRZ
+         (alerte unique), dépassement de la zone ou de C (zone invalidée).
+
+    D pouvant se former plusieurs points après C, une zone reste active tant
+    que le prix ne l'a pas invalidée.
+    """
+
+    WINDOW  = 100
+    MIN_BARS = 30
+
+    def __init__(self, detector: HarmonicDetector = None):
+        self.detector = detector or HarmonicDetector()
+        self._states: dict[tuple, _TrackerState] = {}
+
+    # ------------------------------------------------------------------ #
+    #  Méthodes publiques                                                  #
+    # ------------------------------------------------------------------ #
+
+    def update(self, key: tuple, df: pd.DataFrame) -> list[dict]:
+        """
+        Met à jour les PRZ de `key` avec les dernières bougies de `df`.
+
+        Args:
+            key : identifiant du flux, ex : ("EURUSD", "1h")
+            df  : DataFrame OHLCV (colonne "timestamp" optionnelle)
+
+        Returns:
+            Signaux au format HarmonicDetector pour chaque PRZ dans laquelle
+            le prix vient d'entrer (clé "prz_entry" = True).
+        """
+        if len(df) < self.MIN_BARS:
+            return []
+
+        window = df.tail(self.WINDOW).reset_index(drop=True)
+        times  = (
+            window["timestamp"].to_numpy() if "timestamp" in window.columns
+            else df.index[-len(window):].to_numpy()
+        )
+        highs = window["high"].to_numpy(dtype=float)
+        lows  = window["low"].to_numpy(dtype=float)
+
+        state = self._states.setdefault(key, _TrackerState())
+        new_from = self._first_new_bar(times, state.last_key)
+        state.last_key = times[-1]
+
+        zigzag = self.detector.build_zigzag(window, order=3)
+        signature = tuple(zip(times[zigzag["idx"]].tolist(), zigzag["price"].tolist()))
+        if signature != state.signature:
+            previous  = set(state.signature)
+            first_new = next(
+                (i for i, point in enumerate(signature) if point not in previous), len(signature)
+            )
+            points = {point[0] for point in signature}
+            kept   = [zone for zone in state.zones if points.issuperset(zone.points)]
+            known  = {zone.identity for zone in kept}
+            state.zones = kept + [
+                zone
+                for zone in self._project(zigzag, times, highs[:new_from], lows[:new_from], first_new)
+                if zone.identity not in known
+            ]
+            state.signature = signature
+
+        if not state.zones or new_from >= len(window):
+            return []
+
+        positions = {t: i for i, t in enumerate(times.tolist())}
+        alerts: list[dict] = []
+        atr = None
+        kept: list[PRZZone] = []
+        for zone in state.zones:
+            entered = False
+            for row in range(new_from, len(window)):
+                if not self._still_valid(zone, highs[row], lows[row]):
+                    break
+                if not zone.alerted and self._touches(zone, highs[row], lows[row]):
+                    zone.alerted = entered = True
+            else:
+                kept.append(zone)
+                if entered:
+                    if atr is None:
+                        atr = self.detector.compute_atr(window, period=14)
+                    alerts.append(self._build_alert(zone, positions, window, atr))
+                continue
+            logger.debug("PRZ invalidée : %s %s", zone.pattern, zone.points)
+        state.zones = kept
+
+        return alerts
+
+    def zones(self, key: tuple) -> list[PRZZone]:
+        """PRZ actuellement projetées pour `key`."""
+        state = self._states.get(key)
+        return list(state.zones) if state else []
+
+    # ------------------------------------------------------------------ #
+    #  Projection                                                          #
+    # ------------------------------------------------------------------ #
+
+    def _project(
+        self,
+        zigzag: np.ndarray,
+        times: np.ndarray,
+        past_highs: np.ndarray,
+        past_lows: np.ndarray,
+        min_c: int,
+    ) -> list[PRZZone]:
+        """
+        Projette les PRZ des jambes X-A-B-C dont C est en position `min_c`
+        ou au-delà dans le zigzag.
+
+        Une zone dont le prix a déjà franchi la borne lointaine, ou dépassé C,
+        sur les bougies déjà traitées est écartée. Une zone déjà touchée est
+        marquée comme alertée (pas d'alerte tardive).
+        """
+        n = len(zigzag)
+        if n < 4 or min_c >= n:
+            return []
+
+        prices = zigzag["price"]
+        bars   = zigzag["idx"]
+        x, a, b, c, xa, bc, ok, _, _ = self.detector.search_legs(prices, min_c=min_c)
+        if len(c) == 0:
+            return []
+
+        px, pa, pb, pc = prices[x], prices[a], prices[b], prices[c]
+        down = pc > pb
+        sign = np.where(down, -1.0, 1.0)
+
+        zones: list[PRZZone] = []
+        for p, (name, rules) in enumerate(self.detector.pattern_rules.items()):
+            # D = C ± CD, avec CD borné par BC (ou XA pour le Shark)
+            lo = np.full(len(c), -np.inf)
+            hi = np.full(len(c), np.inf)
+            for ratio, base in (("CD_BC", bc), ("CD_XA", xa)):
+                if ratio in rules:
+                    low, high = rules[ratio]
+                    ends = (pc + sign * low * base, pc + sign * high * base)
+                    lo = np.maximum(lo, np.minimum(*ends))
+                    hi = np.minimum(hi, np.maximum(*ends))
+
+            for side in ("BULLISH", "BEARISH"):
+                s_lo, s_hi = lo.copy(), hi.copy()
+                if name == "SHARK":
+                    if side == "BULLISH":
+                        s_hi = np.minimum(s_hi, np.minimum(px, pa))
+                    else:
+                        s_lo = np.maximum(s_lo, np.maximum(px, pa))
+                elif "XD_XA" in rules:
+                    low, high = rules["XD_XA"]
+                    if side == "BULLISH":
+                        s_lo = np.maximum(s_lo, px - high * xa)
+                        s_hi = np.minimum(s_hi, px - low * xa)
+                    else:
+                        s_lo = np.maximum(s_lo, px + low * xa)
+                        s_hi = np.minimum(s_hi, px + high * xa)
+
+                for row in np.flatnonzero(ok[p] & (s_lo < s_hi)):
+                    zone = PRZZone(
+                        pattern   = f"{name}_{side}",
+                        direction = "LONG" if side == "BULLISH" else "SHORT",
+                        points    = tuple(times[bars[[x[row], a[row], b[row], c[row]]]].tolist()),
+                        prices    = (float(px[row]), float(pa[row]), float(pb[row]), float(pc[row])),
+                        prz_low   = float(s_lo[row]),
+                        prz_high  = float(s_hi[row]),
+                        d_down    = bool(down[row]),
+                    )
+
+                    # Bougies déjà traitées depuis C
+                    start = bars[c[row]] + 1
+                    if start < len(past_highs):
+                        high, low = past_highs[start:].max(), past_lows[start:].min()
+                        if not self._still_valid(zone, high, low):
+                            continue
+                        zone.alerted = self._touches(zone, high, low)
+                    zones.append(zone)
+
+        logger.debug("%d PRZ projetée(s)", len(zones))
+        return zones
+
+    # ------------------------------------------------------------------ #
+    #  Test de prix                                                        #
+    # ------------------------------------------------------------------ #
+
+    @staticmethod
+    def _first_new_bar(times: np.ndarray, last_key) -> int:
+        """Position de la première bougie non encore traitée (dernière au premier appel)."""
+        if last_key is None:
+            return len(times) - 1
+        hits = np.flatnonzero(times == last_key)
+        return int(hits[0]) + 1 if len(hits) else len(times) - 1
+
+    @staticmethod
+    def _still_valid(zone: PRZZone, high: float, low: float) -> bool:
+        """Faux si le prix a dépassé C ou franchi la borne lointaine de la PRZ."""
+        c = zone.prices[3]
+        if zone.d_down:
+            return high <= c and low >= zone.prz_low
+        return low >= c and high <= zone.prz_high
+
+    @staticmethod
+    def _touches(zone: PRZZone, high: float, low: float) -> bool:
+        """Vrai si la bougie atteint la borne proche de la PRZ."""
+        if zone.d_down:
+            return low <= zone.prz_high
+        return high >= zone.prz_low
+
+    def _build_alert(
+        self, zone: PRZZone, positions: dict, window: pd.DataFrame, atr: float
+    ) -> dict:
+        """Construit un signal harmonique dont D est la borne de PRZ atteinte."""
+        d = zone.prz_high if zone.d_down else zone.prz_low
+        xabcd = np.zeros(5, dtype=self.detector.ZIGZAG_DTYPE)
+        xabcd["idx"]   = [positions.get(t, 0) for t in zone.points] + [len(window) - 1]
+        xabcd["price"] = list(zone.prices) + [d]
+        signal = self.detector.signal_from_points(zone.pattern, xabcd, atr)
+
+        signal.update({
+            "price":       float(window["close"].iloc[-1]),
+            "prz_entry":   True,
+            "prz_low":     round(zone.prz_low, 4),
+            "prz_high":    round(zone.prz_high, 4),
+            "description": (
+                f"{zone.pattern} en formation — prix dans la PRZ "
+                f"[{zone.prz_low:.2f} - {zone.prz_high:.2f}]"
+            ),
+        })
+        logger.info(
+            "Entrée en PRZ : %s | [%.5f - %.5f]", zone.pattern, zone.prz_low, zone.prz_high
+        )
+        return signal
@@ -13,7 +13,7 @@ Indicateurs calculés :
     - QQE  (Quantitative Qualitative Estimation, Fast + Slow lines)
     - MACD (Moving Average Convergence Divergence)
     - Bollinger Bands (période 20, 2 écarts-types)
-    - EMA 50 / EMA 200
+    - EMA 50 / EMA 200 (+ tendance dérivée, voir trend_label)
 
 Auteur  : Trading Bot Ultimate
 Version : 1.0
@@ -118,6 +118,34 @@ def _wilder_ema(series: pd.Series, period: int) -> pd.Series:
     return pd.Series(result, index=series.index)
 
 
+def trend_label(price: float, ema_fast: float, ema_slow: float) -> str:
+    """
+    Tendance à partir de la position du prix par rapport aux EMA 50 / 200.
+
+    Règles :
+        - BULLISH si prix > EMA50 > EMA200, ou à défaut prix > EMA200
+        - BEARISH si prix < EMA50 < EMA200, ou à défaut prix < EMA200
+        - NEUTRE sinon
+
+    Args:
+        price    (float): Dernier prix de clôture.
+        ema_fast (float): EMA 50 (adjust=False).
+        ema_slow (float): EMA 200 (adjust=False).
+
+    Returns:
+        str: "BULLISH", "BEARISH" ou "NEUTRE".
+    """
+    if price > ema_fast > ema_slow:
+        return "BULLISH"
+    elif price < ema_fast < ema_slow:
+        return "BEARISH"
+    elif price > ema_slow:
+        return "BULLISH"
+    elif price < ema_slow:
+        return "BEARISH"
+    return "NEUTRE"
+
+
 class IndicatorEngine:
     """
     Calcule tous les indicateurs techniques nécessaires au bot de trading.
@@ -155,6 +183,7 @@ class IndicatorEngine:
             "bb_lower": 0.0,
             "ema50": 0.0,
             "ema200": 0.0,
+            "trend": "NEUTRE",
         }
 
     # ------------------------------------------------------------------
@@ -241,6 +270,9 @@ class IndicatorEngine:
                 "ema50" : float(ema50_series.iloc[-1]),
                 "ema200": float(ema200_series.iloc[-1]),
             }
+            result["trend"] = trend_label(
+                float(close.iloc[-1]), result["ema50"], result["ema200"]
+            )
 
             logger.debug(
                 "Indicateurs calculés — ADX: %.2f | RSI: %.2f | ATR: %.6f | "
@@ -259,6 +291,87 @@ class IndicatorEngine:
             logger.exception("Erreur lors du calcul des indicateurs : %s", exc)
             return self._empty_result()
 
+    def compute_history(self, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Mode historique : les valeurs de compute() vues à chaque bougie.
+
+        Tous les indicateurs sont récursifs ou glissants, donc causaux : une
+        seule passe sur l'historique donne, ligne t, ce que
+        compute(df.iloc[:t + 1]) retournerait. Les lignes qui n'ont pas
+        encore MIN_BARS bougies d'historique prennent les valeurs de
+        _empty_result(), comme compute().
+
+        Args:
+            df (pd.DataFrame): DataFrame OHLCV complet, ordre chronologique.
+
+        Returns:
+            pd.DataFrame: une ligne par bougie (même index que df), une
+                          colonne par clé de compute().
+        """
+        empty = self._empty_result()
+        n = 0 if df is None else len(df)
+        index = df.index if df is not None else None
+        history = pd.DataFrame({key: [value] * n for key, value in empty.items()}, index=index)
+        if n < MIN_BARS:
+            return history
+
+        try:
+            close = df["close"].astype(float)
+            high  = df["high"].astype(float)
+            low   = df["low"].astype(float)
+
+            atr_series = self._compute_atr(high, low, close)
+            adx_vals   = self._compute_adx(high, low, close, atr_series)
+            rsi_series = self._compute_rsi(close)
+            qqe_vals   = self._compute_qqe(rsi_series)
+            macd_vals  = self._compute_macd(close)
+            bb_vals    = self._compute_bollinger(close)
+            ema50      = close.ewm(span=EMA_FAST,  adjust=False).mean()
+            ema200     = close.ewm(span=EMA_SLOW, adjust=False).mean()
+
+            adx  = adx_vals["adx"]
+            fast = qqe_vals["fast"]
+            slow = qqe_vals["slow"]
+
+            # Tendance (trend_label appliqué à chaque bougie)
+            c, f, s = close.to_numpy(), ema50.to_numpy(), ema200.to_numpy()
+            trend = np.select(
+                [(c > f) & (f > s), (c < f) & (f < s), c > s, c < s],
+                ["BULLISH", "BEARISH", "BULLISH", "BEARISH"],
+                "NEUTRE",
+            )
+
+            columns = {
+                "adx"               : adx,
+                "di_plus"           : adx_vals["di_plus"],
+                "di_minus"          : adx_vals["di_minus"],
+                "adx_rising"        : adx > adx.shift(1),
+                "qqe_fast"          : fast,
+                "qqe_slow"          : slow,
+                "qqe_fast_prev"     : fast.shift(1),
+                "qqe_slow_prev"     : slow.shift(1),
+                "qqe_cross_bars_ago": self._qqe_cross_history(fast, slow),
+                "rsi"               : rsi_series,
+                "atr"               : atr_series,
+                "macd"              : macd_vals["macd"],
+                "macd_signal"       : macd_vals["signal"],
+                "bb_upper"          : bb_vals["upper"],
+                "bb_lower"          : bb_vals["lower"],
+                "ema50"             : ema50,
+                "ema200"            : ema200,
+                "trend"             : trend,
+            }
+
+            ready = np.arange(n) >= MIN_BARS - 1
+            for key, values in columns.items():
+                values = np.asarray(values)
+                history[key] = np.where(ready, values, empty[key]).astype(values.dtype)
+            return history
+
+        except Exception as exc:
+            logger.exception("Erreur lors du calcul historique des indicateurs : %s", exc)
+            return history
+
     # ------------------------------------------------------------------
     # Calcul de l'ATR (méthode Wilder)
     # ------------------------------------------------------------------
@@ -547,6 +660,26 @@ class IndicatorEngine:
         # Aucun croisement trouvé dans la fenêtre
         return 99
 
+    def _qqe_cross_history(self, fast: pd.Series, slow: pd.Series) -> np.ndarray:
+        """
+        _qqe_cross_bars_ago évalué à chaque bougie.
+
+        Le dernier croisement (indice du plus récent croisement <= t) est
+        propagé par un maximum cumulé ; au-delà de QQE_CROSS_LOOKBACK - 1
+        barres, la valeur est 99 comme dans la version bougie courante.
+        """
+        f, s = fast.to_numpy(dtype=float), slow.to_numpy(dtype=float)
+        pf, ps = np.roll(f, 1), np.roll(s, 1)
+        with np.errstate(invalid="ignore"):
+            crossed = ((pf <= ps) & (f > s)) | ((pf >= ps) & (f < s))
+        crossed &= ~(np.isnan(f) | np.isnan(s) | np.isnan(pf) | np.isnan(ps))
+        crossed[0] = False
+
+        bars = np.arange(len(f))
+        last = np.maximum.accumulate(np.where(crossed, bars, -1))
+        ago  = bars - last
+        return np.where((last >= 0) & (ago <= QQE_CROSS_LOOKBACK - 1), ago, 99)
+
     # ------------------------------------------------------------------
     # Calcul du MACD
     # ------------------------------------------------------------------
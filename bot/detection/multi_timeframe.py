@@ -9,6 +9,8 @@ C'est ce que font les traders professionnels.
 from dataclasses import dataclass
 from typing import Optional
 
+from bot.detection.indicator_engine import EMA_FAST, EMA_SLOW, trend_label
+
 
 # Hiérarchie des timeframes
 TF_HIERARCHY = {
@@ -210,22 +212,139 @@ class MultiTimeframeAnalyzer:
         """
         Détermine la tendance d'un dataframe OHLCV.
         Méthode simple : position par rapport à EMA 50 + EMA 200
+        (même EMA que l'IndicatorEngine : adjust=False, voir trend_label).
+
+        Pour un suivi bougie par bougie, préférer TrendService (état EMA
+        incrémental par paire/timeframe).
         """
         try:
             close = df["close"]
-            ema50 = close.ewm(span=50).mean().iloc[-1]
-            ema200= close.ewm(span=200).mean().iloc[-1]
-            price = close.iloc[-1]
-
-            if price > ema50 > ema200:
-                return "BULLISH"
-            elif price < ema50 < ema200:
-                return "BEARISH"
-            elif price > ema200:
-                return "BULLISH"
-            elif price < ema200:
-                return "BEARISH"
-            else:
-                return "NEUTRE"
+            ema50 = close.ewm(span=EMA_FAST, adjust=False).mean().iloc[-1]
+            ema200= close.ewm(span=EMA_SLOW, adjust=False).mean().iloc[-1]
+            return trend_label(close.iloc[-1], ema50, ema200)
         except Exception:
             return "NEUTRE"
+
+
+# ══════════════════════════════════════════════════════════════════════
+# MATRICE D'ALIGNEMENT — tout l'univers (paire × timeframe), une fois par scan
+# ══════════════════════════════════════════════════════════════════════
+
+# Score de tendance par label (signe = sens, valeur absolue = force)
+_TREND_SCORE = {"BULLISH": 1, "BEARISH": -1, "NEUTRE": 0}
+
+
+@dataclass
+class MTFCell:
+    pair          : str
+    tf            : str
+    trend         : str            # BULLISH / BEARISH / NEUTRE
+    score         : int            # -2..+2 : +2 = prix > EMA50 > EMA200, +1 = prix > EMA200 seul
+    price         : float          # dernière clôture
+    sr_levels     : list           # niveaux S/R du timeframe (utilisés comme niveaux HTF)
+    nearest_level : Optional[float] = None
+
+    @property
+    def strength(self) -> int:
+        return abs(self.score)
+
+    def to_dict(self) -> dict:
+        return {
+            "trend"        : self.trend,
+            "score"        : self.score,
+            "strength"     : self.strength,
+            "price"        : round(self.price, 5),
+            "nearest_level": round(self.nearest_level, 5) if self.nearest_level is not None else None,
+        }
+
+
+class AlignmentMatrix:
+    """
+    Tendance, force et niveau S/R le plus proche de chaque (paire, timeframe)
+    de l'univers, calculés une seule fois par scan à partir des DataFrames
+    déjà chargés.
+
+    L'annotation HTF d'un signal devient une lecture de table : le résultat
+    de analyze_sniper est mémorisé par (paire, timeframe, direction).
+    La matrice se sérialise telle quelle pour la heatmap de l'interface web.
+    """
+
+    # Nombre de bougies utilisées pour les niveaux S/R d'un timeframe supérieur
+    SR_BARS = 100
+
+    def __init__(self, analyzer: MultiTimeframeAnalyzer, htf_map: dict):
+        self.analyzer = analyzer
+        self.htf_map  = htf_map
+        self.cells    : dict[tuple, MTFCell] = {}
+        self._sniper  : dict[tuple, MTFResult] = {}
+
+    @classmethod
+    def build(cls,
+              frames        : dict,
+              trend_service,
+              sr_detector,
+              analyzer      : MultiTimeframeAnalyzer,
+              htf_map       : dict) -> "AlignmentMatrix":
+        """
+        frames        : {(paire, tf): DataFrame OHLCV} chargés pour le scan
+        trend_service : TrendService (EMA incrémentales par paire/tf)
+        sr_detector   : SRDetector pour les niveaux de chaque timeframe
+        htf_map       : {tf: (htf1, htf2)} hiérarchie utilisée par le scan
+        """
+        matrix = cls(analyzer, htf_map)
+        for (pair, tf), df in frames.items():
+            if df is None or len(df) == 0:
+                continue
+            trend = trend_service.update(pair, tf, df)
+            price = float(df["close"].iloc[-1])
+            fast, slow = trend_service.emas(pair, tf)
+            full_stack = (price > fast > slow) or (price < fast < slow)
+            score = _TREND_SCORE[trend] * (2 if full_stack else 1)
+
+            levels  = [z.get("price", 0) for z in sr_detector.detect(df.tail(cls.SR_BARS))]
+            nearest = min((lvl for lvl in levels if lvl), key=lambda lvl: abs(lvl - price), default=None)
+
+            matrix.cells[(pair, tf)] = MTFCell(
+                pair=pair, tf=tf, trend=trend, score=score, price=price,
+                sr_levels=levels, nearest_level=nearest,
+            )
+        return matrix
+
+    def cell(self, pair: str, tf: Optional[str]) -> Optional[MTFCell]:
+        return self.cells.get((pair, tf)) if tf else None
+
+    def trend(self, pair: str, tf: Optional[str]) -> str:
+        cell = self.cell(pair, tf)
+        return cell.trend if cell else "NEUTRE"
+
+    def sniper(self, pair: str, tf: str, direction: str) -> MTFResult:
+        """analyze_sniper de (paire, tf, direction), calculé une seule fois."""
+        key = (pair, tf, direction)
+        if key not in self._sniper:
+            htf1_tf, htf2_tf = self.htf_map.get(tf, ("4h", None))
+            base = self.cell(pair, tf)
+            htf1 = self.cell(pair, htf1_tf)
+            self._sniper[key] = self.analyzer.analyze_sniper(
+                signal_tf  = tf,
+                signal_dir = direction,
+                htf1_data  = {
+                    "trend"     : htf1.trend if htf1 else "NEUTRE",
+                    "tf"        : htf1_tf,
+                    "sr_levels" : htf1.sr_levels if htf1 else [],
+                    "price"     : base.price if base else 0,
+                },
+                htf2_data  = {
+                    "trend" : self.trend(pair, htf2_tf),
+                    "tf"    : htf2_tf,
+                } if htf2_tf else None,
+            )
+        return self._sniper[key]
+
+    def to_dict(self) -> dict:
+        """Matrice sérialisable (heatmap) : {pairs, timeframes, cells[pair][tf]}."""
+        pairs = list(dict.fromkeys(pair for pair, _ in self.cells))
+        tfs   = sorted({tf for _, tf in self.cells}, key=lambda tf: TF_HIERARCHY.get(tf, 0))
+        cells: dict = {}
+        for (pair, tf), cell in self.cells.items():
+            cells.setdefault(pair, {})[tf] = cell.to_dict()
+        return {"pairs": pairs, "timeframes": tfs, "cells": cells}
@@ -6,11 +6,268 @@ Utilise scipy.signal.argrelextrema pour identifier les pivots.
 import logging
 import numpy as np
 import pandas as pd
+from dataclasses import dataclass
+from numpy.lib.stride_tricks import sliding_window_view
 from scipy.signal import argrelextrema
 from typing import Optional
 
 logger = logging.getLogger(__name__)
 
+# Nombre de couples de pivots traités à la fois par _between_extreme()
+_HISTORY_CHUNK = 4096
+
+
+@dataclass
+class _WindowBatch:
+    """
+    Lot de fenêtres glissantes [starts[k], ends[k]] sur un même historique.
+
+    Les pivots sont stockés en indices absolus, alignés à gauche et complétés
+    par -1 (une ligne par fenêtre). `hi_last` / `lo_last` sont les 5 derniers
+    pivots (alignés à droite) et `hi_slope` / `lo_slope` les pentes de leur
+    régression, partagés par les triangles et les biseaux. `atr` est l'ATR de
+    chaque fenêtre, calculé exactement comme _compute_atr() sur la fenêtre isolée.
+    """
+    high       : np.ndarray
+    low        : np.ndarray
+    close      : np.ndarray
+    starts     : np.ndarray
+    ends       : np.ndarray
+    hi_piv     : np.ndarray
+    hi_count   : np.ndarray
+    lo_piv     : np.ndarray
+    lo_count   : np.ndarray
+    hi_last    : np.ndarray
+    hi_last_ok : np.ndarray
+    lo_last    : np.ndarray
+    lo_last_ok : np.ndarray
+    hi_slope   : np.ndarray
+    lo_slope   : np.ndarray
+    atr        : np.ndarray
+    near_sr    : Optional[np.ndarray] = None
+
+
+def _dominance(values: np.ndarray, order: int, greater: bool) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Pour chaque barre : nombre de voisins consécutifs (plafonné à `order`)
+    strictement dominés à gauche et à droite.
+    """
+    n     = len(values)
+    left  = np.zeros(n, dtype=np.int64)
+    right = np.zeros(n, dtype=np.int64)
+    alive_l = np.ones(n, dtype=bool)
+    alive_r = np.ones(n, dtype=bool)
+    cmp = np.greater if greater else np.less
+
+    for k in range(1, order + 1):
+        dom_l = np.zeros(n, dtype=bool)
+        dom_r = np.zeros(n, dtype=bool)
+        if k < n:
+            dom_l[k:]  = cmp(values[k:], values[:-k])
+            dom_r[:-k] = cmp(values[:-k], values[k:])
+        alive_l &= dom_l
+        alive_r &= dom_r
+        left  += alive_l
+        right += alive_r
+
+    return left, right
+
+
+def _window_pivots(
+    values: np.ndarray,
+    starts: np.ndarray,
+    ends: np.ndarray,
+    order: int,
+    greater: bool,
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Pivots argrelextrema(order) de chaque fenêtre [starts[k], ends[k]].
+
+    argrelextrema (mode "clip") retient i si values[i] domine ses `order`
+    voisins de chaque côté, les indices hors fenêtre étant ramenés au bord.
+    Cela revient à : starts < i < ends, dominance gauche >= min(order, i - start)
+    et dominance droite >= min(order, end - i). La dominance est calculée une
+    seule fois sur tout l'historique puis partagée par toutes les fenêtres.
+
+    Returns:
+        (pivots, counts) : matrice [fenêtres, K] d'indices absolus (-1 = vide)
+                           et nombre de pivots par fenêtre.
+    """
+    left, right = _dominance(values, order, greater)
+    cand = np.flatnonzero((left >= 1) & (right >= 1))
+
+    lo = np.searchsorted(cand, starts, side="right")
+    hi = np.searchsorted(cand, ends,   side="left")
+    width = int((hi - lo).max()) if len(cand) and len(starts) else 0
+    if width <= 0:
+        return np.full((len(starts), 0), -1, dtype=np.int64), np.zeros(len(starts), dtype=np.int64)
+
+    pos   = lo[:, None] + np.arange(width)
+    valid = pos < hi[:, None]
+    idx   = cand[np.minimum(pos, len(cand) - 1)]
+    valid &= left[idx]  >= np.minimum(order, idx - starts[:, None])
+    valid &= right[idx] >= np.minimum(order, ends[:, None] - idx)
+
+    # Compactage à gauche des pivots retenus (l'ordre chronologique est conservé)
+    counts = valid.sum(axis=1)
+    pivots = np.full((len(starts), int(counts.max())), -1, dtype=np.int64)
+    rows, cols = np.nonzero(valid)
+    pivots[rows, np.cumsum(valid, axis=1)[rows, cols] - 1] = idx[rows, cols]
+    return pivots, counts
+
+
+def _between_extreme(
+    rows: np.ndarray,
+    a_idx: np.ndarray,
+    b_idx: np.ndarray,
+    pivots: np.ndarray,
+    values: np.ndarray,
+    lowest: bool,
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Pour chaque couple (a, b) de la fenêtre `rows` : pivot extrême strictement
+    compris entre a et b.
+
+    Returns:
+        (idx, price) : indice absolu du pivot (-1 si aucun) et son prix
+                       (+inf / -inf si aucun). En cas d'égalité, le premier
+                       pivot chronologique est retenu (comme np.argmin/argmax).
+    """
+    fill    = np.inf if lowest else -np.inf
+    out_idx = np.full(len(rows), -1, dtype=np.int64)
+    out_val = np.full(len(rows), fill)
+    if pivots.shape[1] == 0 or len(rows) == 0:
+        return out_idx, out_val
+
+    for lo in range(0, len(rows), _HISTORY_CHUNK):
+        chunk  = slice(lo, lo + _HISTORY_CHUNK)
+        q      = pivots[rows[chunk]]
+        inside = (q > a_idx[chunk, None]) & (q < b_idx[chunk, None])
+        vals   = np.where(inside, values[q], fill)
+        best   = vals.argmin(axis=1) if lowest else vals.argmax(axis=1)
+        picked = q[np.arange(len(q)), best]
+        out_idx[chunk] = np.where(inside.any(axis=1), picked, -1)
+        out_val[chunk] = vals[np.arange(len(q)), best]
+
+    return out_idx, out_val
+
+
+def _range_extreme(
+    pivots: np.ndarray,
+    values: np.ndarray,
+    a_idx: np.ndarray,
+    b_idx: np.ndarray,
+    lowest: bool,
+) -> np.ndarray:
+    """
+    Prix extrême des pivots strictement compris entre a et b, pour chaque couple.
+
+    Les pivots étant triés, ceux d'un couple forment une plage contiguë
+    [lo, hi) trouvée par searchsorted ; minimum.reduceat / maximum.reduceat
+    réduit toutes les plages en un appel (O(K log K) quel que soit le
+    nombre de bougies). +inf / -inf si aucun pivot.
+    """
+    fill = np.inf if lowest else -np.inf
+    out  = np.full(len(a_idx), fill)
+    lo   = np.searchsorted(pivots, a_idx, side="right")
+    hi   = np.searchsorted(pivots, b_idx, side="left")
+    found = hi > lo
+    if not found.any():
+        return out
+
+    # Plages [lo, hi) entrelacées : reduceat réduit chaque plage paire
+    prices = np.append(values[pivots], fill)
+    bounds = np.column_stack([lo[found], hi[found]]).ravel()
+    reduce = np.minimum if lowest else np.maximum
+    out[found] = reduce.reduceat(prices, bounds)[::2]
+    return out
+
+
+def _first_extreme(pivots: np.ndarray, values: np.ndarray, a: int, b: int, lowest: bool) -> int:
+    """Indice du pivot extrême entre a et b (le premier en cas d'égalité)."""
+    mid = pivots[(pivots > a) & (pivots < b)]
+    return int(mid[np.argmin(values[mid])] if lowest else mid[np.argmax(values[mid])])
+
+
+def _last_pivots(pivots: np.ndarray, counts: np.ndarray, k: int = 5) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Les k derniers pivots de chaque fenêtre (équivalent de pivots[-k:]),
+    alignés à droite : la colonne k-1 est toujours le pivot le plus récent.
+    """
+    pos   = counts[:, None] - k + np.arange(k)
+    valid = pos >= 0
+    if pivots.shape[1] == 0:
+        return np.full((len(counts), k), -1, dtype=np.int64), valid
+    idx = np.take_along_axis(pivots, np.clip(pos, 0, pivots.shape[1] - 1), axis=1)
+    return np.where(valid, idx, -1), valid
+
+
+def _all_monotonic(prices: np.ndarray, valid: np.ndarray, increasing: bool) -> np.ndarray:
+    """np.all(np.diff(p) > 0) (ou < 0) restreint aux pivots valides de chaque ligne."""
+    diff = prices[:, 1:] - prices[:, :-1]
+    pair = valid[:, 1:] & valid[:, :-1]
+    ok   = diff > 0 if increasing else diff < 0
+    return np.all(~pair | ok, axis=1)
+
+
+class _RollingRegression:
+    """
+    Régression linéaire y = slope·x + intercept sur n'importe quelle fenêtre.
+
+    Les sommes cumulées de x, y, xy, x² et y² sont calculées une seule fois ;
+    chaque fenêtre [start, end) est ensuite ajustée en O(1), ce qui permet
+    d'obtenir toutes les droites candidates (mâts, drapeaux, lignes de
+    pivots) en une passe. Un tableau 2D est traité ligne par ligne (sommes
+    cumulées sur le dernier axe). x et y sont centrés pour limiter les
+    erreurs d'arrondi des sommes cumulées.
+    """
+
+    def __init__(self, y: np.ndarray, x: np.ndarray = None):
+        y = np.asarray(y, dtype=float)
+        if x is None:
+            x = np.broadcast_to(np.arange(y.shape[-1], dtype=float), y.shape)
+        x = np.asarray(x, dtype=float)
+
+        self._x0 = x.mean(axis=-1, keepdims=True) if x.shape[-1] else np.zeros(x.shape[:-1] + (1,))
+        self._y0 = y.mean(axis=-1, keepdims=True) if y.shape[-1] else np.zeros(y.shape[:-1] + (1,))
+        xc, yc = x - self._x0, y - self._y0
+
+        pad = [(0, 0)] * (y.ndim - 1) + [(1, 0)]
+        self._sums = [
+            np.pad(np.cumsum(v, axis=-1), pad)
+            for v in (xc, yc, xc * yc, xc * xc, yc * yc)
+        ]
+
+    def fit(self, start, end) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Ajuste la fenêtre [start, end) (scalaires, ou un couple par ligne en 2D).
+
+        Returns:
+            (slope, intercept, r2) — pente nulle si moins de 2 points.
+        """
+        start = np.asarray(start)
+        end   = np.asarray(end)
+
+        if self._sums[0].ndim == 1:
+            sx, sy, sxy, sxx, syy = (c[end] - c[start] for c in self._sums)
+            x0, y0 = self._x0[0], self._y0[0]
+        else:
+            rows = np.arange(self._sums[0].shape[0])
+            sx, sy, sxy, sxx, syy = (c[rows, end] - c[rows, start] for c in self._sums)
+            x0, y0 = self._x0[:, 0], self._y0[:, 0]
+
+        n     = end - start
+        var_x = n * sxx - sx ** 2
+        var_y = n * syy - sy ** 2
+        cov   = n * sxy - sx * sy
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            slope     = np.where(n >= 2, cov / (var_x + 1e-12), 0.0)
+            intercept = np.where(n >= 1, (sy - slope * sx) / n, 0.0) + y0 - slope * x0
+            r2        = np.where((var_x > 0) & (var_y > 0), cov ** 2 / (var_x * var_y), 0.0)
+
+        return slope, intercept, r2
+
 
 class PatternDetector:
     """
@@ -24,6 +281,18 @@ class PatternDetector:
       - Rising Wedge / Falling Wedge
     """
 
+    # Taille de la fenêtre analysée (100 dernières bougies)
+    WINDOW = 100
+
+    # Nombre minimum de bougies pour lancer la détection
+    MIN_BARS = 30
+
+    # Nombre de bougies de chaque côté pour définir un pivot
+    PIVOT_ORDER = 5
+
+    # Période ATR (Wilder)
+    ATR_PERIOD = 14
+
     # ------------------------------------------------------------------ #
     #  Méthode publique principale                                         #
     # ------------------------------------------------------------------ #
@@ -40,18 +309,21 @@ class PatternDetector:
         Returns:
             Liste de dicts de signaux (clarity >= 2 uniquement).
         """
-        if len(df) < 30:
-            logger.warning("Pas assez de bougies pour la détection de figures (%d < 30)", len(df))
+        if len(df) < self.MIN_BARS:
+            logger.warning(
+                "Pas assez de bougies pour la détection de figures (%d < %d)",
+                len(df), self.MIN_BARS,
+            )
             return []
 
         # Travailler sur les 100 dernières bougies
-        df_slice = df.tail(100).copy().reset_index(drop=True)
+        df_slice = df.tail(self.WINDOW).copy().reset_index(drop=True)
 
         # Calcul de l'ATR une seule fois
-        atr_value = self._compute_atr(df_slice, period=14)
+        atr_value = self._compute_atr(df_slice, period=self.ATR_PERIOD)
 
         # Pivots hauts et bas
-        highs_idx, lows_idx = self._find_pivots(df_slice, order=5)
+        highs_idx, lows_idx = self._find_pivots(df_slice, order=self.PIVOT_ORDER)
 
         signals: list[dict] = []
 
@@ -98,6 +370,93 @@ class PatternDetector:
 
         return signals
 
+    def detect_history(
+        self,
+        bars: pd.DataFrame,
+        sr_zones: list = None,
+        ends: np.ndarray = None,
+        zones_at=None,
+    ) -> list[dict]:
+        """
+        Mode historique : rejoue detect() sur chaque bougie d'un historique complet.
+
+        La bougie t est évaluée sur la même fenêtre que detect(bars.iloc[:t + 1])
+        (les 100 bougies se terminant en t). Les pivots, l'ATR et les pentes
+        sont calculés une seule fois sur tout l'historique puis partagés entre
+        les fenêtres qui se chevauchent, au lieu de rappeler detect() sur une
+        copie à chaque bougie.
+
+        Args:
+            bars      : DataFrame OHLCV complet, ordre chronologique
+            sr_zones  : Zones S/R appliquées à toutes les bougies (optionnel)
+            ends      : Bougies de complétion à évaluer (défaut : toutes)
+            zones_at  : callable(bougie) → zones S/R propres à cette bougie
+                        (remplace sr_zones ; appelé seulement pour les
+                        bougies portant une figure candidate)
+
+        Returns:
+            Liste de signaux (clarity >= 2 uniquement), triés par bougie de
+            complétion. Chaque dict est celui que detect() aurait produit à
+            cette bougie, avec en plus :
+              - "bar"       : indice absolu de la bougie de complétion
+              - "timestamp" : horodatage de cette bougie (si colonne présente)
+        """
+        n = len(bars)
+        if n < self.MIN_BARS:
+            logger.warning(
+                "Pas assez de bougies pour le scan historique (%d < %d)", n, self.MIN_BARS
+            )
+            return []
+
+        ends = np.arange(self.MIN_BARS - 1, n) if ends is None else np.asarray(ends, dtype=np.int64)
+        ends = ends[ends >= self.MIN_BARS - 1]
+        if not len(ends):
+            return []
+
+        batch = self._build_batch(bars, ends)
+        # Zones par bougie : pas de masque commun (aucune figure élaguée d'avance)
+        batch.near_sr = None if zones_at else self._near_sr_mask(batch, sr_zones or [])
+
+        history_detectors = [
+            lambda b: self._history_double(b, top=True),
+            lambda b: self._history_double(b, top=False),
+            lambda b: self._history_head_shoulders(b, inverse=False),
+            lambda b: self._history_head_shoulders(b, inverse=True),
+            lambda b: self._history_flag(b, bull=True),
+            lambda b: self._history_flag(b, bull=False),
+            self._history_ascending_triangle,
+            self._history_descending_triangle,
+            self._history_symmetric_triangle,
+            lambda b: self._history_wedge(b, rising=True),
+            lambda b: self._history_wedge(b, rising=False),
+        ]
+
+        timestamps = bars["timestamp"].values if "timestamp" in bars.columns else None
+        found: list[tuple[int, dict]] = []
+
+        for history_fn in history_detectors:
+            for row, result in history_fn(batch):
+                result.setdefault("reversal_candle", False)
+                bar = int(batch.ends[row])
+                if zones_at is not None:
+                    result["pattern_clarity"] = self._compute_clarity(
+                        result, zones_at(bar), float(batch.atr[row])
+                    )
+                elif batch.near_sr[row]:
+                    result["pattern_clarity"] = min(result["pattern_clarity"] + 1, 3)
+                if result["pattern_clarity"] < 2:
+                    continue
+                result["bar"] = bar
+                if timestamps is not None:
+                    result["timestamp"] = timestamps[bar]
+                found.append((bar, result))
+
+        found.sort(key=lambda item: item[0])
+        logger.info(
+            "Scan historique : %d figure(s) sur %d bougies", len(found), len(batch.ends)
+        )
+        return [result for _, result in found]
+
     # ------------------------------------------------------------------ #
     #  Helpers internes                                                    #
     # ------------------------------------------------------------------ #
@@ -179,14 +538,400 @@ class PatternDetector:
         """Régression linéaire simple — retourne la pente."""
         if len(indices) < 2:
             return 0.0
-        x = indices.astype(float)
-        y = values.astype(float)
-        n = len(x)
-        slope = (n * np.dot(x, y) - x.sum() * y.sum()) / (
-            n * np.dot(x, x) - x.sum() ** 2 + 1e-12
-        )
+        slope, _, _ = _RollingRegression(values, indices).fit(0, len(indices))
         return float(slope)
 
+    # ------------------------------------------------------------------ #
+    #  Mode historique : fenêtres glissantes vectorisées                   #
+    # ------------------------------------------------------------------ #
+
+    def _build_batch(self, bars: pd.DataFrame, ends: np.ndarray) -> _WindowBatch:
+        """Pivots et ATR des fenêtres de WINDOW bougies se terminant en `ends`."""
+        high  = bars["high"].to_numpy(dtype=float)
+        low   = bars["low"].to_numpy(dtype=float)
+        close = bars["close"].to_numpy(dtype=float)
+
+        ends   = np.asarray(ends, dtype=np.int64)
+        starts = np.maximum(ends - self.WINDOW + 1, 0)
+
+        hi_piv, hi_count = _window_pivots(high, starts, ends, self.PIVOT_ORDER, greater=True)
+        lo_piv, lo_count = _window_pivots(low,  starts, ends, self.PIVOT_ORDER, greater=False)
+
+        # 5 derniers pivots (cf. pivots[-5:]) et pentes, x relatif à la fenêtre
+        hi_last, hi_last_ok = _last_pivots(hi_piv, hi_count)
+        lo_last, lo_last_ok = _last_pivots(lo_piv, lo_count)
+        hi_slope = self._pivot_fit(hi_piv, hi_count, high, starts)
+        lo_slope = self._pivot_fit(lo_piv, lo_count, low,  starts)
+
+        return _WindowBatch(
+            high=high, low=low, close=close,
+            starts=starts, ends=ends,
+            hi_piv=hi_piv, hi_count=hi_count,
+            lo_piv=lo_piv, lo_count=lo_count,
+            hi_last=hi_last, hi_last_ok=hi_last_ok,
+            lo_last=lo_last, lo_last_ok=lo_last_ok,
+            hi_slope=hi_slope, lo_slope=lo_slope,
+            atr=self._history_atr(high, low, close, starts, ends),
+        )
+
+    @staticmethod
+    def _pivot_fit(
+        pivots: np.ndarray, counts: np.ndarray, values: np.ndarray, starts: np.ndarray
+    ) -> np.ndarray:
+        """Pente des 5 derniers pivots de chaque fenêtre (x relatif à la fenêtre)."""
+        if pivots.shape[1] == 0:
+            return np.zeros(len(counts))
+        x = np.where(pivots >= 0, pivots - starts[:, None], 0)
+        slope, _, _ = _RollingRegression(values[pivots], x).fit(np.maximum(counts - 5, 0), counts)
+        return slope
+
+    def _history_atr(
+        self,
+        high: np.ndarray,
+        low: np.ndarray,
+        close: np.ndarray,
+        starts: np.ndarray,
+        ends: np.ndarray,
+    ) -> np.ndarray:
+        """
+        ATR de chaque fenêtre, identique à _compute_atr() sur la fenêtre isolée.
+
+        Fenêtre pleine : ATR = a^k · moyenne(14 premières TR)
+                              + Σ (1/period) · a^j · TR[end - j]   (a = 13/14)
+        Le second terme est une convolution calculée une seule fois.
+        Les fenêtres du début (start = 0) suivent la série séquentielle.
+        """
+        period = self.ATR_PERIOD
+        n      = len(close)
+
+        tr = np.zeros(n)
+        tr[1:] = np.maximum.reduce([
+            high[1:] - low[1:],
+            np.abs(high[1:] - close[:-1]),
+            np.abs(low[1:]  - close[:-1]),
+        ])
+
+        atr  = np.empty(len(ends))
+        head = starts == 0
+
+        # Fenêtres tronquées [0, end] : lissage de Wilder séquentiel
+        if head.any():
+            last = int(ends[head].max())
+            seq  = np.zeros(last + 1)
+            for end in range(1, last + 1):
+                if end <= period:
+                    seq[end] = float(np.mean(tr[1:end + 1]))
+                else:
+                    seq[end] = (seq[end - 1] * (period - 1) + tr[end]) / period
+            atr[head] = seq[ends[head]]
+
+        # Fenêtres pleines : amortissement de la moyenne initiale + convolution
+        full = ~head
+        if full.any():
+            decay   = (period - 1) / period
+            steps   = self.WINDOW - 1 - period
+            weights = decay ** np.arange(steps) / period
+            tail    = np.convolve(tr, weights)[:n]
+            cum     = np.concatenate(([0.0], np.cumsum(tr)))
+            s       = starts[full]
+            seed    = (cum[s + period + 1] - cum[s + 1]) / period
+            atr[full] = decay ** steps * seed + tail[ends[full]]
+
+        return atr
+
+    def _near_sr_mask(self, batch: _WindowBatch, sr_zones: list) -> np.ndarray:
+        """Bonus S/R de _compute_clarity() évalué pour chaque fenêtre du lot."""
+        prices = [
+            zone.get("price", zone) if isinstance(zone, dict) else float(zone)
+            for zone in sr_zones
+        ]
+        if not prices:
+            return np.zeros(len(batch.ends), dtype=bool)
+
+        zones = np.sort(np.asarray(prices, dtype=float))
+        price = batch.close[batch.ends]
+        pos   = np.searchsorted(zones, price)
+        below = zones[np.clip(pos - 1, 0, len(zones) - 1)]
+        above = zones[np.clip(pos,     0, len(zones) - 1)]
+        dist  = np.minimum(np.abs(price - below), np.abs(above - price))
+        return dist <= batch.atr
+
+    def _history_double(self, b: _WindowBatch, top: bool):
+        """
+        Double Top / Double Bottom sur toutes les fenêtres.
+
+        Les paires de pivots consécutifs sont testées colonne par colonne,
+        uniquement pour les fenêtres sans figure trouvée : comme detect(),
+        la première paire valide l'emporte.
+        """
+        piv, count = (b.hi_piv, b.hi_count) if top else (b.lo_piv, b.lo_count)
+        values       = b.high if top else b.low
+        other_piv    = b.lo_piv if top else b.hi_piv
+        other_values = b.low if top else b.high
+
+        done  = np.zeros(len(count), dtype=bool)
+        found = []
+
+        for col in range(piv.shape[1] - 1):
+            rows = np.flatnonzero(~done & (count > col + 1))
+            if len(rows) == 0:
+                break
+            idx1, idx2 = piv[rows, col], piv[rows, col + 1]
+            p1, p2 = values[idx1], values[idx2]
+
+            # Sommets (ou creux) similaires (< 1%)
+            similar = np.abs(p1 - p2) / p1 <= 0.01
+            rows, idx1, idx2, p1, p2 = rows[similar], idx1[similar], idx2[similar], p1[similar], p2[similar]
+
+            # Pivot opposé entre les deux + validation de la neckline
+            neck_idx, neck = _between_extreme(rows, idx1, idx2, other_piv, other_values, lowest=top)
+            close = b.close[b.ends[rows]]
+            with np.errstate(invalid="ignore"):
+                ok = close <= neck * 1.02 if top else close >= neck * 0.98
+            ok &= neck_idx >= 0
+
+            done[rows[ok]] = True
+            found.append((rows[ok], p1[ok], p2[ok], idx1[ok], idx2[ok], neck_idx[ok], neck[ok]))
+
+        if not found:
+            return
+
+        rows, p1, p2, idx1, idx2, neck_idx, neck = (np.concatenate(f) for f in zip(*found))
+
+        # Clarté 1 sans zone S/R proche : rejeté par le filtre final, inutile
+        # de construire le signal
+        if b.near_sr is not None:
+            keep = (np.abs(p1 - p2) / p1 < 0.005) | b.near_sr[rows]
+            rows, p1, p2, idx1, idx2, neck_idx, neck = (
+                rows[keep], p1[keep], p2[keep], idx1[keep], idx2[keep], neck_idx[keep], neck[keep]
+            )
+
+        s     = b.starts[rows]
+        build = self._double_top_signal if top else self._double_bottom_signal
+
+        # Conversion en scalaires Python : round() est lent sur les scalaires numpy
+        hits = zip(
+            rows.tolist(), p1.tolist(), p2.tolist(),
+            (idx1 - s).tolist(), (idx2 - s).tolist(), (neck_idx - s).tolist(), neck.tolist(),
+            b.close[b.ends[rows]].tolist(), b.atr[rows].tolist(),
+        )
+        for row, *fields in hits:
+            yield row, build(*fields)
+
+    def _history_head_shoulders(self, b: _WindowBatch, inverse: bool):
+        """
+        ETE / ETE inversé sur toutes les fenêtres.
+
+        Même parcours colonne par colonne que _history_double : le premier
+        triplet valide de chaque fenêtre l'emporte.
+        """
+        piv, count = (b.lo_piv, b.lo_count) if inverse else (b.hi_piv, b.hi_count)
+        values       = b.low if inverse else b.high
+        other_piv    = b.hi_piv if inverse else b.lo_piv
+        other_values = b.high if inverse else b.low
+
+        done  = np.zeros(len(count), dtype=bool)
+        found = []
+
+        for col in range(piv.shape[1] - 2):
+            rows = np.flatnonzero(~done & (count > col + 2))
+            if len(rows) == 0:
+                break
+            ls_idx, h_idx, rs_idx = piv[rows, col], piv[rows, col + 1], piv[rows, col + 2]
+            ls, hd, rs = values[ls_idx], values[h_idx], values[rs_idx]
+
+            # Tête extrême + épaules comparables (< 5%)
+            ok = (hd < ls) & (hd < rs) if inverse else (hd > ls) & (hd > rs)
+            ok &= np.abs(ls - rs) / ls <= 0.05
+            rows, ls_idx, h_idx, rs_idx = rows[ok], ls_idx[ok], h_idx[ok], rs_idx[ok]
+            ls, hd, rs = ls[ok], hd[ok], rs[ok]
+
+            # Creux (ou sommets) entre épaules et tête
+            left_idx,  left  = _between_extreme(rows, ls_idx, h_idx,  other_piv, other_values, lowest=not inverse)
+            right_idx, right = _between_extreme(rows, h_idx,  rs_idx, other_piv, other_values, lowest=not inverse)
+            ok = (left_idx >= 0) & (right_idx >= 0)
+
+            neckline = np.zeros(len(rows))
+            neckline[ok] = (left[ok] + right[ok]) / 2.0
+            close = b.close[b.ends[rows]]
+            ok &= close >= neckline * 0.98 if inverse else close <= neckline * 1.02
+
+            done[rows[ok]] = True
+            found.append((rows[ok], ls[ok], hd[ok], rs[ok], ls_idx[ok], h_idx[ok], rs_idx[ok], neckline[ok]))
+
+        if not found:
+            return
+
+        rows, ls, hd, rs, ls_idx, h_idx, rs_idx, neckline = (np.concatenate(f) for f in zip(*found))
+        s = b.starts[rows]
+
+        hits = zip(
+            rows.tolist(), ls.tolist(), hd.tolist(), rs.tolist(),
+            (ls_idx - s).tolist(), (h_idx - s).tolist(), (rs_idx - s).tolist(),
+            neckline.tolist(), b.close[b.ends[rows]].tolist(), b.atr[rows].tolist(),
+        )
+        for row, *fields in hits:
+            yield row, self._head_shoulders_signal(inverse, *fields)
+
+    def _history_flag(self, b: _WindowBatch, bull: bool):
+        """
+        Bull / Bear Flag sur toutes les fenêtres.
+
+        Le drapeau (10 dernières bougies) ne dépend pas de la longueur du mât :
+        sa pente et son range sont calculés une fois. Le mât s'allonge d'une
+        bougie vers la gauche à chaque longueur (10 → 20, la première valide
+        l'emporte) : son max/min est donc mis à jour de façon incrémentale.
+        """
+        flag_len = 10
+        e        = b.ends
+        flag_at  = e - flag_len + 1
+
+        flag_high = sliding_window_view(b.high, flag_len).max(axis=1)[flag_at]
+        flag_low  = sliding_window_view(b.low,  flag_len).min(axis=1)[flag_at]
+
+        flag_slope, _, _ = _RollingRegression(b.close).fit(flag_at, e + 1)
+
+        pending   = flag_slope < 0 if bull else flag_slope > 0
+        mast_len  = np.zeros(len(e), dtype=np.int64)
+        mast_high = np.zeros(len(e))
+        mast_low  = np.zeros(len(e))
+
+        # Mât initial de 9 bougies, étendu à 10 au premier tour de boucle
+        hi = sliding_window_view(b.high, 9).max(axis=1)[flag_at - 9]
+        lo = sliding_window_view(b.low,  9).min(axis=1)[flag_at - 9]
+
+        for length in range(10, 21):
+            if not pending.any():
+                break
+            start = e - length - flag_len + 1
+            hi = np.maximum(hi, b.high[start])
+            lo = np.minimum(lo, b.low[start])
+
+            if bull:
+                move_ok  = (hi - lo) / lo >= 0.03
+                trend_ok = b.close[e - flag_len] >= b.close[start] * 1.02
+            else:
+                move_ok  = (hi - lo) / hi >= 0.03
+                trend_ok = b.close[e - flag_len] <= b.close[start] * 0.98
+
+            hit = pending & move_ok & trend_ok & (flag_high - flag_low <= 0.5 * (hi - lo))
+            mast_len[hit]  = length
+            mast_high[hit] = hi[hit]
+            mast_low[hit]  = lo[hit]
+            pending &= ~hit
+
+        rows     = np.flatnonzero(mast_len)
+        flag_rel = flag_at[rows] - b.starts[rows]
+
+        hits = zip(
+            rows.tolist(),
+            mast_high[rows].tolist(), mast_low[rows].tolist(),
+            flag_high[rows].tolist(), flag_low[rows].tolist(),
+            (flag_rel - mast_len[rows]).tolist(), flag_rel.tolist(),
+            b.close[e[rows]].tolist(), b.atr[rows].tolist(),
+        )
+        for row, *fields in hits:
+            yield row, self._flag_signal(bull, *fields)
+
+    def _history_recent(self, b: _WindowBatch) -> tuple:
+        """Les 5 derniers pivots hauts/bas de chaque fenêtre et leurs prix."""
+        return (
+            b.hi_last, b.hi_last_ok, b.high[b.hi_last],
+            b.lo_last, b.lo_last_ok, b.low[b.lo_last],
+        )
+
+    @staticmethod
+    def _history_row(idx: np.ndarray, ok: np.ndarray, prices: np.ndarray, row: int, start: int):
+        """Pivots valides d'une ligne, en indices relatifs à la fenêtre."""
+        keep = ok[row]
+        return (idx[row][keep] - start).tolist(), prices[row][keep].tolist()
+
+    def _history_ascending_triangle(self, b: _WindowBatch):
+        """Triangle Ascendant sur toutes les fenêtres."""
+        hi_idx, hi_ok, hi, lo_idx, lo_ok, lo = self._history_recent(b)
+        n_hi = hi_ok.sum(axis=1)
+
+        resistance = np.where(hi_ok, hi, 0.0).sum(axis=1) / np.maximum(n_hi, 1)
+        flat = np.abs(hi - resistance[:, None]) / resistance[:, None] <= 0.005
+
+        ok  = (n_hi >= 2) & (lo_ok.sum(axis=1) >= 2)
+        ok &= np.all(~hi_ok | flat, axis=1)
+        ok &= _all_monotonic(lo, lo_ok, increasing=True)
+
+        for row in np.flatnonzero(ok):
+            s = b.starts[row]
+            r_hi_idx, _    = self._history_row(hi_idx, hi_ok, hi, row, s)
+            r_lo_idx, r_lo = self._history_row(lo_idx, lo_ok, lo, row, s)
+            yield row, self._ascending_triangle_signal(
+                float(resistance[row]), r_hi_idx, r_lo_idx, r_lo,
+                float(b.close[b.ends[row]]), float(b.atr[row]),
+            )
+
+    def _history_descending_triangle(self, b: _WindowBatch):
+        """Triangle Descendant sur toutes les fenêtres."""
+        hi_idx, hi_ok, hi, lo_idx, lo_ok, lo = self._history_recent(b)
+        n_lo = lo_ok.sum(axis=1)
+
+        support = np.where(lo_ok, lo, 0.0).sum(axis=1) / np.maximum(n_lo, 1)
+        flat = np.abs(lo - support[:, None]) / support[:, None] <= 0.005
+
+        ok  = (hi_ok.sum(axis=1) >= 2) & (n_lo >= 2)
+        ok &= np.all(~lo_ok | flat, axis=1)
+        ok &= _all_monotonic(hi, hi_ok, increasing=False)
+
+        for row in np.flatnonzero(ok):
+            s = b.starts[row]
+            r_hi_idx, r_hi = self._history_row(hi_idx, hi_ok, hi, row, s)
+            r_lo_idx, _    = self._history_row(lo_idx, lo_ok, lo, row, s)
+            yield row, self._descending_triangle_signal(
+                float(support[row]), r_hi_idx, r_lo_idx, r_hi,
+                float(b.close[b.ends[row]]), float(b.atr[row]),
+            )
+
+    def _history_symmetric_triangle(self, b: _WindowBatch):
+        """Triangle Symétrique sur toutes les fenêtres."""
+        hi_idx, hi_ok, hi, lo_idx, lo_ok, lo = self._history_recent(b)
+        hi_slope, lo_slope = b.hi_slope, b.lo_slope
+
+        ok  = (hi_ok.sum(axis=1) >= 3) & (lo_ok.sum(axis=1) >= 3)
+        ok &= _all_monotonic(hi, hi_ok, increasing=False)
+        ok &= _all_monotonic(lo, lo_ok, increasing=True)
+        ok &= (hi_slope < 0) & (lo_slope > 0)
+
+        for row in np.flatnonzero(ok):
+            s = b.starts[row]
+            r_hi_idx, r_hi = self._history_row(hi_idx, hi_ok, hi, row, s)
+            r_lo_idx, r_lo = self._history_row(lo_idx, lo_ok, lo, row, s)
+            yield row, self._symmetric_triangle_signal(
+                float(hi_slope[row]), float(lo_slope[row]),
+                r_hi_idx, r_lo_idx, r_hi, r_lo,
+                float(b.close[b.ends[row]]), float(b.atr[row]),
+            )
+
+    def _history_wedge(self, b: _WindowBatch, rising: bool):
+        """Rising / Falling Wedge sur toutes les fenêtres."""
+        hi_idx, hi_ok, hi, lo_idx, lo_ok, lo = self._history_recent(b)
+        hi_slope, lo_slope = b.hi_slope, b.lo_slope
+
+        ok  = (hi_ok.sum(axis=1) >= 3) & (lo_ok.sum(axis=1) >= 3)
+        ok &= _all_monotonic(hi, hi_ok, increasing=rising)
+        ok &= _all_monotonic(lo, lo_ok, increasing=rising)
+        if rising:
+            ok &= (lo_slope > hi_slope) & (hi_slope > 0) & (lo_slope > 0)
+        else:
+            ok &= (hi_slope < lo_slope) & (hi_slope < 0) & (lo_slope < 0)
+
+        for row in np.flatnonzero(ok):
+            s = b.starts[row]
+            r_hi_idx, r_hi = self._history_row(hi_idx, hi_ok, hi, row, s)
+            r_lo_idx, r_lo = self._history_row(lo_idx, lo_ok, lo, row, s)
+            yield row, self._wedge_signal(
+                rising,
+                float(hi_slope[row]), float(lo_slope[row]),
+                r_hi_idx, r_lo_idx, r_hi, r_lo,
+                float(b.close[b.ends[row]]), float(b.atr[row]),
+            )
+
     # ------------------------------------------------------------------ #
     #  Détecteurs individuels                                              #
     # ------------------------------------------------------------------ #
@@ -209,55 +954,56 @@ class PatternDetector:
         if len(highs_idx) < 2 or len(lows_idx) < 1:
             return None
 
-        highs_prices = df["high"].values
+        highs_prices  = df["high"].values
+        lows_prices   = df["low"].values
+        current_close = float(df["close"].iloc[-1])
 
-        # Parcourir les paires de pivots hauts
-        for i in range(len(highs_idx) - 1):
-            idx1 = highs_idx[i]
-            idx2 = highs_idx[i + 1]
-            p1   = highs_prices[idx1]
-            p2   = highs_prices[idx2]
+        # Paires de pivots hauts consécutifs
+        idx1, idx2 = highs_idx[:-1], highs_idx[1:]
+        p1, p2     = highs_prices[idx1], highs_prices[idx2]
 
-            # Les deux sommets doivent être similaires (< 1%)
-            if abs(p1 - p2) / p1 > 0.01:
-                continue
+        # Les deux sommets doivent être similaires (< 1%)
+        ok = np.abs(p1 - p2) / p1 <= 0.01
 
-            # Il doit exister un pivot bas entre les deux sommets
-            mid_lows = lows_idx[(lows_idx > idx1) & (lows_idx < idx2)]
-            if len(mid_lows) == 0:
-                continue
+        # Il doit exister un pivot bas entre les deux sommets : le plus bas
+        # est la neckline. Validation : prix proche de la neckline ou cassée.
+        neckline = _range_extreme(lows_idx, lows_prices, idx1, idx2, lowest=True)
+        ok &= np.isfinite(neckline) & (current_close <= neckline * 1.02)
 
-            neckline_idx   = mid_lows[np.argmin(df["low"].values[mid_lows])]
-            neckline_price = float(df["low"].values[neckline_idx])
-            current_close  = float(df["close"].iloc[-1])
+        if not ok.any():
+            return None
 
-            # Validation : le prix est proche de la neckline ou l'a cassée
-            near_or_broken = current_close <= neckline_price * 1.02
+        # Première paire valide
+        i = int(np.argmax(ok))
+        neckline_idx = _first_extreme(lows_idx, lows_prices, idx1[i], idx2[i], lowest=True)
 
-            if not near_or_broken:
-                continue
+        return self._double_top_signal(
+            p1[i], p2[i], idx1[i], idx2[i], neckline_idx, float(neckline[i]), current_close, atr
+        )
 
-            clarity = 2 if abs(p1 - p2) / p1 < 0.005 else 1
-
-            return {
-                "pattern":    "DOUBLE_TOP",
-                "direction":  "SHORT",
-                "pattern_clarity": clarity,
-                "price":      current_close,
-                "atr":        round(atr, 4),
-                "description": f"Double Top détecté — neckline {neckline_price:.2f}",
-                "neckline":   neckline_price,
-                "valley":     neckline_price,  # alias entry_calculator
-                "top1_price": float(p1),
-                "top2_price": float(p2),
-                "top1_idx":   int(idx1),
-                "top2_idx":   int(idx2),
-                "top1_bar":   int(idx1),  # alias pour chart_drawers
-                "top2_bar":   int(idx2),  # alias pour chart_drawers
-                "valley_bar": int(neckline_idx),
-            }
+    def _double_top_signal(
+        self, p1, p2, idx1, idx2, neckline_idx, neckline_price, current_close, atr
+    ) -> dict:
+        """Construit le signal Double Top (partagé par detect et detect_history)."""
+        clarity = 2 if abs(p1 - p2) / p1 < 0.005 else 1
 
-        return None
+        return {
+            "pattern":    "DOUBLE_TOP",
+            "direction":  "SHORT",
+            "pattern_clarity": clarity,
+            "price":      current_close,
+            "atr":        round(atr, 4),
+            "description": f"Double Top détecté — neckline {neckline_price:.2f}",
+            "neckline":   neckline_price,
+            "valley":     neckline_price,  # alias entry_calculator
+            "top1_price": float(p1),
+            "top2_price": float(p2),
+            "top1_idx":   int(idx1),
+            "top2_idx":   int(idx2),
+            "top1_bar":   int(idx1),  # alias pour chart_drawers
+            "top2_bar":   int(idx2),  # alias pour chart_drawers
+            "valley_bar": int(neckline_idx),
+        }
 
     # --- 2. DOUBLE BOTTOM ------------------------------------------------
 
@@ -277,49 +1023,50 @@ class PatternDetector:
         if len(lows_idx) < 2 or len(highs_idx) < 1:
             return None
 
-        lows_prices = df["low"].values
+        lows_prices   = df["low"].values
+        highs_prices  = df["high"].values
+        current_close = float(df["close"].iloc[-1])
 
-        for i in range(len(lows_idx) - 1):
-            idx1 = lows_idx[i]
-            idx2 = lows_idx[i + 1]
-            p1   = lows_prices[idx1]
-            p2   = lows_prices[idx2]
+        idx1, idx2 = lows_idx[:-1], lows_idx[1:]
+        p1, p2     = lows_prices[idx1], lows_prices[idx2]
 
-            if abs(p1 - p2) / p1 > 0.01:
-                continue
+        ok = np.abs(p1 - p2) / p1 <= 0.01
 
-            mid_highs = highs_idx[(highs_idx > idx1) & (highs_idx < idx2)]
-            if len(mid_highs) == 0:
-                continue
+        # Neckline = pivot haut le plus haut entre les deux creux
+        neckline = _range_extreme(highs_idx, highs_prices, idx1, idx2, lowest=False)
+        ok &= np.isfinite(neckline) & (current_close >= neckline * 0.98)
 
-            neckline_idx   = mid_highs[np.argmax(df["high"].values[mid_highs])]
-            neckline_price = float(df["high"].values[neckline_idx])
-            current_close  = float(df["close"].iloc[-1])
+        if not ok.any():
+            return None
 
-            near_or_broken = current_close >= neckline_price * 0.98
+        i = int(np.argmax(ok))
+        neckline_idx = _first_extreme(highs_idx, highs_prices, idx1[i], idx2[i], lowest=False)
 
-            if not near_or_broken:
-                continue
+        return self._double_bottom_signal(
+            p1[i], p2[i], idx1[i], idx2[i], neckline_idx, float(neckline[i]), current_close, atr
+        )
 
-            clarity = 2 if abs(p1 - p2) / p1 < 0.005 else 1
-
-            return {
-                "pattern":    "DOUBLE_BOTTOM",
-                "direction":  "LONG",
-                "pattern_clarity": clarity,
-                "price":      current_close,
-                "atr":        round(atr, 4),
-                "description": f"Double Bottom détecté — neckline {neckline_price:.2f}",
-                "neckline":   neckline_price,
-                "peak":       neckline_price,  # alias entry_calculator
-                "bot1_price": float(p1),
-                "bot2_price": float(p2),
-                "bot1_bar":   int(idx1),       # alias pour chart_drawers
-                "bot2_bar":   int(idx2),       # alias pour chart_drawers
-                "peak_bar":   int(neckline_idx),
-            }
+    def _double_bottom_signal(
+        self, p1, p2, idx1, idx2, neckline_idx, neckline_price, current_close, atr
+    ) -> dict:
+        """Construit le signal Double Bottom (partagé par detect et detect_history)."""
+        clarity = 2 if abs(p1 - p2) / p1 < 0.005 else 1
 
-        return None
+        return {
+            "pattern":    "DOUBLE_BOTTOM",
+            "direction":  "LONG",
+            "pattern_clarity": clarity,
+            "price":      current_close,
+            "atr":        round(atr, 4),
+            "description": f"Double Bottom détecté — neckline {neckline_price:.2f}",
+            "neckline":   neckline_price,
+            "peak":       neckline_price,  # alias entry_calculator
+            "bot1_price": float(p1),
+            "bot2_price": float(p2),
+            "bot1_bar":   int(idx1),       # alias pour chart_drawers
+            "bot2_bar":   int(idx2),       # alias pour chart_drawers
+            "peak_bar":   int(neckline_idx),
+        }
 
     # --- 3. HEAD & SHOULDERS (Bearish) -----------------------------------
 
@@ -340,64 +1087,66 @@ class PatternDetector:
         if len(highs_idx) < 3:
             return None
 
-        highs_prices = df["high"].values
-        lows_prices  = df["low"].values
-
-        for i in range(len(highs_idx) - 2):
-            ls_idx  = highs_idx[i]
-            h_idx   = highs_idx[i + 1]
-            rs_idx  = highs_idx[i + 2]
+        highs_prices  = df["high"].values
+        lows_prices   = df["low"].values
+        current_close = float(df["close"].iloc[-1])
 
-            ls  = highs_prices[ls_idx]
-            hd  = highs_prices[h_idx]
-            rs  = highs_prices[rs_idx]
+        # Triplets de pivots hauts consécutifs
+        ls_idx, h_idx, rs_idx = highs_idx[:-2], highs_idx[1:-1], highs_idx[2:]
+        ls, hd, rs = highs_prices[ls_idx], highs_prices[h_idx], highs_prices[rs_idx]
 
-            # La tête doit être le plus haut
-            if not (hd > ls and hd > rs):
-                continue
+        # La tête doit être le plus haut, épaules comparables (< 5% d'écart)
+        ok = (hd > ls) & (hd > rs) & (np.abs(ls - rs) / ls <= 0.05)
 
-            # Les épaules doivent être comparables (< 5% d'écart)
-            if abs(ls - rs) / ls > 0.05:
-                continue
+        # Creux entre épaule gauche et tête, puis entre tête et épaule droite
+        ll_price = _range_extreme(lows_idx, lows_prices, ls_idx, h_idx,  lowest=True)
+        rl_price = _range_extreme(lows_idx, lows_prices, h_idx,  rs_idx, lowest=True)
+        ok &= np.isfinite(ll_price) & np.isfinite(rl_price)
 
-            # Creux entre épaule gauche et tête
-            left_lows  = lows_idx[(lows_idx > ls_idx) & (lows_idx < h_idx)]
-            # Creux entre tête et épaule droite
-            right_lows = lows_idx[(lows_idx > h_idx)  & (lows_idx < rs_idx)]
+        # Validation : le prix est sous ou proche de la neckline
+        neckline = np.where(ok, (ll_price + rl_price) / 2.0, 0.0)
+        ok &= current_close <= neckline * 1.02
 
-            if len(left_lows) == 0 or len(right_lows) == 0:
-                continue
+        if not ok.any():
+            return None
 
-            ll_price = float(lows_prices[left_lows[np.argmin(lows_prices[left_lows])]])
-            rl_price = float(lows_prices[right_lows[np.argmin(lows_prices[right_lows])]])
-            neckline = (ll_price + rl_price) / 2.0
+        i = int(np.argmax(ok))
+        return self._head_shoulders_signal(
+            False, ls[i], hd[i], rs[i], ls_idx[i], h_idx[i], rs_idx[i],
+            float(neckline[i]), current_close, atr,
+        )
 
-            current_close = float(df["close"].iloc[-1])
+    def _head_shoulders_signal(
+        self, inverse, ls, hd, rs, ls_idx, h_idx, rs_idx, neckline, current_close, atr
+    ) -> dict:
+        """Construit le signal ETE / ETE inversé (partagé par detect et detect_history)."""
+        if inverse:
+            pattern, direction = "INVERSE_HEAD_SHOULDERS", "LONG"
+            description = f"ETE Inversé détecté — neckline {neckline:.2f}"
+        else:
+            pattern, direction = "HEAD_SHOULDERS", "SHORT"
+            description = f"Épaule-Tête-Épaule détecté — neckline {neckline:.2f}"
 
-            # Validation : le prix est sous ou proche de la neckline
-            if current_close > neckline * 1.02:
-                continue
+        ls, hd, rs = round(float(ls), 4), round(float(hd), 4), round(float(rs), 4)
 
-            return {
-                "pattern":    "HEAD_SHOULDERS",
-                "direction":  "SHORT",
-                "pattern_clarity": 2,
-                "price":      current_close,
-                "atr":        round(atr, 4),
-                "description": f"Épaule-Tête-Épaule détecté — neckline {neckline:.2f}",
-                "neckline":             round(neckline, 4),
-                "left_shoulder":        round(float(ls), 4),
-                "left_shoulder_price":  round(float(ls), 4),   # alias chart_drawers
-                "head":                 round(float(hd), 4),
-                "head_price":           round(float(hd), 4),   # alias entry/drawers
-                "right_shoulder":       round(float(rs), 4),
-                "right_shoulder_price": round(float(rs), 4),   # alias entry/drawers
-                "left_shoulder_bar":    int(ls_idx),           # alias chart_drawers
-                "head_bar":             int(h_idx),            # alias chart_drawers
-                "right_shoulder_bar":   int(rs_idx),           # alias chart_drawers
-            }
-
-        return None
+        return {
+            "pattern":    pattern,
+            "direction":  direction,
+            "pattern_clarity": 2,
+            "price":      current_close,
+            "atr":        round(atr, 4),
+            "description": description,
+            "neckline":             round(neckline, 4),
+            "left_shoulder":        ls,
+            "left_shoulder_price":  ls,              # alias chart_drawers
+            "head":                 hd,
+            "head_price":           hd,              # alias entry/drawers
+            "right_shoulder":       rs,
+            "right_shoulder_price": rs,              # alias entry/drawers
+            "left_shoulder_bar":    int(ls_idx),     # alias chart_drawers
+            "head_bar":             int(h_idx),      # alias chart_drawers
+            "right_shoulder_bar":   int(rs_idx),     # alias chart_drawers
+        }
 
     # --- 4. INVERSE HEAD & SHOULDERS (Bullish) ---------------------------
 
@@ -416,63 +1165,33 @@ class PatternDetector:
         if len(lows_idx) < 3:
             return None
 
-        lows_prices  = df["low"].values
-        highs_prices = df["high"].values
-
-        for i in range(len(lows_idx) - 2):
-            ls_idx  = lows_idx[i]
-            h_idx   = lows_idx[i + 1]
-            rs_idx  = lows_idx[i + 2]
-
-            ls  = lows_prices[ls_idx]
-            hd  = lows_prices[h_idx]
-            rs  = lows_prices[rs_idx]
-
-            # La tête doit être le plus bas
-            if not (hd < ls and hd < rs):
-                continue
-
-            # Les épaules doivent être comparables (< 5%)
-            if abs(ls - rs) / ls > 0.05:
-                continue
+        lows_prices   = df["low"].values
+        highs_prices  = df["high"].values
+        current_close = float(df["close"].iloc[-1])
 
-            # Sommets entre les creux
-            left_highs  = highs_idx[(highs_idx > ls_idx) & (highs_idx < h_idx)]
-            right_highs = highs_idx[(highs_idx > h_idx)  & (highs_idx < rs_idx)]
+        ls_idx, h_idx, rs_idx = lows_idx[:-2], lows_idx[1:-1], lows_idx[2:]
+        ls, hd, rs = lows_prices[ls_idx], lows_prices[h_idx], lows_prices[rs_idx]
 
-            if len(left_highs) == 0 or len(right_highs) == 0:
-                continue
+        # La tête doit être le plus bas, épaules comparables (< 5%)
+        ok = (hd < ls) & (hd < rs) & (np.abs(ls - rs) / ls <= 0.05)
 
-            lh_price = float(highs_prices[left_highs[np.argmax(highs_prices[left_highs])]])
-            rh_price = float(highs_prices[right_highs[np.argmax(highs_prices[right_highs])]])
-            neckline = (lh_price + rh_price) / 2.0
+        # Sommets entre les creux
+        lh_price = _range_extreme(highs_idx, highs_prices, ls_idx, h_idx,  lowest=False)
+        rh_price = _range_extreme(highs_idx, highs_prices, h_idx,  rs_idx, lowest=False)
+        ok &= np.isfinite(lh_price) & np.isfinite(rh_price)
 
-            current_close = float(df["close"].iloc[-1])
+        # Validation : le prix est au-dessus ou proche de la neckline
+        neckline = np.where(ok, (lh_price + rh_price) / 2.0, 0.0)
+        ok &= current_close >= neckline * 0.98
 
-            # Validation : le prix est au-dessus ou proche de la neckline
-            if current_close < neckline * 0.98:
-                continue
-
-            return {
-                "pattern":    "INVERSE_HEAD_SHOULDERS",
-                "direction":  "LONG",
-                "pattern_clarity": 2,
-                "price":      current_close,
-                "atr":        round(atr, 4),
-                "description": f"ETE Inversé détecté — neckline {neckline:.2f}",
-                "neckline":             round(neckline, 4),
-                "left_shoulder":        round(float(ls), 4),
-                "left_shoulder_price":  round(float(ls), 4),   # alias chart_drawers
-                "head":                 round(float(hd), 4),
-                "head_price":           round(float(hd), 4),   # alias entry/drawers
-                "right_shoulder":       round(float(rs), 4),
-                "right_shoulder_price": round(float(rs), 4),   # alias entry/drawers
-                "left_shoulder_bar":    int(ls_idx),           # alias chart_drawers
-                "head_bar":             int(h_idx),            # alias chart_drawers
-                "right_shoulder_bar":   int(rs_idx),           # alias chart_drawers
-            }
+        if not ok.any():
+            return None
 
-        return None
+        i = int(np.argmax(ok))
+        return self._head_shoulders_signal(
+            True, ls[i], hd[i], rs[i], ls_idx[i], h_idx[i], rs_idx[i],
+            float(neckline[i]), current_close, atr,
+        )
 
     # --- 5. BULL FLAG (Bullish) ------------------------------------------
 
@@ -498,6 +1217,17 @@ class PatternDetector:
         high  = df["high"].values
         low   = df["low"].values
 
+        # Zone de drapeau : 10 dernières bougies (indépendante du mât)
+        flag_start = n - 10
+        flag_high  = float(np.max(high[flag_start:]))
+        flag_low   = float(np.min(low[flag_start:]))
+        flag_range = flag_high - flag_low
+
+        # Légère pente négative du drapeau
+        flag_slope, _, _ = _RollingRegression(close).fit(flag_start, n)
+        if flag_slope >= 0:
+            return None
+
         # Recherche du mât dans les 20-40 bougies précédentes
         for mast_len in range(10, 21):
             mast_start = n - mast_len - 10
@@ -516,51 +1246,67 @@ class PatternDetector:
             if close[mast_end - 1] < close[mast_start] * 1.02:
                 continue
 
-            # Zone de drapeau : 10 dernières bougies
-            flag_start = n - 10
-            flag_close = close[flag_start:]
-            flag_high  = float(np.max(high[flag_start:]))
-            flag_low   = float(np.min(low[flag_start:]))
-            flag_range = flag_high - flag_low
-
             # Range du drapeau < 50% du mât
             if flag_range > 0.5 * (mast_high_price - mast_low_price):
                 continue
 
-            # Légère pente négative du drapeau
-            flag_slope = self._slope(
-                np.arange(len(flag_close)), flag_close
-            )
-            if flag_slope >= 0:
-                continue
-
             current_close = float(df["close"].iloc[-1])
 
-            return {
-                "pattern":    "BULL_FLAG",
-                "direction":  "LONG",
-                "pattern_clarity": 2,
-                "price":      current_close,
-                "atr":        round(atr, 4),
-                "description": (
-                    f"Drapeau Haussier — mât {mast_move * 100:.1f}% | "
-                    f"flag [{flag_low:.2f}-{flag_high:.2f}]"
-                ),
-                "mast_high":       round(mast_high_price, 4),
-                "mast_low":        round(mast_low_price, 4),
-                "mat_high":        round(mast_high_price, 4),   # alias entry_calculator
-                "mat_low":         round(mast_low_price, 4),    # alias entry_calculator
-                "flag_high":       round(flag_high, 4),
-                "flag_low":        round(flag_low, 4),
-                "flag_canal_high": round(flag_high, 4),         # alias entry_calculator
-                "flag_canal_low":  round(flag_low, 4),          # alias entry_calculator
-                "pole_height":     round(mast_high_price - mast_low_price, 4),
-                "mat_start_bar":   int(mast_start),             # alias drawers
-                "mat_end_bar":     int(mast_end),               # alias drawers
-            }
+            return self._flag_signal(
+                True, mast_high_price, mast_low_price, flag_high, flag_low,
+                mast_start, mast_end, current_close, atr,
+            )
 
         return None
 
+    def _flag_signal(
+        self,
+        bull,
+        mast_high_price,
+        mast_low_price,
+        flag_high,
+        flag_low,
+        mast_start,
+        mast_end,
+        current_close,
+        atr,
+    ) -> dict:
+        """Construit le signal Bull / Bear Flag (partagé par detect et detect_history)."""
+        if bull:
+            pattern, direction, label = "BULL_FLAG", "LONG", "Drapeau Haussier"
+            mast_move = (mast_high_price - mast_low_price) / mast_low_price
+        else:
+            pattern, direction, label = "BEAR_FLAG", "SHORT", "Drapeau Baissier"
+            mast_move = (mast_high_price - mast_low_price) / mast_high_price
+
+        mast_high = round(mast_high_price, 4)
+        mast_low  = round(mast_low_price, 4)
+        flag_hi   = round(flag_high, 4)
+        flag_lo   = round(flag_low, 4)
+
+        return {
+            "pattern":    pattern,
+            "direction":  direction,
+            "pattern_clarity": 2,
+            "price":      current_close,
+            "atr":        round(atr, 4),
+            "description": (
+                f"{label} — mât {mast_move * 100:.1f}% | "
+                f"flag [{flag_low:.2f}-{flag_high:.2f}]"
+            ),
+            "mast_high":       mast_high,
+            "mast_low":        mast_low,
+            "mat_high":        mast_high,            # alias entry_calculator
+            "mat_low":         mast_low,             # alias entry_calculator
+            "flag_high":       flag_hi,
+            "flag_low":        flag_lo,
+            "flag_canal_high": flag_hi,              # alias entry_calculator
+            "flag_canal_low":  flag_lo,              # alias entry_calculator
+            "pole_height":     round(mast_high_price - mast_low_price, 4),
+            "mat_start_bar":   int(mast_start),      # alias drawers
+            "mat_end_bar":     int(mast_end),        # alias drawers
+        }
+
     # --- 6. BEAR FLAG (Bearish) ------------------------------------------
 
     def _detect_bear_flag(
@@ -584,6 +1330,16 @@ class PatternDetector:
         high  = df["high"].values
         low   = df["low"].values
 
+        flag_start = n - 10
+        flag_high  = float(np.max(high[flag_start:]))
+        flag_low   = float(np.min(low[flag_start:]))
+        flag_range = flag_high - flag_low
+
+        # Légère pente positive du drapeau
+        flag_slope, _, _ = _RollingRegression(close).fit(flag_start, n)
+        if flag_slope <= 0:
+            return None
+
         for mast_len in range(10, 21):
             mast_start = n - mast_len - 10
             if mast_start < 0:
@@ -601,46 +1357,15 @@ class PatternDetector:
             if close[mast_end - 1] > close[mast_start] * 0.98:
                 continue
 
-            flag_start = n - 10
-            flag_close = close[flag_start:]
-            flag_high  = float(np.max(high[flag_start:]))
-            flag_low   = float(np.min(low[flag_start:]))
-            flag_range = flag_high - flag_low
-
             if flag_range > 0.5 * (mast_high_price - mast_low_price):
                 continue
 
-            # Légère pente positive du drapeau
-            flag_slope = self._slope(
-                np.arange(len(flag_close)), flag_close
-            )
-            if flag_slope <= 0:
-                continue
-
             current_close = float(df["close"].iloc[-1])
 
-            return {
-                "pattern":    "BEAR_FLAG",
-                "direction":  "SHORT",
-                "pattern_clarity": 2,
-                "price":      current_close,
-                "atr":        round(atr, 4),
-                "description": (
-                    f"Drapeau Baissier — mât {mast_move * 100:.1f}% | "
-                    f"flag [{flag_low:.2f}-{flag_high:.2f}]"
-                ),
-                "mast_high":       round(mast_high_price, 4),
-                "mast_low":        round(mast_low_price, 4),
-                "mat_high":        round(mast_high_price, 4),   # alias entry_calculator
-                "mat_low":         round(mast_low_price, 4),    # alias entry_calculator
-                "flag_high":       round(flag_high, 4),
-                "flag_low":        round(flag_low, 4),
-                "flag_canal_high": round(flag_high, 4),         # alias entry_calculator
-                "flag_canal_low":  round(flag_low, 4),          # alias entry_calculator
-                "pole_height":     round(mast_high_price - mast_low_price, 4),
-                "mat_start_bar":   int(mast_start),             # alias drawers
-                "mat_end_bar":     int(mast_end),               # alias drawers
-            }
+            return self._flag_signal(
+                False, mast_high_price, mast_low_price, flag_high, flag_low,
+                mast_start, mast_end, current_close, atr,
+            )
 
         return None
 
@@ -691,6 +1416,14 @@ class PatternDetector:
 
         current_close = float(df["close"].iloc[-1])
 
+        return self._ascending_triangle_signal(
+            resistance, recent_hi_idx, recent_lo_idx, recent_lo, current_close, atr
+        )
+
+    def _ascending_triangle_signal(
+        self, resistance, recent_hi_idx, recent_lo_idx, recent_lo, current_close, atr
+    ) -> dict:
+        """Construit le signal Triangle Ascendant (partagé par detect et detect_history)."""
         return {
             "pattern":    "ASCENDING_TRIANGLE",
             "direction":  "LONG",
@@ -750,6 +1483,14 @@ class PatternDetector:
 
         current_close = float(df["close"].iloc[-1])
 
+        return self._descending_triangle_signal(
+            support, recent_hi_idx, recent_lo_idx, recent_hi, current_close, atr
+        )
+
+    def _descending_triangle_signal(
+        self, support, recent_hi_idx, recent_lo_idx, recent_hi, current_close, atr
+    ) -> dict:
+        """Construit le signal Triangle Descendant (partagé par detect et detect_history)."""
         return {
             "pattern":    "DESCENDING_TRIANGLE",
             "direction":  "SHORT",
@@ -812,6 +1553,23 @@ class PatternDetector:
 
         current_close = float(df["close"].iloc[-1])
 
+        return self._symmetric_triangle_signal(
+            hi_slope, lo_slope, recent_hi_idx, recent_lo_idx,
+            recent_hi, recent_lo, current_close, atr,
+        )
+
+    def _symmetric_triangle_signal(
+        self,
+        hi_slope,
+        lo_slope,
+        recent_hi_idx,
+        recent_lo_idx,
+        recent_hi,
+        recent_lo,
+        current_close,
+        atr,
+    ) -> dict:
+        """Construit le signal Triangle Symétrique (partagé par detect et detect_history)."""
         # Déterminer la direction probable selon la position du prix
         mid_price = (float(recent_hi[-1]) + float(recent_lo[-1])) / 2.0
         direction = "LONG" if current_close > mid_price else "SHORT"
@@ -883,14 +1641,39 @@ class PatternDetector:
 
         current_close = float(df["close"].iloc[-1])
 
+        return self._wedge_signal(
+            True, hi_slope, lo_slope, recent_hi_idx, recent_lo_idx,
+            recent_hi, recent_lo, current_close, atr,
+        )
+
+    def _wedge_signal(
+        self,
+        rising,
+        hi_slope,
+        lo_slope,
+        recent_hi_idx,
+        recent_lo_idx,
+        recent_hi,
+        recent_lo,
+        current_close,
+        atr,
+    ) -> dict:
+        """Construit le signal Rising / Falling Wedge (partagé par detect et detect_history)."""
+        if rising:
+            pattern, direction = "RISING_WEDGE", "SHORT"
+            label = "Biseau Ascendant (Rising Wedge)"
+        else:
+            pattern, direction = "FALLING_WEDGE", "LONG"
+            label = "Biseau Descendant (Falling Wedge)"
+
         return {
-            "pattern":    "RISING_WEDGE",
-            "direction":  "SHORT",
+            "pattern":    pattern,
+            "direction":  direction,
             "pattern_clarity": 2,
             "price":      current_close,
             "atr":        round(atr, 4),
             "description": (
-                f"Biseau Ascendant (Rising Wedge) — "
+                f"{label} — "
                 f"pente haute={hi_slope:.4f} | pente basse={lo_slope:.4f}"
             ),
             "upper_line_start": round(float(recent_hi[0]), 4),
@@ -950,22 +1733,7 @@ class PatternDetector:
 
         current_close = float(df["close"].iloc[-1])
 
-        return {
-            "pattern":    "FALLING_WEDGE",
-            "direction":  "LONG",
-            "pattern_clarity": 2,
-            "price":      current_close,
-            "atr":        round(atr, 4),
-            "description": (
-                f"Biseau Descendant (Falling Wedge) — "
-                f"pente haute={hi_slope:.4f} | pente basse={lo_slope:.4f}"
-            ),
-            "upper_line_start": round(float(recent_hi[0]), 4),
-            "lower_line_start": round(float(recent_lo[0]), 4),
-            # Clés pour entry_calculator
-            "resistance_start": round(float(recent_hi[0]), 4),
-            "resistance_end":   round(float(recent_hi[-1]), 4),
-            "support_start":    round(float(recent_lo[0]), 4),
-            "support_end":      round(float(recent_lo[-1]), 4),
-            "wedge_start_bar":  int(min(recent_hi_idx[0], recent_lo_idx[0])),  # alias drawers
-        }
+        return self._wedge_signal(
+            False, hi_slope, lo_slope, recent_hi_idx, recent_lo_idx,
+            recent_hi, recent_lo, current_close, atr,
+        )
@@ -0,0 +1,129 @@
+"""
+trend_service.py
+────────────────
+Service de tendance partagé (EMA 50 / EMA 200) par (paire, timeframe).
+
+Une seule définition de l'EMA pour tout le bot : celle de l'IndicatorEngine
+(lissage récursif, équivalent pandas ewm(span, adjust=False)).
+L'état EMA de chaque (paire, timeframe) est conservé entre deux appels :
+seules les bougies nouvelles sont intégrées, en O(1) par bougie.
+"""
+
+import logging
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+from bot.detection.indicator_engine import EMA_FAST, EMA_SLOW, trend_label
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class EMAState:
+    """État EMA d'un (paire, timeframe) arrêté à la dernière bougie clôturée."""
+    last_key : object        # horodatage (ou index) de la dernière bougie intégrée
+    ema_fast : float
+    ema_slow : float
+    price    : float = 0.0   # dernier prix vu (bougie en cours incluse)
+    trend    : str = "NEUTRE"
+
+
+class TrendService:
+    """
+    Sert la tendance EMA 50 / 200 de chaque (paire, timeframe).
+
+    La dernière bougie du DataFrame est considérée comme en cours : elle est
+    appliquée à l'état clôturé sans y être intégrée, et peut donc changer
+    d'un appel à l'autre. L'état repart de zéro si la dernière bougie
+    intégrée n'est plus dans le DataFrame (trou de données).
+    """
+
+    ALPHA_FAST = 2.0 / (EMA_FAST + 1)
+    ALPHA_SLOW = 2.0 / (EMA_SLOW + 1)
+
+    def __init__(self):
+        self._states: dict[tuple, EMAState] = {}
+
+    # ------------------------------------------------------------------ #
+    #  Méthodes publiques                                                  #
+    # ------------------------------------------------------------------ #
+
+    def update(self, pair: str, tf: str, df: pd.DataFrame) -> str:
+        """
+        Intègre les nouvelles bougies de `df` et retourne la tendance courante.
+
+        Args:
+            pair : paire (ex : "EUR/USD")
+            tf   : timeframe (ex : "4h")
+            df   : DataFrame OHLCV (colonne "timestamp" optionnelle)
+
+        Returns:
+            "BULLISH", "BEARISH" ou "NEUTRE"
+        """
+        if df is None or len(df) == 0:
+            return "NEUTRE"
+
+        closes = df["close"].to_numpy(dtype=float)
+        keys   = df["timestamp"].to_numpy() if "timestamp" in df.columns else df.index.to_numpy()
+        state  = self._states.get((pair, tf))
+
+        # Première bougie non intégrée
+        start = 0
+        if state is not None:
+            hits = np.flatnonzero(keys == state.last_key)
+            if len(hits):
+                start = int(hits[-1]) + 1
+            else:
+                logger.debug("Trend %s %s : continuité perdue, état réinitialisé", pair, tf)
+                state = None
+
+        # Bougies clôturées (toutes sauf la dernière)
+        closed = closes[start:len(closes) - 1].tolist()
+        if closed:
+            if state is None:
+                state = EMAState(last_key=None, ema_fast=closed[0], ema_slow=closed[0])
+                closed = closed[1:]
+            fast, slow = state.ema_fast, state.ema_slow
+            for close in closed:
+                fast += self.ALPHA_FAST * (close - fast)
+                slow += self.ALPHA_SLOW * (close - slow)
+            state.ema_fast, state.ema_slow = fast, slow
+            state.last_key = keys[len(closes) - 2]
+
+        price = float(closes[-1])
+        if state is None:
+            # Une seule bougie : l'EMA vaut le prix
+            state = EMAState(last_key=None, ema_fast=price, ema_slow=price)
+            fast = slow = price
+        else:
+            fast, slow = self._live(state, price)
+
+        state.price = price
+        state.trend = trend_label(price, fast, slow)
+        self._states[(pair, tf)] = state
+        return state.trend
+
+    def trend(self, pair: str, tf: str) -> str:
+        """Dernière tendance calculée pour (pair, tf), NEUTRE si inconnue."""
+        state = self._states.get((pair, tf))
+        return state.trend if state else "NEUTRE"
+
+    def emas(self, pair: str, tf: str) -> tuple[float, float] | None:
+        """(EMA50, EMA200) incluant la bougie en cours, ou None si inconnues."""
+        state = self._states.get((pair, tf))
+        return self._live(state, state.price) if state else None
+
+    # ------------------------------------------------------------------ #
+    #  Helpers internes                                                    #
+    # ------------------------------------------------------------------ #
+
+    def _live(self, state: EMAState, price: float) -> tuple[float, float]:
+        """EMA de l'état clôturé prolongées d'une bougie au prix `price`."""
+        if state.last_key is None:
+            return state.ema_fast, state.ema_slow
+        return (
+            state.ema_fast + self.ALPHA_FAST * (price - state.ema_fast),
+            state.ema_slow + self.ALPHA_SLOW * (price - state.ema_slow),
+        )
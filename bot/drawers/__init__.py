@@ -1,11 +1,11 @@
 """
 drawers/__init__.py
 ───────────────────
-REGISTRE DES DRAWERS — Auto-chargement de tous les drawers disponibles.
+REGISTRE DES DRAWERS — Chargement à la demande des drawers disponibles.
 
 Fonctionnement :
-  1. Au démarrage, charge automatiquement tous les drawers définis
-  2. Si un drawer spécifique est trouvé → l'utilise
+  1. Au démarrage, aucun module de drawer n'est importé
+  2. Au premier dessin d'une figure, seul le module de son drawer est importé
   3. Si AUCUN drawer n'est trouvé pour une figure → utilise le FALLBACK GÉNÉRIQUE
   4. AUCUNE erreur possible, JAMAIS
 
@@ -16,13 +16,12 @@ Usage :
 """
 
 import importlib
-import inspect
 import logging
-from typing import Dict, Type
+from typing import Dict, Optional, Type
 
 from .base_drawer import BaseDrawer, DrawingOutput, GenericFallbackDrawer
 
-# Import explicite de tous les modules de drawers disponibles
+# Modules de drawers disponibles (parcourus pour une classe hors de DRAWER_MODULES)
 _DRAWER_MODULES = [
     "bot.drawers.chart_drawers",
     "bot.drawers.harmonic_drawers",
@@ -36,8 +35,8 @@ class DrawerRegistry:
     """
     Registre central de tous les drawers.
     ─────────────────────────────────────
-    - Charge automatiquement TOUS les drawers disponibles au démarrage
-    - Mappe chaque pattern_name à son drawer
+    - Mappe chaque pattern_name à son drawer, et chaque drawer à son module
+    - N'importe le module d'un drawer qu'au premier dessin de sa figure
     - Si un drawer manque → Fallback générique (jamais d'erreur)
     - Permet d'ajouter de nouveaux drawers sans modifier ce fichier
     """
@@ -97,33 +96,62 @@ class DrawerRegistry:
         "DOJI"                   : "ReversalCandleDrawer",
     }
 
+    # Classe du drawer → module qui la définit (importé au premier usage)
+    DRAWER_MODULES: Dict[str, str] = {
+        "HeadShouldersDrawer"      : "bot.drawers.chart_drawers",
+        "InverseHSDrawer"          : "bot.drawers.chart_drawers",
+        "DoubleTopDrawer"          : "bot.drawers.chart_drawers",
+        "DoubleBottomDrawer"       : "bot.drawers.chart_drawers",
+        "BullFlagDrawer"           : "bot.drawers.chart_drawers",
+        "BearFlagDrawer"           : "bot.drawers.chart_drawers",
+        "RisingWedgeDrawer"        : "bot.drawers.chart_drawers",
+        "FallingWedgeDrawer"       : "bot.drawers.chart_drawers",
+        "AscendingTriangleDrawer"  : "bot.drawers.chart_drawers",
+        "DescendingTriangleDrawer" : "bot.drawers.chart_drawers",
+        "SymmetricTriangleDrawer"  : "bot.drawers.chart_drawers",
+        "ButterflyDrawer"          : "bot.drawers.harmonic_drawers",
+        "SharkDrawer"              : "bot.drawers.harmonic_drawers",
+        "ReversalCandleDrawer"     : "bot.drawers.special_drawers",
+        "CompressionDrawer"        : "bot.drawers.special_drawers",
+    }
+
     def __init__(self):
         self._drawers: Dict[str, BaseDrawer] = {}
-        self._classes: Dict[str, Type[BaseDrawer]] = {}
+        # Classes déjà résolues (None = introuvable, fallback)
+        self._classes: Dict[str, Optional[Type[BaseDrawer]]] = {
+            "GenericFallbackDrawer": GenericFallbackDrawer,
+        }
         self._fallback = GenericFallbackDrawer()
-        self._load_all_drawers()
+        logger.debug(f"📦 {len(self.DRAWER_MODULES)} drawers connus, chargés à la demande")
 
-    def _load_all_drawers(self):
+    def _load_class(self, class_name: str) -> Optional[Type[BaseDrawer]]:
         """
-        Charge automatiquement tous les drawers depuis les modules définis.
-        Découverte automatique = pas besoin de toucher ce fichier pour ajouter un drawer.
+        Importe la classe `class_name` au premier appel (None si introuvable).
+        Une classe absente de DRAWER_MODULES est cherchée dans _DRAWER_MODULES :
+        un nouveau drawer fonctionne sans toucher à l'index.
         """
-        # Toujours enregistrer le fallback
-        self._classes["GenericFallbackDrawer"] = GenericFallbackDrawer
+        if class_name in self._classes:
+            return self._classes[class_name]
 
-        for module_path in _DRAWER_MODULES:
+        known = self.DRAWER_MODULES.get(class_name)
+        found = None
+        for module_path in ([known] if known else _DRAWER_MODULES):
             try:
                 module = importlib.import_module(module_path)
-                for name, obj in inspect.getmembers(module, inspect.isclass):
-                    if issubclass(obj, BaseDrawer) and obj not in (BaseDrawer, GenericFallbackDrawer):
-                        self._classes[name] = obj
-                        logger.debug(f"✅ Drawer chargé : {name}")
             except ImportError as e:
                 logger.warning(f"⚠️ Module {module_path} non chargé : {e}")
+                continue
             except Exception as e:
                 logger.warning(f"⚠️ Erreur chargement {module_path} : {e}")
+                continue
+            obj = getattr(module, class_name, None)
+            if isinstance(obj, type) and issubclass(obj, BaseDrawer):
+                found = obj
+                logger.debug(f"✅ Drawer chargé : {class_name} ({module_path})")
+                break
 
-        logger.info(f"📦 {len(self._classes)} drawers disponibles : {list(self._classes.keys())}")
+        self._classes[class_name] = found
+        return found
 
     def register(self, pattern_name: str, drawer_class: Type[BaseDrawer]):
         """
@@ -150,13 +178,15 @@ class DrawerRegistry:
         class_name = self.PATTERN_MAP.get(pattern_upper)
 
         # 2. Chercher par nom exact de classe
-        if not class_name and pattern_upper in self._classes:
+        if not class_name and (pattern_upper in self._classes or pattern_upper in self.DRAWER_MODULES):
             class_name = pattern_upper
 
-        # 3. Instancier si trouvé
-        if class_name and class_name in self._classes:
-            if class_name not in self._drawers:
-                self._drawers[class_name] = self._classes[class_name]()
+        # 3. Charger (premier usage) et instancier si trouvé
+        if class_name in self._drawers:
+            return self._drawers[class_name]
+        drawer_class = self._load_class(class_name) if class_name else None
+        if drawer_class is not None:
+            self._drawers[class_name] = drawer_class()
             return self._drawers[class_name]
 
         # 4. Fallback générique — JAMAIS d'erreur
@@ -213,7 +243,8 @@ class DrawerRegistry:
         print(f"  Drawers dédiés   : {dedicated}")
         print(f"  Fallback générique: {fallback}")
         print(f"  Total patterns   : {len(self.PATTERN_MAP)}")
-        print(f"  Classes chargées : {len(self._classes)}")
+        print(f"  Classes chargées : {sum(1 for c in self._classes.values() if c)}"
+              f" / {len(self.DRAWER_MODULES) + 1}")
         print("═"*55)
         for item in self.list_available():
             print(f"  {item['status']}  {item['pattern']:30s} → {item['drawer']}")
@@ -6,9 +6,12 @@ Chaque figure a sa propre formule mathématique précise.
 Retourne toujours 4 prix exacts prêts à afficher sur le graphique.
 """
 
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from typing import Optional
 
+import numpy as np
+import pandas as pd
+
 
 @dataclass
 class EntryResult:
@@ -22,64 +25,167 @@ class EntryResult:
     description : str       # Explication du calcul
 
 
-class EntryCalculator:
-
-    def calculate(self, signal: dict) -> EntryResult:
-        pattern = signal.get("pattern", "").upper()
-        atr     = signal.get("atr", 0)
-
-        calculators = {
-            "ETE"                  : self._ete_bearish,
-            "HEAD_SHOULDERS"       : self._ete_bearish,
-            "ETE_INVERSE"          : self._ete_bullish,
-            "INVERSE_HEAD_SHOULDERS": self._ete_bullish,
-            "DOUBLE_TOP"           : self._double_top,
-            "DOUBLE_BOTTOM"        : self._double_bottom,
-            "BULL_FLAG"            : self._bull_flag,
-            "DRAPEAU_HAUSSIER"     : self._bull_flag,
-            "BEAR_FLAG"            : self._bear_flag,
-            "DRAPEAU_BAISSIER"     : self._bear_flag,
-            "PENNANT"              : self._pennant,
-            "FANION"               : self._pennant,
-            "BISEAU_ASCENDANT"     : self._rising_wedge,
-            "RISING_WEDGE"         : self._rising_wedge,
-            "BISEAU_DESCENDANT"    : self._falling_wedge,
-            "FALLING_WEDGE"        : self._falling_wedge,
-            "TRIANGLE_ASCENDANT"   : self._ascending_triangle,
-            "ASCENDING_TRIANGLE"   : self._ascending_triangle,
-            "TRIANGLE_DESCENDANT"  : self._descending_triangle,
-            "DESCENDING_TRIANGLE"  : self._descending_triangle,
-            "TRIANGLE_SYMETRIQUE"  : self._symmetric_triangle,
-            "SYMMETRIC_TRIANGLE"   : self._symmetric_triangle,
-            "BUTTERFLY"            : self._butterfly,
-            "BUTTERFLY_BULLISH"    : self._butterfly,
-            "BUTTERFLY_BEARISH"    : self._butterfly,
-            "SHARK"                : self._shark,
-            "SHARK_BULLISH"        : self._shark,
-            "SHARK_BEARISH"        : self._shark,
-            "GARTLEY"              : self._gartley,
-            "BAT"                  : self._bat,
-            "CRAB"                 : self._crab,
-            "COMPRESSION"          : self._compression,
-            "ZONE_COMPRESSION"     : self._compression,
+@dataclass
+class EntryBatchResult:
+    """
+    Résultat de EntryCalculator.calculate_batch : un élément par signal.
+
+    `valid` est faux pour les signaux auxquels il manque un prix requis par
+    leur formule (calculate() lèverait KeyError) : leurs niveaux valent NaN.
+    Les descriptions sont construites à la demande par `result(i)`.
+    """
+    pattern   : np.ndarray     # object
+    direction : np.ndarray     # object
+    entry     : np.ndarray
+    stop_loss : np.ndarray
+    tp1       : np.ndarray
+    tp2       : np.ndarray
+    rr_ratio  : np.ndarray
+    valid     : np.ndarray     # bool
+    _table      : pd.DataFrame = field(repr=False, default=None)
+    _calculator : "EntryCalculator" = field(repr=False, default=None)
+
+    def __len__(self) -> int:
+        return len(self.valid)
+
+    def result(self, i: int) -> EntryResult:
+        """EntryResult complet de la ligne i (identique à calculate() sur ce signal)."""
+        signal = {
+            key: value.item() if isinstance(value, np.generic) else value
+            for key, value in self._table.iloc[i].items()
+            if not (isinstance(value, float) and value != value)    # NaN = clé absente
         }
+        return self._calculator.calculate(signal)
+
+
+class _Columns:
+    """
+    Accès colonne par colonne aux signaux d'un groupe de calculate_batch.
+    Une valeur absente (NaN) prend le défaut donné ; sans défaut, la ligne
+    est marquée invalide (équivalent du KeyError de calculate()).
+    """
+
+    def __init__(self, cache: dict, table: pd.DataFrame, rows: np.ndarray):
+        self._cache   = cache       # colonnes converties, partagées entre les groupes
+        self._table   = table
+        self.rows     = rows
+        self.missing  = np.zeros(len(rows), dtype=bool)
+
+    def __call__(self, key: str, default=None) -> np.ndarray:
+        if key not in self._cache:
+            if key in self._table:
+                self._cache[key] = pd.to_numeric(self._table[key], errors="coerce").to_numpy(dtype=float)
+            else:
+                self._cache[key] = np.full(len(self._table), np.nan)
+        values = self._cache[key][self.rows]
+        absent = np.isnan(values)
+        if default is None:
+            self.missing |= absent
+            return values
+        return np.where(absent, default, values)
+
+    def direction(self, default: Optional[str] = "LONG") -> np.ndarray:
+        """Colonne direction (object) ; sans défaut, une direction absente invalide la ligne."""
+        if "direction" not in self._cache:
+            column = (
+                self._table["direction"] if "direction" in self._table
+                else pd.Series(None, index=self._table.index, dtype=object)
+            )
+            self._cache["direction"] = (column.to_numpy(dtype=object), column.isna().to_numpy())
+        values, absent = self._cache["direction"]
+        values, absent = values[self.rows], absent[self.rows]
+        if default is None:
+            self.missing |= absent
+        else:
+            values = np.where(absent, default, values)
+        return values
 
-        # Chandeliers reversal — tous traitables par la même méthode
-        reversal_candles = {
-            "PIN_BAR_BULLISH", "PIN_BAR_BEARISH", "MARTEAU", "HAMMER",
-            "ETOILE_FILANTE", "SHOOTING_STAR", "BULLISH_ENGULFING",
-            "BEARISH_ENGULFING", "MORNING_STAR", "EVENING_STAR",
-            "HARAMI_BULLISH", "HARAMI_BEARISH", "DOJI"
-        }
 
-        if pattern in reversal_candles:
-            return self._reversal_candle(signal)
+class EntryCalculator:
 
-        if pattern in calculators:
-            return calculators[pattern](signal)
+    # Chandeliers reversal — tous traitables par la même méthode
+    REVERSAL_CANDLES = frozenset({
+        "PIN_BAR_BULLISH", "PIN_BAR_BEARISH", "MARTEAU", "HAMMER",
+        "ETOILE_FILANTE", "SHOOTING_STAR", "BULLISH_ENGULFING",
+        "BEARISH_ENGULFING", "MORNING_STAR", "EVENING_STAR",
+        "HARAMI_BULLISH", "HARAMI_BEARISH", "DOJI"
+    })
 
-        # Fallback générique
-        return self._generic_fallback(signal)
+    def calculate(self, signal: dict) -> EntryResult:
+        return self._resolve(signal.get("pattern", ""))(self, signal)
+
+    def calculate_batch(self, signals) -> EntryBatchResult:
+        """
+        Version tableau de calculate() : les signaux sont groupés par
+        formule et chaque groupe est calculé en arithmétique de tableaux.
+
+        Args:
+            signals : DataFrame (une ligne par signal, NaN = clé absente)
+                      ou liste de dicts au format de calculate()
+
+        Returns:
+            EntryBatchResult (mêmes niveaux et RR que calculate())
+        """
+        table = signals if isinstance(signals, pd.DataFrame) else pd.DataFrame(list(signals))
+        table = table.reset_index(drop=True)
+        n = len(table)
+
+        patterns = (
+            table["pattern"].to_numpy(dtype=object) if "pattern" in table
+            else np.full(n, None, dtype=object)
+        )
+        # Résolution une fois par nom de figure distinct (code -1 = absent)
+        codes, names = pd.factorize(patterns)
+        resolved = [self._resolve(str(name)) for name in names] + [type(self)._generic_fallback]
+        groups   = list(dict.fromkeys(resolved))
+        group_of = np.array([groups.index(method) for method in resolved])[codes]
+        order    = np.argsort(group_of, kind="stable")
+        bounds   = np.searchsorted(group_of[order], np.arange(len(groups) + 1))
+
+        out_pattern   = np.empty(n, dtype=object)
+        out_direction = np.empty(n, dtype=object)
+        levels = np.full((4, n), np.nan)
+        valid  = np.ones(n, dtype=bool)
+        cache: dict = {}
+
+        for g, method in enumerate(groups):
+            rows = order[bounds[g]:bounds[g + 1]]
+            if not len(rows):
+                continue
+            col  = _Columns(cache, table, rows)
+            name, direction, *prices = self._BATCH_LEVELS[method](self, col)
+
+            if name is None:
+                # Nom du signal conservé (reversal / fallback)
+                name = patterns[rows]
+                name = np.where(pd.isna(name), self._DEFAULT_NAME[method], name)
+            out_pattern[rows]   = name
+            out_direction[rows] = direction
+            levels[:, rows]     = [np.broadcast_to(price, rows.shape) for price in prices]
+            valid[rows]         = ~col.missing
+
+        entry, sl, tp1, tp2 = levels
+        levels[:, ~valid] = np.nan
+        return EntryBatchResult(
+            pattern     = out_pattern,
+            direction   = out_direction,
+            entry       = entry,
+            stop_loss   = sl,
+            tp1         = tp1,
+            tp2         = tp2,
+            rr_ratio    = self._rr_batch(entry, sl, tp2),
+            valid       = valid,
+            _table      = table,
+            _calculator = self,
+        )
+
+    @classmethod
+    def _resolve(cls, pattern: str):
+        """Méthode de calcul associée à une figure (fallback générique si inconnue)."""
+        pattern = pattern.upper()
+        if pattern in cls.REVERSAL_CANDLES:
+            return cls._reversal_candle
+        return cls._CALCULATORS.get(pattern, cls._generic_fallback)
 
     # ──────────────────────────────────────────────────────────────
     # FIGURES CHARTISTES
@@ -431,3 +537,254 @@ class EntryCalculator:
         if risk == 0:
             return 0
         return round(reward / risk, 2)
+
+    @staticmethod
+    def _rr_batch(entry: np.ndarray, sl: np.ndarray, tp: np.ndarray) -> np.ndarray:
+        risk   = np.abs(entry - sl)
+        reward = np.abs(tp - entry)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            rr = np.round(reward / risk, 2)
+        rr[risk == 0] = 0
+        return rr
+
+    # ──────────────────────────────────────────────────────────────
+    # NIVEAUX EN TABLEAU (calculate_batch)
+    # Mêmes formules que les méthodes ci-dessus, sur un groupe de signaux.
+    # Retour : (nom ou None, direction, entrée, SL, TP1, TP2)
+    # ──────────────────────────────────────────────────────────────
+
+    def _levels_ete_bearish(self, col: _Columns):
+        neckline = col("neckline")
+        tete     = col("head_price")
+        epaule_d = col("right_shoulder_price")
+        atr      = col("atr", np.abs(tete - neckline) * 0.1)
+        hauteur  = tete - neckline
+        return ("ETE", "SHORT", neckline, epaule_d + atr * 0.5,
+                neckline - hauteur * 0.5, neckline - hauteur)
+
+    def _levels_ete_bullish(self, col: _Columns):
+        neckline = col("neckline")
+        tete     = col("head_price")
+        epaule_d = col("right_shoulder_price")
+        atr      = col("atr", np.abs(neckline - tete) * 0.1)
+        hauteur  = neckline - tete
+        return ("ETE_INVERSE", "LONG", neckline, epaule_d - atr * 0.5,
+                neckline + hauteur * 0.5, neckline + hauteur)
+
+    def _levels_double_top(self, col: _Columns):
+        top     = np.maximum(col("top1_price"), col("top2_price"))
+        valley  = col("valley")
+        atr     = col("atr", 0)
+        hauteur = top - valley
+        return ("DOUBLE_TOP", "SHORT", valley, top + atr * 0.5,
+                valley - hauteur * 0.5, valley - hauteur)
+
+    def _levels_double_bottom(self, col: _Columns):
+        bottom  = np.minimum(col("bot1_price"), col("bot2_price"))
+        peak    = col("peak")
+        atr     = col("atr", 0)
+        hauteur = peak - bottom
+        return ("DOUBLE_BOTTOM", "LONG", peak, bottom - atr * 0.5,
+                peak + hauteur * 0.5, peak + hauteur)
+
+    def _levels_bull_flag(self, col: _Columns):
+        hauteur = col("mat_high") - col("mat_low")
+        entry   = col("flag_canal_high")
+        sl      = col("flag_canal_low") - col("atr", 0) * 0.3
+        return ("BULL_FLAG", "LONG", entry, sl, entry + hauteur * 0.5, entry + hauteur)
+
+    def _levels_bear_flag(self, col: _Columns):
+        hauteur = col("mat_high") - col("mat_low")
+        entry   = col("flag_canal_low")
+        sl      = col("flag_canal_high") + col("atr", 0) * 0.3
+        return ("BEAR_FLAG", "SHORT", entry, sl, entry - hauteur * 0.5, entry - hauteur)
+
+    def _levels_pennant(self, col: _Columns):
+        direction  = col.direction("LONG")
+        mat_height = col("mat_height", 0)
+        entry      = col("breakout_price", col("entry", 0))
+        atr        = col("atr", 0)
+        sign       = np.where(direction == "LONG", 1.0, -1.0)
+        return ("PENNANT", direction, entry, entry - sign * atr,
+                entry + sign * mat_height * 0.5, entry + sign * mat_height)
+
+    def _levels_rising_wedge(self, col: _Columns):
+        largeur = col("resistance_start") - col("support_start")
+        entry   = col("support_end")
+        sl      = col("resistance_end") + col("atr", 0) * 0.5
+        return ("BISEAU_ASCENDANT", "SHORT", entry, sl, entry - largeur * 0.5, entry - largeur)
+
+    def _levels_falling_wedge(self, col: _Columns):
+        largeur = col("resistance_start") - col("support_start")
+        entry   = col("resistance_end")
+        sl      = col("support_end") - col("atr", 0) * 0.5
+        return ("BISEAU_DESCENDANT", "LONG", entry, sl, entry + largeur * 0.5, entry + largeur)
+
+    def _levels_ascending_triangle(self, col: _Columns):
+        res     = col("resistance_level")
+        sup_s   = col("support_start")
+        sup_e   = col("support_end", sup_s)
+        hauteur = res - sup_s
+        return ("TRIANGLE_ASCENDANT", "LONG", res, sup_e - col("atr", 0) * 0.3,
+                res + hauteur * 0.5, res + hauteur)
+
+    def _levels_descending_triangle(self, col: _Columns):
+        sup     = col("support_level")
+        res_s   = col("resistance_start")
+        res_e   = col("resistance_end", res_s)
+        hauteur = res_s - sup
+        return ("TRIANGLE_DESCENDANT", "SHORT", sup, res_e + col("atr", 0) * 0.3,
+                sup - hauteur * 0.5, sup - hauteur)
+
+    def _levels_symmetric_triangle(self, col: _Columns):
+        direction = col.direction("LONG")
+        res_e     = col("resistance_end")
+        sup_e     = col("support_end")
+        base      = col("resistance_start") - col("support_start")
+        atr       = col("atr", 0)
+        long      = direction == "LONG"
+        sign      = np.where(long, 1.0, -1.0)
+        entry     = np.where(long, res_e, sup_e)
+        sl        = np.where(long, sup_e - atr * 0.3, res_e + atr * 0.3)
+        return ("TRIANGLE_SYMETRIQUE", direction, entry, sl,
+                entry + sign * base * 0.5, entry + sign * base)
+
+    def _levels_harmonic(self, col: _Columns, entry_key, tp1_key, tp2_key, atr_default, sl_levels):
+        """Harmoniques : entrée sur D (ou C), TP aux retracements des points suivants."""
+        direction = col.direction(None)
+        entry     = col(entry_key)
+        atr       = col("atr", atr_default)
+        sign      = np.where(direction == "LONG", 1.0, -1.0)
+        return (direction, entry, sl_levels(sign, entry, atr),
+                entry + sign * np.abs(entry - col(tp1_key)),
+                entry + sign * np.abs(entry - col(tp2_key)))
+
+    def _levels_butterfly(self, col: _Columns):
+        xa = np.abs(col("X_price") - col("A_price"))
+        return ("BUTTERFLY", *self._levels_harmonic(
+            col, "D_price", "C_price", "A_price", xa * 0.05,
+            lambda sign, d, atr: d - sign * atr * 2))
+
+    def _levels_shark(self, col: _Columns):
+        xa = np.abs(col("X_price") - col("A_price"))
+        return ("SHARK", *self._levels_harmonic(
+            col, "C_price", "B_price", "A_price", xa * 0.05,
+            lambda sign, c, atr: c - sign * atr * 2))
+
+    def _levels_gartley(self, col: _Columns):
+        x_p = col("X_price")
+        return ("GARTLEY", *self._levels_harmonic(
+            col, "D_price", "C_price", "B_price", np.abs(x_p - col("D_price")) * 0.05,
+            lambda sign, d, atr: x_p - sign * atr))
+
+    def _levels_bat(self, col: _Columns):
+        x_p = col("X_price")
+        return ("BAT", *self._levels_harmonic(
+            col, "D_price", "C_price", "A_price", np.abs(x_p - col("D_price")) * 0.03,
+            lambda sign, d, atr: x_p - sign * atr))
+
+    def _levels_crab(self, col: _Columns):
+        x_p = col("X_price")
+        return ("CRAB", *self._levels_harmonic(
+            col, "D_price", "C_price", "B_price", np.abs(x_p - col("D_price")) * 0.03,
+            lambda sign, d, atr: d - sign * atr * 1.5))
+
+    def _levels_compression(self, col: _Columns):
+        direction = col.direction("LONG")
+        high_zone = col("compression_high")
+        low_zone  = col("compression_low")
+        amplitude = high_zone - low_zone
+        atr       = col("atr", amplitude * 0.2)
+        long      = direction == "LONG"
+        sign      = np.where(long, 1.0, -1.0)
+        entry     = np.where(long, high_zone, low_zone)
+        sl        = np.where(long, low_zone - atr * 0.3, high_zone + atr * 0.3)
+        return ("COMPRESSION", direction, entry, sl,
+                entry + sign * amplitude, entry + sign * amplitude * 2)
+
+    def _levels_reversal_candle(self, col: _Columns):
+        direction = col.direction("LONG")
+        entry     = col("close")
+        high      = col("high")
+        low       = col("low")
+        atr       = col("atr", np.abs(high - low))
+        sl        = np.where(direction == "LONG", low - atr * 0.3, high + atr * 0.3)
+        return (None, direction, entry, sl, entry + (entry - sl), entry + (entry - sl) * 2)
+
+    def _levels_generic_fallback(self, col: _Columns):
+        direction = col.direction("LONG")
+        entry     = col("entry", col("close", 0))
+        atr       = col("atr", entry * 0.005)
+        sign      = np.where(direction == "LONG", 1.0, -1.0)
+        return (None, direction, entry, entry - sign * atr * 2,
+                entry + sign * atr * 2, entry + sign * atr * 4)
+
+    # ──────────────────────────────────────────────────────────────
+    # TABLES DE DISPATCH (construites une seule fois)
+    # ──────────────────────────────────────────────────────────────
+
+    _CALCULATORS = {
+        "ETE"                  : _ete_bearish,
+        "HEAD_SHOULDERS"       : _ete_bearish,
+        "ETE_INVERSE"          : _ete_bullish,
+        "INVERSE_HEAD_SHOULDERS": _ete_bullish,
+        "DOUBLE_TOP"           : _double_top,
+        "DOUBLE_BOTTOM"        : _double_bottom,
+        "BULL_FLAG"            : _bull_flag,
+        "DRAPEAU_HAUSSIER"     : _bull_flag,
+        "BEAR_FLAG"            : _bear_flag,
+        "DRAPEAU_BAISSIER"     : _bear_flag,
+        "PENNANT"              : _pennant,
+        "FANION"               : _pennant,
+        "BISEAU_ASCENDANT"     : _rising_wedge,
+        "RISING_WEDGE"         : _rising_wedge,
+        "BISEAU_DESCENDANT"    : _falling_wedge,
+        "FALLING_WEDGE"        : _falling_wedge,
+        "TRIANGLE_ASCENDANT"   : _ascending_triangle,
+        "ASCENDING_TRIANGLE"   : _ascending_triangle,
+        "TRIANGLE_DESCENDANT"  : _descending_triangle,
+        "DESCENDING_TRIANGLE"  : _descending_triangle,
+        "TRIANGLE_SYMETRIQUE"  : _symmetric_triangle,
+        "SYMMETRIC_TRIANGLE"   : _symmetric_triangle,
+        "BUTTERFLY"            : _butterfly,
+        "BUTTERFLY_BULLISH"    : _butterfly,
+        "BUTTERFLY_BEARISH"    : _butterfly,
+        "SHARK"                : _shark,
+        "SHARK_BULLISH"        : _shark,
+        "SHARK_BEARISH"        : _shark,
+        "GARTLEY"              : _gartley,
+        "BAT"                  : _bat,
+        "CRAB"                 : _crab,
+        "COMPRESSION"          : _compression,
+        "ZONE_COMPRESSION"     : _compression,
+    }
+
+    # Méthode scalaire → version tableau
+    _BATCH_LEVELS = {
+        _ete_bearish         : _levels_ete_bearish,
+        _ete_bullish         : _levels_ete_bullish,
+        _double_top          : _levels_double_top,
+        _double_bottom       : _levels_double_bottom,
+        _bull_flag           : _levels_bull_flag,
+        _bear_flag           : _levels_bear_flag,
+        _pennant             : _levels_pennant,
+        _rising_wedge        : _levels_rising_wedge,
+        _falling_wedge       : _levels_falling_wedge,
+        _ascending_triangle  : _levels_ascending_triangle,
+        _descending_triangle : _levels_descending_triangle,
+        _symmetric_triangle  : _levels_symmetric_triangle,
+        _butterfly           : _levels_butterfly,
+        _shark               : _levels_shark,
+        _gartley             : _levels_gartley,
+        _bat                 : _levels_bat,
+        _crab                : _levels_crab,
+        _compression         : _levels_compression,
+        _reversal_candle     : _levels_reversal_candle,
+        _generic_fallback    : _levels_generic_fallback,
+    }
+
+    # Nom par défaut des signaux sans clé "pattern"
+    _DEFAULT_NAME = {
+        _reversal_candle  : "REVERSAL",
+        _generic_fallback : "UNKNOWN",
+    }
@@ -0,0 +1,275 @@
+"""
+alert_dispatcher.py
+───────────────────
+Envoi Telegram en arrière-plan, hors de la boucle de détection.
+
+  - File bornée : le scan dépose le message et continue ; si la file est
+    pleine, le message est abandonné (compté) plutôt que de bloquer le scan.
+  - Une seule requests.Session (connexions HTTPS réutilisées).
+  - Limite Telegram : sur HTTP 429, attente du `retry_after` renvoyé ;
+    erreurs réseau / 5xx : nouvelles tentatives avec attente exponentielle.
+  - Digest optionnel : les signaux reçus pendant `digest_window` secondes
+    sont regroupés en un seul message (découpé sous 4096 caractères).
+
+`api_base` permet de viser un serveur HTTP local (tests, bouchon).
+"""
+
+import atexit
+import logging
+import queue
+import threading
+import time
+from dataclasses import dataclass
+
+try:
+    import requests
+    from requests.adapters import HTTPAdapter
+    REQUESTS_OK = True
+except ImportError:
+    REQUESTS_OK = False
+
+logger = logging.getLogger("AlertDispatcher")
+
+TELEGRAM_API   = "https://api.telegram.org"
+MAX_TEXT       = 4096                     # longueur max d'un message Telegram
+DIGEST_SEP     = "\n\n━━━━━━━━━━━━━━━━━━\n\n"
+
+
+@dataclass
+class _Job:
+    method   : str                  # sendMessage | sendPhoto | sendDocument
+    data     : dict
+    files    : dict = None          # {"photo": (nom, octets)} — lus au dépôt
+    label    : str = ""
+    digest   : bool = False
+    attempts : int = 0
+
+
+class _Marker:
+    """Repère déposé dans la file : vide le digest, puis signale l'événement."""
+
+    def __init__(self, stop: bool = False):
+        self.done = threading.Event()
+        self.stop = stop
+
+
+class AlertDispatcher:
+    """
+    Expédie les messages Telegram depuis un thread dédié.
+
+    Usage :
+        dispatcher = AlertDispatcher(token, chat_id, digest_window=30)
+        dispatcher.send_message(text, digest=True)
+        dispatcher.send_document("📄 Pine Script", "outputs/tradingview/EUR_USD_1h.pine")
+        dispatcher.flush(timeout=0)     # fin de scan : digest envoyé sans attendre
+    """
+
+    def __init__(self,
+                 token: str,
+                 chat_id: str,
+                 api_base: str = TELEGRAM_API,
+                 max_queue: int = 200,
+                 digest_window: float = 0.0,
+                 digest_max: int = 10,
+                 max_retries: int = 4,
+                 min_interval: float = 1.0,
+                 timeout: float = 10.0,
+                 session=None):
+        self.token         = token
+        self.chat_id       = chat_id
+        self.api_base      = api_base.rstrip("/")
+        self.digest_window = digest_window
+        self.digest_max    = digest_max
+        self.max_retries   = max_retries
+        self.min_interval  = min_interval      # Telegram : ~1 message / s par conversation
+        self.timeout       = timeout
+
+        if session is None and REQUESTS_OK:
+            session = requests.Session()
+            session.mount("https://", HTTPAdapter(pool_connections=1, pool_maxsize=4))
+            session.mount("http://", HTTPAdapter(pool_connections=1, pool_maxsize=4))
+        self.session = session
+
+        self._queue   = queue.Queue(maxsize=max_queue)
+        self._digest  : list[_Job] = []
+        self._deadline = 0.0
+        self._last_send = 0.0
+        self._thread  = None
+        self._start_lock = threading.Lock()
+        self.stats = {"sent": 0, "failed": 0, "dropped": 0, "retried": 0, "digests": 0}
+
+    # ──────────────────────────────────────────────────────────────
+    # DÉPÔT (appelé depuis le scan — ne bloque jamais)
+    # ──────────────────────────────────────────────────────────────
+
+    def send_message(self, text: str, digest: bool = False, label: str = "") -> bool:
+        """Dépose un message texte ; `digest` = peut être regroupé avec d'autres."""
+        data = {"chat_id": self.chat_id, "text": text, "parse_mode": "Markdown"}
+        return self._submit(_Job("sendMessage", data, label=label, digest=digest))
+
+    def send_photo(self, caption: str, image_path: str, label: str = "") -> bool:
+        """Dépose une photo légendée (fichier lu immédiatement)."""
+        return self._submit_file("sendPhoto", "photo", caption, image_path, label,
+                                 parse_mode="Markdown")
+
+    def send_document(self, caption: str, path: str, label: str = "") -> bool:
+        """Dépose un document (fichier lu immédiatement : il peut être réécrit ensuite)."""
+        return self._submit_file("sendDocument", "document", caption, path, label)
+
+    def flush(self, timeout: float | None = None) -> bool:
+        """
+        Envoie le digest en cours après les messages déjà déposés.
+        timeout=0 : n'attend pas ; sinon attend au plus `timeout` s (None = sans limite).
+        Retourne True si tout ce qui précède a été traité.
+        """
+        marker = _Marker()
+        if not self._submit(marker, block=True):
+            return False
+        return marker.done.wait(timeout) if timeout != 0 else False
+
+    def close(self, timeout: float = 10.0) -> None:
+        """Vide la file (au plus `timeout` s) et arrête le thread."""
+        if self._thread is None or not self._thread.is_alive():
+            return
+        marker = _Marker(stop=True)
+        try:
+            self._queue.put(marker, timeout=timeout)
+        except queue.Full:
+            return
+        marker.done.wait(timeout)
+
+    # ──────────────────────────────────────────────────────────────
+    # THREAD D'ENVOI
+    # ──────────────────────────────────────────────────────────────
+
+    def _submit(self, job, block: bool = False) -> bool:
+        self._ensure_worker()
+        try:
+            self._queue.put(job, block=block, timeout=self.timeout if block else None)
+            return True
+        except queue.Full:
+            self.stats["dropped"] += 1
+            logger.warning("⚠️ File Telegram pleine — message abandonné (%s)", getattr(job, "label", ""))
+            return False
+
+    def _submit_file(self, method, field_name, caption, path, label, **extra) -> bool:
+        try:
+            with open(path, "rb") as f:
+                content = f.read()
+        except OSError as e:
+            logger.error(f"❌ Lecture {path} : {e}")
+            return False
+        data = {"chat_id": self.chat_id, "caption": caption, **extra}
+        files = {field_name: (path.rsplit("/", 1)[-1], content)}
+        return self._submit(_Job(method, data, files=files, label=label or caption))
+
+    def _ensure_worker(self) -> None:
+        with self._start_lock:
+            if self._thread is None:
+                atexit.register(self.close)
+            if not self._thread or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="AlertDispatcher", daemon=True)
+                self._thread.start()
+
+    def _run(self) -> None:
+        while True:
+            wait = max(self._deadline - time.monotonic(), 0) if self._digest else None
+            try:
+                job = self._queue.get(timeout=wait)
+            except queue.Empty:
+                self._send_digest()
+                continue
+
+            if isinstance(job, _Marker):
+                self._send_digest()
+                job.done.set()
+                if job.stop:
+                    return
+                continue
+
+            if job.digest and self.digest_window > 0:
+                if not self._digest:
+                    self._deadline = time.monotonic() + self.digest_window
+                self._digest.append(job)
+                if len(self._digest) >= self.digest_max:
+                    self._send_digest()
+            else:
+                self._deliver(job)
+
+    def _send_digest(self) -> None:
+        """Regroupe les messages en attente en un minimum de messages."""
+        jobs, self._digest = self._digest, []
+        if not jobs:
+            return
+        if len(jobs) == 1:
+            self._deliver(jobs[0])
+            return
+
+        self.stats["digests"] += 1
+        label  = f"digest ({len(jobs)} signaux)"
+        header = f"🤖 *{len(jobs)} SIGNAUX*\n\n"
+        chunk = header
+        for job in jobs:
+            text = job.data["text"]
+            candidate = chunk + (DIGEST_SEP if chunk != header else "") + text
+            if len(candidate) > MAX_TEXT and chunk != header:
+                self._deliver(_Job("sendMessage", {**job.data, "text": chunk}, label=label))
+                candidate = header + text
+            chunk = candidate[:MAX_TEXT]
+        self._deliver(_Job("sendMessage", {**jobs[0].data, "text": chunk}, label=label))
+
+    def _deliver(self, job: _Job) -> bool:
+        """Envoie un message ; 429 → attente `retry_after`, réseau / 5xx → backoff."""
+        url = f"{self.api_base}/bot{self.token}/{job.method}"
+        while True:
+            pause = self.min_interval - (time.monotonic() - self._last_send)
+            if pause > 0:
+                time.sleep(pause)
+            self._last_send = time.monotonic()
+
+            job.attempts += 1
+            error = ""
+            try:
+                if job.files:
+                    response = self.session.post(url, data=job.data, files=job.files, timeout=self.timeout)
+                else:
+                    response = self.session.post(url, json=job.data, timeout=self.timeout)
+                status = response.status_code
+            except Exception as e:
+                status, response = None, None
+                error = str(e)
+
+            if status == 200:
+                self.stats["sent"] += 1
+                logger.info(f"✅ Telegram envoyé : {job.label or job.method}")
+                return True
+
+            if status == 429:
+                delay = self._retry_after(response)
+            elif status is None or status >= 500:
+                delay = min(2 ** (job.attempts - 1), 30)
+            else:
+                self.stats["failed"] += 1
+                logger.warning(f"⚠️ Telegram erreur {status} : {response.text}")
+                return False
+
+            if job.attempts > self.max_retries:
+                self.stats["failed"] += 1
+                logger.error(f"❌ Telegram abandonné après {job.attempts} essais : "
+                             f"{status or error}")
+                return False
+            self.stats["retried"] += 1
+            logger.warning(f"⚠️ Telegram {status or error} — nouvel essai dans {delay:.0f} s")
+            time.sleep(delay)
+
+    @staticmethod
+    def _retry_after(response) -> float:
+        """Délai imposé par Telegram (parameters.retry_after, sinon en-tête Retry-After)."""
+        try:
+            return float(response.json()["parameters"]["retry_after"])
+        except Exception:
+            pass
+        try:
+            return float(response.headers.get("Retry-After", 1))
+        except (TypeError, ValueError):
+            return 1.0
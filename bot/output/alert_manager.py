@@ -3,21 +3,20 @@ alert_manager.py
 ────────────────
 Gestion des alertes : console + Telegram.
 Chaque signal valide génère une alerte formatée
-avec le label complet (figure, prix, SL, TP).
+avec le label complet (figure, prix, SL, TP),
+puis est ajouté au journal des signaux (SignalJournal).
+Les envois Telegram passent par l'AlertDispatcher (thread dédié) :
+le scan n'attend jamais la réponse de l'API.
 """
 
 import os
-import json
 import logging
 from datetime import datetime
 from dataclasses import dataclass
 from typing import Optional
 
-try:
-    import requests
-    REQUESTS_OK = True
-except ImportError:
-    REQUESTS_OK = False
+from bot.output.alert_dispatcher import REQUESTS_OK, AlertDispatcher
+from bot.output.signal_journal import SignalJournal
 
 logger = logging.getLogger("AlertManager")
 
@@ -49,12 +48,18 @@ class AlertManager:
 
     def __init__(self,
                  telegram_token: Optional[str] = None,
-                 telegram_chat_id: Optional[str] = None):
+                 telegram_chat_id: Optional[str] = None,
+                 journal: Optional[SignalJournal] = None,
+                 dispatcher: Optional[AlertDispatcher] = None):
 
         # Telegram — récupère depuis les variables d'environnement si pas fourni
         self.tg_token   = telegram_token   or os.getenv("TELEGRAM_BOT_TOKEN")
         self.tg_chat_id = telegram_chat_id or os.getenv("TELEGRAM_CHAT_ID")
         self.tg_enabled = bool(self.tg_token and self.tg_chat_id and REQUESTS_OK)
+        self.journal    = journal or SignalJournal()
+        self.dispatcher = None
+        if self.tg_enabled:
+            self.dispatcher = dispatcher or AlertDispatcher(self.tg_token, self.tg_chat_id)
 
         if self.tg_enabled:
             logger.info("✅ Telegram activé")
@@ -72,6 +77,12 @@ class AlertManager:
             self._telegram(alert)
         self._save_log(alert)
 
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Envoie le digest Telegram en attente (timeout=0 : sans attendre)."""
+        if self.dispatcher is None:
+            return True
+        return self.dispatcher.flush(timeout)
+
     # ──────────────────────────────────────────────────────────────
     # CONSOLE
     # ──────────────────────────────────────────────────────────────
@@ -116,20 +127,7 @@ class AlertManager:
 ADX: `{a.adx}` | QQE: `{a.qqe_status}`
         """.strip()
 
-        url     = f"https://api.telegram.org/bot{self.tg_token}/sendMessage"
-        payload = {
-            "chat_id"    : self.tg_chat_id,
-            "text"       : message,
-            "parse_mode" : "Markdown",
-        }
-        try:
-            response = requests.post(url, json=payload, timeout=10)
-            if response.status_code == 200:
-                logger.info(f"✅ Telegram envoyé : {a.pair} {a.pattern}")
-            else:
-                logger.warning(f"⚠️ Telegram erreur {response.status_code} : {response.text}")
-        except Exception as e:
-            logger.error(f"❌ Telegram exception : {e}")
+        self.dispatcher.send_message(message, digest=True, label=f"{a.pair} {a.pattern}")
 
     def send_visual_analysis(self, analysis: dict, image_path: str = ""):
         """
@@ -174,61 +172,29 @@ ADX: `{a.adx}` | QQE: `{a.qqe_status}`
         if warnings:
             message += f"\n\n\u26a0\ufe0f {', '.join(warnings)}"
 
-        if not self.tg_enabled or not REQUESTS_OK:
+        if not self.tg_enabled:
             return
 
-        try:
-            # Si image disponible, envoyer comme photo
-            if image_path and os.path.isfile(image_path):
-                url = f"https://api.telegram.org/bot{self.tg_token}/sendPhoto"
-                with open(image_path, "rb") as f:
-                    requests.post(url, data={
-                        "chat_id": self.tg_chat_id,
-                        "caption": message,
-                        "parse_mode": "Markdown",
-                    }, files={"photo": f}, timeout=30)
-            else:
-                # Pas d'image, envoyer comme texte
-                url = f"https://api.telegram.org/bot{self.tg_token}/sendMessage"
-                requests.post(url, json={
-                    "chat_id": self.tg_chat_id,
-                    "text": message,
-                    "parse_mode": "Markdown",
-                }, timeout=10)
-
-            logger.info(f"Telegram visual analysis envoyé : {pair} {tf} score={score}")
-        except Exception as e:
-            logger.error(f"Telegram visual analysis erreur : {e}")
+        label = f"analyse visuelle {pair} {tf} score={score}"
+        # Si image disponible, envoyer comme photo, sinon comme texte
+        if image_path and os.path.isfile(image_path):
+            self.dispatcher.send_photo(message, image_path, label=label)
+        else:
+            self.dispatcher.send_message(message, label=label)
 
     def send_pine_script(self, pair: str, tf: str, pine_path: str):
         """Envoie le fichier Pine Script sur Telegram."""
-        if not self.tg_enabled or not REQUESTS_OK:
+        if not self.tg_enabled:
             return
-        try:
-            url = f"https://api.telegram.org/bot{self.tg_token}/sendDocument"
-            with open(pine_path, "rb") as f:
-                requests.post(url, data={
-                    "chat_id" : self.tg_chat_id,
-                    "caption" : f"📄 Pine Script — {pair} {tf}"
-                }, files={"document": f}, timeout=15)
-        except Exception as e:
-            logger.error(f"❌ Envoi Pine Script : {e}")
+        self.dispatcher.send_document(f"📄 Pine Script — {pair} {tf}", pine_path)
 
     # ──────────────────────────────────────────────────────────────
-    # LOG JSON
+    # JOURNAL DES SIGNAUX
     # ──────────────────────────────────────────────────────────────
 
     def _save_log(self, a: Alert):
-        log_path = "outputs/signals_log.json"
-        os.makedirs("outputs", exist_ok=True)
         try:
-            try:
-                with open(log_path, "r") as f:
-                    logs = json.load(f)
-            except (FileNotFoundError, json.JSONDecodeError):
-                logs = []
-
-            logs.append({
+            self.journal.append({
                 "timestamp"  : a.timestamp,
                 "pair"       : a.pair,
                 "timeframe"  : a.timeframe,
@@ -242,8 +208,5 @@ ADX: `{a.adx}` | QQE: `{a.qqe_status}`
                 "adx"        : a.adx,
                 "compression": a.compression,
             })
-
-            with open(log_path, "w") as f:
-                json.dump(logs[-500:], f, indent=2)  # Garde les 500 derniers
         except Exception as e:
             logger.warning(f"⚠️ Sauvegarde log : {e}")
@@ -4,14 +4,23 @@ backtester.py
 Valide les signaux du bot sur données historiques.
 Répond à la question : "Est-ce que ce signal aurait marché ?"
 Génère un rapport de performance (winrate, RR moyen, etc.)
+
+Une bougie qui touche à la fois le SL et un TP est départagée, si un
+BarStore est fourni, par les bougies 1m / 5m de cette seule bougie.
 """
 
+import re
+
 import pandas as pd
 import numpy as np
 from dataclasses import dataclass, field
 from typing import List, Optional
 from datetime import datetime
 
+# Partie date d'un horodatage texte ("2024-03-01 14:30", "01/03/2024 …") :
+# une heure seule ("14:30", format de run_scan) n'identifie aucune bougie
+_DATE_PART = re.compile(r"\d{4}[-/.]\d{1,2}[-/.]\d{1,2}|\d{1,2}[-/.]\d{1,2}[-/.]\d{4}")
+
 
 @dataclass
 class BacktestTrade:
@@ -66,109 +75,288 @@ class Backtester:
         report.print()
     """
 
-    def __init__(self, risk_pct: float = 1.0, max_bars: int = 100):
+    def __init__(self,
+                 risk_pct : float = 1.0,
+                 max_bars : int = 100,
+                 store    = None,
+                 fine_tfs : tuple = ("1m", "5m")):
         self.risk_pct = risk_pct       # % du capital risqué par trade
         self.max_bars = max_bars       # Nombre max de bougies à attendre
+        self.store    = store          # BarStore des bougies fines (None = SL prioritaire)
+        self.fine_tfs = fine_tfs       # Timeframes fins essayés, du plus fin au plus large
 
     def run(self, signals: list, ohlcv_df: pd.DataFrame) -> BacktestReport:
         """
         signals    : liste de dicts (sortie du scanner)
         ohlcv_df   : DataFrame avec colonnes [open, high, low, close, volume]
+                     (+ colonne "timestamp" ou index daté)
+        """
+        trades = [t for t in self.simulate(signals, ohlcv_df) if t]
+        return self.report(trades)
+
+    def simulate(self, signals: list, df: pd.DataFrame) -> List[Optional[BacktestTrade]]:
+        """
+        Simule tous les signaux ensemble sur `df` (None pour un signal invalide).
+
+        La bougie d'entrée de chaque signal est trouvée par recherche
+        binaire sur les horodatages ; le premier contact SL / TP2 / TP1
+        des `max_bars` bougies suivantes est cherché pour tous les signaux
+        à la fois (argmax sur la matrice des contacts). Dans une même
+        bougie, le SL est prioritaire sur TP2, lui-même prioritaire sur TP1 ;
+        avec un BarStore, une bougie touchant SL et TP est rejouée sur ses
+        bougies fines (voir _resolve_intrabar).
         """
-        trades = []
+        trades: List[Optional[BacktestTrade]] = [None] * len(signals)
 
-        for sig in signals:
-            trade = self._simulate_trade(sig, ohlcv_df)
-            if trade:
-                trades.append(trade)
+        # Signaux simulables (mêmes règles que la simulation bougie par bougie)
+        rows = []
+        for i, sig in enumerate(signals):
+            entry, sl, tp2 = sig.get("entry"), sig.get("sl") or sig.get("stop_loss"), sig.get("tp2")
+            if all([entry, sl, tp2]) and abs(entry - sl) != 0:
+                rows.append(i)
+        if not rows:
+            return trades
+        picked = [signals[i] for i in rows]
 
-        return self._compute_report(trades)
+        entry = np.array([s["entry"] for s in picked], dtype=float)
+        sl    = np.array([s.get("sl") or s.get("stop_loss") for s in picked], dtype=float)
+        tp1   = np.array([s.get("tp1") or 0 for s in picked], dtype=float)
+        tp2   = np.array([s["tp2"] for s in picked], dtype=float)
+        long_ = np.array([s.get("direction", "LONG") == "LONG" for s in picked])
+
+        # Fenêtre [start, stop[ des bougies suivant l'entrée (sémantique de df.iloc)
+        n = len(df)
+        entry_idx = self._entry_bars([s.get("timestamp", "") for s in picked], df)
+        start = self._clip_slice(entry_idx + 1, n)
+        stop  = np.maximum(self._clip_slice(entry_idx + 1 + self.max_bars, n), start)
+
+        outcome, bars_held, ambiguous = self._first_touch(
+            df, start, stop, long_, sl, tp1, tp2,
+        )
+        if self.store is not None and ambiguous.any():
+            amb = np.flatnonzero(ambiguous)
+            outcome[amb] = self._resolve_intrabar(
+                [picked[j].get("pair", "") for j in amb], df, start[amb] + bars_held[amb] - 1,
+                long_[amb], sl[amb], tp1[amb], tp2[amb], outcome[amb],
+            )
+
+        for j, i in enumerate(rows):
+            trades[i] = self._make_trade(signals[i], int(outcome[j]), int(bars_held[j]))
+        return trades
 
     def _simulate_trade(self, sig: dict, df: pd.DataFrame) -> Optional[BacktestTrade]:
-        entry     = sig.get("entry")
-        sl        = sig.get("sl") or sig.get("stop_loss")
-        tp2       = sig.get("tp2")
-        tp1       = sig.get("tp1")
-        direction = sig.get("direction", "LONG")
-        pattern   = sig.get("pattern", "UNKNOWN")
-        pair      = sig.get("pair", "")
-        timestamp = sig.get("timestamp", "")
-        rr        = sig.get("rr_ratio", 0)
+        """Simulation d'un seul signal (voir simulate)."""
+        return self.simulate([sig], df)[0]
 
-        if not all([entry, sl, tp2]):
-            return None
+    # ──────────────────────────────────────────────────────────────
+    # MOTEUR VECTORISÉ
+    # ──────────────────────────────────────────────────────────────
+
+    # Issue d'un trade, par priorité dans la bougie de contact
+    PENDING, LOSS, WIN_TP2, WIN_TP1 = 0, 1, 2, 3
+    _RESULTS = {PENDING: "PENDING", LOSS: "LOSS", WIN_TP2: "WIN_TP2", WIN_TP1: "WIN_TP1"}
+
+    # Signaux traités par bloc (matrice bloc × max_bars en mémoire)
+    CHUNK = 20_000
+
+    def _entry_bars(self, timestamps: list, df: pd.DataFrame) -> np.ndarray:
+        """
+        Bougie la plus proche de chaque horodatage (égalité → la plus récente).
+        Horodatage absent, illisible ou sans date (heure seule, ex : "14:30") :
+        len(df) - max_bars, comme avant.
+        """
+        fallback = np.full(len(timestamps), len(df) - self.max_bars, dtype=np.int64)
+        bar_ts = self._bar_times(df)
+        if bar_ts is None or not len(bar_ts):
+            return fallback
+
+        # Sans date, pandas daterait l'heure d'aujourd'hui : horodatage ignoré
+        dated = [
+            ts if not isinstance(ts, str) or _DATE_PART.search(ts) else None
+            for ts in timestamps
+        ]
+        sig_ts = pd.to_datetime(
+            pd.Series(dated, dtype=object), errors="coerce", utc=True, format="mixed",
+        ).dt.tz_localize(None).to_numpy(dtype="datetime64[ns]").view(np.int64)
+        known = sig_ts != np.iinfo(np.int64).min          # NaT
 
-        # Trouver la bougie d'entrée dans le DataFrame
-        try:
-            entry_idx = df.index.get_loc(timestamp, method="nearest")
-        except Exception:
-            entry_idx = len(df) - self.max_bars
+        order = None
+        if not (np.diff(bar_ts) >= 0).all():
+            order  = np.argsort(bar_ts, kind="stable")
+            bar_ts = bar_ts[order]
 
-        result    = "PENDING"
-        pnl_pct   = 0.0
-        bars_held = 0
+        pos   = np.searchsorted(bar_ts, sig_ts, side="left")
+        right = np.minimum(pos, len(bar_ts) - 1)
+        left  = np.maximum(pos - 1, 0)
+        take_left = (sig_ts - bar_ts[left]) < (bar_ts[right] - sig_ts)
+        nearest = np.where(take_left, left, right)
+        if order is not None:
+            nearest = order[nearest]
+        return np.where(known, nearest, fallback)
 
-        risk = abs(entry - sl)
-        if risk == 0:
+    @staticmethod
+    def _bar_times(df: pd.DataFrame) -> Optional[np.ndarray]:
+        """Horodatages des bougies en ns UTC (colonne "timestamp" ou index daté)."""
+        if "timestamp" in df.columns:
+            values = df["timestamp"]
+        elif isinstance(df.index, pd.DatetimeIndex):
+            values = df.index.to_series()
+        else:
             return None
+        ts = pd.to_datetime(values, errors="coerce", utc=True)
+        if ts.isna().any():
+            return None
+        return ts.dt.tz_localize(None).to_numpy(dtype="datetime64[ns]").view(np.int64)
+
+    @staticmethod
+    def _clip_slice(bound: np.ndarray, n: int) -> np.ndarray:
+        """Borne de tranche normalisée comme par Python (négatifs depuis la fin)."""
+        bound = np.where(bound < 0, bound + n, bound)
+        return np.clip(bound, 0, n)
+
+    def _first_touch(self, df, start, stop, long_, sl, tp1, tp2):
+        """
+        Premier contact de chaque trade dans sa fenêtre de bougies.
+
+        Returns:
+            (issue, bougies tenues, ambiguïté) — issue ∈ PENDING / LOSS /
+            WIN_TP2 / WIN_TP1 ; ambiguïté : la bougie de contact touche aussi
+            un TP (SL retenu par défaut)
+        """
+        lows  = df["low"].to_numpy(dtype=float)
+        highs = df["high"].to_numpy(dtype=float)
+        outcome   = np.full(len(start), self.PENDING, dtype=np.int8)
+        ambiguous = np.zeros(len(start), dtype=bool)
+        bars_held = stop - start
+        if not len(lows):
+            return outcome, bars_held, ambiguous
+
+        offsets = np.arange(self.max_bars)
+        for lo in range(0, len(start), self.CHUNK):
+            blk = slice(lo, lo + self.CHUNK)
+            idx = start[blk, None] + offsets
+            inside = idx < stop[blk, None]
+            idx = np.minimum(idx, len(lows) - 1)
+
+            code, first, hit, both = self._first_hit(
+                lows[idx], highs[idx], inside, long_[blk], sl[blk], tp1[blk], tp2[blk],
+            )
+            outcome[blk]   = code
+            ambiguous[blk] = both
+            bars_held[blk] = np.where(hit, first + 1, bars_held[blk])
+        return outcome, bars_held, ambiguous
+
+    def _first_hit(self, low, high, inside, long_, sl, tp1, tp2):
+        """
+        Premier contact SL / TP2 / TP1 de chaque ligne d'une matrice de
+        bougies (une ligne par trade).
+
+        Returns:
+            (issue, position du contact, contact trouvé, SL et TP dans la
+            bougie de contact)
+        """
+        is_long = long_[:, None]
+        s, t1, t2 = sl[:, None], tp1[:, None], tp2[:, None]
+        hit_sl  = np.where(is_long, low <= s, high >= s)
+        hit_tp2 = np.where(is_long, high >= t2, low <= t2)
+        hit_tp1 = (t1 != 0) & np.where(is_long, high >= t1, low <= t1)
+        touched = (hit_sl | hit_tp2 | hit_tp1) & inside
+
+        first = touched.argmax(axis=1)
+        rows  = np.arange(len(first))
+        hit   = touched[rows, first]
+        sl_first = hit_sl[rows, first]
+        tp_first = hit_tp2[rows, first] | hit_tp1[rows, first]
+        code  = np.where(
+            sl_first, self.LOSS,
+            np.where(hit_tp2[rows, first], self.WIN_TP2, self.WIN_TP1),
+        )
+        code = np.where(hit, code, self.PENDING).astype(np.int8)
+        return code, first, hit, hit & sl_first & tp_first
+
+    def _resolve_intrabar(self, pairs, df, bars, long_, sl, tp1, tp2, outcome):
+        """
+        Départage SL / TP des bougies ambiguës avec les bougies fines du
+        BarStore (fine_tfs, du plus fin au plus large).
+
+        Chaque bougie ambiguë est indexée sur sa plage de bougies fines par
+        recherche binaire sur les horodatages ; seules ces lignes sont lues
+        dans la série projetée en mémoire. Sans bougies fines, ou si le
+        contact reste ambigu, l'issue d'origine (SL) est conservée.
+
+        Returns:
+            issues mises à jour, une par bougie ambiguë
+        """
+        outcome = outcome.copy()
+        bar_ts  = self._bar_times(df)
+        if bar_ts is None or len(bar_ts) < 2:
+            return outcome
+
+        # Plage [début, fin[ de chaque bougie : jusqu'à l'ouverture suivante
+        width = int(np.median(np.diff(bar_ts)))
+        begin = bar_ts[bars]
+        end   = np.where(bars + 1 < len(bar_ts), bar_ts[np.minimum(bars + 1, len(bar_ts) - 1)], begin + width)
+
+        pairs = np.asarray(pairs, dtype=object)
+        for pair in dict.fromkeys(pairs):
+            todo = np.flatnonzero(pairs == pair)
+            for tf in self.fine_tfs:
+                series = self.store.series(pair, tf)
+                if series is None or not todo.size:
+                    continue
+                times, ohlcv = series
+                lo = np.searchsorted(times, begin[todo], side="left")
+                hi = np.searchsorted(times, end[todo], side="left")
+                covered = hi > lo
+                if not covered.any():
+                    continue
+
+                rows, lo, hi = todo[covered], lo[covered], hi[covered]
+                idx = lo[:, None] + np.arange(int((hi - lo).max()))
+                inside = idx < hi[:, None]
+                idx = np.minimum(idx, len(times) - 1)
+                code, _, hit, both = self._first_hit(
+                    ohlcv[idx, 2], ohlcv[idx, 1], inside,
+                    long_[rows], sl[rows], tp1[rows], tp2[rows],
+                )
+                resolved = hit & ~both
+                outcome[rows[resolved]] = code[resolved]
+                # Encore ambiguës ou sans données : timeframe suivant
+                todo = np.setdiff1d(todo, rows[resolved])
+        return outcome
+
+    def _make_trade(self, sig: dict, outcome: int, bars_held: int) -> BacktestTrade:
+        entry     = sig.get("entry")
+        sl        = sig.get("sl") or sig.get("stop_loss")
+        tp1       = sig.get("tp1")
+        tp2       = sig.get("tp2")
+        risk      = abs(entry - sl)
 
-        # Simuler les bougies suivantes
-        future = df.iloc[entry_idx + 1 : entry_idx + 1 + self.max_bars]
-
-        for i, (_, bar) in enumerate(future.iterrows()):
-            bars_held = i + 1
-
-            if direction == "LONG":
-                # Stop touché
-                if bar["low"] <= sl:
-                    result  = "LOSS"
-                    pnl_pct = -(self.risk_pct)
-                    break
-                # TP2 touché
-                if bar["high"] >= tp2:
-                    reward  = abs(tp2 - entry)
-                    result  = "WIN_TP2"
-                    pnl_pct = self.risk_pct * (reward / risk)
-                    break
-                # TP1 touché
-                if tp1 and bar["high"] >= tp1:
-                    reward  = abs(tp1 - entry)
-                    result  = "WIN_TP1"
-                    pnl_pct = self.risk_pct * (reward / risk) * 0.5
-                    break
-
-            else:  # SHORT
-                if bar["high"] >= sl:
-                    result  = "LOSS"
-                    pnl_pct = -(self.risk_pct)
-                    break
-                if bar["low"] <= tp2:
-                    reward  = abs(entry - tp2)
-                    result  = "WIN_TP2"
-                    pnl_pct = self.risk_pct * (reward / risk)
-                    break
-                if tp1 and bar["low"] <= tp1:
-                    reward  = abs(entry - tp1)
-                    result  = "WIN_TP1"
-                    pnl_pct = self.risk_pct * (reward / risk) * 0.5
-                    break
+        pnl_pct = 0.0
+        if outcome == self.LOSS:
+            pnl_pct = -(self.risk_pct)
+        elif outcome == self.WIN_TP2:
+            pnl_pct = self.risk_pct * (abs(tp2 - entry) / risk)
+        elif outcome == self.WIN_TP1:
+            pnl_pct = self.risk_pct * (abs(tp1 - entry) / risk) * 0.5
 
         return BacktestTrade(
-            timestamp  = str(timestamp),
-            pair       = pair,
-            pattern    = pattern,
-            direction  = direction,
+            timestamp  = str(sig.get("timestamp", "")),
+            pair       = sig.get("pair", ""),
+            pattern    = sig.get("pattern", "UNKNOWN"),
+            direction  = sig.get("direction", "LONG"),
             entry      = entry,
             sl         = sl,
             tp1        = tp1 or 0,
             tp2        = tp2,
-            rr_ratio   = rr,
-            result     = result,
+            rr_ratio   = sig.get("rr_ratio", 0),
+            result     = self._RESULTS[outcome],
             pnl_pct    = round(pnl_pct, 3),
             bars_held  = bars_held,
         )
 
-    def _compute_report(self, trades: List[BacktestTrade]) -> BacktestReport:
+    def report(self, trades: List[BacktestTrade]) -> BacktestReport:
+        """Rapport de performance d'une liste de trades simulés (cf. simulate)."""
         if not trades:
             return BacktestReport(0, 0, 0, 0, 0, 0, 0, 0, [])
 
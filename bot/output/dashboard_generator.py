@@ -4,43 +4,132 @@ dashboard_generator.py
 Génère un dashboard HTML mis à jour en temps réel.
 Affiche tous les signaux détectés avec leurs figures.
 Ouvre dans le navigateur → tu vois les signaux sans TradingView.
+
+Rendu incrémental :
+  - la page (styles + script) n'est écrite qu'une fois : plus de
+    rechargement complet toutes les 60 s ;
+  - les signaux sont publiés dans un flux JSON versionné
+    (dashboard_feed.js, enveloppé dans un appel JS pour fonctionner aussi
+    en file://) que la page interroge toutes les 15 s ;
+  - chaque carte est un fragment nommé par son empreinte
+    (dashboard_cards/<empreinte>.js) : la page ne charge que les cartes
+    qu'elle n'a pas encore, et ne redessine rien si la version est inchangée ;
+  - le SVG de chaque (figure, direction) n'est construit qu'une fois.
 """
 
+import hashlib
 import os
 import json
 from datetime import datetime
 from typing import List
 
+# Intervalle d'interrogation du flux par la page (ms)
+POLL_MS = 15_000
+
 
 class DashboardGenerator:
     """
-    Génère outputs/dashboard.html
-    Rafraîchi automatiquement toutes les 60 secondes.
+    Génère outputs/dashboard.html (page fixe), outputs/dashboard_feed.js
+    (flux versionné) et outputs/dashboard_cards/ (une carte par fichier).
     """
 
+    # SVG par (figure, direction), partagé entre les scans
+    _svg_cache: dict = {}
+
     def __init__(self, output_path: str = "outputs/dashboard.html"):
         self.output_path = output_path
-        os.makedirs("outputs", exist_ok=True)
+        self.output_dir  = os.path.dirname(output_path) or "."
+        self.feed_path   = os.path.join(self.output_dir, "dashboard_feed.js")
+        self.cards_dir   = os.path.join(self.output_dir, "dashboard_cards")
+        os.makedirs(self.cards_dir, exist_ok=True)
+        self._version = 0
+        self._last_payload = None
 
     def generate(self, signals: list, backtest_report=None):
-        """Génère le dashboard avec les signaux en cours."""
-        html = self._build_html(signals, backtest_report)
-        with open(self.output_path, "w", encoding="utf-8") as f:
-            f.write(html)
-
-    def _build_html(self, signals: list, report=None) -> str:
-        now         = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        signal_cards= "".join(self._signal_card(s) for s in signals)
-        backtest_html = self._backtest_section(report) if report else ""
-        n_long  = sum(1 for s in signals if s.get('direction') == 'LONG')
-        n_short = sum(1 for s in signals if s.get('direction') == 'SHORT')
-        n_comp  = sum(1 for s in signals if s.get('compression_zone'))
-
+        """Publie les signaux en cours ; seules les cartes nouvelles sont écrites."""
+        self._write_if_changed(self.output_path, self._build_shell())
+
+        cards = []
+        for s in signals:
+            html   = self._signal_card(s)
+            digest = hashlib.sha1(html.encode("utf-8")).hexdigest()[:16]
+            self._write_if_changed(
+                os.path.join(self.cards_dir, f"{digest}.js"),
+                f"window.dashboardCard({json.dumps(digest)}, {json.dumps(html, ensure_ascii=False)});\n",
+            )
+            cards.append(digest)
+        self._prune_cards(set(cards))
+
+        payload = {
+            "cards"   : cards,
+            "n_total" : len(signals),
+            "n_long"  : sum(1 for s in signals if s.get('direction') == 'LONG'),
+            "n_short" : sum(1 for s in signals if s.get('direction') == 'SHORT'),
+            "n_comp"  : sum(1 for s in signals if s.get('compression_zone')),
+            "backtest": self._backtest_section(backtest_report) if backtest_report else "",
+        }
+        if self._last_payload is None:
+            self._version, self._last_payload = self._read_published()
+        if payload != self._last_payload:
+            self._version += 1
+            self._last_payload = payload
+        feed = {
+            "version": self._version,
+            "updated": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+            **payload,
+        }
+        with open(self.feed_path, "w", encoding="utf-8") as f:
+            f.write(f"window.dashboardFeed({json.dumps(feed, ensure_ascii=False)});\n")
+
+    # ──────────────────────────────────────────────────────────────
+    # FICHIERS
+    # ──────────────────────────────────────────────────────────────
+
+    @staticmethod
+    def _write_if_changed(path: str, content: str) -> bool:
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                if f.read() == content:
+                    return False
+        except OSError:
+            pass
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(content)
+        return True
+
+    def _prune_cards(self, keep: set) -> None:
+        """Supprime les fragments des cartes qui ne sont plus affichées."""
+        for name in os.listdir(self.cards_dir):
+            if name.endswith(".js") and name[:-3] not in keep:
+                try:
+                    os.remove(os.path.join(self.cards_dir, name))
+                except OSError:
+                    pass
+
+    def _read_published(self) -> tuple[int, dict | None]:
+        """
+        Version et contenu du flux déjà publié (continuité après redémarrage) :
+        un contenu identique ne fait pas changer la version.
+        """
+        try:
+            with open(self.feed_path, "r", encoding="utf-8") as f:
+                raw = f.read()
+            feed = json.loads(raw[raw.index("(") + 1:raw.rindex(")")])
+            version = int(feed.pop("version"))
+        except (OSError, ValueError, KeyError, TypeError, AttributeError):
+            return 0, None
+        feed.pop("updated", None)
+        return version, feed
+
+    # ──────────────────────────────────────────────────────────────
+    # PAGE (écrite une fois)
+    # ──────────────────────────────────────────────────────────────
+
+    def _build_shell(self) -> str:
         return f"""<!DOCTYPE html>
 <html lang="fr">
 <head>
 <meta charset="UTF-8">
-<meta http-equiv="refresh" content="60">
 <title>Trading Bot — Dashboard</title>
 <style>
   :root {{
@@ -130,24 +219,94 @@ class DashboardGenerator:
 <div class="topbar">
   <div class="brand">Trading Bot <em>Ultimate</em></div>
   <div class="tstats">
-    <div class="tstat"><div class="tv b">{len(signals)}</div><div class="tl">Signaux</div></div>
-    <div class="tstat"><div class="tv g">{n_long}</div><div class="tl">Long</div></div>
-    <div class="tstat"><div class="tv r">{n_short}</div><div class="tl">Short</div></div>
-    <div class="tstat"><div class="tv o">{n_comp}</div><div class="tl">Compression</div></div>
+    <div class="tstat"><div class="tv b" id="n_total">0</div><div class="tl">Signaux</div></div>
+    <div class="tstat"><div class="tv g" id="n_long">0</div><div class="tl">Long</div></div>
+    <div class="tstat"><div class="tv r" id="n_short">0</div><div class="tl">Short</div></div>
+    <div class="tstat"><div class="tv o" id="n_comp">0</div><div class="tl">Compression</div></div>
   </div>
-  <div class="time">Mis à jour : {now} — Rafraîchi toutes les 60s</div>
+  <div class="time">Mis à jour : <span id="updated">—</span> — Actualisé toutes les {POLL_MS // 1000}s</div>
 </div>
 
-<div class="grid">
-{signal_cards if signals else '<div class="empty">⏳ Aucun signal détecté — Scanner en cours...</div>'}
+<div class="grid" id="grid">
+<div class="empty">⏳ Aucun signal détecté — Scanner en cours...</div>
 </div>
 
-{backtest_html}
+<div id="backtest"></div>
+
+<script>
+(function () {{
+  const known = {{}};          // empreinte → HTML de la carte
+  let version = -1, pending = null;
+
+  function load(src) {{
+    const el = document.createElement("script");
+    el.src = src;
+    el.onload = el.onerror = () => el.remove();
+    document.head.appendChild(el);
+  }}
+
+  function render(feed) {{
+    if (feed.cards.some(h => !(h in known))) return;   // cartes encore en chargement
+    version = feed.version;
+    pending = null;
+    for (const id of ["n_total", "n_long", "n_short", "n_comp"]) {{
+      document.getElementById(id).textContent = feed[id];
+    }}
+    document.getElementById("backtest").innerHTML = feed.backtest;
+
+    // Les cartes déjà affichées sont réutilisées telles quelles
+    const grid = document.getElementById("grid");
+    const shown = {{}};
+    grid.querySelectorAll("[data-hash]").forEach(n => (shown[n.dataset.hash] ||= []).push(n));
+    const frag = document.createDocumentFragment();
+    for (const h of feed.cards) {{
+      let node = (shown[h] || []).shift();
+      if (!node) {{
+        const t = document.createElement("template");
+        t.innerHTML = known[h].trim();
+        node = t.content.firstElementChild;
+        node.dataset.hash = h;
+      }}
+      frag.appendChild(node);
+    }}
+    if (!feed.cards.length) {{
+      frag.appendChild(Object.assign(document.createElement("div"), {{
+        className: "empty", textContent: "⏳ Aucun signal détecté — Scanner en cours...",
+      }}));
+    }}
+    grid.replaceChildren(frag);
+  }}
+
+  window.dashboardCard = function (hash, html) {{
+    known[hash] = html;
+    if (pending) render(pending);
+  }};
+
+  window.dashboardFeed = function (feed) {{
+    document.getElementById("updated").textContent = feed.updated;
+    if (feed.version === version) return;
+    pending = feed;
+    feed.cards.filter(h => !(h in known)).forEach(h => load("dashboard_cards/" + h + ".js"));
+    render(feed);
+  }};
+
+  const poll = () => load("dashboard_feed.js?t=" + Date.now());
+  poll();
+  setInterval(poll, {POLL_MS});
+}})();
+</script>
 
 </body></html>"""
 
     def _pattern_svg(self, pattern_name: str, direction: str) -> str:
-        """Retourne un SVG inline illustrant le pattern."""
+        """Retourne un SVG inline illustrant le pattern (mémorisé par figure / direction)."""
+        key = (pattern_name, direction)
+        svg = self._svg_cache.get(key)
+        if svg is None:
+            svg = self._svg_cache[key] = self._render_pattern_svg(pattern_name, direction)
+        return svg
+
+    def _render_pattern_svg(self, pattern_name: str, direction: str) -> str:
         n = (pattern_name or "").lower()
         L = direction == "LONG"
         G, R, W = "#2dcc74", "#e84545", "#f5a623"
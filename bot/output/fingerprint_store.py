@@ -0,0 +1,194 @@
+"""
+fingerprint_store.py
+────────────────────
+Empreintes des signaux déjà émis, conservées d'un scan à l'autre.
+
+Un même setup (paire, timeframe, figure, direction, entrée à ±0,2 %) est
+redétecté à chaque cycle de 15 min tant qu'il reste visible. Il n'est
+alerté qu'à sa première détection : les suivantes mettent à jour
+l'empreinte (dernière vue, nombre de détections) et gardent son dessin
+dans le script du graphique, sans nouvelle alerte.
+
+  - TTL      : une empreinte non revue pendant `ttl_bars` bougies expire —
+               le setup a disparu, une nouvelle détection sera alertée.
+  - Cooldown : un setup toujours présent est de nouveau alerté au plus
+               une fois toutes les `cooldown_bars` bougies (rappel).
+
+Persistance : outputs/signal_fingerprints.json, réécrit en fin de scan
+(path=None : index en mémoire seulement, pour le rejeu historique).
+"""
+
+import json
+import logging
+import os
+import time
+from dataclasses import asdict, dataclass
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PATH = "outputs/signal_fingerprints.json"
+
+# Durée d'une bougie par timeframe (secondes)
+TF_SECONDS = {
+    "15m": 900,
+    "30m": 1_800,
+    "1h" : 3_600,
+    "4h" : 14_400,
+    "1d" : 86_400,
+}
+
+
+@dataclass
+class FingerprintRecord:
+    """Dernier état connu d'un setup déjà signalé."""
+    fingerprint : str
+    pair        : str
+    timeframe   : str
+    pattern     : str
+    direction   : str
+    entry       : float
+    first_seen  : float          # epoch (s)
+    last_seen   : float
+    last_alert  : float
+    hits        : int = 1        # détections depuis la première vue
+    pine_file   : str = ""
+
+
+class FingerprintStore:
+    """
+    Index (paire, timeframe, figure, direction) → empreintes actives.
+
+    Usage :
+        record, is_new = store.observe(sig)
+        record.pine_file = script_store.add(pair, tf, drawing)   # toujours dessiné
+        if not is_new:
+            continue                      # déjà alerté : pas de nouvelle alerte
+        ...
+        store.save()                      # fin de scan
+    """
+
+    def __init__(self,
+                 path: str = DEFAULT_PATH,
+                 ttl_bars: int = 3,
+                 cooldown_bars: int = 24,
+                 entry_tolerance: float = 0.002):
+        self.path            = path
+        self.ttl_bars        = ttl_bars
+        self.cooldown_bars   = cooldown_bars
+        self.entry_tolerance = entry_tolerance
+        self._index: dict[tuple, list[FingerprintRecord]] = {}
+        self.repeats = 0                  # détections répétées depuis le dernier save()
+        self._dirty  = False
+        if self.path:
+            self._load()
+
+    # ------------------------------------------------------------------ #
+    #  Méthodes publiques                                                  #
+    # ------------------------------------------------------------------ #
+
+    def observe(self, sig: dict, now: float | None = None) -> tuple[FingerprintRecord, bool]:
+        """
+        Enregistre une détection.
+
+        Returns:
+            (empreinte, True) si le setup est nouveau — ou revenu après son
+            cooldown — et doit être traité ; (empreinte mise à jour, False) sinon.
+        """
+        now   = time.time() if now is None else now
+        key   = self._key(sig)
+        entry = float(sig.get("entry") or 0)
+        bar_s = TF_SECONDS.get(key[1], 3_600)
+
+        records = [r for r in self._index.get(key, ()) if now - r.last_seen <= self.ttl_bars * bar_s]
+        self._index[key] = records
+        self._dirty = True
+
+        record = next((r for r in records if self._same_entry(r.entry, entry)), None)
+        if record is None:
+            record = FingerprintRecord(
+                fingerprint = "|".join((*key, f"{entry:.6g}")),
+                pair        = key[0],
+                timeframe   = key[1],
+                pattern     = key[2],
+                direction   = key[3],
+                entry       = entry,
+                first_seen  = now,
+                last_seen   = now,
+                last_alert  = now,
+            )
+            records.append(record)
+            return record, True
+
+        record.last_seen = now
+        record.hits     += 1
+        if self.cooldown_bars and now - record.last_alert >= self.cooldown_bars * bar_s:
+            record.last_alert = now
+            return record, True
+        self.repeats += 1
+        return record, False
+
+    def save(self) -> None:
+        """Purge les empreintes expirées et réécrit le fichier (si modifié)."""
+        now = time.time()
+        for key, records in list(self._index.items()):
+            ttl = self.ttl_bars * TF_SECONDS.get(key[1], 3_600)
+            kept = [r for r in records if now - r.last_seen <= ttl]
+            if kept:
+                self._index[key] = kept
+            else:
+                del self._index[key]
+                self._dirty = True
+
+        if self.repeats:
+            logger.info("Empreintes : %d détection(s) répétée(s) non réalertée(s)", self.repeats)
+        self.repeats = 0
+        if not self._dirty or not self.path:
+            return
+
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp = f"{self.path}.tmp"
+        try:
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump([asdict(r) for records in self._index.values() for r in records], f)
+            os.replace(tmp, self.path)
+            self._dirty = False
+        except OSError as e:
+            logger.error("Écriture des empreintes impossible : %s", e)
+
+    def __len__(self) -> int:
+        return sum(len(records) for records in self._index.values())
+
+    # ------------------------------------------------------------------ #
+    #  Helpers internes                                                    #
+    # ------------------------------------------------------------------ #
+
+    @staticmethod
+    def _key(sig: dict) -> tuple:
+        return (
+            sig.get("pair", ""),
+            sig.get("timeframe", ""),
+            sig.get("pattern", ""),
+            sig.get("direction", ""),
+        )
+
+    def _same_entry(self, a: float, b: float) -> bool:
+        return abs(a - b) <= self.entry_tolerance * max(abs(a), abs(b))
+
+    def _load(self) -> None:
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                rows = json.load(f)
+        except FileNotFoundError:
+            return
+        except (OSError, ValueError) as e:
+            logger.warning("Empreintes illisibles (%s) : %s — index vide", self.path, e)
+            return
+
+        for row in rows:
+            try:
+                record = FingerprintRecord(**row)
+            except TypeError:
+                continue
+            key = (record.pair, record.timeframe, record.pattern, record.direction)
+            self._index.setdefault(key, []).append(record)
+        logger.debug("Empreintes chargées : %d", len(self))
@@ -0,0 +1,352 @@
+"""
+param_sweep.py
+──────────────
+Balayage parallèle des seuils du pipeline sur l'historique local.
+
+Chaque configuration (une combinaison de la grille) est rejouée par le
+ReplayEngine sur toutes les séries demandées, puis résumée par les
+métriques de son backtest. Les résultats forment une seule table, classée.
+
+Données partagées : le processus principal lit une fois chaque série du
+BarStore (timeframes HTF compris) et calcule les indicateurs des timeframes
+rejoués, puis dépose le tout dans des blocs multiprocessing.shared_memory.
+Les workers du pool s'y attachent à leur démarrage : aucune copie, aucun
+rechargement, aucun recalcul d'indicateurs par configuration.
+
+Paramètres balayables :
+  min_adx             GateChecker.min_adx (porte 3)
+  qqe_max_bars        GateChecker.qqe_max_bars (porte 4, âge du croisement QQE)
+  sr_tolerance        SRDetector.CLUSTER_TOLERANCE
+  harmonic_tolerance  HarmonicDetector(tolerance)
+  compression_range   CompressionDetector.SEUIL_RANGE
+"""
+
+import itertools
+import logging
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass
+from multiprocessing import shared_memory
+
+import numpy as np
+import pandas as pd
+
+from bot.data.bar_store import COLUMNS, BarStore
+from bot.detection.harmonic_detector import HarmonicDetector
+from bot.detection.indicator_engine import QQE_CROSS_LOOKBACK, IndicatorEngine
+from bot.output.replay_engine import SIGNAL_INDICATORS, ReplayEngine
+from bot.validation.gate_checker import GateChecker
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PATH = "outputs/param_sweep.csv"
+
+PARAMETERS = ("min_adx", "qqe_max_bars", "sr_tolerance", "harmonic_tolerance", "compression_range")
+
+# Indicateurs partagés (float64 en mémoire) et leur type d'origine
+FEATURE_TYPES = {key: float for key in SIGNAL_INDICATORS} | {
+    "adx_rising"         : bool,
+    "qqe_cross_bars_ago" : np.int64,
+}
+
+# Métriques du classement : la première décide, les suivantes départagent
+RANK_BY = ("total_pnl_pct", "winrate_pct", "total_trades")
+
+# Métriques du BacktestReport reprises dans la table
+METRICS = (
+    "total_trades", "wins", "losses", "winrate_pct", "avg_rr",
+    "total_pnl_pct", "best_trade_pct", "worst_trade_pct",
+)
+
+
+class MemoryBarStore(BarStore):
+    """
+    BarStore en lecture seule servi depuis des tableaux déjà en mémoire
+    (mémoire partagée dans les workers), indicateurs précalculés compris.
+
+    Les séries absentes (bougies fines du backtest) sont lues dans le
+    BarStore disque de `root`, en mémoire projetée, si root est fourni.
+    """
+
+    def __init__(self, arrays: dict, root: str = None):
+        super().__init__(root=root)
+        self._arrays = arrays            # {(paire, tf): (horodatages, OHLCV, indicateurs | None)}
+
+    def has(self, pair: str, tf: str) -> bool:
+        return (pair, tf) in self._arrays or (self.root is not None and super().has(pair, tf))
+
+    def series(self, pair: str, tf: str):
+        arrays = self._arrays.get((pair, tf))
+        if arrays is None:
+            return super().series(pair, tf) if self.root is not None else None
+        return arrays[:2]
+
+    def features(self, pair: str, tf: str) -> np.ndarray | None:
+        """Indicateurs float64 [n, len(FEATURE_TYPES)] de la série, ou None."""
+        arrays = self._arrays.get((pair, tf))
+        return None if arrays is None else arrays[2]
+
+    def write(self, pair: str, tf: str, df: pd.DataFrame) -> int:
+        raise NotImplementedError("MemoryBarStore est en lecture seule")
+
+
+class _SweepEngine(ReplayEngine):
+    """ReplayEngine dont les indicateurs sont lus dans le MemoryBarStore."""
+
+    def _indicators(self, pair, tf, df, first_row):
+        features = self.store.features(pair, tf)
+        if features is None:
+            return super()._indicators(pair, tf, df, first_row)
+        rows = features[first_row:first_row + len(df)]
+        return pd.DataFrame({
+            key: rows[:, j].astype(kind) for j, (key, kind) in enumerate(FEATURE_TYPES.items())
+        })
+
+
+@dataclass
+class _Block:
+    """Bloc de mémoire partagée d'une série : horodatages, OHLCV, indicateurs."""
+    name     : str
+    rows     : int
+    features : bool
+
+    @property
+    def size(self) -> int:
+        width = 1 + len(COLUMNS) + (len(FEATURE_TYPES) if self.features else 0)
+        return max(self.rows * width * 8, 1)
+
+    def views(self, buf) -> tuple:
+        """(horodatages, OHLCV, indicateurs | None) posés sur le tampon partagé."""
+        n = self.rows
+        times = np.ndarray((n,), dtype=np.int64, buffer=buf)
+        ohlcv = np.ndarray((n, len(COLUMNS)), dtype=np.float64, buffer=buf, offset=8 * n)
+        features = None
+        if self.features:
+            offset   = 8 * n * (1 + len(COLUMNS))
+            features = np.ndarray((n, len(FEATURE_TYPES)), dtype=np.float64, buffer=buf, offset=offset)
+        return times, ohlcv, features
+
+
+# ── État d'un worker : blocs attachés et réglages du rejeu ──
+_worker: dict = {}
+
+
+def _attach(blocks: dict, settings: dict):
+    """Initialisation d'un worker : attache les blocs partagés (sans copie)."""
+    segments, arrays = [], {}
+    for key, block in blocks.items():
+        shm = shared_memory.SharedMemory(name=block.name)
+        segments.append(shm)
+        arrays[key] = block.views(shm.buf)
+    _worker.update(settings, segments=segments, store=MemoryBarStore(arrays, root=settings["root"]))
+
+
+def _engine(store, htf_map: dict, params: dict, block_htf: bool) -> ReplayEngine:
+    """ReplayEngine réglé pour une combinaison de paramètres."""
+    gate = GateChecker(
+        min_adx      = params.get("min_adx", 20),
+        qqe_max_bars = params.get("qqe_max_bars", 6),
+    )
+    engine = _SweepEngine(store, htf_map, block_htf=block_htf, gate=gate)
+    if "sr_tolerance" in params:
+        engine.sr_det.CLUSTER_TOLERANCE = params["sr_tolerance"]
+    if "harmonic_tolerance" in params:
+        engine.harm_det = HarmonicDetector(tolerance=params["harmonic_tolerance"])
+    if "compression_range" in params:
+        engine.comp_det.SEUIL_RANGE = params["compression_range"]
+    return engine
+
+
+def _run(params: dict) -> dict:
+    """Rejoue une configuration et renvoie sa ligne de résultats."""
+    t0 = time.perf_counter()
+    engine = _engine(_worker["store"], _worker["htf_map"], params, _worker["block_htf"])
+    report = engine.run(_worker["pairs"], _worker["tfs"], start=_worker["start"], end=_worker["end"])
+    row = dict(params, signals=len(report.signals))
+    row.update({metric: getattr(report.backtest, metric) for metric in METRICS})
+    row["elapsed_s"] = round(time.perf_counter() - t0, 2)
+    return row
+
+
+class ParamSweep:
+    """
+    Rejoue le pipeline pour chaque combinaison d'une grille de paramètres,
+    réparties sur un pool de processus.
+
+    Usage :
+        sweep = ParamSweep(BarStore(), HTF_MAP, ["EUR/USD"], ["1h", "4h"], start="2023-01-01")
+        table = sweep.run({"min_adx": [15, 20, 25], "sr_tolerance": [0.002, 0.003]})
+        print(table.head(10))
+    """
+
+    def __init__(self,
+                 store,
+                 htf_map   : dict,
+                 pairs     : list,
+                 tfs       : list,
+                 start     = None,
+                 end       = None,
+                 block_htf : bool = False,
+                 base      : dict = None,
+                 workers   : int = None):
+        """
+        base    : paramètres fixes, complétés par chaque combinaison de la grille
+        workers : taille du pool (défaut : nombre de CPU ; 1 = dans ce processus)
+        """
+        self.store     = store
+        self.htf_map   = htf_map
+        self.pairs     = pairs
+        self.tfs       = tfs
+        self.start     = start
+        self.end       = end
+        self.block_htf = block_htf
+        self.base      = dict(base or {})
+        self.workers   = workers or os.cpu_count() or 1
+
+    def configurations(self, grid: dict) -> list[dict]:
+        """Produit cartésien de la grille, chaque combinaison complétant `base`."""
+        unknown = set(grid) | set(self.base)
+        unknown -= set(PARAMETERS)
+        if unknown:
+            raise ValueError(f"Paramètre(s) inconnu(s) : {', '.join(sorted(unknown))}")
+        # Les indicateurs partagés ne connaissent que les croisements récents
+        lookback = [self.base.get("qqe_max_bars", 6), *grid.get("qqe_max_bars", ())]
+        if max(lookback) > QQE_CROSS_LOOKBACK - 1:
+            raise ValueError(f"qqe_max_bars limité à {QQE_CROSS_LOOKBACK - 1} (QQE_CROSS_LOOKBACK)")
+
+        keys = list(grid)
+        return [dict(self.base, **dict(zip(keys, combo)))
+                for combo in itertools.product(*(grid[k] for k in keys))]
+
+    def run(self, grid: dict, path: str = DEFAULT_PATH) -> pd.DataFrame:
+        """
+        Balaye la grille et classe les configurations.
+
+        Returns:
+            DataFrame : rang, paramètres, nombre de signaux et métriques du
+            backtest, une ligne par configuration (meilleure en tête).
+            Écrit aussi en CSV dans `path` (None = pas d'écriture).
+        """
+        configs = self.configurations(grid)
+        t0 = time.perf_counter()
+        arrays = self._load()
+        if not arrays:
+            logger.warning("Balayage : aucune série dans le BarStore")
+            return pd.DataFrame()
+        settings = {
+            "htf_map"   : self.htf_map,
+            "pairs"     : self.pairs,
+            "tfs"       : self.tfs,
+            "start"     : self.start,
+            "end"       : self.end,
+            "block_htf" : self.block_htf,
+            "root"      : getattr(self.store, "root", None),
+        }
+        logger.info("Balayage : %d configuration(s), %d série(s), %d worker(s)",
+                    len(configs), len(arrays), min(self.workers, len(configs)))
+
+        rows = []
+        if self.workers <= 1 or len(configs) <= 1:
+            _worker.update(settings, store=MemoryBarStore(arrays, root=settings["root"]))
+            try:
+                for i, params in enumerate(configs, 1):
+                    rows.append(self._done(_run(params), i, len(configs)))
+            finally:
+                _worker.clear()
+        else:
+            segments, blocks = self._share(arrays)
+            del arrays
+            try:
+                with ProcessPoolExecutor(max_workers=min(self.workers, len(configs)),
+                                         initializer=_attach,
+                                         initargs=(blocks, settings)) as pool:
+                    futures = {pool.submit(_run, params): params for params in configs}
+                    for i, future in enumerate(as_completed(futures), 1):
+                        try:
+                            rows.append(self._done(future.result(), i, len(configs)))
+                        except Exception as e:
+                            logger.error(f"Configuration {futures[future]} : {e}", exc_info=True)
+            finally:
+                for shm in segments:
+                    shm.close()
+                    shm.unlink()
+
+        table = self._rank(rows)
+        logger.info("Balayage terminé en %.1f s", time.perf_counter() - t0)
+        if path and len(table):
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+            table.to_csv(path, index=False)
+        return table
+
+    # ──────────────────────────────────────────────────────────────
+    # DONNÉES PARTAGÉES
+    # ──────────────────────────────────────────────────────────────
+
+    def _load(self) -> dict:
+        """
+        Séries nécessaires au rejeu (timeframes rejoués + HTF), indicateurs
+        calculés une fois sur tout l'historique des timeframes rejoués.
+
+        Returns:
+            {(paire, tf): (horodatages, OHLCV, indicateurs | None)}
+        """
+        ind_eng = IndicatorEngine()
+        universe = list(dict.fromkeys(
+            t for tf in self.tfs for t in (tf, *self.htf_map.get(tf, ("4h", None))) if t
+        ))
+        arrays = {}
+        for pair in self.pairs:
+            for tf in universe:
+                series = self.store.series(pair, tf)
+                if series is None or not len(series[0]):
+                    continue
+                times, ohlcv = (np.asarray(a) for a in series)
+                features = None
+                if tf in self.tfs:
+                    ind = ind_eng.compute_history(self.store.load(pair, tf))
+                    features = np.column_stack([ind[key].to_numpy(dtype=float) for key in FEATURE_TYPES])
+                arrays[(pair, tf)] = (times, ohlcv, features)
+        return arrays
+
+    @staticmethod
+    def _share(arrays: dict) -> tuple[list, dict]:
+        """Copie les séries dans des blocs shared_memory (une seule fois)."""
+        segments, blocks = [], {}
+        try:
+            for key, (times, ohlcv, features) in arrays.items():
+                block = _Block(name="", rows=len(times), features=features is not None)
+                shm = shared_memory.SharedMemory(create=True, size=block.size)
+                segments.append(shm)
+                block.name = shm.name
+                s_times, s_ohlcv, s_features = block.views(shm.buf)
+                s_times[:], s_ohlcv[:] = times, ohlcv
+                if features is not None:
+                    s_features[:] = features
+                del s_times, s_ohlcv, s_features
+                blocks[key] = block
+        except Exception:
+            for shm in segments:
+                shm.close()
+                shm.unlink()
+            raise
+        return segments, blocks
+
+    # ──────────────────────────────────────────────────────────────
+    # RÉSULTATS
+    # ──────────────────────────────────────────────────────────────
+
+    @staticmethod
+    def _done(row: dict, i: int, total: int) -> dict:
+        logger.info("Configuration %d/%d : %s → %d trade(s), win %.1f%%, PnL %+.2f%%",
+                    i, total, {k: row[k] for k in PARAMETERS if k in row},
+                    row["total_trades"], row["winrate_pct"], row["total_pnl_pct"])
+        return row
+
+    @staticmethod
+    def _rank(rows: list) -> pd.DataFrame:
+        if not rows:
+            return pd.DataFrame()
+        table = pd.DataFrame(rows).sort_values(list(RANK_BY), ascending=False, ignore_index=True)
+        table.insert(0, "rank", np.arange(1, len(table) + 1))
+        return table
@@ -0,0 +1,498 @@
+"""
+replay_engine.py
+────────────────
+Rejeu walk-forward du pipeline de run_scan sur l'historique local (BarStore).
+
+Chaque (paire, timeframe) est parcouru comme si le scan tournait à la
+clôture de chaque bougie, sans jamais lire une bougie future :
+
+  1. Indicateurs (ADX / DI, QQE) : une passe causale sur tout l'historique
+     (IndicatorEngine.compute_history).
+  2. Tendance HTF : EMA 50 / 200 des bougies HTF clôturées, prolongées au
+     prix courant (même règle que TrendService).
+  3. Portes de bougie 3, 4 et 5 évaluées en bloc pour toutes les bougies
+     (signal sonde par direction, comme PipelinePlanner) : zones S/R et
+     détecteurs ne tournent que là où une direction est ouverte.
+  4. Zones S/R sur la fenêtre de 300 bougies du scan ; figures en mode
+     historique, chandeliers (masques vectorisés), harmoniques + suivi des
+     PRZ, compressions.
+  5. Portes 1 à 5 (check_batch), entrées (calculate_batch), puis
+     déduplication par empreinte (FingerprintStore en mémoire, horloge =
+     clôture de la bougie) : seul le premier signal d'un setup est émis.
+  6. Les signaux émis sont simulés par le Backtester sur la même série
+     (bougies ambiguës SL / TP départagées par les bougies 1m / 5m du store).
+
+Écart assumé avec le scan en direct : les indicateurs sont chauffés sur
+tout l'historique chargé, et non sur les 300 dernières bougies.
+"""
+
+import logging
+import time
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field
+
+import numpy as np
+import pandas as pd
+
+from bot.detection.candle_detector import CandleDetector
+from bot.detection.compression_detector import CompressionDetector
+from bot.detection.harmonic_detector import HarmonicDetector
+from bot.detection.harmonic_prz import HarmonicPRZTracker
+from bot.detection.indicator_engine import EMA_FAST, EMA_SLOW, IndicatorEngine
+from bot.detection.multi_timeframe import AlignmentMatrix, MultiTimeframeAnalyzer
+from bot.detection.pattern_detector import PatternDetector
+from bot.detection.sr_detector import SRDetector
+from bot.entries.entry_calculator import EntryCalculator
+from bot.output.backtester import Backtester, BacktestReport
+from bot.output.fingerprint_store import TF_SECONDS, FingerprintStore
+from bot.validation.gate_checker import GateChecker
+
+logger = logging.getLogger(__name__)
+
+# Bougies par graphique, comme feed.get_ohlcv(limit=300) dans run_scan
+WINDOW = 300
+
+# Valeurs d'indicateurs recopiées dans chaque signal (cf. run_scan)
+SIGNAL_INDICATORS = (
+    "adx", "adx_rising", "di_plus", "di_minus",
+    "qqe_fast", "qqe_slow", "qqe_fast_prev", "qqe_slow_prev", "qqe_cross_bars_ago",
+)
+
+
+@dataclass
+class SeriesStats:
+    """Compteurs du rejeu d'un (paire, timeframe)."""
+    pair       : str
+    timeframe  : str
+    bars       : int = 0          # bougies rejouées
+    open_bars  : int = 0          # bougies où une direction franchit les portes 3 à 5
+    candidates : int = 0          # signaux des détecteurs
+    allowed    : int = 0          # signaux acceptés par les portes 1 à 5
+    emitted    : int = 0          # premières détections d'un setup (simulées)
+    repeats    : int = 0          # redétections d'un setup déjà émis
+    elapsed_s  : float = 0.0
+
+
+@dataclass
+class ReplayReport:
+    """Signaux émis pendant le rejeu et backtest de ces signaux."""
+    signals   : list                 # dicts du scan + "bar", "result", "pnl_pct", "bars_held"
+    backtest  : BacktestReport
+    series    : list = field(default_factory=list)
+    elapsed_s : float = 0.0
+
+    def by_pattern(self) -> dict:
+        """{figure: {signals, wins, losses, winrate_pct, pnl_pct}}"""
+        table: dict = {}
+        for sig in self.signals:
+            row = table.setdefault(sig.get("pattern", "UNKNOWN"),
+                                   {"signals": 0, "wins": 0, "losses": 0, "pnl_pct": 0.0})
+            row["signals"] += 1
+            result = sig.get("result", "")
+            row["wins"]    += result.startswith("WIN")
+            row["losses"]  += result == "LOSS"
+            row["pnl_pct"] += sig.get("pnl_pct", 0.0)
+        for row in table.values():
+            row["winrate_pct"] = round(row["wins"] / max(row["signals"], 1) * 100, 1)
+            row["pnl_pct"]     = round(row["pnl_pct"], 3)
+        return dict(sorted(table.items(), key=lambda item: -item[1]["signals"]))
+
+    def summary(self) -> dict:
+        """Résumé sérialisable (sans la liste des trades)."""
+        backtest = {k: v for k, v in asdict(self.backtest).items() if k != "trades"}
+        return {
+            "elapsed_s": round(self.elapsed_s, 2),
+            "bars"     : sum(s.bars for s in self.series),
+            "signals"  : len(self.signals),
+            "backtest" : backtest,
+            "patterns" : self.by_pattern(),
+            "series"   : [asdict(s) for s in self.series],
+        }
+
+    def print(self):
+        bars = sum(s.bars for s in self.series)
+        print("\n" + "═"*55)
+        print("  🔁 REJEU HISTORIQUE DU PIPELINE")
+        print("═"*55)
+        print(f"  Séries         : {len(self.series)}")
+        print(f"  Bougies        : {bars}  ({self.elapsed_s:.1f} s)")
+        print(f"  Signaux émis   : {len(self.signals)}")
+        for pattern, row in list(self.by_pattern().items())[:10]:
+            print(f"    {pattern:26s} {row['signals']:5d}  win {row['winrate_pct']:5.1f}%  "
+                  f"PnL {row['pnl_pct']:+.2f}%")
+        self.backtest.print()
+
+
+@dataclass
+class _HTFContext:
+    """Timeframe supérieur vu depuis chaque bougie de la série rejouée."""
+    tf      : str
+    frame   : pd.DataFrame
+    trend   : np.ndarray         # tendance à chaque bougie de la série
+    current : np.ndarray         # indice de la bougie HTF en cours (-1 = aucune)
+
+
+@contextmanager
+def _quiet(names=("bot.detection", "bot.validation", "bot.entries")):
+    """Détecteurs en WARNING le temps du rejeu (un log INFO par appel sinon)."""
+    loggers = [logging.getLogger(name) for name in names]
+    levels  = [lg.level for lg in loggers]
+    for lg in loggers:
+        lg.setLevel(logging.WARNING)
+    try:
+        yield
+    finally:
+        for lg, level in zip(loggers, levels):
+            lg.setLevel(level)
+
+
+class ReplayEngine:
+    """
+    Rejoue le pipeline du scanner sur l'historique du BarStore.
+
+    Usage :
+        engine = ReplayEngine(BarStore(), HTF_MAP)
+        report = engine.run(["EUR/USD"], ["1h", "4h"], start="2023-01-01")
+        report.print()
+    """
+
+    def __init__(self,
+                 store,
+                 htf_map    : dict,
+                 block_htf  : bool = False,
+                 window     : int = WINDOW,
+                 gate       : GateChecker = None,
+                 backtester : Backtester = None):
+        self.store      = store
+        self.htf_map    = htf_map
+        self.window     = window
+        self.backtester = backtester or Backtester(store=store)
+
+        self.sr_det   = SRDetector()
+        self.pat_det  = PatternDetector()
+        self.cdl_det  = CandleDetector()
+        self.harm_det = HarmonicDetector()
+        self.comp_det = CompressionDetector()
+        self.ind_eng  = IndicatorEngine()
+        self.mtf      = MultiTimeframeAnalyzer(block_counter_trend=block_htf)
+        self.gate     = gate or GateChecker()
+        self.calc     = EntryCalculator()
+
+        # États conservés d'une bougie à l'autre pendant un rejeu
+        self._prz          = HarmonicPRZTracker(self.harm_det)
+        self._fingerprints = FingerprintStore(path=None)
+        self._levels: dict[tuple, list] = {}       # niveaux S/R par (paire, htf, bougie HTF)
+
+    # ──────────────────────────────────────────────────────────────
+    # REJEU
+    # ──────────────────────────────────────────────────────────────
+
+    def run(self, pairs: list, tfs: list, start=None, end=None) -> ReplayReport:
+        """
+        Rejoue chaque (paire, timeframe) sur [start, end[ et backteste les
+        signaux émis.
+
+        Returns:
+            ReplayReport (signaux, rapport de backtest, compteurs par série)
+        """
+        t0 = time.perf_counter()
+        self._prz          = HarmonicPRZTracker(self.harm_det)
+        self._fingerprints = FingerprintStore(path=None)
+        self._levels       = {}
+
+        signals, trades, series = [], [], []
+        with _quiet():
+            for pair in pairs:
+                for tf in tfs:
+                    try:
+                        emitted, simulated, stats = self.replay_series(pair, tf, start, end)
+                    except Exception as e:
+                        logger.error(f"Rejeu {pair} {tf} : {e}", exc_info=True)
+                        continue
+                    signals += emitted
+                    trades  += simulated
+                    series.append(stats)
+                    logger.info(
+                        "Rejeu %s %s : %d bougies, %d signal(s) émis, %d répété(s) (%.1f s)",
+                        pair, tf, stats.bars, stats.emitted, stats.repeats, stats.elapsed_s,
+                    )
+
+        return ReplayReport(
+            signals   = signals,
+            backtest  = self.backtester.report(trades),
+            series    = series,
+            elapsed_s = time.perf_counter() - t0,
+        )
+
+    def replay_series(self, pair: str, tf: str, start=None, end=None) -> tuple[list, list, SeriesStats]:
+        """
+        Rejoue un (paire, timeframe).
+
+        Returns:
+            (signaux émis, trades simulés, SeriesStats)
+        """
+        t0 = time.perf_counter()
+        stats = SeriesStats(pair, tf)
+
+        # Fenêtre de chauffe avant `start`, max_bars après `end` pour la simulation
+        lo, hi = self.store.locate(pair, tf, start, end)
+        first_row = max(lo - self.window, 0)
+        total = self.store.span(pair, tf)
+        last_row = min(hi + self.backtester.max_bars, total[2] if total else hi)
+        df = self.store.rows(pair, tf, first_row, last_row)
+
+        first = max(lo - first_row, self.window - 1)
+        stop  = hi - first_row
+        if df is None or stop <= first:
+            logger.warning(f"Rejeu {pair} {tf} : historique insuffisant")
+            return [], [], stats
+        stats.bars = stop - first
+
+        times = df["timestamp"].to_numpy(dtype="datetime64[ns]")
+        close = df["close"].to_numpy(dtype=float)
+        ind   = self._indicators(pair, tf, df, first_row)
+
+        htf1_tf, htf2_tf = self.htf_map.get(tf, ("4h", None))
+        htf1 = self._htf_context(pair, htf1_tf, times, close)
+        htf2 = self._htf_context(pair, htf2_tf, times, close)
+        neutral = np.full(len(df), "NEUTRE", dtype=object)
+        htf1_trend = htf1.trend if htf1 else neutral
+        htf2_trend = htf2.trend if htf2 else neutral
+
+        # Portes de bougie (3, 4, 5) pour chaque direction, toutes bougies
+        opened = self._open_directions(tf, ind, htf1_trend)
+        replayed = np.zeros(len(df), dtype=bool)
+        replayed[first:stop] = True
+        directional = np.flatnonzero((opened["LONG"] | opened["SHORT"]) & replayed)
+        compressive = np.flatnonzero(opened["NEUTRE"] & replayed)
+        stats.open_bars = len(np.union1d(directional, compressive))
+
+        zones_memo: dict[int, list] = {}
+
+        def zones_at(t: int) -> list:
+            if t not in zones_memo:
+                zones_memo[t] = self.sr_det.detect(df.iloc[t - self.window + 1:t + 1])
+            return zones_memo[t]
+
+        found = self._detect(pair, tf, df, directional, compressive, zones_at)
+        stats.candidates = len(found)
+        if not found:
+            stats.elapsed_s = time.perf_counter() - t0
+            return [], [], stats
+
+        # ── Annotation des signaux (mêmes clés que run_scan) ──
+        bars  = np.array([t for t, _, _ in found])
+        stamp = pd.DatetimeIndex(times[bars]).strftime("%Y-%m-%d %H:%M:%S")
+        values = {key: ind[key].to_numpy() for key in SIGNAL_INDICATORS}
+        signals = []
+        for j, (t, _, sig) in enumerate(found):
+            zones     = zones_at(t)
+            direction = sig.get("direction", "LONG")
+            sig.update({key: values[key][t].item() for key in SIGNAL_INDICATORS})
+            sig.update({
+                "pair"       : pair,
+                "timeframe"  : tf,
+                "sr_zone"    : bool(zones),
+                "sr_strength": max((z.get("strength", 0) for z in zones), default=0),
+                "timestamp"  : stamp[j],
+                "bar"        : int(t),
+                "htf1_tf"    : htf1_tf,
+                "htf1_trend" : htf1_trend[t],
+                "htf2_tf"    : htf2_tf,
+                "htf2_trend" : htf2_trend[t],
+                "htf_aligned": self._aligned(direction, htf1_trend[t]),
+                "htf_blocked": self._counter(direction, htf1_trend[t]),
+            })
+            signals.append(sig)
+
+        # ── Portes 1 à 5, puis entrées des signaux acceptés ──
+        gates   = self.gate.check_batch(pd.DataFrame(signals))
+        allowed = np.flatnonzero(gates.allowed)
+        reasons = gates.reasons(allowed)
+        stats.allowed = len(allowed)
+
+        emitted = []
+        if len(allowed):
+            entries = self.calc.calculate_batch([signals[i] for i in allowed])
+            bar_s   = TF_SECONDS.get(tf, 3_600)
+            for k, i in enumerate(allowed):
+                if not entries.valid[k]:
+                    continue
+                sig = signals[i]
+                t   = sig["bar"]
+                sig["confluence"] = reasons[int(i)]
+                sig.update({
+                    "entry"   : float(entries.entry[k]),
+                    "sl"      : float(entries.stop_loss[k]),
+                    "tp1"     : float(entries.tp1[k]),
+                    "tp2"     : float(entries.tp2[k]),
+                    "rr_ratio": float(entries.rr_ratio[k]),
+                })
+                sig["qqe_status"] = "croisement" if sig.get("qqe_fast", 0) > sig.get("qqe_slow", 0) else ""
+
+                # Horloge du rejeu : clôture de la bougie
+                now = times[t].astype("datetime64[s]").astype(np.int64) + bar_s
+                record, is_new = self._fingerprints.observe(sig, now=float(now))
+                if not is_new:
+                    stats.repeats += 1
+                    continue
+
+                htf_result = self._sniper(pair, tf, sig["direction"], t, close[t], htf1, htf2)
+                sig["htf_label"] = htf_result.label
+                emitted.append(sig)
+        stats.emitted = len(emitted)
+
+        # ── Backtest des signaux émis sur la même série ──
+        trades = []
+        for sig, trade in zip(emitted, self.backtester.simulate(emitted, df)):
+            if trade is None:
+                continue
+            sig.update({"result": trade.result, "pnl_pct": trade.pnl_pct, "bars_held": trade.bars_held})
+            trades.append(trade)
+
+        stats.elapsed_s = time.perf_counter() - t0
+        return emitted, trades, stats
+
+    def _indicators(self, pair: str, tf: str, df: pd.DataFrame, first_row: int) -> pd.DataFrame:
+        """
+        Indicateurs de chaque bougie de `df` (lignes first_row… de la série).
+        Point d'extension : le balayage de paramètres les sert précalculés.
+        """
+        return self.ind_eng.compute_history(df)
+
+    # ──────────────────────────────────────────────────────────────
+    # DÉTECTEURS
+    # ──────────────────────────────────────────────────────────────
+
+    def _detect(self, pair, tf, df, directional, compressive, zones_at) -> list[tuple]:
+        """
+        Signaux des détecteurs aux bougies ouvertes, dans l'ordre de run_scan.
+
+        Returns:
+            [(bougie, rang du détecteur, signal)] triés par bougie
+        """
+        found: list[tuple] = []
+
+        # Figures chartistes : mode historique, zones S/R de chaque bougie
+        for sig in self.pat_det.detect_history(df, ends=directional, zones_at=zones_at):
+            found.append((sig.pop("bar"), 0, sig))
+
+        # Chandeliers : mode historique, zone S/R cherchée seulement sur les
+        # bougies portant une figure
+        for sig in self.cdl_det.detect_history(df, ends=directional, zones_at=zones_at):
+            found.append((sig.pop("bar"), 1, sig))
+
+        # Harmoniques + PRZ : le suivi rattrape les bougies sautées (portes
+        # fermées) sans en garder les alertes, comme run_scan
+        key, previous = (pair, tf), None
+        for t in directional:
+            window = df.iloc[t - self.window + 1:t + 1]
+            if previous != t - 1:
+                self._prz.update(key, df.iloc[max(t - self.window, 0):t])
+            prz_alerts = self._prz.update(key, window)
+            previous = t
+            for sig in self.harm_det.detect(window, zones_at(t)) + prz_alerts:
+                found.append((int(t), 2, sig))
+
+        # Compressions : detect() rejoué aux bougies ouvertes, ATR partagé
+        for compression in self.comp_det.detect_at(df, compressive):
+            found.append((compression.pop("bar"), 3, compression))
+
+        found.sort(key=lambda item: (item[0], item[1]))
+        return found
+
+    # ──────────────────────────────────────────────────────────────
+    # PORTES ET CONTEXTE HTF
+    # ──────────────────────────────────────────────────────────────
+
+    def _open_directions(self, tf: str, ind: pd.DataFrame, htf1_trend: np.ndarray) -> dict:
+        """
+        Directions ouvertes à chaque bougie : signal sonde de
+        PipelinePlanner.open_directions, évalué par check_batch.
+
+        Returns:
+            {"LONG": bool[n], "SHORT": bool[n], "NEUTRE": bool[n]}
+        """
+        opened = {}
+        for direction in ("LONG", "SHORT", "NEUTRE"):
+            probe = pd.DataFrame({
+                "sr_zone"            : True,
+                "pattern"            : "PLAN",
+                "pattern_clarity"    : 3,
+                "timeframe"          : tf,
+                "direction"          : direction,
+                "adx"                : ind["adx"].to_numpy(),
+                "di_plus"            : ind["di_plus"].to_numpy(),
+                "di_minus"           : ind["di_minus"].to_numpy(),
+                "qqe_fast"           : ind["qqe_fast"].to_numpy(),
+                "qqe_slow"           : ind["qqe_slow"].to_numpy(),
+                "qqe_cross_bars_ago" : ind["qqe_cross_bars_ago"].to_numpy(),
+                "htf_blocked"        : [self._counter(direction, trend) for trend in htf1_trend],
+            })
+            opened[direction] = self.gate.check_batch(probe).allowed
+        return opened
+
+    def _htf_context(self, pair: str, htf_tf: str, times: np.ndarray, close: np.ndarray):
+        """
+        Tendance du timeframe supérieur vue à chaque bougie : EMA des
+        bougies HTF clôturées, prolongées au prix courant (TrendService).
+
+        Returns:
+            _HTFContext, ou None si le timeframe est absent du BarStore
+        """
+        if not htf_tf:
+            return None
+        frame = self.store.load(pair, htf_tf)
+        if frame is None:
+            return None
+
+        closes  = frame["close"].astype(float)
+        ema_f   = closes.ewm(span=EMA_FAST, adjust=False).mean().to_numpy()
+        ema_s   = closes.ewm(span=EMA_SLOW, adjust=False).mean().to_numpy()
+        current = np.searchsorted(frame["timestamp"].to_numpy(dtype="datetime64[ns]"), times, side="right") - 1
+
+        # EMA des bougies clôturées (< bougie en cours) prolongées au prix
+        prev  = np.maximum(current - 1, 0)
+        fast  = ema_f[prev] + (2.0 / (EMA_FAST + 1)) * (close - ema_f[prev])
+        slow  = ema_s[prev] + (2.0 / (EMA_SLOW + 1)) * (close - ema_s[prev])
+        trend = np.select(
+            [(close > fast) & (fast > slow), (close < fast) & (fast < slow), close > slow, close < slow],
+            ["BULLISH", "BEARISH", "BULLISH", "BEARISH"],
+            "NEUTRE",
+        ).astype(object)
+        # Aucune bougie HTF clôturée : l'EMA vaut le prix
+        trend[current < 1] = "NEUTRE"
+        return _HTFContext(tf=htf_tf, frame=frame, trend=trend, current=current)
+
+    def _sniper(self, pair: str, tf: str, direction: str, t: int, price: float, htf1, htf2):
+        """analyze_sniper du signal (label HTF), niveaux S/R des bougies HTF clôturées."""
+        htf1_tf, htf2_tf = self.htf_map.get(tf, ("4h", None))
+        levels = []
+        if htf1 is not None and htf1.current[t] > 0:
+            k = int(htf1.current[t])
+            if (pair, htf1_tf, k) not in self._levels:
+                bars = htf1.frame.iloc[max(k - AlignmentMatrix.SR_BARS, 0):k]
+                self._levels[(pair, htf1_tf, k)] = [z.get("price", 0) for z in self.sr_det.detect(bars)]
+            levels = self._levels[(pair, htf1_tf, k)]
+        return self.mtf.analyze_sniper(
+            signal_tf  = tf,
+            signal_dir = direction,
+            htf1_data  = {
+                "trend"     : htf1.trend[t] if htf1 else "NEUTRE",
+                "tf"        : htf1_tf,
+                "sr_levels" : levels,
+                "price"     : price,
+            },
+            htf2_data  = {
+                "trend" : htf2.trend[t] if htf2 else "NEUTRE",
+                "tf"    : htf2_tf,
+            } if htf2_tf else None,
+        )
+
+    @staticmethod
+    def _aligned(direction: str, trend: str) -> bool:
+        return (direction == "LONG" and trend == "BULLISH") or (direction == "SHORT" and trend == "BEARISH")
+
+    @staticmethod
+    def _counter(direction: str, trend: str) -> bool:
+        return (direction == "LONG" and trend == "BEARISH") or (direction == "SHORT" and trend == "BULLISH")
@@ -1,15 +1,19 @@
 """
 report_generator.py
 Génère des rapports de performance quotidiens et hebdomadaires
-à partir du journal de signaux JSON.
+à partir du journal des signaux (SignalJournal).
+
+Les totaux viennent des compteurs journaliers du journal (O(jours)) ;
+seuls les derniers signaux de la période sont relus pour le détail.
 """
 
-import json
 import logging
 from collections import Counter
 from datetime import datetime, timedelta, timezone
 from pathlib import Path
 
+from bot.output.signal_journal import DEFAULT_PATH, SignalJournal, empty_bucket
+
 # Journalisation du module
 logger = logging.getLogger(__name__)
 
@@ -17,33 +21,34 @@ logger = logging.getLogger(__name__)
 _LINE_DOUBLE = "=" * 60
 _LINE_SINGLE = "-" * 60
 
+# Nombre maximal de signaux listés dans la section détail
+DETAIL_LIMIT = 50
+
 
 class ReportGenerator:
     """
-    Génère des rapports de performance lisibles à partir d'un fichier
-    journal JSON contenant les signaux émis par le bot de trading.
+    Génère des rapports de performance lisibles à partir du journal
+    des signaux émis par le bot de trading (une ligne JSON par signal).
 
-    Format attendu du fichier JSON :
-    [
+    Champs utilisés de chaque signal :
         {
             "timestamp": "2025-01-15T09:30:00",
             "pair":      "EURUSD",
             "direction": "LONG",
             "pattern":   "Double Bottom W",
             "result":    "TP1"          (optionnel)
-        },
-        ...
-    ]
+        }
     """
 
-    def __init__(self, log_file: str = "outputs/signals_log.json") -> None:
+    def __init__(self, log_file: str = DEFAULT_PATH) -> None:
         """
         Initialise le générateur de rapports.
 
         Args:
-            log_file: Chemin relatif ou absolu vers le fichier JSON des signaux.
+            log_file: Chemin relatif ou absolu vers le journal des signaux (.jsonl).
         """
         self.log_path = Path(log_file)
+        self.journal = SignalJournal(log_file)
         logger.debug("ReportGenerator initialisé — log_file=%s", self.log_path)
 
     # ------------------------------------------------------------------
@@ -58,9 +63,7 @@ class ReportGenerator:
             Rapport formaté sous forme de chaîne de caractères.
         """
         since = datetime.now(tz=timezone.utc) - timedelta(days=1)
-        signals = self._load_signals(since)
-        logger.info("Rapport quotidien : %d signal(s) trouvé(s)", len(signals))
-        return self._format_report(signals, period="Rapport Quotidien (24h)")
+        return self.period_report(since, period="Rapport Quotidien (24h)")
 
     def weekly_report(self) -> str:
         """
@@ -70,51 +73,65 @@ class ReportGenerator:
             Rapport formaté sous forme de chaîne de caractères.
         """
         since = datetime.now(tz=timezone.utc) - timedelta(days=7)
-        signals = self._load_signals(since)
-        logger.info("Rapport hebdomadaire : %d signal(s) trouvé(s)", len(signals))
-        return self._format_report(signals, period="Rapport Hebdomadaire (7 jours)")
+        return self.period_report(since, period="Rapport Hebdomadaire (7 jours)")
+
+    def period_report(
+        self, since: datetime, until: datetime | None = None, period: str = "Rapport"
+    ) -> str:
+        """
+        Génère un rapport pour les signaux de [since, until[.
+
+        Le coût ne dépend que du nombre de jours de la période (compteurs
+        journaliers du journal), pas du nombre de signaux.
+
+        Args:
+            since:  Date/heure de début (UTC).
+            until:  Date/heure de fin exclue (UTC) — None = maintenant.
+            period: Intitulé de la période.
+
+        Returns:
+            Rapport formaté sous forme de chaîne de caractères.
+        """
+        try:
+            stats = self.journal.aggregate(since, until)
+        except OSError as exc:
+            logger.error("Erreur lecture %s : %s", self.log_path, exc)
+            stats = empty_bucket()
+        signals = self._load_signals(since, until, limit=DETAIL_LIMIT) if stats["total"] else []
+        logger.info("%s : %d signal(s) trouvé(s)", period, stats["total"])
+        return self._format_report(stats, signals, period=period)
 
     # ------------------------------------------------------------------
     # Méthodes privées — chargement des données
     # ------------------------------------------------------------------
 
-    def _load_signals(self, since: datetime) -> list[dict]:
+    def _load_signals(
+        self, since: datetime, until: datetime | None = None, limit: int | None = None
+    ) -> list[dict]:
         """
-        Charge les signaux depuis le fichier JSON et filtre par date.
+        Charge les signaux depuis le journal et filtre par date.
+
+        Le journal ne lit que les segments et les jours concernés (index
+        temporel) ; le filtre exact sur les fuseaux est appliqué ensuite.
 
         Args:
             since: Date/heure de début (UTC) — les signaux antérieurs sont ignorés.
+            until: Date/heure de fin exclue (UTC), None = sans borne.
+            limit: Ne garder que les `limit` signaux les plus récents.
 
         Returns:
             Liste de dictionnaires représentant les signaux filtrés,
             triés par ordre chronologique.
         """
-        # Vérification de l'existence du fichier
-        if not self.log_path.exists():
-            logger.warning("Fichier de signaux introuvable : %s", self.log_path)
-            return []
-
-        # Lecture du JSON
+        # Marge d'un jour : le journal compare les heures sans tenir compte du fuseau
         try:
-            raw_text = self.log_path.read_text(encoding="utf-8").strip()
+            data = self.journal.read(since=since - timedelta(days=1), until=until, limit=limit)
         except OSError as exc:
             logger.error("Erreur lecture %s : %s", self.log_path, exc)
             return []
 
-        if not raw_text:
-            logger.warning("Fichier de signaux vide : %s", self.log_path)
-            return []
-
-        try:
-            data = json.loads(raw_text)
-        except json.JSONDecodeError as exc:
-            logger.error("JSON invalide dans %s : %s", self.log_path, exc)
-            return []
-
-        if not isinstance(data, list):
-            logger.error(
-                "Format JSON invalide : liste attendue, %s reçu", type(data).__name__
-            )
+        if not data:
+            logger.warning("Aucun signal dans le journal : %s", self.log_path)
             return []
 
         # Filtrage par date
@@ -130,7 +147,7 @@ class ReportGenerator:
             except ValueError as exc:
                 logger.warning("Timestamp invalide ignoré ('%s') : %s", ts_raw, exc)
                 continue
-            if ts >= since:
+            if ts >= since and (until is None or ts < until):
                 filtered.append(signal)
 
         # Tri chronologique
@@ -142,19 +159,20 @@ class ReportGenerator:
     # Méthodes privées — formatage du rapport
     # ------------------------------------------------------------------
 
-    def _format_report(self, signals: list[dict], period: str) -> str:
+    def _format_report(self, stats: dict, signals: list[dict], period: str) -> str:
         """
-        Formate les signaux en un rapport texte lisible.
+        Formate les compteurs et les derniers signaux en un rapport texte lisible.
 
         Args:
-            signals: Liste des signaux à inclure dans le rapport.
+            stats:   Compteurs de la période (SignalJournal.aggregate).
+            signals: Derniers signaux de la période, pour la section détail.
             period:  Intitulé de la période (ex. "Rapport Quotidien").
 
         Returns:
             Rapport complet sous forme de chaîne multi-lignes.
         """
         # Cas : aucun signal
-        if not signals:
+        if not stats["total"]:
             return (
                 f"{_LINE_DOUBLE}\n"
                 f"  {period}\n"
@@ -172,49 +190,51 @@ class ReportGenerator:
         lines.append(_LINE_DOUBLE)
 
         # --- Totaux ---
-        total = len(signals)
-        long_count = sum(1 for s in signals if s.get("direction", "").upper() == "LONG")
-        short_count = sum(1 for s in signals if s.get("direction", "").upper() == "SHORT")
+        total = stats["total"]
+        directions = stats["direction"].items()
+        long_count = sum(n for d, n in directions if d.upper() == "LONG")
+        short_count = sum(n for d, n in directions if d.upper() == "SHORT")
 
         lines.append(f"  Total signaux : {total}")
         lines.append(f"  LONG          : {long_count}")
         lines.append(f"  SHORT         : {short_count}")
 
         # --- Résultats (optionnel) ---
-        results = [s.get("result") for s in signals if s.get("result")]
-        if results:
+        if stats["result"]:
             lines.append(_LINE_SINGLE)
             lines.append("  RESULTATS")
             lines.append(_LINE_SINGLE)
-            result_counts = Counter(results)
+            result_counts = Counter(stats["result"])
             for result, count in result_counts.most_common():
                 lines.append(f"  {result:<15} : {count}")
 
         # --- Par figure chartiste ---
-        patterns = [s.get("pattern") for s in signals if s.get("pattern")]
-        if patterns:
+        if stats["pattern"]:
             lines.append(_LINE_SINGLE)
             lines.append("  PAR FIGURE")
             lines.append(_LINE_SINGLE)
-            pattern_counts = Counter(patterns)
+            pattern_counts = Counter(stats["pattern"])
             for pattern, count in pattern_counts.most_common():
                 lines.append(f"  {pattern:<30} : {count}")
 
         # --- Par paire ---
-        pairs = [s.get("pair") for s in signals if s.get("pair")]
-        if pairs:
+        if stats["pair"]:
             lines.append(_LINE_SINGLE)
             lines.append("  PAR PAIRE")
             lines.append(_LINE_SINGLE)
-            pair_counts = Counter(pairs)
+            pair_counts = Counter(stats["pair"])
             for pair, count in pair_counts.most_common():
                 lines.append(f"  {pair:<15} : {count}")
 
         # --- Détail des signaux ---
         lines.append(_LINE_SINGLE)
-        lines.append("  DETAIL DES SIGNAUX")
+        if total > len(signals):
+            lines.append(f"  DETAIL DES SIGNAUX ({len(signals)} derniers sur {total})")
+        else:
+            lines.append("  DETAIL DES SIGNAUX")
         lines.append(_LINE_SINGLE)
-        for i, signal in enumerate(signals, start=1):
+        first = total - len(signals) + 1
+        for i, signal in enumerate(signals, start=first):
             ts = signal.get("timestamp", "?")
             pair = signal.get("pair", "?")
             direction = signal.get("direction", "?")
@@ -0,0 +1,171 @@
+"""
+scan_metrics.py
+───────────────
+Télémétrie d'un scan : compteurs par porte et par figure, durées par étape.
+
+Permet de voir quelle porte élimine le plus de candidats, et combien de
+temps de détection est dépensé pour des signaux rejetés par une porte
+peu coûteuse — de quoi réordonner le pipeline selon coût et sélectivité.
+Le résumé est journalisé en JSON à la fin de run_scan et servi par
+l'interface web (GET /api/metrics).
+"""
+
+import logging
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from datetime import datetime
+
+logger = logging.getLogger(__name__)
+
+# Portes du GateChecker, dans l'ordre d'évaluation
+GATES = {
+    1: "sr_zone",
+    2: "figure",
+    3: "adx",
+    4: "qqe",
+    5: "htf",
+}
+
+# Bornes supérieures (ms) des classes de l'histogramme de latence
+LATENCY_BUCKETS_MS = (1, 5, 10, 50, 100, 500, 1000, 5000)
+
+
+@dataclass
+class StageStats:
+    """Durées cumulées d'une étape du pipeline."""
+    calls    : int = 0
+    total_s  : float = 0.0
+    max_s    : float = 0.0
+    items    : int = 0      # éléments produits (ex : signaux détectés)
+    buckets  : list = field(default_factory=lambda: [0] * (len(LATENCY_BUCKETS_MS) + 1))
+
+    def observe(self, seconds: float, items: int = 0) -> None:
+        self.calls   += 1
+        self.total_s += seconds
+        self.max_s    = max(self.max_s, seconds)
+        self.items   += items
+        ms = seconds * 1000
+        slot = next((i for i, bound in enumerate(LATENCY_BUCKETS_MS) if ms <= bound), -1)
+        self.buckets[slot] += 1
+
+    def to_dict(self) -> dict:
+        labels = [f"<={b}ms" for b in LATENCY_BUCKETS_MS] + [f">{LATENCY_BUCKETS_MS[-1]}ms"]
+        return {
+            "calls"    : self.calls,
+            "total_ms" : round(self.total_s * 1000, 2),
+            "mean_ms"  : round(self.total_s * 1000 / self.calls, 3) if self.calls else 0.0,
+            "max_ms"   : round(self.max_s * 1000, 2),
+            "items"    : self.items,
+            "histogram": dict(zip(labels, self.buckets)),
+        }
+
+
+class ScanMetrics:
+    """
+    Registre en mémoire des métriques d'un scan.
+
+    Usage :
+        metrics = ScanMetrics()
+        with metrics.timer("harmonics") as stage:
+            signals = harm_det.detect(df, sr_zones)
+            stage.items = len(signals)
+        metrics.record_gate(sig["pattern"], gate_result)
+        metrics.summary()
+
+    Les portes étant évaluées dans l'ordre, un signal arrêté à la porte k
+    compte comme « passé » pour les portes 1 à k-1, « échoué » pour la
+    porte k, et n'est pas compté pour les suivantes.
+    Thread-safe : l'interface web peut lire le résumé pendant un scan.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.started_at = datetime.now()
+        self._stages: dict[str, StageStats] = defaultdict(StageStats)
+        # {figure: {n° porte: [passés, échoués]}}
+        self._gates: dict[str, dict[int, list]] = defaultdict(
+            lambda: {gate: [0, 0] for gate in GATES}
+        )
+
+    # ------------------------------------------------------------------ #
+    #  Enregistrement                                                      #
+    # ------------------------------------------------------------------ #
+
+    @contextmanager
+    def timer(self, stage: str):
+        """Chronomètre le bloc ; `items` du contexte = éléments produits."""
+        probe = _StageProbe()
+        start = time.perf_counter()
+        try:
+            yield probe
+        finally:
+            self.observe(stage, time.perf_counter() - start, probe.items)
+
+    def observe(self, stage: str, seconds: float, items: int = 0) -> None:
+        """Ajoute une mesure de durée pour `stage`."""
+        with self._lock:
+            self._stages[stage].observe(seconds, items)
+
+    def record_gate(self, pattern: str, gate_result) -> None:
+        """Comptabilise le passage d'un signal dans les portes (GateResult)."""
+        with self._lock:
+            self._count_gates(pattern, gate_result.closed_gate)
+
+    def record_gate_batch(self, patterns, closed_gates) -> None:
+        """Version tableau de record_gate (GateBatchResult.closed_gate)."""
+        with self._lock:
+            for pattern, closed in zip(patterns, closed_gates):
+                self._count_gates(pattern, int(closed))
+
+    def _count_gates(self, pattern: str, closed: int) -> None:
+        counts = self._gates[pattern or "?"]
+        for gate in range(1, (closed or len(GATES)) + 1):
+            counts[gate][gate == closed] += 1
+
+    # ------------------------------------------------------------------ #
+    #  Résumé                                                              #
+    # ------------------------------------------------------------------ #
+
+    def summary(self) -> dict:
+        """Résumé sérialisable JSON : étapes, portes, figures."""
+        with self._lock:
+            stages = {name: stats.to_dict() for name, stats in self._stages.items()}
+            by_pattern = {
+                pattern: {GATES[g]: {"pass": c[0], "fail": c[1]} for g, c in counts.items()}
+                for pattern, counts in sorted(self._gates.items())
+            }
+
+        by_gate = {name: {"pass": 0, "fail": 0} for name in GATES.values()}
+        accepted = 0
+        for pattern, gates in by_pattern.items():
+            for name, count in gates.items():
+                by_gate[name]["pass"] += count["pass"]
+                by_gate[name]["fail"] += count["fail"]
+            accepted += gates[GATES[len(GATES)]]["pass"]
+        candidates = by_gate[GATES[1]]["pass"] + by_gate[GATES[1]]["fail"]
+
+        # Sélectivité : part des signaux entrant dans la porte qui y sont rejetés
+        for count in by_gate.values():
+            seen = count["pass"] + count["fail"]
+            count["reject_rate"] = round(count["fail"] / seen, 3) if seen else 0.0
+
+        return {
+            "started_at": self.started_at.strftime("%Y-%m-%d %H:%M:%S"),
+            "duration_s": round((datetime.now() - self.started_at).total_seconds(), 2),
+            "candidates": candidates,
+            "accepted"  : accepted,
+            "stages"    : stages,
+            "gates"     : by_gate,
+            "patterns"  : by_pattern,
+        }
+
+
+class _StageProbe:
+    """Contexte renvoyé par ScanMetrics.timer."""
+    __slots__ = ("items",)
+
+    def __init__(self):
+        self.items = 0
@@ -0,0 +1,166 @@
+"""
+script_store.py
+───────────────
+Écriture des scripts Pine / MQL4 générés par les drawers.
+
+  - Un seul script par (paire, timeframe) : tous les signaux acceptés du
+    graphique sont regroupés (un seul en-tête //@version / indicator()).
+  - Le contenu est haché (SHA-256) : un script identique à celui déjà sur
+    disque n'est pas réécrit, et n'a donc pas à être renvoyé sur Telegram.
+  - Deux dessins identiques dans un même graphique ne sont écrits qu'une fois.
+  - Les variables déclarées par chaque dessin Pine (ex : `var r_line`) sont
+    suffixées par le rang du dessin : deux biseaux ou triangles sur un même
+    graphique ne redéclarent pas la même variable.
+"""
+
+import hashlib
+import logging
+import os
+import re
+from dataclasses import dataclass, field
+
+logger = logging.getLogger(__name__)
+
+# Déclaration Pine de premier niveau : [var|varip] [type] nom = / :=
+_PINE_DECLARATION = re.compile(r"^(?:(?:var|varip)\s+)?(?:\w+\s+)?([A-Za-z_]\w*)\s*:?=(?!=)")
+
+
+@dataclass
+class ScriptWrite:
+    """Résultat de ScriptStore.flush pour un (paire, timeframe)."""
+    pine_path     : str
+    mql4_path     : str
+    signals       : int            # dessins distincts regroupés
+    pine_changed  : bool = False   # False = contenu identique, écriture sautée
+    mql4_changed  : bool = False
+
+
+@dataclass
+class _Bundle:
+    pine  : list = field(default_factory=list)
+    mql4  : list = field(default_factory=list)
+    seen  : set = field(default_factory=set)     # empreintes des dessins déjà ajoutés
+
+
+class ScriptStore:
+    """
+    Regroupe les dessins par graphique et n'écrit que les scripts modifiés.
+
+    Usage :
+        store.add(pair, tf, drawing)        # pour chaque signal accepté
+        written = store.flush(pair, tf)     # une fois le graphique traité
+        if written.pine_changed: ...        # envoi Telegram
+    """
+
+    def __init__(self, pine_dir: str = "outputs/tradingview", mql4_dir: str = "outputs/mt4"):
+        self.pine_dir = pine_dir
+        self.mql4_dir = mql4_dir
+        self._bundles: dict[tuple, _Bundle] = {}
+        self._hashes: dict[str, str] = {}        # chemin → empreinte du contenu écrit
+        self.skipped = 0                          # écritures évitées (contenu identique)
+
+    # ------------------------------------------------------------------ #
+    #  Méthodes publiques                                                  #
+    # ------------------------------------------------------------------ #
+
+    def paths(self, pair: str, tf: str) -> tuple[str, str]:
+        """Chemins (Pine, MQL4) du script groupé de (pair, tf)."""
+        name = f"{pair.replace('/', '_')}_{tf}"
+        return (
+            os.path.join(self.pine_dir, f"{name}.pine"),
+            os.path.join(self.mql4_dir, f"{name}.mql4"),
+        )
+
+    def add(self, pair: str, tf: str, drawing) -> str:
+        """Ajoute un DrawingOutput au script de (pair, tf) ; retourne le chemin Pine."""
+        bundle = self._bundles.setdefault((pair, tf), _Bundle())
+        digest = self._digest(drawing.pine_script + "\0" + drawing.mql4_script)
+        if digest not in bundle.seen:
+            bundle.seen.add(digest)
+            bundle.pine.append((drawing.pattern_name, drawing.direction, drawing.pine_script))
+            bundle.mql4.append((drawing.pattern_name, drawing.direction, drawing.mql4_script))
+        return self.paths(pair, tf)[0]
+
+    def flush(self, pair: str, tf: str) -> ScriptWrite | None:
+        """Écrit les scripts groupés de (pair, tf) s'ils ont changé ; None si aucun dessin."""
+        bundle = self._bundles.pop((pair, tf), None)
+        pine_path, mql4_path = self.paths(pair, tf)
+        if bundle is None:
+            return None
+
+        result = ScriptWrite(
+            pine_path    = pine_path,
+            mql4_path    = mql4_path,
+            signals      = len(bundle.pine),
+            pine_changed = self.write(pine_path, self._pine_bundle(pair, tf, bundle.pine)),
+            mql4_changed = self.write(mql4_path, self._mql4_bundle(pair, tf, bundle.mql4)),
+        )
+        logger.debug(
+            "Scripts %s %s : %d dessin(s), Pine %s, MQL4 %s", pair, tf, result.signals,
+            "écrit" if result.pine_changed else "inchangé",
+            "écrit" if result.mql4_changed else "inchangé",
+        )
+        return result
+
+    def clear(self) -> None:
+        """Abandonne les dessins en attente (graphique interrompu par une erreur)."""
+        self._bundles.clear()
+
+    def write(self, path: str, content: str) -> bool:
+        """Écrit `content` dans `path` sauf s'il est identique ; True si écrit."""
+        digest = self._digest(content)
+        if self._hashes.get(path) is None and os.path.isfile(path):
+            with open(path, "rb") as f:
+                self._hashes[path] = hashlib.sha256(f.read()).hexdigest()
+        if self._hashes.get(path) == digest and os.path.isfile(path):
+            self.skipped += 1
+            return False
+
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(content)
+        self._hashes[path] = digest
+        return True
+
+    # ------------------------------------------------------------------ #
+    #  Assemblage                                                          #
+    # ------------------------------------------------------------------ #
+
+    @staticmethod
+    def _digest(content: str) -> str:
+        return hashlib.sha256(content.encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def _pine_bundle(pair: str, tf: str, parts: list) -> str:
+        """Un seul en-tête Pine, puis le corps de chaque dessin."""
+        lines = [
+            "//@version=5",
+            f'indicator("{pair} {tf} — {len(parts)} signal(s)", overlay=true, '
+            f"max_lines_count=500, max_labels_count=500, max_boxes_count=500)",
+        ]
+        for rank, (pattern, direction, script) in enumerate(parts, start=1):
+            body = [
+                line for line in script.strip("\n").splitlines()
+                if not line.startswith(("//@version", "indicator("))
+            ]
+            lines += ["", f"// ════ {pattern} {direction} ════", *ScriptStore._scope_pine(body, rank)]
+        return "\n".join(lines) + "\n"
+
+    @staticmethod
+    def _scope_pine(body: list, rank: int) -> list:
+        """Suffixe `_<rang>` aux variables déclarées par le corps d'un dessin."""
+        names = {
+            match.group(1) for line in body
+            if (match := _PINE_DECLARATION.match(line))
+        }
+        if not names:
+            return body
+        pattern = re.compile(r"(?<![\w.])(" + "|".join(map(re.escape, sorted(names))) + r")\b")
+        return [pattern.sub(rf"\g<1>_{rank}", line) for line in body]
+
+    @staticmethod
+    def _mql4_bundle(pair: str, tf: str, parts: list) -> str:
+        lines = [f"// {pair} {tf} — {len(parts)} signal(s)"]
+        for pattern, direction, script in parts:
+            lines += ["", f"// ════ {pattern} {direction} ════", script.strip("\n")]
+        return "\n".join(lines) + "\n"
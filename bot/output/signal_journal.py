@@ -0,0 +1,462 @@
+"""
+signal_journal.py
+─────────────────
+Journal des signaux émis, en ajout seul (JSON Lines).
+
+  - Un signal = une ligne JSON ajoutée en fin de fichier : O(1) par alerte,
+    et une écriture unique en mode append, donc deux scans concurrents
+    ne s'écrasent plus mutuellement.
+  - Rotation par taille : le segment actif plein est renommé d'après son
+    premier horodatage (signals_log.20261019120000.jsonl) ; au-delà de
+    `backups` segments, les plus anciens sont supprimés.
+  - Index (signals_log.idx.json) : bornes temporelles de chaque segment et
+    position du premier signal de chaque jour. Une lecture sur une période
+    ne lit que les segments concernés, à partir du bon octet. L'index se
+    rattrape seul sur les lignes écrites par un autre processus.
+  - Compaction périodique du segment actif : lignes tronquées supprimées,
+    signaux remis dans l'ordre chronologique, index reconstruit.
+  - Compteurs journaliers (total, par paire, figure, direction, résultat)
+    tenus à jour à chaque ajout et conservés dans l'index, y compris pour
+    les segments supprimés par la rotation : un rapport sur une période
+    quelconque coûte O(jours), plus la lecture des deux jours incomplets.
+
+Source unique des signaux : AlertManager y écrit, ReportGenerator et
+l'interface web (GET /api/signals) y lisent.
+"""
+
+import glob
+import json
+import logging
+import os
+import threading
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timedelta
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PATH = "outputs/signals_log.jsonl"
+LEGACY_PATH  = "outputs/signals_log.json"     # ancien journal (liste JSON réécrite)
+
+# Complète une clé tronquée ("2026-10-19 12:00") jusqu'à la seconde
+_KEY_TEMPLATE = "0000-01-01 00:00:00"
+_MIDNIGHT     = " 00:00:00"
+
+# Champs comptés par jour, au fil des ajouts
+AGGREGATE_FIELDS = ("pair", "pattern", "direction", "result")
+
+
+def timestamp_key(ts) -> str:
+    """
+    Clé de tri d'un horodatage : "YYYY-MM-DD HH:MM:SS".
+
+    Accepte un datetime ou une chaîne ISO / "%Y-%m-%d %H:%M" (format d'Alert).
+    Le fuseau éventuel est ignoré : les clés se comparent telles quelles.
+    """
+    if isinstance(ts, datetime):
+        return ts.strftime("%Y-%m-%d %H:%M:%S")
+    key = str(ts or "").replace("T", " ")[:19]
+    return key + _KEY_TEMPLATE[len(key):]
+
+
+def empty_bucket() -> dict:
+    """Compteurs d'une période : {"total": n, "pair": {valeur: n}, ...}."""
+    return {"total": 0, **{name: {} for name in AGGREGATE_FIELDS}}
+
+
+def merge_bucket(into: dict, bucket: dict) -> dict:
+    """Ajoute les compteurs de `bucket` à `into` (modifié et retourné)."""
+    into["total"] += bucket.get("total", 0)
+    for name in AGGREGATE_FIELDS:
+        counts = into[name]
+        for value, n in bucket.get(name, {}).items():
+            counts[value] = counts.get(value, 0) + n
+    return into
+
+
+def _count(bucket: dict, entry: dict) -> None:
+    bucket["total"] += 1
+    for name in AGGREGATE_FIELDS:
+        value = entry.get(name)
+        if value:
+            counts = bucket[name]
+            counts[str(value)] = counts.get(str(value), 0) + 1
+
+
+def _next_day(day: str) -> str:
+    return (datetime.strptime(day, "%Y-%m-%d") + timedelta(days=1)).strftime("%Y-%m-%d")
+
+
+@dataclass
+class _Segment:
+    """Entrée d'index d'un fichier du journal."""
+    file  : str                  # nom du fichier, dans le dossier du journal
+    first : str = ""             # plus petite clé horodatage
+    last  : str = ""             # plus grande clé horodatage
+    count : int = 0              # signaux indexés
+    size  : int = 0              # octets indexés
+    days  : dict = field(default_factory=dict)   # "YYYY-MM-DD" → octet de la 1re ligne du jour
+    stats : dict = field(default_factory=dict)   # "YYYY-MM-DD" → compteurs (empty_bucket)
+    ordered : bool = True        # lignes en ordre chronologique (lecture arrêtée à `until`)
+
+    def add(self, offset: int, length: int, key: str, entry: dict) -> None:
+        self.count += 1
+        self.size   = offset + length
+        self.days.setdefault(key[:10], offset)
+        self.ordered = self.ordered and key >= self.last
+        self.first  = min(self.first, key) if self.first else key
+        self.last   = max(self.last, key)
+        day_stats = self.stats.get(key[:10])
+        if day_stats is None:
+            day_stats = self.stats[key[:10]] = empty_bucket()
+        _count(day_stats, entry)
+
+    def start(self, since: str) -> int | None:
+        """Premier octet pouvant contenir un signal >= since (None si aucun)."""
+        day = since[:10]
+        return min((off for d, off in self.days.items() if d >= day), default=None)
+
+
+class _SharedState:
+    """État partagé par toutes les instances ouvertes sur un même journal."""
+
+    def __init__(self):
+        self.lock     = threading.RLock()
+        self.segments = None     # list[_Segment], du plus ancien au segment actif
+        self.archive  = {}       # compteurs journaliers des segments supprimés
+        self.appends  = 0
+
+
+class SignalJournal:
+    """
+    Journal des signaux en ajout seul, avec rotation et index temporel.
+
+    Usage :
+        journal = SignalJournal()
+        journal.append({"timestamp": "2026-10-19 12:00", "pair": "EUR/USD", ...})
+        journal.read(since=datetime(2026, 10, 18), until=datetime(2026, 10, 19))
+
+    Les instances ouvertes sur le même chemin partagent verrou et index :
+    AlertManager (un par scan), ReportGenerator et l'interface web peuvent
+    coexister dans un même processus.
+    """
+
+    _states: dict[str, _SharedState] = {}
+    _states_lock = threading.Lock()
+
+    def __init__(self,
+                 path: str = DEFAULT_PATH,
+                 max_bytes: int = 2_000_000,
+                 backups: int = 20,
+                 compact_every: int = 500,
+                 legacy_path: str | None = LEGACY_PATH):
+        self.path          = os.path.abspath(path)
+        self.directory     = os.path.dirname(self.path)
+        self.stem          = os.path.basename(self.path).removesuffix(".jsonl")
+        self.index_path    = os.path.join(self.directory, f"{self.stem}.idx.json")
+        self.max_bytes     = max_bytes
+        self.backups       = backups
+        self.compact_every = compact_every
+        self.legacy_path   = os.path.abspath(legacy_path) if legacy_path else None
+
+        with self._states_lock:
+            self._state = self._states.setdefault(self.path, _SharedState())
+
+    # ------------------------------------------------------------------ #
+    #  Méthodes publiques                                                  #
+    # ------------------------------------------------------------------ #
+
+    def append(self, entry: dict) -> None:
+        """Ajoute un signal en fin de journal (rotation si le segment est plein)."""
+        line = (json.dumps(entry, ensure_ascii=False, default=str) + "\n").encode("utf-8")
+        key  = timestamp_key(entry.get("timestamp"))
+
+        with self._state.lock:
+            segments = self._segments()
+            active   = segments[-1]
+            if active.count and active.size + len(line) > self.max_bytes:
+                active = self._rotate(segments)
+
+            os.makedirs(self.directory, exist_ok=True)
+            with open(self.path, "ab") as f:
+                offset = f.tell()
+                f.write(line)
+            new_day = key[:10] not in active.days
+            # Si un autre processus a écrit entre-temps, _segments() indexera l'ensemble
+            if offset == active.size:
+                active.add(offset, len(line), key, entry)
+
+            self._state.appends += 1
+            if self.compact_every and self._state.appends % self.compact_every == 0:
+                self.compact()
+            elif new_day:
+                self._save_index(segments)
+
+    def read(self, since=None, until=None, limit: int | None = None) -> list[dict]:
+        """
+        Signaux de la période [since, until[, triés chronologiquement.
+
+        Args:
+            since : datetime ou chaîne (None = depuis le début)
+            until : datetime ou chaîne, exclu (None = jusqu'à maintenant)
+            limit : ne garder que les `limit` plus récents
+
+        Returns:
+            Liste de dicts, tels qu'ajoutés par append().
+        """
+        lo = timestamp_key(since) if since else ""
+        hi = timestamp_key(until) if until else None
+
+        # Plan de lecture figé sous verrou : (fichier, octet de départ, octet de fin, trié)
+        with self._state.lock:
+            plan = []
+            for seg in self._segments():
+                if not seg.count or seg.last < lo or (hi is not None and seg.first >= hi):
+                    continue
+                start = seg.start(lo) if lo else 0
+                if start is not None:
+                    plan.append((os.path.join(self.directory, seg.file), start, seg.size, seg.ordered))
+
+        # Avec `limit`, les segments les plus récents suffisent
+        signals = []
+        for path, start, end, ordered in (reversed(plan) if limit else plan):
+            for _, _, entry in self._iter_lines(path, start, end):
+                key = timestamp_key(entry.get("timestamp"))
+                if hi is not None and key >= hi:
+                    if ordered:
+                        break
+                    continue
+                if key >= lo:
+                    signals.append(entry)
+            if limit and len(signals) >= limit:
+                break
+
+        signals.sort(key=lambda e: timestamp_key(e.get("timestamp")))
+        return signals[-limit:] if limit else signals
+
+    def aggregate(self, since=None, until=None) -> dict:
+        """
+        Compteurs de la période [since, until[ (voir empty_bucket).
+
+        Les jours entièrement couverts viennent des compteurs de l'index ;
+        seuls les jours incomplets aux bornes sont relus. Un jour incomplet
+        dont les signaux ont été supprimés par la rotation compte en entier.
+        """
+        lo = timestamp_key(since) if since else ""
+        hi = timestamp_key(until) if until else None
+        first_full = lo[:10] if not lo or lo.endswith(_MIDNIGHT) else _next_day(lo[:10])
+        hi_day     = hi[:10] if hi is not None else None
+
+        total = empty_bucket()
+        with self._state.lock:
+            segments = self._segments()          # charge aussi l'archive de l'index
+            sources = [self._state.archive] + [seg.stats for seg in segments]
+            for stats in sources:
+                for day, bucket in stats.items():
+                    if day >= first_full and (hi_day is None or day < hi_day):
+                        merge_bucket(total, bucket)
+
+        # Jours incomplets : début de période, puis fin de période
+        partial = []
+        if lo and first_full != lo[:10]:
+            day_end = first_full + _MIDNIGHT
+            partial.append((lo, min(day_end, hi) if hi is not None else day_end))
+        if hi is not None and not hi.endswith(_MIDNIGHT) and hi_day >= first_full:
+            partial.append((hi_day + _MIDNIGHT, hi))
+        for start, end in partial:
+            for entry in self.read(since=start, until=end):
+                _count(total, entry)
+            if start[:10] in self._state.archive:
+                merge_bucket(total, self._state.archive[start[:10]])
+        return total
+
+    def compact(self) -> int:
+        """
+        Réécrit le segment actif : lignes illisibles supprimées, signaux triés
+        par horodatage, index reconstruit. Retourne le nombre de lignes retirées.
+        """
+        with self._state.lock:
+            segments = self._segments()
+            if not os.path.isfile(self.path):
+                return 0
+
+            entries, dropped = [], 0
+            with open(self.path, "rb") as f:
+                for raw in f:
+                    try:
+                        entry = json.loads(raw)
+                    except ValueError:
+                        entry = None
+                    if isinstance(entry, dict):
+                        entries.append(entry)
+                    else:
+                        dropped += 1
+            entries.sort(key=lambda e: timestamp_key(e.get("timestamp")))
+
+            tmp = f"{self.path}.tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                for entry in entries:
+                    f.write(json.dumps(entry, ensure_ascii=False, default=str) + "\n")
+            os.replace(tmp, self.path)
+
+            segments[-1] = self._scan(_Segment(file=os.path.basename(self.path)))
+            self._save_index(segments)
+            if dropped:
+                logger.warning("Journal compacté : %d ligne(s) illisible(s) retirée(s)", dropped)
+            logger.debug("Journal compacté : %d signal(s) dans le segment actif", len(entries))
+            return dropped
+
+    # ------------------------------------------------------------------ #
+    #  Index                                                               #
+    # ------------------------------------------------------------------ #
+
+    def _segments(self) -> list[_Segment]:
+        """Index chargé (ou reconstruit) et rattrapé sur la fin du segment actif."""
+        state = self._state
+        if state.segments is None:
+            state.segments = self._load_index()
+        segments = state.segments
+
+        active = segments[-1]
+        size = os.path.getsize(self.path) if os.path.isfile(self.path) else 0
+        if size < active.size:
+            # Segment actif tourné ou compacté par un autre processus
+            state.segments = segments = self._load_index()
+        elif size > active.size:
+            self._scan(active, active.size)
+        return segments
+
+    def _load_index(self) -> list[_Segment]:
+        active_name = os.path.basename(self.path)
+        try:
+            with open(self.index_path, "r", encoding="utf-8") as f:
+                index = json.load(f)
+            self._state.archive = index.get("archive") or {}
+            segments = [_Segment(**seg) for seg in index["segments"]]
+            if segments and segments[-1].file == active_name and all(
+                os.path.isfile(os.path.join(self.directory, seg.file))
+                and (seg.stats or not seg.count)
+                for seg in segments[:-1]
+            ) and (segments[-1].stats or not segments[-1].count):
+                active = segments[-1]
+                if os.path.isfile(self.path) and os.path.getsize(self.path) < active.size:
+                    segments[-1] = self._scan(_Segment(file=active_name))
+                return segments
+        except (OSError, ValueError, KeyError, TypeError):
+            pass
+
+        # Index absent ou incohérent : reconstruction depuis les fichiers
+        self._migrate_legacy()
+        rotated = sorted(
+            os.path.basename(p)
+            for p in glob.glob(os.path.join(glob.escape(self.directory), f"{glob.escape(self.stem)}.*.jsonl"))
+        )
+        segments = [self._scan(_Segment(file=name)) for name in rotated + [active_name]]
+        if any(seg.count for seg in segments):
+            self._save_index(segments)
+            logger.info("Index du journal reconstruit : %d segment(s)", len(segments))
+        return segments
+
+    def _save_index(self, segments: list[_Segment]) -> None:
+        os.makedirs(self.directory, exist_ok=True)
+        tmp = f"{self.index_path}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({
+                "segments": [asdict(seg) for seg in segments],
+                "archive" : self._state.archive,
+            }, f)
+        os.replace(tmp, self.index_path)
+
+    def _scan(self, seg: _Segment, start: int = 0) -> _Segment:
+        """Indexe les lignes complètes de `seg` à partir de l'octet `start`."""
+        path = os.path.join(self.directory, seg.file)
+        if not os.path.isfile(path):
+            return seg
+        for offset, length, entry in self._iter_lines(path, start, None, partial=True):
+            if entry is None:
+                seg.size = offset + length          # ligne illisible : sautée
+            else:
+                seg.add(offset, length, timestamp_key(entry.get("timestamp")), entry)
+        return seg
+
+    @staticmethod
+    def _iter_lines(path: str, start: int, end: int | None, partial: bool = False):
+        """
+        (octet, longueur, signal) de chaque ligne complète entre start et end.
+        Avec `partial`, les lignes illisibles sont rendues avec signal=None.
+        """
+        try:
+            f = open(path, "rb")
+        except OSError:
+            return
+        with f:
+            f.seek(start)
+            offset = start
+            for raw in f:
+                if end is not None and offset >= end:
+                    break
+                if not raw.endswith(b"\n"):
+                    break                           # écriture en cours
+                try:
+                    entry = json.loads(raw)
+                except ValueError:
+                    entry = None
+                if isinstance(entry, dict):
+                    yield offset, len(raw), entry
+                elif partial:
+                    yield offset, len(raw), None
+                offset += len(raw)
+
+    # ------------------------------------------------------------------ #
+    #  Rotation / migration                                                #
+    # ------------------------------------------------------------------ #
+
+    def _rotate(self, segments: list[_Segment]) -> _Segment:
+        """Renomme le segment actif plein et en ouvre un nouveau."""
+        active = segments[-1]
+        stamp  = "".join(c for c in active.first if c.isdigit()) or datetime.now().strftime("%Y%m%d%H%M%S")
+        name   = f"{self.stem}.{stamp}.jsonl"
+        n = 1
+        while os.path.exists(os.path.join(self.directory, name)):
+            name = f"{self.stem}.{stamp}-{n}.jsonl"
+            n += 1
+        os.replace(self.path, os.path.join(self.directory, name))
+        active.file = name
+
+        fresh = _Segment(file=os.path.basename(self.path))
+        segments.append(fresh)
+        while len(segments) - 1 > self.backups:
+            old = segments.pop(0)
+            # Les compteurs survivent au segment
+            for day, bucket in old.stats.items():
+                merge_bucket(self._state.archive.setdefault(day, empty_bucket()), bucket)
+            try:
+                os.remove(os.path.join(self.directory, old.file))
+            except OSError:
+                pass
+        self._save_index(segments)
+        logger.info("Journal des signaux : rotation → %s", name)
+        return fresh
+
+    def _migrate_legacy(self) -> None:
+        """Reprend une fois l'ancien signals_log.json (liste JSON) dans le journal."""
+        if not self.legacy_path or not os.path.isfile(self.legacy_path) or os.path.isfile(self.path):
+            return
+        try:
+            with open(self.legacy_path, "r", encoding="utf-8") as f:
+                legacy = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning("Ancien journal illisible (%s) : %s", self.legacy_path, e)
+            return
+        if not isinstance(legacy, list):
+            return
+
+        entries = sorted(
+            (e for e in legacy if isinstance(e, dict)),
+            key=lambda e: timestamp_key(e.get("timestamp")),
+        )
+        os.makedirs(self.directory, exist_ok=True)
+        with open(self.path, "w", encoding="utf-8") as f:
+            for entry in entries:
+                f.write(json.dumps(entry, ensure_ascii=False, default=str) + "\n")
+        os.replace(self.legacy_path, self.legacy_path + ".migrated")
+        logger.info("Ancien journal migré : %d signal(s) repris de %s", len(entries), self.legacy_path)
@@ -6,7 +6,9 @@ DI dans la mauvaise direction → signal bloqué.
 """
 
 import logging
-from dataclasses import dataclass
+from dataclasses import dataclass, field
+
+import numpy as np
 
 # Journalisation du module
 logger = logging.getLogger(__name__)
@@ -21,6 +23,29 @@ class ADXResult:
     adx_category: str  # "FAIBLE" | "NAISSANT" | "CONFIRME" | "FORT" | "EXTREME"
 
 
+@dataclass
+class ADXBatchResult:
+    """
+    Résultat de ADXValidator.validate_batch : un élément par signal.
+    Les raisons sont construites à la demande par `reason(i)`.
+    """
+    valid: np.ndarray         # bool
+    adx_value: np.ndarray
+    adx_category: np.ndarray  # object, mêmes libellés que ADXResult
+    _inputs: tuple = field(repr=False, default=())
+    _validator: "ADXValidator" = field(repr=False, default=None)
+
+    def __len__(self) -> int:
+        return len(self.valid)
+
+    def reason(self, i: int) -> str:
+        """Raison du signal i (identique à validate() sur ce signal)."""
+        adx, di_plus, di_minus, direction = (column[i] for column in self._inputs)
+        return self._validator.validate(
+            float(adx), float(di_plus), float(di_minus), str(direction)
+        ).reason
+
+
 class ADXValidator:
     """
     Valide le momentum ADX avant d'émettre un signal.
@@ -112,6 +137,43 @@ class ADXValidator:
             adx_category=category,
         )
 
+    def validate_batch(self, adx, di_plus, di_minus, direction) -> ADXBatchResult:
+        """
+        Version vectorisée de validate() pour un tableau de signaux.
+
+        Args:
+            adx, di_plus, di_minus: Tableaux de valeurs (une par signal).
+            direction:              Tableau de directions "LONG" / "SHORT".
+
+        Returns:
+            ADXBatchResult (mêmes verdicts et catégories que validate()).
+        """
+        adx       = np.asarray(adx, dtype=float)
+        di_plus   = np.asarray(di_plus, dtype=float)
+        di_minus  = np.asarray(di_minus, dtype=float)
+        direction = np.char.upper(np.asarray(direction, dtype=str))
+
+        strong   = ~(adx < self.min_adx)
+        category = np.select(
+            [~strong, adx < 25, adx < 40, adx <= 60],
+            ["FAIBLE", "NAISSANT", "CONFIRME", "FORT"],
+            default="EXTREME",
+        ).astype(object)
+        against = (
+            ((direction == "LONG") & (di_minus > di_plus))
+            | ((direction == "SHORT") & (di_plus > di_minus))
+        )
+        valid = strong & ~against
+
+        logger.debug("ADX batch : %d/%d signaux valides", int(valid.sum()), len(valid))
+        return ADXBatchResult(
+            valid=valid,
+            adx_value=adx,
+            adx_category=category,
+            _inputs=(adx, di_plus, di_minus, direction),
+            _validator=self,
+        )
+
     # ------------------------------------------------------------------
     # Méthodes privées
     # ------------------------------------------------------------------
@@ -6,9 +6,12 @@ Si une porte est fermée → STOP TOTAL, aucun signal émis.
 Ce fichier ne peut pas être contourné dans le pipeline.
 """
 
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from typing import Optional
 
+import numpy as np
+import pandas as pd
+
 
 @dataclass
 class GateResult:
@@ -25,6 +28,62 @@ class GateResult:
         if self.warnings is None:
             self.warnings = []
 
+    @property
+    def closed_gate(self) -> int:
+        """0 si toutes les portes sont ouvertes, sinon n° de la porte fermée (1-5)."""
+        if self.allowed:
+            return 0
+        flags = (self.gate1_sr, self.gate2_figure, self.adx_ok, self.qqe_ok)
+        return next((i for i, ok in enumerate(flags, 1) if not ok), 5)
+
+
+@dataclass
+class GateBatchResult:
+    """
+    Résultat de GateChecker.check_batch : un élément par ligne de la table.
+
+    Les raisons ne sont pas construites pendant le filtrage :
+    `reasons()` les produit pour les signaux acceptés, `result(i)` donne le
+    GateResult complet (raison + avertissements) d'une ligne à la demande.
+    """
+    allowed      : np.ndarray     # bool
+    closed_gate  : np.ndarray     # 0 = toutes les portes ouvertes, sinon n° de la porte fermée (1-5)
+    confluence   : np.ndarray     # score de confluence /8 (0 si refusé)
+    gate1_sr     : np.ndarray
+    gate2_figure : np.ndarray
+    adx_ok       : np.ndarray
+    qqe_ok       : np.ndarray
+    compression  : np.ndarray
+    _table       : pd.DataFrame = field(repr=False, default=None)
+    _checker     : "GateChecker" = field(repr=False, default=None)
+
+    def __len__(self) -> int:
+        return len(self.allowed)
+
+    def result(self, i: int) -> GateResult:
+        """GateResult complet de la ligne i (identique à check() sur ce signal)."""
+        signal = {}
+        for key, value in self._table.iloc[i].items():
+            if isinstance(value, float):
+                if value != value:          # NaN = clé absente de ce signal
+                    continue
+                if value.is_integer():      # entier converti en float par la table
+                    value = int(value)
+            signal[key] = value
+        return self._checker.check(signal)
+
+    def reason(self, i: int) -> str:
+        """Raison de la ligne i, construite à la demande."""
+        if self.allowed[i]:
+            return GateChecker._status_reason(int(self.confluence[i]))
+        return self.result(i).reason
+
+    def reasons(self, rows=None) -> dict[int, str]:
+        """Raisons des lignes demandées (par défaut : les signaux acceptés)."""
+        if rows is None:
+            rows = np.flatnonzero(self.allowed)
+        return {int(i): self.reason(int(i)) for i in rows}
+
 
 class GateChecker:
     """
@@ -33,6 +92,15 @@ class GateChecker:
     Les autres génèrent des avertissements.
     """
 
+    def __init__(self, min_adx: float = 20, qqe_max_bars: int = 6):
+        """
+        Args:
+            min_adx      : ADX minimum de la porte 3
+            qqe_max_bars : âge maximum (en bougies) du croisement QQE, porte 4
+        """
+        self.min_adx      = min_adx
+        self.qqe_max_bars = qqe_max_bars
+
     def check(self, signal: dict) -> GateResult:
 
         warnings = []
@@ -88,13 +156,13 @@ class GateChecker:
         di_minus  = float(signal.get("di_minus", 0))
         direction = signal.get("direction", "NEUTRE")
 
-        adx_ok = adx_value >= 20
+        adx_ok = adx_value >= self.min_adx
         di_ok  = (di_plus >= di_minus) if direction == "LONG" else (di_minus >= di_plus)
 
         if not adx_ok:
             return GateResult(
                 allowed      = False,
-                reason       = f"❌ GATE 3 FERMÉE — ADX {adx_value:.1f} < 20 — momentum insuffisant",
+                reason       = f"❌ GATE 3 FERMÉE — ADX {adx_value:.1f} < {self.min_adx:g} — momentum insuffisant",
                 gate1_sr     = True,
                 gate2_figure = True,
                 warnings     = warnings,
@@ -123,7 +191,7 @@ class GateChecker:
         qqe_bars_ago  = int(signal.get("qqe_cross_bars_ago", 99))
 
         qqe_side_ok = (qqe_fast > qqe_slow) if direction == "LONG" else (qqe_fast < qqe_slow)
-        qqe_fresh   = qqe_bars_ago <= 6
+        qqe_fresh   = qqe_bars_ago <= self.qqe_max_bars
 
         if not qqe_side_ok:
             sens = "baissier" if direction == "LONG" else "haussier"
@@ -139,7 +207,7 @@ class GateChecker:
         if not qqe_fresh:
             return GateResult(
                 allowed      = False,
-                reason       = f"❌ GATE 4 FERMÉE — QQE croisement il y a {qqe_bars_ago} barres (max autorisé : 6)",
+                reason       = f"❌ GATE 4 FERMÉE — QQE croisement il y a {qqe_bars_ago} barres (max autorisé : {self.qqe_max_bars})",
                 gate1_sr     = True,
                 gate2_figure = True,
                 adx_ok       = True,
@@ -241,18 +309,9 @@ class GateChecker:
             htf2_aligned,                   # H4 dans le sens du trade
         ])
 
-        if confluence_score >= 6:
-            status = "🔥 SNIPER PARFAIT"
-        elif confluence_score >= 4:
-            status = "✅ SIGNAL FORT"
-        elif confluence_score >= 2:
-            status = "📊 SIGNAL VALIDE"
-        else:
-            status = "⚠️ SIGNAL FAIBLE — surveiller"
-
         return GateResult(
             allowed      = True,
-            reason       = f"{status} — confluence {confluence_score}/8",
+            reason       = self._status_reason(confluence_score),
             gate1_sr     = True,
             gate2_figure = True,
             adx_ok       = adx_ok,
@@ -260,3 +319,114 @@ class GateChecker:
             compression  = has_compression,
             warnings     = warnings,
         )
+
+    @staticmethod
+    def _status_reason(confluence_score: int) -> str:
+        """Raison d'un signal accepté, selon son score de confluence."""
+        if confluence_score >= 6:
+            status = "🔥 SNIPER PARFAIT"
+        elif confluence_score >= 4:
+            status = "✅ SIGNAL FORT"
+        elif confluence_score >= 2:
+            status = "📊 SIGNAL VALIDE"
+        else:
+            status = "⚠️ SIGNAL FAIBLE — surveiller"
+        return f"{status} — confluence {confluence_score}/8"
+
+    # ══════════════════════════════════════════════
+    # MODE BATCH — table colonnaire de signaux
+    # ══════════════════════════════════════════════
+
+    def check_batch(self, table) -> GateBatchResult:
+        """
+        Évalue les portes 1 à 5 et le score de confluence sur une table de
+        signaux candidats (une ligne = un signal, une colonne = une clé de
+        signal), avec les mêmes règles et valeurs par défaut que check().
+
+        table : pd.DataFrame, ou tout ce que pd.DataFrame accepte
+                (dict de colonnes, liste de dicts).
+        """
+        if not isinstance(table, pd.DataFrame):
+            table = pd.DataFrame(table)
+        n = len(table)
+
+        def truthy(key):
+            # bool(valeur), valeur absente (NaN) = False
+            if key not in table:
+                return np.zeros(n, dtype=bool)
+            col = table[key].to_numpy()
+            if col.dtype == bool:
+                return col
+            if col.dtype.kind in "iuf":
+                return (col != 0) & (col == col)
+            return col.astype(bool) & (col == col)
+
+        def number(key, default):
+            if key not in table:
+                return np.full(n, float(default))
+            return pd.to_numeric(table[key], errors="coerce").fillna(default).to_numpy(dtype=float)
+
+        def text(key):
+            # Les valeurs absentes ne valent jamais les libellés comparés,
+            # comme les défauts de check() ("NEUTRE", "1h", None)
+            if key not in table:
+                return np.full(n, None, dtype=object)
+            return table[key].to_numpy(dtype=object)
+
+        direction = text("direction")
+        long_     = direction == "LONG"
+        short_    = direction == "SHORT"
+
+        # PORTE 1 — Zone S/R
+        has_sr = truthy("sr_zone")
+
+        # PORTE 2 — Figure OU reversal, figure assez claire
+        has_pattern  = truthy("pattern")
+        has_reversal = truthy("reversal_candle")
+        clarity      = number("pattern_clarity", 0)
+        gate2 = (has_pattern | has_reversal) & ~(has_pattern & (clarity < 2))
+
+        # GATE 3 — ADX
+        adx      = number("adx", 0)
+        di_plus  = number("di_plus", 0)
+        di_minus = number("di_minus", 0)
+        gate3 = (adx >= self.min_adx) & np.where(long_, di_plus >= di_minus, di_minus >= di_plus)
+
+        # GATE 4 — QQE du bon côté et croisement récent
+        qqe_fast = number("qqe_fast", 0)
+        qqe_slow = number("qqe_slow", 0)
+        bars_ago = number("qqe_cross_bars_ago", 99).astype(int)
+        gate4 = np.where(long_, qqe_fast > qqe_slow, qqe_fast < qqe_slow) & (bars_ago <= self.qqe_max_bars)
+
+        # GATE 5 — HTF contre le signal sur M15/M30
+        tf    = text("timeframe")
+        gate5 = ~(((tf == "15m") | (tf == "30m")) & truthy("htf_blocked"))
+
+        # Première porte fermée (0 = aucune)
+        gates = np.stack([has_sr, gate2, gate3, gate4, gate5])
+        closed_gate = np.where(gates.all(axis=0), 0, np.argmin(gates, axis=0) + 1)
+        allowed = closed_gate == 0
+
+        # Score de confluence (signaux acceptés)
+        htf2_trend = text("htf2_trend")
+        htf2_aligned = (long_ & (htf2_trend == "BULLISH")) | (short_ & (htf2_trend == "BEARISH"))
+        compression = truthy("compression_zone")
+        confluence = (
+            1 + 1 + (has_pattern & has_reversal) + 1 + 1
+            + compression + truthy("htf_aligned") + htf2_aligned
+        )
+        confluence = np.where(allowed, confluence, 0)
+
+        passed = lambda gate: (closed_gate == 0) | (closed_gate > gate)
+        return GateBatchResult(
+            allowed      = allowed,
+            closed_gate  = closed_gate,
+            confluence   = confluence,
+            gate1_sr     = has_sr,
+            gate2_figure = passed(2),
+            adx_ok       = passed(3),
+            qqe_ok       = passed(4),
+            compression  = compression & allowed,
+            _table       = table,
+            _checker     = self,
+        )
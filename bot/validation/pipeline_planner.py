@@ -0,0 +1,208 @@
+"""
+pipeline_planner.py
+───────────────────
+Planification du pipeline de détection, par (paire, timeframe).
+
+Les portes 1 (zone S/R), 3 (ADX / DI), 4 (QQE) et 5 (HTF) ne dépendent que
+de la bougie courante et de la direction du signal, pas de la figure.
+Elles sont donc évaluées AVANT les détecteurs, pour chaque direction
+possible, en réutilisant le GateChecker (aucune règle dupliquée) :
+  - aucune direction ne peut passer → aucun détecteur n'est lancé
+  - seules LONG / SHORT passent     → le détecteur de compression
+                                      (signaux NEUTRE) est sauté, et
+                                      inversement
+
+Les deux contrôles de bougie (S/R d'un côté, indicateurs de l'autre) sont
+ordonnés par coût / taux de rejet mesurés : le moins cher et le plus
+sélectif d'abord. Le travail évité est estimé à partir des durées mesurées
+par ScanMetrics et journalisé à la fin de chaque scan.
+"""
+
+import logging
+import time
+from dataclasses import dataclass, field
+
+from bot.validation.gate_checker import GateChecker
+
+logger = logging.getLogger(__name__)
+
+# Directions émises par chaque famille de détecteurs
+DETECTOR_DIRECTIONS = {
+    "patterns"    : ("LONG", "SHORT"),
+    "candles"     : ("LONG", "SHORT"),
+    "harmonics"   : ("LONG", "SHORT"),
+    "compressions": ("NEUTRE",),
+}
+
+# Coût initial (ms / appel, 300 bougies) avant les premières mesures
+DEFAULT_COST_MS = {
+    "sr_zones"    : 1.0,
+    "indicators"  : 8.0,
+    "patterns"    : 2.0,
+    "candles"     : 0.7,
+    "harmonics"   : 0.8,
+    "compressions": 0.5,
+}
+
+
+@dataclass
+class FramePlan:
+    """Décision du planificateur pour une bougie (paire, timeframe)."""
+    sr_zones   : list = None             # None si non calculées
+    indicators : dict = None             # None si non calculés
+    directions : tuple = ()              # directions pouvant franchir les portes
+    closed_by  : str = ""                # contrôle ayant tout fermé ("" si ouvert)
+    detectors  : list = field(default_factory=list)
+
+    def runs(self, detector: str) -> bool:
+        return detector in self.detectors
+
+
+class PipelinePlanner:
+    """
+    Évalue les portes de bougie avant les détecteurs et comptabilise
+    le travail évité. Conservé d'un scan à l'autre (coûts appris).
+
+    Usage :
+        plan = planner.plan_frame(
+            tf,
+            sr_stage   = lambda: sr_det.detect(df),
+            ind_stage  = lambda: ind_eng.compute(df),
+            sniper     = lambda direction: matrix.sniper(pair, tf, direction),
+            metrics    = metrics,
+        )
+        if plan.runs("harmonics"): ...
+        planner.finish_scan(metrics.summary())
+    """
+
+    CHECKS = ("sr_zones", "indicators")
+
+    def __init__(self, gate: GateChecker = None):
+        self.gate = gate or GateChecker()
+        self._cost_ms = dict(DEFAULT_COST_MS)
+        # {contrôle: [évaluations, fermetures]} — cumulé sur tous les scans
+        self._checks = {name: [0, 0] for name in self.CHECKS}
+        # Étapes sautées pendant le scan en cours
+        self._skipped = {name: 0 for name in DEFAULT_COST_MS}
+        self._frames  = 0
+
+    # ------------------------------------------------------------------ #
+    #  Méthodes publiques                                                  #
+    # ------------------------------------------------------------------ #
+
+    def plan_frame(self, tf: str, sr_stage, ind_stage, sniper, metrics=None) -> FramePlan:
+        """
+        Évalue les portes de bougie dans l'ordre coût / sélectivité.
+
+        Args:
+            tf        : timeframe de la bougie
+            sr_stage  : callable → zones S/R (SRDetector.detect)
+            ind_stage : callable → indicateurs (IndicatorEngine.compute)
+            sniper    : callable(direction) → MTFResult (AlignmentMatrix.sniper)
+            metrics   : ScanMetrics optionnel (durées des étapes)
+
+        Returns:
+            FramePlan (zones, indicateurs, directions ouvertes, détecteurs à lancer)
+        """
+        self._frames += 1
+        plan = FramePlan()
+
+        for check in self.order():
+            start = time.perf_counter()
+            if check == "sr_zones":
+                plan.sr_zones = sr_stage()
+                opened = bool(plan.sr_zones)
+                items  = len(plan.sr_zones)
+            else:
+                plan.indicators = ind_stage()
+                plan.directions = self.open_directions(tf, plan.indicators, sniper)
+                opened = bool(plan.directions)
+                items  = len(plan.directions)
+            if metrics is not None:
+                metrics.observe(check, time.perf_counter() - start, items)
+
+            self._checks[check][0] += 1
+            if not opened:
+                self._checks[check][1] += 1
+                plan.closed_by = check
+                break
+
+        if plan.closed_by:
+            for stage in self.CHECKS:
+                if (plan.sr_zones if stage == "sr_zones" else plan.indicators) is None:
+                    self._skipped[stage] += 1
+            plan.directions = ()
+
+        for detector, directions in DETECTOR_DIRECTIONS.items():
+            if set(directions) & set(plan.directions):
+                plan.detectors.append(detector)
+            else:
+                self._skipped[detector] += 1
+
+        return plan
+
+    def open_directions(self, tf: str, indicators: dict, sniper) -> tuple:
+        """
+        Directions pour lesquelles les portes 3, 4 et 5 sont ouvertes.
+
+        Un signal sonde (zone S/R et figure nette) est passé au GateChecker :
+        seules les portes dépendant de la bougie peuvent alors le fermer.
+        """
+        probe = {
+            "sr_zone"            : True,
+            "pattern"            : "PLAN",
+            "pattern_clarity"    : 3,
+            "timeframe"          : tf,
+            "adx"                : indicators.get("adx", 0),
+            "di_plus"            : indicators.get("di_plus", 0),
+            "di_minus"           : indicators.get("di_minus", 0),
+            "qqe_fast"           : indicators.get("qqe_fast", 0),
+            "qqe_slow"           : indicators.get("qqe_slow", 0),
+            "qqe_cross_bars_ago" : indicators.get("qqe_cross_bars_ago", 99),
+        }
+        directions = []
+        for direction in ("LONG", "SHORT", "NEUTRE"):
+            probe["direction"]   = direction
+            probe["htf_blocked"] = sniper(direction).blocked
+            if self.gate.check(probe).allowed:
+                directions.append(direction)
+        return tuple(directions)
+
+    def order(self) -> list[str]:
+        """
+        Contrôles de bougie triés par coût / taux de rejet croissant
+        (taux lissé : (fermetures + 1) / (évaluations + 2)).
+        """
+        def rank(check):
+            evaluated, closed = self._checks[check]
+            return self._cost_ms[check] / ((closed + 1) / (evaluated + 2))
+        return sorted(self.CHECKS, key=rank)
+
+    def finish_scan(self, summary: dict = None) -> dict:
+        """
+        Journalise le travail évité pendant le scan, apprend les coûts
+        mesurés (résumé ScanMetrics) et remet les compteurs à zéro.
+
+        Returns:
+            {"frames", "skipped": {étape: n}, "avoided_ms", "order"}
+        """
+        for stage, stats in ((summary or {}).get("stages") or {}).items():
+            if stage in self._cost_ms and stats.get("calls"):
+                self._cost_ms[stage] = stats["mean_ms"]
+
+        avoided_ms = sum(n * self._cost_ms[stage] for stage, n in self._skipped.items())
+        report = {
+            "frames"    : self._frames,
+            "skipped"   : {stage: n for stage, n in self._skipped.items() if n},
+            "avoided_ms": round(avoided_ms, 1),
+            "order"     : self.order(),
+        }
+        logger.info(
+            "Planificateur : %d bougie(s), %d étape(s) sautée(s), ~%.0f ms évitées (%s)",
+            self._frames, sum(self._skipped.values()), avoided_ms,
+            ", ".join(f"{stage}×{n}" for stage, n in report["skipped"].items()) or "aucune",
+        )
+
+        self._skipped = {name: 0 for name in self._skipped}
+        self._frames  = 0
+        return report
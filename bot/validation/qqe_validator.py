@@ -5,7 +5,9 @@ Un croisement récent dans le bon sens est requis pour confirmer le signal.
 """
 
 import logging
-from dataclasses import dataclass
+from dataclasses import dataclass, field
+
+import numpy as np
 
 # Journalisation du module
 logger = logging.getLogger(__name__)
@@ -20,6 +22,29 @@ class QQEResult:
     bars_ago: int
 
 
+@dataclass
+class QQEBatchResult:
+    """
+    Résultat de QQEValidator.validate_batch : un élément par signal.
+    Les raisons sont construites à la demande par `reason(i)`.
+    """
+    valid: np.ndarray     # bool
+    quality: np.ndarray   # object, mêmes libellés que QQEResult
+    bars_ago: np.ndarray
+    _inputs: tuple = field(repr=False, default=())
+    _validator: "QQEValidator" = field(repr=False, default=None)
+
+    def __len__(self) -> int:
+        return len(self.valid)
+
+    def reason(self, i: int) -> str:
+        """Raison du signal i (identique à validate() sur ce signal)."""
+        qqe_fast, qqe_slow, bars_ago, direction = (column[i] for column in self._inputs)
+        return self._validator.validate(
+            float(qqe_fast), float(qqe_slow), 0.0, 0.0, int(bars_ago), str(direction)
+        ).reason
+
+
 class QQEValidator:
     """
     Valide le croisement QQE avant d'émettre un signal.
@@ -86,6 +111,46 @@ class QQEValidator:
         logger.error(reason)
         return QQEResult(valid=False, quality="CONTRE", reason=reason, bars_ago=bars_ago)
 
+    def validate_batch(self, qqe_fast, qqe_slow, bars_ago, direction) -> QQEBatchResult:
+        """
+        Version vectorisée de validate() pour un tableau de signaux.
+
+        Les valeurs précédentes (fast_prev / slow_prev) n'entrant pas dans le
+        verdict, elles ne sont pas demandées.
+
+        Args:
+            qqe_fast, qqe_slow: Tableaux des lignes QQE actuelles.
+            bars_ago:           Tableau du nombre de bougies depuis le croisement.
+            direction:          Tableau de directions "LONG" / "SHORT".
+
+        Returns:
+            QQEBatchResult (mêmes verdicts et qualités que validate()).
+        """
+        qqe_fast  = np.asarray(qqe_fast, dtype=float)
+        qqe_slow  = np.asarray(qqe_slow, dtype=float)
+        bars_ago  = np.asarray(bars_ago, dtype=int)
+        direction = np.char.upper(np.asarray(direction, dtype=str))
+
+        aligned = (
+            ((direction == "LONG") & (qqe_fast > qqe_slow))
+            | ((direction == "SHORT") & (qqe_fast < qqe_slow))
+        )
+        quality = np.select(
+            [~aligned, bars_ago >= self.BARS_TROP_TARD, bars_ago <= 1, bars_ago <= 3],
+            ["CONTRE", "TROP_TARD", "OPTIMAL", "BON"],
+            default="ACCEPTABLE",
+        ).astype(object)
+        valid = aligned & (bars_ago < self.BARS_TROP_TARD)
+
+        logger.debug("QQE batch : %d/%d signaux valides", int(valid.sum()), len(valid))
+        return QQEBatchResult(
+            valid=valid,
+            quality=quality,
+            bars_ago=bars_ago,
+            _inputs=(qqe_fast, qqe_slow, bars_ago, direction),
+            _validator=self,
+        )
+
     # ------------------------------------------------------------------
     # Méthodes privées par direction
     # ------------------------------------------------------------------
@@ -7,6 +7,8 @@ Scanner principal du bot.
   - manual    : enregistre un screenshot → prêt pour analyse Claude Code
   - semi-auto : capture écran Mac → circuit templates x TF → prêt pour Claude Code
   - batch     : prépare tous les screenshots d'un dossier pour analyse
+  - replay    : rejoue le pipeline du scan sur l'historique local et le backteste
+  - sweep     : rejoue l'historique pour une grille de seuils, classement des backtests
 
 L'analyse visuelle se fait directement dans Claude Code (pas d'API externe).
 
@@ -16,6 +18,8 @@ Usage :
   python scanner.py --mode manual --image sc.png --pair GBPUSD --tf H1
   python scanner.py --mode semi-auto --pair GBPUSD
   python scanner.py --mode batch --pair GBPUSD              Analyse toutes les captures
+  python scanner.py --mode replay --start 2024-01-01 --sync  Rejeu historique + backtest
+  python scanner.py --mode sweep --start 2024-01-01         Balayage des seuils (SWEEP_GRID)
 """
 
 import argparse
@@ -24,6 +28,7 @@ import os
 import sys
 import time
 import logging
+import threading
 import schedule
 from datetime import datetime
 from dotenv import load_dotenv
@@ -82,6 +87,14 @@ PAIRS = [
 
 TIMEFRAMES = ["15m", "30m", "1h", "4h"]
 
+# Timeframes supérieurs (contexte direct, tendance de fond) de chaque timeframe
+HTF_MAP = {
+    "15m": ("1h",  "4h"),
+    "30m": ("1h",  "4h"),
+    "1h" : ("4h",  "1d"),
+    "4h" : ("1d",  None),
+}
+
 EXCHANGE = "forex"           # "forex" = yfinance | "binance" = crypto CCXT
 
 MIN_ADX    = 20              # ADX minimum pour valider un signal
@@ -89,6 +102,47 @@ BLOCK_HTF  = False           # Bloquer si HTF contre la tendance ?
 
 TELEGRAM_TOKEN   = os.getenv("TELEGRAM_BOT_TOKEN", "")
 TELEGRAM_CHAT_ID = os.getenv("TELEGRAM_CHAT_ID",   "")
+ALERT_DIGEST_S   = 0         # > 0 : signaux reçus pendant N s regroupés en un message Telegram
+
+REPLAY_SYNC_LIMIT = 700      # Bougies demandées par série pour --sync (yfinance : ~60 jours en 15m / 30m)
+
+# Grille du mode sweep (une configuration par combinaison)
+SWEEP_GRID = {
+    "min_adx"            : [15, 20, 25],
+    "qqe_max_bars"       : [4, 6, 10],
+    "sr_tolerance"       : [0.002, 0.003],
+    "harmonic_tolerance" : [0.05, 0.08],
+    "compression_range"  : [0.01, 0.015],
+}
+
+# États conservés d'un scan à l'autre (mode --schedule) :
+# suivi des PRZ harmoniques et EMA de tendance par (paire, timeframe)
+_prz_tracker   = None
+_trend_service = None
+
+# Matrice d'alignement MTF du dernier scan (servie à l'interface web)
+_alignment_matrix = None
+
+# Métriques (portes / durées) du dernier scan, ou du scan en cours
+_scan_metrics = None
+
+# Planificateur du pipeline (coûts et sélectivité appris d'un scan à l'autre)
+_pipeline_planner = None
+
+# Scripts Pine / MQL4 déjà écrits (empreintes), pour ne réécrire que les changements
+_script_store = None
+
+# Envoi Telegram en arrière-plan (thread, session HTTP et file conservés)
+_alert_dispatcher = None
+
+# Empreintes des signaux déjà alertés (déduplication d'un scan à l'autre)
+_fingerprints = None
+
+# Dashboard (dernier contenu publié, pour ne changer la version du flux qu'à bon escient)
+_dashboard = None
+
+# Les états ci-dessus sont partagés : un seul scan à la fois (web + --schedule)
+_scan_lock = threading.Lock()
 
 
 # ══════════════════════════════════════════════════════════════════════
@@ -203,7 +257,23 @@ def run_batch(pair: str = None):
 # ══════════════════════════════════════════════════════════════════════
 
 def run_scan(pairs_override=None, tfs_override=None):
-    """Lance un scan complet sur toutes les paires et timeframes."""
+    """
+    Lance un scan complet sur toutes les paires et timeframes.
+
+    Les scans sont sérialisés : un appel concurrent attend la fin du scan en cours.
+    """
+    with _scan_lock:
+        return _run_scan(pairs_override, tfs_override)
+
+
+def scan_in_progress() -> bool:
+    """Vrai si un scan est en cours dans ce processus."""
+    return _scan_lock.locked()
+
+
+def _run_scan(pairs_override, tfs_override):
+    global _prz_tracker, _trend_service, _alignment_matrix, _scan_metrics, _pipeline_planner
+    global _script_store, _alert_dispatcher, _fingerprints, _dashboard
     pairs = pairs_override if pairs_override else PAIRS
     tfs   = tfs_override   if tfs_override   else TIMEFRAMES
     logger.info("=" * 55)
@@ -216,17 +286,24 @@ def run_scan(pairs_override=None, tfs_override=None):
         from bot.detection.pattern_detector import PatternDetector
         from bot.detection.candle_detector  import CandleDetector
         from bot.detection.harmonic_detector import HarmonicDetector
+        from bot.detection.harmonic_prz     import HarmonicPRZTracker
         from bot.detection.compression_detector import CompressionDetector
         from bot.detection.indicator_engine    import IndicatorEngine
-        from bot.detection.multi_timeframe     import MultiTimeframeAnalyzer
+        from bot.detection.multi_timeframe     import MultiTimeframeAnalyzer, AlignmentMatrix
+        from bot.detection.trend_service       import TrendService
         from bot.validation.gate_checker       import GateChecker
         from bot.validation.adx_validator      import ADXValidator
         from bot.validation.qqe_validator      import QQEValidator
+        from bot.validation.pipeline_planner   import PipelinePlanner
         from bot.entries.entry_calculator      import EntryCalculator
         from bot.drawers                        import registry as drawer_registry
         from bot.output.alert_manager          import AlertManager, Alert
+        from bot.output.alert_dispatcher       import AlertDispatcher
         from bot.output.dashboard_generator    import DashboardGenerator
         from bot.output.backtester             import Backtester
+        from bot.output.scan_metrics           import ScanMetrics
+        from bot.output.script_store           import ScriptStore
+        from bot.output.fingerprint_store      import FingerprintStore
     except ImportError as e:
         logger.error(f"Import manquant : {e}")
         logger.error("Lance d'abord : pip install -r requirements.txt")
@@ -237,52 +314,102 @@ def run_scan(pairs_override=None, tfs_override=None):
     pat_det     = PatternDetector()
     cdl_det     = CandleDetector()
     harm_det    = HarmonicDetector()
+    if _prz_tracker is None:
+        _prz_tracker = HarmonicPRZTracker(harm_det)
+    if _trend_service is None:
+        _trend_service = TrendService()
     comp_det    = CompressionDetector()
     ind_eng     = IndicatorEngine()
     mtf         = MultiTimeframeAnalyzer(block_counter_trend=BLOCK_HTF)
-    gate        = GateChecker()
+    gate        = GateChecker(min_adx=MIN_ADX)
+    if _pipeline_planner is None:
+        _pipeline_planner = PipelinePlanner(gate)
     adx_val     = ADXValidator(min_adx=MIN_ADX)
     qqe_val     = QQEValidator()
     calc        = EntryCalculator()
-    alerts      = AlertManager(TELEGRAM_TOKEN, TELEGRAM_CHAT_ID)
-    dashboard   = DashboardGenerator()
+    if _alert_dispatcher is None and TELEGRAM_TOKEN and TELEGRAM_CHAT_ID:
+        _alert_dispatcher = AlertDispatcher(
+            TELEGRAM_TOKEN, TELEGRAM_CHAT_ID, digest_window=ALERT_DIGEST_S,
+        )
+    alerts      = AlertManager(TELEGRAM_TOKEN, TELEGRAM_CHAT_ID, dispatcher=_alert_dispatcher)
+    if _script_store is None:
+        _script_store = ScriptStore()
+    _script_store.clear()
+    if _fingerprints is None:
+        _fingerprints = FingerprintStore()
+    if _dashboard is None:
+        _dashboard = DashboardGenerator()
+    dashboard   = _dashboard
+
+    metrics     = ScanMetrics()
+    _scan_metrics = metrics
 
     active_signals = []
 
+    # ── Chargement unique de chaque (paire, timeframe), HTF compris ──
+    universe_tfs = list(dict.fromkeys(
+        t for tf in tfs for t in (tf, *HTF_MAP.get(tf, ("4h", None))) if t
+    ))
+    frames = {}
+    for pair in pairs:
+        for tf in universe_tfs:
+            try:
+                with metrics.timer("fetch"):
+                    frames[(pair, tf)] = feed.get_ohlcv(pair, tf, limit=300)
+            except Exception as e:
+                logger.error(f"     Erreur données {pair} {tf} : {e}")
+
+    # ── Matrice d'alignement MTF (tendance / force / niveau HTF) ──
+    with metrics.timer("mtf_matrix"):
+        matrix = AlignmentMatrix.build(frames, _trend_service, sr_det, mtf, HTF_MAP)
+    _alignment_matrix = matrix
+
     for pair in pairs:
         for tf in tfs:
             try:
                 logger.info(f"  {pair} | {tf}")
 
-                df = feed.get_ohlcv(pair, tf, limit=300)
+                df = frames.get((pair, tf))
                 if df is None or len(df) < 50:
                     logger.warning(f"     Données insuffisantes")
                     continue
 
-                indicators = ind_eng.compute(df)
-                sr_zones = sr_det.detect(df)
-
-                patterns  = pat_det.detect(df, sr_zones)
-                candles   = cdl_det.detect(df, sr_zones)
-                harmonics = harm_det.detect(df, sr_zones)
-                compressions = comp_det.detect(df)
-
-                all_signals = patterns + candles + harmonics + compressions
+                # Le suivi des PRZ garde son état à jour même si la bougie est écartée
+                with metrics.timer("harmonic_prz") as stage:
+                    prz_alerts = _prz_tracker.update((pair, tf), df)
+                    stage.items = len(prz_alerts)
+
+                # Portes de bougie (S/R, ADX / DI, QQE, HTF) avant les détecteurs
+                plan = _pipeline_planner.plan_frame(
+                    tf,
+                    sr_stage  = lambda: sr_det.detect(df),
+                    ind_stage = lambda: ind_eng.compute(df),
+                    sniper    = lambda direction: matrix.sniper(pair, tf, direction),
+                    metrics   = metrics,
+                )
+                if plan.closed_by:
+                    logger.debug(f"     Portes fermées ({plan.closed_by}) — détecteurs sautés")
+                    continue
+                indicators, sr_zones = plan.indicators, plan.sr_zones
 
-                HTF_MAP = {
-                    "15m": ("1h",  "4h"),
-                    "30m": ("1h",  "4h"),
-                    "1h" : ("4h",  "1d"),
-                    "4h" : ("1d",  None),
+                detectors = {
+                    "patterns"    : lambda: pat_det.detect(df, sr_zones),
+                    "candles"     : lambda: cdl_det.detect(df, sr_zones),
+                    "harmonics"   : lambda: harm_det.detect(df, sr_zones) + prz_alerts,
+                    "compressions": lambda: comp_det.detect(df),
                 }
-                htf1_tf, htf2_tf = HTF_MAP.get(tf, ("4h", None))
-
-                df_htf1    = feed.get_ohlcv(pair, htf1_tf, limit=100)
-                htf1_trend = mtf.get_trend_from_data(df_htf1) if df_htf1 is not None else "NEUTRE"
-                htf1_sr    = sr_det.detect(df_htf1) if df_htf1 is not None else []
+                all_signals = []
+                for name, detect in detectors.items():
+                    if not plan.runs(name):
+                        continue
+                    with metrics.timer(name) as stage:
+                        found = detect()
+                        stage.items = len(found)
+                    all_signals += found
 
-                df_htf2    = feed.get_ohlcv(pair, htf2_tf, limit=100) if htf2_tf else None
-                htf2_trend = mtf.get_trend_from_data(df_htf2) if df_htf2 is not None else "NEUTRE"
+                htf1_tf, htf2_tf = HTF_MAP.get(tf, ("4h", None))
+                htf1_trend = matrix.trend(pair, htf1_tf)
+                htf2_trend = matrix.trend(pair, htf2_tf)
 
                 for sig in all_signals:
                     sig.update({
@@ -306,31 +433,21 @@ def run_scan(pairs_override=None, tfs_override=None):
                         "htf2_trend" : htf2_trend,
                     })
 
-                    htf_result = mtf.analyze_sniper(
-                        signal_tf  = tf,
-                        signal_dir = sig.get("direction", "LONG"),
-                        htf1_data  = {
-                            "trend"     : htf1_trend,
-                            "tf"        : htf1_tf,
-                            "sr_levels" : [z.get("price", 0) for z in htf1_sr],
-                            "price"     : df["close"].iloc[-1],
-                        },
-                        htf2_data  = {
-                            "trend" : htf2_trend,
-                            "tf"    : htf2_tf,
-                        } if htf2_tf else None,
-                    )
+                    htf_result = matrix.sniper(pair, tf, sig.get("direction", "LONG"))
                     sig["htf_label"]   = htf_result.label
                     sig["htf_aligned"] = htf_result.aligned
                     sig["htf_blocked"] = htf_result.blocked
 
-                    gate_result = gate.check(sig)
+                    with metrics.timer("gates"):
+                        gate_result = gate.check(sig)
+                    metrics.record_gate(sig.get("pattern"), gate_result)
                     if not gate_result.allowed:
                         logger.debug(f"     {gate_result.reason}")
                         continue
 
                     sig["confluence"] = gate_result.reason
-                    entry_result = calc.calculate(sig)
+                    with metrics.timer("entry"):
+                        entry_result = calc.calculate(sig)
                     sig.update({
                         "entry"    : entry_result.entry,
                         "sl"       : entry_result.stop_loss,
@@ -338,19 +455,27 @@ def run_scan(pairs_override=None, tfs_override=None):
                         "tp2"      : entry_result.tp2,
                         "rr_ratio" : entry_result.rr_ratio,
                     })
+                    qqe_status = "croisement" if sig.get("qqe_fast",0) > sig.get("qqe_slow",0) else ""
+                    sig["qqe_status"] = qqe_status
 
-                    drawing = drawer_registry.draw(sig)
-                    pine_path = f"outputs/tradingview/{pair.replace('/','_')}_{tf}_{sig.get('pattern','sig')}.pine"
-                    mql4_path = f"outputs/mt4/{pair.replace('/','_')}_{tf}_{sig.get('pattern','sig')}.mql4"
-                    os.makedirs("outputs/tradingview", exist_ok=True)
-                    os.makedirs("outputs/mt4", exist_ok=True)
-                    with open(pine_path, "w") as f:
-                        f.write(drawing.pine_script)
-                    with open(mql4_path, "w") as f:
-                        f.write(drawing.mql4_script)
+                    with metrics.timer("fingerprints") as stage:
+                        record, is_new = _fingerprints.observe(sig)
+                        stage.items = int(not is_new)
+
+                    # Dessin toujours ajouté au script groupé : un setup déjà
+                    # alerté reste tracé (script inchangé = ni réécriture ni envoi)
+                    with metrics.timer("drawing"):
+                        drawing = drawer_registry.draw(sig)
+                    pine_path = _script_store.add(pair, tf, drawing)
                     sig["pine_file"] = pine_path
+                    record.pine_file = pine_path
+
+                    # Setup déjà alerté : empreinte mise à jour, pas de nouvelle alerte
+                    if not is_new:
+                        logger.debug(f"     Déjà signalé ({record.hits}×) : {record.fingerprint}")
+                        active_signals.append(sig)
+                        continue
 
-                    qqe_status = "croisement" if sig.get("qqe_fast",0) > sig.get("qqe_slow",0) else ""
                     alert = Alert(
                         pair        = pair,
                         timeframe   = tf,
@@ -367,21 +492,121 @@ def run_scan(pairs_override=None, tfs_override=None):
                         compression = sig.get("compression_zone", False),
                         pine_file   = pine_path,
                     )
-                    alerts.send(alert)
-                    if TELEGRAM_TOKEN:
-                        alerts.send_pine_script(pair, tf, pine_path)
+                    with metrics.timer("alerts"):
+                        alerts.send(alert)
 
-                    sig["qqe_status"] = qqe_status
                     active_signals.append(sig)
 
+                # Scripts du graphique : écrits et envoyés seulement s'ils ont changé
+                with metrics.timer("scripts"):
+                    written = _script_store.flush(pair, tf)
+                    if written and written.pine_changed and TELEGRAM_TOKEN:
+                        alerts.send_pine_script(pair, tf, written.pine_path)
+
             except Exception as e:
                 logger.error(f"     Erreur {pair} {tf} : {e}", exc_info=True)
 
-    dashboard.generate(active_signals)
+    # Digest Telegram en attente : envoyé en arrière-plan, le scan n'attend pas
+    alerts.flush(timeout=0)
+    _fingerprints.save()
+
+    with metrics.timer("dashboard"):
+        dashboard.generate(active_signals)
     logger.info(f"\nScan terminé — {len(active_signals)} signaux | Dashboard: outputs/dashboard.html\n")
+
+    summary = metrics.summary()
+    summary["planner"] = _pipeline_planner.finish_scan(summary)
+    logger.info(f"Métriques du scan : {json.dumps(summary, ensure_ascii=False)}")
+    try:
+        with open("outputs/scan_metrics.json", "w") as f:
+            json.dump(summary, f, indent=2, ensure_ascii=False)
+    except OSError as e:
+        logger.error(f"Écriture des métriques impossible : {e}")
     return active_signals
 
 
+def latest_alignment_matrix() -> dict | None:
+    """Matrice d'alignement MTF du dernier scan, sérialisée pour la heatmap web."""
+    return _alignment_matrix.to_dict() if _alignment_matrix is not None else None
+
+
+def latest_scan_metrics() -> dict | None:
+    """Résumé des métriques du dernier scan (ou du scan en cours)."""
+    return _scan_metrics.summary() if _scan_metrics is not None else None
+
+
+# ══════════════════════════════════════════════════════════════════════
+# MODE 5 : REPLAY — Rejeu walk-forward du scan sur l'historique local
+# ══════════════════════════════════════════════════════════════════════
+
+def run_replay(pairs=None, tfs=None, start=None, end=None, sync=False):
+    """
+    Rejoue run_scan bougie par bougie sur l'historique du BarStore
+    (outputs/bars) et backteste les signaux qu'il aurait émis.
+
+    sync=True : complète d'abord l'historique via le MarketFeed, timeframes
+    HTF compris. Rapport écrit dans outputs/replay_report.json.
+    """
+    from bot.data.bar_store          import BarStore
+    from bot.output.replay_engine    import ReplayEngine
+    from bot.validation.gate_checker import GateChecker
+
+    pairs = pairs or PAIRS
+    tfs   = tfs or TIMEFRAMES
+    store = BarStore()
+
+    if sync:
+        from bot.data.market_feed import MarketFeed
+        feed = MarketFeed(exchange_id=EXCHANGE)
+        universe_tfs = list(dict.fromkeys(
+            t for tf in tfs for t in (tf, *HTF_MAP.get(tf, ("4h", None))) if t
+        ))
+        # Bougies fines : départage SL / TP d'une même bougie au backtest
+        universe_tfs += ["5m", "1m"]
+        for pair in pairs:
+            for tf in universe_tfs:
+                try:
+                    added = store.sync(feed, pair, tf, limit=REPLAY_SYNC_LIMIT)
+                    logger.info(f"Historique {pair} {tf} : {added} bougie(s) ajoutée(s)")
+                except Exception as e:
+                    logger.error(f"Synchronisation {pair} {tf} impossible : {e}")
+
+    engine = ReplayEngine(store, HTF_MAP, block_htf=BLOCK_HTF, gate=GateChecker(min_adx=MIN_ADX))
+    report = engine.run(pairs, tfs, start=start, end=end)
+    report.print()
+
+    try:
+        with open("outputs/replay_report.json", "w") as f:
+            json.dump(report.summary(), f, indent=2, ensure_ascii=False)
+    except OSError as e:
+        logger.error(f"Écriture du rapport de rejeu impossible : {e}")
+    return report
+
+
+# ══════════════════════════════════════════════════════════════════════
+# MODE 6 : SWEEP — Balayage des seuils sur l'historique local
+# ══════════════════════════════════════════════════════════════════════
+
+def run_sweep(pairs=None, tfs=None, start=None, end=None, workers=None, grid=None):
+    """
+    Rejoue l'historique du BarStore pour chaque combinaison de `grid`
+    (défaut : SWEEP_GRID) sur un pool de processus, et classe les
+    configurations par PnL du backtest. Table écrite dans outputs/param_sweep.csv.
+    """
+    from bot.data.bar_store       import BarStore
+    from bot.output.param_sweep   import ParamSweep
+
+    sweep = ParamSweep(
+        BarStore(), HTF_MAP, pairs or PAIRS, tfs or TIMEFRAMES,
+        start=start, end=end, block_htf=BLOCK_HTF,
+        base={"min_adx": MIN_ADX}, workers=workers,
+    )
+    table = sweep.run(grid or SWEEP_GRID)
+    if len(table):
+        print("\n" + table.head(20).to_string(index=False))
+    return table
+
+
 def _resolve_pair(arg: str) -> str | None:
     """Convertit un argument CLI en paire reconnue (ex: EURUSD -> EUR/USD)."""
     arg = arg.upper().strip()
@@ -408,13 +633,14 @@ Exemples :
   python scanner.py --mode manual --image sc.png --pair GBPUSD --tf H1
   python scanner.py --mode semi-auto --pair GBPUSD          Capture circuit MT4
   python scanner.py --mode batch --pair GBPUSD              Liste screenshots prêts
+  python scanner.py --mode replay --pair EURUSD --start 2024-01-01
         """
     )
 
     parser.add_argument("legacy_pair", nargs="?", default=None,
                         help="Paire pour scan API (mode legacy, ex: EURUSD)")
     parser.add_argument("--mode", "-m",
-                        choices=["manual", "semi-auto", "batch", "api-scan"],
+                        choices=["manual", "semi-auto", "batch", "api-scan", "replay", "sweep"],
                         default=None,
                         help="Mode d'analyse")
     parser.add_argument("--image", "-i", type=str,
@@ -426,6 +652,16 @@ Exemples :
     parser.add_argument("--template", type=str, default="Momentum",
                         choices=["Momentum", "RSI", "EXTREM_MONEY", "Harmoniques"],
                         help="Template MT4 (mode manual)")
+    parser.add_argument("--start", type=str, default=None,
+                        help="Début du rejeu (mode replay, ex: 2024-01-01)")
+    parser.add_argument("--end", type=str, default=None,
+                        help="Fin du rejeu, exclue (mode replay)")
+    parser.add_argument("--timeframes", nargs="+", default=None,
+                        help="Timeframes rejoués (mode replay, ex: 1h 4h)")
+    parser.add_argument("--sync", action="store_true",
+                        help="Complète l'historique local avant le rejeu (mode replay)")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="Processus du balayage (mode sweep, défaut : nombre de CPU)")
 
     args = parser.parse_args()
 
@@ -481,6 +717,20 @@ Exemples :
         run_batch(pair)
         return
 
+    # ── MODES REPLAY / SWEEP ────────────────────────────
+    if mode in ("replay", "sweep"):
+        pairs = None
+        if args.pair:
+            pair = _resolve_pair(args.pair)
+            if pair is None:
+                parser.error(f"Paire inconnue : '{args.pair}'")
+            pairs = [pair]
+        if mode == "replay":
+            run_replay(pairs, args.timeframes, start=args.start, end=args.end, sync=args.sync)
+        else:
+            run_sweep(pairs, args.timeframes, start=args.start, end=args.end, workers=args.workers)
+        return
+
     # ── MODE API-SCAN (existant) ────────────────────────
     single_pair = None
     pair_arg = args.legacy_pair or args.pair
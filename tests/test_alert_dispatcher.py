@@ -0,0 +1,133 @@
+"""
+AlertDispatcher contre un serveur HTTP local (bouchon de l'API Telegram) :
+attente retry_after sur 429, nouvelles tentatives sur 5xx, découpage du
+digest sous MAX_TEXT, file pleine sans blocage du scan.
+"""
+
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from bot.output import alert_dispatcher
+from bot.output.alert_dispatcher import MAX_TEXT, AlertDispatcher
+
+
+class _StubTelegram:
+    """Serveur local : répond avec les statuts prévus, puis 200 ; enregistre les requêtes."""
+
+    def __init__(self, responses=()):
+        self.responses = list(responses)        # [(statut, corps JSON)]
+        self.requests: list[tuple[float, str, dict]] = []
+        self.received = threading.Event()       # au moins une requête reçue
+        self.release = threading.Event()        # les réponses attendent cet événement
+        self.release.set()
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+                stub.requests.append((time.monotonic(), self.path, json.loads(body or b"{}")))
+                stub.received.set()
+                stub.release.wait(10)
+                status, payload = stub.responses.pop(0) if stub.responses else (200, {"ok": True})
+                raw = json.dumps(payload).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(raw)))
+                self.end_headers()
+                self.wfile.write(raw)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def texts(self) -> list[str]:
+        return [data["text"] for _, _, data in self.requests]
+
+    def close(self):
+        self.release.set()
+        self.server.shutdown()
+        self.server.server_close()
+
+
+@pytest.fixture
+def stub():
+    server = _StubTelegram()
+    yield server
+    server.close()
+
+
+def _dispatcher(stub, **kwargs) -> AlertDispatcher:
+    kwargs.setdefault("min_interval", 0.0)
+    kwargs.setdefault("timeout", 5.0)
+    return AlertDispatcher("TOKEN", "42", api_base=stub.url, **kwargs)
+
+
+def test_429_waits_retry_after(stub):
+    stub.responses = [(429, {"ok": False, "parameters": {"retry_after": 0.3}})]
+    dispatcher = _dispatcher(stub)
+    assert dispatcher.send_message("signal")
+    assert dispatcher.flush(timeout=5)
+    dispatcher.close()
+
+    (first, path, _), (second, _, data) = stub.requests
+    assert path == "/botTOKEN/sendMessage" and data["text"] == "signal"
+    assert second - first >= 0.3
+    assert dispatcher.stats["retried"] == 1 and dispatcher.stats["sent"] == 1
+
+
+def test_5xx_retries_up_to_max_retries(stub, monkeypatch):
+    stub.responses = [(503, {"ok": False})] * 10
+    delays = []
+    real_sleep = time.sleep
+    monkeypatch.setattr(alert_dispatcher.time, "sleep", lambda s: (delays.append(s), real_sleep(0))[1])
+
+    dispatcher = _dispatcher(stub, max_retries=3)
+    dispatcher.send_message("signal")
+    assert dispatcher.flush(timeout=5)
+    dispatcher.close()
+
+    assert len(stub.requests) == 4                      # 1 envoi + max_retries essais
+    assert delays == [1, 2, 4]                          # attente exponentielle
+    assert dispatcher.stats["failed"] == 1 and dispatcher.stats["retried"] == 3
+
+
+def test_digest_is_split_under_max_text(stub):
+    dispatcher = _dispatcher(stub, digest_window=60, digest_max=10)
+    texts = [f"signal {i} " + "x" * 1500 for i in range(5)]
+    for text in texts:
+        assert dispatcher.send_message(text, digest=True)
+    assert dispatcher.flush(timeout=5)
+    dispatcher.close()
+
+    sent = stub.texts()
+    assert len(sent) == 3
+    assert all(len(text) <= MAX_TEXT for text in sent)
+    assert all(text.startswith("🤖 *5 SIGNAUX*") for text in sent)
+    positions = ["".join(sent).index(f"signal {i} ") for i in range(5)]
+    assert positions == sorted(positions)                # ordre de dépôt conservé
+    assert dispatcher.stats["digests"] == 1
+
+
+def test_full_queue_drops_and_counts(stub):
+    stub.release.clear()                               # le premier envoi reste bloqué
+    dispatcher = _dispatcher(stub, max_queue=1)
+    assert dispatcher.send_message("premier")
+    assert stub.received.wait(5)                       # le thread d'envoi est occupé
+
+    assert dispatcher.send_message("en file")
+    start = time.monotonic()
+    assert not dispatcher.send_message("abandonné")
+    assert time.monotonic() - start < 0.5              # le scan n'est pas bloqué
+    assert dispatcher.stats["dropped"] == 1
+
+    stub.release.set()
+    assert dispatcher.flush(timeout=5)
+    dispatcher.close()
+    assert stub.texts() == ["premier", "en file"]
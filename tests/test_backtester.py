@@ -0,0 +1,102 @@
+"""
+Backtester.simulate (vectorisé) comparé à la simulation bougie par bougie
+d'origine : même bougie d'entrée, même issue, même PnL, même durée.
+"""
+
+import numpy as np
+import pandas as pd
+
+from bot.output.backtester import Backtester
+
+MAX_BARS = 50
+
+
+def _bars(seed: int, n: int = 600) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.005, n)))
+    open_ = np.r_[close[0], close[:-1]]
+    return pd.DataFrame({
+        "timestamp": pd.date_range("2024-01-01", periods=n, freq="h"),
+        "open": open_,
+        "high": np.maximum(open_, close) * (1 + np.abs(rng.normal(0, 0.003, n))),
+        "low":  np.minimum(open_, close) * (1 - np.abs(rng.normal(0, 0.003, n))),
+        "close": close, "volume": 1.0,
+    })
+
+
+def _signals(seed: int, df: pd.DataFrame, count: int) -> list[dict]:
+    """Signaux aléatoires : horodatages exacts, décalés, à mi-chemin ou illisibles."""
+    rng = np.random.default_rng(seed)
+    times = df["timestamp"]
+    signals = []
+    for _ in range(count):
+        bar = int(rng.integers(0, len(df)))
+        kind = rng.integers(0, 5)
+        if kind == 0:
+            timestamp = str(times[bar])
+        elif kind == 1:
+            timestamp = (times[bar] + pd.Timedelta(minutes=int(rng.integers(-29, 30)))).strftime("%Y-%m-%d %H:%M")
+        elif kind == 2:
+            timestamp = times[bar] + pd.Timedelta(minutes=30)          # égalité entre deux bougies
+        else:
+            timestamp = ["14:30", "", None, "n/a"][int(rng.integers(0, 4))]
+
+        entry = float(df["close"][bar])
+        direction = "LONG" if rng.random() < 0.5 else "SHORT"
+        side = 1 if direction == "LONG" else -1
+        risk = entry * rng.uniform(0.002, 0.02)
+        signals.append({
+            "timestamp": timestamp, "pair": "EURUSD", "pattern": "TEST", "direction": direction,
+            "entry": entry, "sl": entry - side * risk,
+            "tp1": entry + side * risk * rng.uniform(0.5, 1.5) if rng.random() < 0.8 else None,
+            "tp2": entry + side * risk * rng.uniform(1.5, 4.0), "rr_ratio": 2.0,
+        })
+    return signals
+
+
+def _bar_by_bar(sig: dict, df: pd.DataFrame, risk_pct: float = 1.0) -> tuple:
+    """Règles d'origine : bougie la plus proche (égalité → la plus récente), puis SL > TP2 > TP1."""
+    entry, sl, tp1, tp2 = sig["entry"], sig["sl"], sig["tp1"], sig["tp2"]
+    stamp = sig["timestamp"]
+    if isinstance(stamp, str) and "-" in stamp:
+        stamp = pd.Timestamp(stamp)
+    if isinstance(stamp, pd.Timestamp):
+        gap = np.abs((df["timestamp"] - stamp).dt.total_seconds().to_numpy())
+        entry_idx = int(np.flatnonzero(gap == gap.min())[-1])
+    else:
+        entry_idx = len(df) - MAX_BARS
+
+    risk = abs(entry - sl)
+    result, pnl, held = "PENDING", 0.0, 0
+    future = df.iloc[entry_idx + 1:entry_idx + 1 + MAX_BARS]
+    for i, (high, low) in enumerate(zip(future["high"], future["low"])):
+        held = i + 1
+        adverse, favour = (low, high) if sig["direction"] == "LONG" else (-high, -low)
+        side = 1 if sig["direction"] == "LONG" else -1
+        if adverse <= side * sl:
+            result, pnl = "LOSS", -risk_pct
+            break
+        if favour >= side * tp2:
+            result, pnl = "WIN_TP2", risk_pct * abs(tp2 - entry) / risk
+            break
+        if tp1 and favour >= side * tp1:
+            result, pnl = "WIN_TP1", risk_pct * abs(tp1 - entry) / risk * 0.5
+            break
+    return result, round(pnl, 3), held
+
+
+def test_simulate_matches_bar_by_bar():
+    backtester = Backtester(max_bars=MAX_BARS)
+    for seed in range(3):
+        df = _bars(seed)
+        signals = _signals(seed, df, 1000)
+        trades = backtester.simulate(signals, df)
+        for sig, trade in zip(signals, trades):
+            assert (trade.result, trade.pnl_pct, trade.bars_held) == _bar_by_bar(sig, df)
+
+
+def test_time_only_timestamp_uses_fallback_bar():
+    df = _bars(0)
+    backtester = Backtester(max_bars=MAX_BARS)
+    bars = backtester._entry_bars(["14:30", "2024-01-02 03:10", ""], df)
+    assert bars.tolist() == [len(df) - MAX_BARS, 27, len(df) - MAX_BARS]
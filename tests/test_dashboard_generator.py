@@ -0,0 +1,34 @@
+"""
+Flux versionné du DashboardGenerator : la version ne change qu'avec le
+contenu, y compris après recréation du générateur (redémarrage).
+"""
+
+import json
+
+from bot.output.dashboard_generator import DashboardGenerator
+
+SIGNAL = {
+    "pair": "EURUSD", "timeframe": "1h", "pattern": "SHARK_BULLISH", "direction": "LONG",
+    "entry": 1.10, "sl": 1.00, "tp1": 1.20, "tp2": 1.30, "rr_ratio": 2.0,
+}
+
+
+def _version(generator: DashboardGenerator) -> int:
+    with open(generator.feed_path, encoding="utf-8") as f:
+        raw = f.read()
+    return json.loads(raw[raw.index("(") + 1:raw.rindex(")")])["version"]
+
+
+def test_feed_version_only_bumps_on_change(tmp_path):
+    path = str(tmp_path / "dashboard.html")
+    generator = DashboardGenerator(path)
+    generator.generate([SIGNAL])
+    assert _version(generator) == 1
+
+    generator.generate([SIGNAL])
+    restarted = DashboardGenerator(path)
+    restarted.generate([SIGNAL])
+    assert _version(restarted) == 1
+
+    restarted.generate([{**SIGNAL, "entry": 1.11}])
+    assert _version(restarted) == 2
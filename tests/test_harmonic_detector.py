@@ -0,0 +1,111 @@
+"""
+Recherche XABCD du HarmonicDetector : les figures des fenêtres de points
+consécutifs du zigzag sont trouvées, et aucune jambe n'enjambe un pivot
+plus extrême que ses propres extrémités.
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from bot.detection.harmonic_detector import HarmonicDetector
+
+
+def _path(vertices: list[tuple[int, float]], spread: float = 0.05) -> pd.DataFrame:
+    """Bougies suivant une ligne brisée passant par (bougie, prix)."""
+    bars, prices = zip(*vertices)
+    close = np.interp(np.arange(bars[-1] + 1), bars, prices)
+    return pd.DataFrame({
+        "open": close, "high": close + spread, "low": close - spread,
+        "close": close, "volume": 1.0,
+    })
+
+
+def _random_walk(seed: int, n: int = 400) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, n)))
+    open_ = np.r_[close[0], close[:-1]]
+    high = np.maximum(open_, close) * (1 + np.abs(rng.normal(0, 0.003, n)))
+    low  = np.minimum(open_, close) * (1 - np.abs(rng.normal(0, 0.003, n)))
+    return pd.DataFrame({"open": open_, "high": high, "low": low, "close": close, "volume": 1.0})
+
+
+def _cases():
+    for seed in range(40):
+        df = _random_walk(seed)
+        for cut in range(100, 400, 20):
+            yield df.iloc[:cut]
+
+
+def _consecutive_matches(det: HarmonicDetector, zigzag: np.ndarray) -> set[tuple[str, int]]:
+    """Figures des fenêtres de 5 points consécutifs dont D est récent : {(figure, D_bar)}."""
+    prices, found = zigzag["price"], set()
+    n = len(prices)
+    for start in range(max(n - 4 - det.D_LAST_POINTS + 1, 0), n - 4):
+        x, a, b, c, d = prices[start:start + 5]
+        xa = abs(a - x)
+        ratios = {
+            "AB_XA": abs(b - a) / xa, "BC_AB": abs(c - b) / abs(b - a),
+            "CD_BC": abs(d - c) / abs(c - b), "XD_XA": abs(d - x) / xa, "CD_XA": abs(d - c) / xa,
+        }
+        for name, rules in det.pattern_rules.items():
+            if not all(low <= ratios[key] <= high for key, (low, high) in rules.items()):
+                continue
+            if name == "SHARK":
+                side = "BULLISH" if d < min(x, a) else "BEARISH" if d > max(x, a) else None
+            else:
+                side = "BULLISH" if d < x else "BEARISH" if d > x else None
+            if side:
+                found.add((f"{name}_{side}", int(zigzag["idx"][start + 4])))
+    return found
+
+
+def test_clean_shark_is_found():
+    # O=100, X=90, A=103 (AB/XA 1.3), B=77 (BC/AB 2.0), C=87 (CD/XA 1.0)
+    df = _path([(0, 95), (15, 100), (27, 90), (40, 103), (60, 77), (72, 87), (78, 84)])
+    signals = HarmonicDetector().detect(df, [])
+    assert ("SHARK_BULLISH", 72) in {(s["pattern"], s["D_bar"]) for s in signals}
+
+
+def test_shark_beyond_twenty_zigzag_points_is_found():
+    # Même Shark, jambe B→C découpée en 10 rebonds : X est à plus de 20 points de D
+    vertices, bar, price = [(0, 95), (4, 100), (12, 90), (22, 103)], 22, 103.0
+    for _ in range(10):
+        bar, price = bar + 3, price - 3.0
+        vertices.append((bar, price))
+        bar, price = bar + 3, price + 1.0
+        vertices.append((bar, price))
+    vertices += [(bar + 4, 77), (bar + 12, 87), (bar + 16, 85)]
+
+    det = HarmonicDetector()
+    zigzag = det.build_zigzag(_path(vertices))
+    assert len(zigzag) > 20
+    signals = det.detect(_path(vertices), [])
+    assert ("SHARK_BULLISH", 4, 94) in {(s["pattern"], s["X_bar"], s["D_bar"]) for s in signals}
+
+
+@pytest.mark.parametrize("seed", [0, 7, 21])
+def test_consecutive_windows_still_found(seed):
+    det = HarmonicDetector()
+    df = _random_walk(seed)
+    for cut in range(100, 400, 5):
+        window = df.iloc[:cut].tail(100).reset_index(drop=True)
+        expected = _consecutive_matches(det, det.build_zigzag(window))
+        found = {(s["pattern"], s["D_bar"]) for s in det.detect(window, [])}
+        assert expected <= found
+
+
+def test_legs_never_skip_a_more_extreme_pivot():
+    det = HarmonicDetector()
+    for df in _cases():
+        window = df.tail(100).reset_index(drop=True)
+        zigzag = det.build_zigzag(window)
+        position = {int(bar): i for i, bar in enumerate(zigzag["idx"])}
+        prices = zigzag["price"]
+        for sig in det.detect(window, []):
+            points = [position[sig[f"{p}_bar"]] for p in "XABCD"]
+            assert points[-1] >= len(zigzag) - det.D_LAST_POINTS
+            for i, j in zip(points, points[1:]):
+                span = prices[i:j + 1]
+                assert (j - i) % 2 == 1
+                assert {prices[i], prices[j]} == {span.min(), span.max()}
@@ -0,0 +1,60 @@
+"""
+Modes historiques des détecteurs utilisés par le rejeu : chaque bougie
+évaluée donne exactement ce que detect() retourne sur l'historique arrêté
+à cette bougie.
+"""
+
+import numpy as np
+import pandas as pd
+
+from bot.detection.candle_detector import CandleDetector
+from bot.detection.compression_detector import CompressionDetector
+
+
+def _bars(seed: int, n: int = 900) -> pd.DataFrame:
+    """Marche aléatoire alternant phases calmes (compressions) et agitées."""
+    rng = np.random.default_rng(seed)
+    vol = np.where((np.arange(n) // 60) % 3 == 0, 0.0005, 0.004)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, vol)))
+    open_ = np.r_[close[0], close[:-1]]
+    high = np.maximum(open_, close) * (1 + np.abs(rng.normal(0, 0.001, n)))
+    low  = np.minimum(open_, close) * (1 - np.abs(rng.normal(0, 0.001, n)))
+    return pd.DataFrame({"open": open_, "high": high, "low": low, "close": close, "volume": 1.0})
+
+
+def _zones_at(df: pd.DataFrame):
+    """Zones S/R propres à chaque bougie : quantiles des 100 dernières clôtures."""
+    close = df["close"].to_numpy()
+
+    def zones_at(t: int) -> list:
+        levels = np.quantile(close[max(t - 99, 0):t + 1], [0.1, 0.5, 0.9])
+        return [{"price": float(p), "type": kind}
+                for p, kind in zip(levels, ("support", "resistance", "support"))]
+    return zones_at
+
+
+def test_candle_history_matches_detect():
+    det = CandleDetector()
+    for seed in range(3):
+        df = _bars(seed)
+        zones_at = _zones_at(df)
+        ends = np.arange(20, len(df), 2)
+        got: dict[int, list] = {}
+        for sig in det.detect_history(df, ends=ends, zones_at=zones_at):
+            got.setdefault(sig.pop("bar"), []).append(sig)
+        assert got
+        for t in ends:
+            assert got.get(int(t), []) == det.detect(df.iloc[:t + 1], zones_at(int(t)))
+
+
+def test_compression_detect_at_matches_detect():
+    det = CompressionDetector()
+    det.SEUIL_RANGE = 0.03
+    for seed in range(3):
+        df = _bars(seed)
+        ends = np.arange(0, len(df), 3)
+        got = {c.pop("bar"): c for c in det.detect_at(df, ends)}
+        assert got
+        for t in ends:
+            expected = det.detect(df.iloc[:t + 1])
+            assert got.get(int(t)) == (expected[0] if expected else None)
@@ -0,0 +1,31 @@
+"""
+Script Pine groupé du ScriptStore : plusieurs biseaux / triangles sur un même
+graphique ne redéclarent pas les mêmes variables.
+"""
+
+import re
+
+from bot.drawers.chart_drawers import FallingWedgeDrawer, RisingWedgeDrawer
+from bot.output.script_store import ScriptStore
+
+
+def _wedge(drawer, resistance_end: float):
+    return drawer().draw({
+        "wedge_start_bar": 10, "resistance_start": 110, "resistance_end": resistance_end,
+        "support_start": 100, "support_end": 103, "atr": 1,
+    })
+
+
+def test_bundle_scopes_each_drawing_variables(tmp_path):
+    store = ScriptStore(pine_dir=str(tmp_path / "pine"), mql4_dir=str(tmp_path / "mql4"))
+    for drawer, end in ((RisingWedgeDrawer, 105), (RisingWedgeDrawer, 106), (FallingWedgeDrawer, 107)):
+        store.add("EURUSD", "1h", _wedge(drawer, end))
+    written = store.flush("EURUSD", "1h")
+
+    with open(written.pine_path, encoding="utf-8") as f:
+        script = f.read()
+    declared = re.findall(r"^var (\w+)", script, re.M)
+    assert written.signals == 3
+    assert len(declared) == 6 and len(set(declared)) == 6
+    assert "linefill.new(r_line_2, s_line_2," in script
+    assert script.count("//@version") == 1
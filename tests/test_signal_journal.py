@@ -0,0 +1,161 @@
+"""
+SignalJournal comparé à un filtrage brut des signaux ajoutés : read() et
+aggregate() donnent les mêmes résultats à travers rotations, compactions,
+rechargement de l'index et suppression de segments (compteurs archivés).
+"""
+
+from collections import Counter
+from datetime import datetime, timedelta
+
+import numpy as np
+import pytest
+
+from bot.output.signal_journal import AGGREGATE_FIELDS, SignalJournal
+
+BASE = datetime(2026, 10, 1)
+
+WINDOWS = [
+    (None, None),
+    ("2026-10-05 08:00", "2026-10-05 17:30"),                  # même jour
+    ("2026-10-03 14:10", "2026-10-07 00:00"),                  # fin à minuit
+    ("2026-10-04 00:00", "2026-10-09 09:15"),                  # début à minuit
+    ("2026-10-04 00:00", "2026-10-06 00:00"),                  # jours entiers
+    (None, "2026-10-06 12:00"),
+    ("2026-10-08 06:00", None),
+    (datetime(2026, 10, 2, 23, 59), datetime(2026, 10, 3, 0, 1)),
+    ("2026-09-20 00:00", "2026-09-25 00:00"),                  # avant le journal
+]
+
+
+def _entries(seed: int, n: int = 1500) -> list[dict]:
+    """Signaux à horodatages uniques, globalement croissants avec ~10 % de retards."""
+    rng = np.random.default_rng(seed)
+    minutes = np.sort(rng.choice(20 * 24 * 60, size=n, replace=False))
+    late = np.flatnonzero(rng.random(n) < 0.1)
+    order = np.arange(n)
+    for i in late:                                   # arrive quelques signaux plus tard
+        j = min(i + int(rng.integers(1, 8)), n - 1)
+        order[[i, j]] = order[[j, i]]
+    entries = []
+    for k, m in enumerate(minutes[order]):
+        stamp = BASE + timedelta(minutes=int(m))
+        entries.append({
+            "id": k,
+            "timestamp": stamp.strftime("%Y-%m-%d %H:%M"),
+            "pair": str(rng.choice(["EUR/USD", "GBP/USD", "XAU/USD"])),
+            "pattern": str(rng.choice(["DOUBLE_TOP", "SHARK_BULLISH", "DOJI"])),
+            "direction": str(rng.choice(["LONG", "SHORT"])),
+            "result": str(rng.choice(["", "WIN_TP1", "LOSS"])),
+        })
+    return entries
+
+
+def _windows(seed: int) -> list[tuple]:
+    rng = np.random.default_rng(seed + 100)
+    spans = []
+    for _ in range(25):
+        a, b = np.sort(rng.integers(0, 21 * 24 * 60, size=2))
+        spans.append(tuple((BASE + timedelta(minutes=int(m))).strftime("%Y-%m-%d %H:%M") for m in (a, b)))
+    return WINDOWS + spans
+
+
+def _key(ts) -> str:
+    if ts is None:
+        return None
+    if isinstance(ts, datetime):
+        return ts.strftime("%Y-%m-%d %H:%M:%S")
+    return ts + ":00"
+
+
+def _inside(entry: dict, since, until) -> bool:
+    key = _key(entry["timestamp"])
+    return (since is None or key >= _key(since)) and (until is None or key < _key(until))
+
+
+def _bucket(entries) -> dict:
+    bucket = {"total": len(entries)}
+    for name in AGGREGATE_FIELDS:
+        bucket[name] = dict(Counter(e[name] for e in entries if e.get(name)))
+    return bucket
+
+
+def _partial_days(since, until) -> set:
+    """Jours incomplets aux bornes de [since, until[ (relus par aggregate)."""
+    days = set()
+    lo, hi = _key(since), _key(until)
+    if lo and not lo.endswith(" 00:00:00"):
+        days.add(lo[:10])
+    if hi and not hi.endswith(" 00:00:00") and (not lo or hi[:10] > lo[:10] or lo.endswith(" 00:00:00")):
+        days.add(hi[:10])
+    return days
+
+
+def _open(path, **kwargs) -> SignalJournal:
+    SignalJournal._states.pop(str(path), None)        # état partagé repris de zéro
+    return SignalJournal(str(path), legacy_path=None, **kwargs)
+
+
+@pytest.mark.parametrize("seed", [0, 1])
+def test_read_and_aggregate_match_brute_force(tmp_path, seed):
+    path = tmp_path / "signals_log.jsonl"
+    entries = _entries(seed)
+    journal = _open(path, max_bytes=8_000, backups=1_000, compact_every=97)
+    for entry in entries:
+        journal.append(entry)
+    with open(path, "ab") as f:                       # ligne tronquée d'un autre processus
+        f.write(b'{"id": -1, "timestamp": "2026-10-2\n')
+    journal.append({**entries[-1], "id": len(entries)})
+    entries.append({**entries[-1], "id": len(entries)})
+    journal.compact()
+
+    assert len(list(tmp_path.glob("signals_log.*.jsonl"))) > 10
+    for reader in (journal, _open(path, max_bytes=8_000, backups=1_000)):   # index rechargé
+        for since, until in _windows(seed):
+            expected = sorted((e for e in entries if _inside(e, since, until)), key=lambda e: _key(e["timestamp"]))
+            assert [e["id"] for e in reader.read(since, until)] == [e["id"] for e in expected]
+            assert [e["id"] for e in reader.read(since, until, limit=7)] == [e["id"] for e in expected[-7:]]
+            assert reader.aggregate(since, until) == _bucket(expected)
+
+
+def test_aggregate_keeps_counts_of_deleted_segments(tmp_path):
+    path = tmp_path / "signals_log.jsonl"
+    entries = _entries(2)
+    journal = _open(path, max_bytes=8_000, backups=3, compact_every=97)
+    for entry in entries:
+        journal.append(entry)
+
+    kept = {e["id"] for e in journal.read()}
+    archived = [e for e in entries if e["id"] not in kept]
+    assert archived and len(kept) < len(entries)
+
+    for reader in (journal, _open(path, max_bytes=8_000, backups=3)):
+        for since, until in _windows(2):
+            partial = _partial_days(since, until)
+            lo_day = _key(since)[:10] if since else None
+            hi_day = _key(until)[:10] if until else None
+            counted = [e for e in entries if e["id"] in kept and _inside(e, since, until)]
+            for e in archived:
+                day = e["timestamp"][:10]
+                full = (
+                    (lo_day is None or day > lo_day or (day == lo_day and day not in partial))
+                    and (hi_day is None or day < hi_day)
+                )
+                # Jour incomplet supprimé par la rotation : compté en entier
+                if full or day in partial:
+                    counted.append(e)
+            assert reader.aggregate(since, until) == _bucket(counted)
+
+
+def test_legacy_log_is_migrated(tmp_path):
+    import json
+
+    legacy = tmp_path / "signals_log.json"
+    entries = _entries(3, n=50)
+    legacy.write_text(json.dumps(list(reversed(entries))), encoding="utf-8")
+    SignalJournal._states.pop(str(tmp_path / "signals_log.jsonl"), None)
+    journal = SignalJournal(str(tmp_path / "signals_log.jsonl"), legacy_path=str(legacy))
+
+    ordered = sorted(entries, key=lambda e: e["timestamp"])
+    assert [e["id"] for e in journal.read()] == [e["id"] for e in ordered]
+    assert not legacy.exists() and (tmp_path / "signals_log.json.migrated").exists()
+    assert journal.aggregate() == _bucket(entries)
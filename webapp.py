@@ -10,6 +10,9 @@ Endpoints :
   GET  /api/stream/<scan_id>  → SSE : logs en temps réel
   GET  /api/results/<scan_id> → JSON : signaux détectés
   GET  /api/chart             → données OHLCV pour graphique
+  GET  /api/mtf-matrix        → JSON : matrice d'alignement MTF (heatmap)
+  GET  /api/metrics           → JSON : métriques du dernier scan (portes, durées)
+  GET  /api/signals           → JSON : journal des signaux (?since=&until=&limit=)
   GET  /pine/<filename>       → sert les fichiers Pine Script
   POST /api/analyze-image     → upload screenshot → analyse visuelle
   GET  /api/analysis/<id>     → résultats d'une analyse visuelle
@@ -44,6 +47,7 @@ TIMEFRAMES = ["30m", "1h", "4h"]
 
 # ── Stockage des scans en mémoire ─────────────────────────────────────────────
 SCANS: dict = {}
+_SCAN_START_LOCK = threading.Lock()   # vérification + création d'un scan atomiques
 ANALYSES: dict = {}  # Analyses visuelles
 
 logging.basicConfig(
@@ -90,13 +94,19 @@ def start_scan():
     pairs  = data.get("pairs", [])       or None
     tfs    = data.get("timeframes", [])  or None
 
-    scan_id = str(uuid.uuid4())
-    SCANS[scan_id] = {
-        "status"    : "running",
-        "signals"   : [],
-        "log_queue" : queue.Queue(maxsize=500),
-        "started_at": datetime.now().strftime("%H:%M:%S"),
-    }
+    # Un seul scan à la fois : les états du scanner sont partagés entre scans
+    with _SCAN_START_LOCK:
+        running = next((sid for sid, scan in SCANS.items() if scan["status"] == "running"), None)
+        if running:
+            return jsonify({"error": "Scan déjà en cours", "scan_id": running}), 409
+
+        scan_id = str(uuid.uuid4())
+        SCANS[scan_id] = {
+            "status"    : "running",
+            "signals"   : [],
+            "log_queue" : queue.Queue(maxsize=500),
+            "started_at": datetime.now().strftime("%H:%M:%S"),
+        }
 
     threading.Thread(
         target = _run_scan_thread,
@@ -215,6 +225,58 @@ def get_results(scan_id: str):
     })
 
 
+# ══════════════════════════════════════════════════════════════════════════════
+# API — MATRICE D'ALIGNEMENT MTF (heatmap)
+# ══════════════════════════════════════════════════════════════════════════════
+
+@app.route("/api/mtf-matrix")
+def get_mtf_matrix():
+    """Matrice tendance / force / niveau HTF calculée par le dernier scan."""
+    from scanner import latest_alignment_matrix
+    matrix = latest_alignment_matrix()
+    if matrix is None:
+        return jsonify({"error": "Aucun scan effectué"}), 404
+    return jsonify(matrix)
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+# API — MÉTRIQUES DU SCAN (portes / durées par étape)
+# ══════════════════════════════════════════════════════════════════════════════
+
+@app.route("/api/metrics")
+def get_scan_metrics():
+    """Compteurs par porte et par figure, durées par étape du dernier scan."""
+    from scanner import latest_scan_metrics
+    metrics = latest_scan_metrics()
+    if metrics is None:
+        return jsonify({"error": "Aucun scan effectué"}), 404
+    return jsonify(metrics)
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+# API — JOURNAL DES SIGNAUX (même source que ReportGenerator)
+# ══════════════════════════════════════════════════════════════════════════════
+
+@app.route("/api/signals")
+def get_signal_journal():
+    """Signaux journalisés sur [since, until[ (ex : ?since=2026-10-01&limit=100)."""
+    from bot.output.signal_journal import SignalJournal
+    since = request.args.get("since") or None
+    until = request.args.get("until") or None
+    try:
+        limit = int(request.args.get("limit", 500))
+    except ValueError:
+        return jsonify({"error": "limit invalide"}), 400
+
+    signals = SignalJournal().read(since=since, until=until, limit=limit)
+    return jsonify({
+        "count"  : len(signals),
+        "since"  : since or "",
+        "until"  : until or "",
+        "signals": signals,
+    })
+
+
 # ══════════════════════════════════════════════════════════════════════════════
 # API — DONNÉES OHLCV POUR GRAPHIQUE
 # ══════════════════════════════════════════════════════════════════════════════